@@ -6,20 +6,21 @@ on GPU-accelerated instances, while keeping the Railway backend responsive.
 """
 
 import asyncio
+import os
 from datetime import datetime
 from typing import Any
 from uuid import UUID
 
 import httpx
-from beam import Image, env, task_queue
+from beam import Image, env, schedule, task_queue
 
 # Structured logging
 from src.utils.logging import get_logger
 
 # Version tracking for debugging deployments
-BEAM_VERSION = "2.2.0"  # Update this when making changes
-DEPLOYMENT_DATE = "2025-09-01"
-CHANGES = "Added resource monitoring and removed GPU to optimize costs"
+BEAM_VERSION = "2.3.0"  # Update this when making changes
+DEPLOYMENT_DATE = "2025-10-22"
+CHANGES = "Split large indexing runs into shards processed by separate tasks"
 
 # Initialize logger
 logger = get_logger(__name__)
@@ -30,7 +31,16 @@ from src.models.pipeline import UploadType
 
 # Import our existing pipeline components
 from src.pipeline.indexing.orchestrator import IndexingOrchestrator
-from src.pipeline.shared.models import DocumentInput
+from src.pipeline.indexing.sharding import (
+    IndexingShard,
+    ShardCoordinator,
+    SupabaseShardLedger,
+    build_document_input,
+    heartbeat_shard,
+    plan_shards,
+    run_shard,
+)
+from src.services.pipeline_service import PipelineService
 from src.services.storage_service import StorageService
 from src.utils.resource_monitor import get_monitor, log_resources
 
@@ -282,7 +292,7 @@ async def run_indexing_pipeline_on_beam(
 
         # Quick database connectivity test
         try:
-            test_run = db.table("indexing_runs").select("id").eq("id", str(indexing_run_id)).execute()
+            test_run = db.table("indexing_runs").select("id, pipeline_config").eq("id", str(indexing_run_id)).execute()
             if not test_run.data:
                 logger.error("indexing_run_not_found", extra={
                     "run_id": indexing_run_id,
@@ -311,6 +321,7 @@ async def run_indexing_pipeline_on_beam(
 
         # Create document inputs for the pipeline
         document_inputs = []
+        document_rows = []
         logger.info("document_preparation_started", extra={
             "run_id": indexing_run_id,
             "document_count": len(document_ids)
@@ -329,18 +340,8 @@ async def run_indexing_pipeline_on_beam(
                     continue
 
                 doc_data = doc_result.data[0]
-                document_input = DocumentInput(
-                    document_id=UUID(doc_id),
-                    run_id=UUID(indexing_run_id),
-                    user_id=UUID(user_id) if user_id else None,
-                    file_path=doc_data.get("file_path", ""),
-                    filename=doc_data.get("filename", ""),
-                    upload_type=(UploadType.EMAIL if not user_id else UploadType.USER_PROJECT),
-                    project_id=UUID(project_id) if project_id else None,
-                    index_run_id=UUID(indexing_run_id),
-                    metadata={"project_id": str(project_id)} if project_id else {},
-                )
-                document_inputs.append(document_input)
+                document_inputs.append(build_document_input(doc_data, indexing_run_id, user_id, project_id))
+                document_rows.append(doc_data)
 
             except Exception as doc_error:
                 logger.error("document_preparation_error", extra={
@@ -368,6 +369,37 @@ async def run_indexing_pipeline_on_beam(
             "prepared_document_count": len(document_inputs)
         })
 
+        # Large runs fan out to one task per shard; the shard that finishes last finalizes the run
+        stored_config = test_run.data[0].get("pipeline_config") or {}
+        sharding_config = stored_config.get("indexing", {}).get("orchestration", {}).get("sharding", {})
+        if sharding_config.get("enabled", False):
+            shards = plan_shards(
+                document_rows,
+                max_shards=sharding_config.get("max_shards", 5),
+                min_pages_per_shard=sharding_config.get("min_pages_per_shard", 50),
+                page_shard_threshold=sharding_config.get("page_shard_threshold", 400),
+                pages_per_shard=sharding_config.get("pages_per_shard", 200),
+            )
+            if len(shards) > 1:
+                coordinator = ShardCoordinator(SupabaseShardLedger(db), PipelineService(use_admin_client=True), db=db)
+                await coordinator.dispatch(
+                    indexing_run_id,
+                    shards,
+                    submit_indexing_shard,
+                    task_kwargs={
+                        "user_id": user_id,
+                        "project_id": project_id,
+                        "webhook_url": webhook_url,
+                        "webhook_api_key": webhook_api_key,
+                    },
+                )
+                return {
+                    "status": "sharded",
+                    "indexing_run_id": indexing_run_id,
+                    "document_count": len(document_inputs),
+                    "shard_count": len(shards),
+                }
+
         # Initialize orchestrator
         logger.info("orchestrator_initializing", extra={
             "run_id": indexing_run_id,
@@ -494,6 +526,166 @@ async def run_indexing_pipeline_on_beam(
         }
 
 
+async def submit_indexing_shard(task_kwargs: dict[str, Any]) -> Any:
+    """Queue one shard of a sharded indexing run on the shard task queue."""
+    return await asyncio.to_thread(process_indexing_shard.put, **task_kwargs)
+
+
+async def run_indexing_shard_on_beam(
+    indexing_run_id: str,
+    shard: dict[str, Any],
+    user_id: str = None,
+    project_id: str = None,
+    webhook_url: str = None,
+    webhook_api_key: str = None,
+) -> dict[str, Any]:
+    """
+    Process one shard of a sharded indexing run and report it to the coordinator.
+
+    The shard that completes last merges all shard outcomes into the run status and
+    sends the wiki (or error) webhook for the whole run.
+    """
+    indexing_shard = IndexingShard.from_payload(shard)
+    db = get_supabase_admin_client()
+    coordinator = ShardCoordinator(SupabaseShardLedger(db), PipelineService(use_admin_client=True), db=db)
+    await coordinator.ledger.mark_running(indexing_run_id, indexing_shard.index)
+    logger.info("shard_started", extra={
+        "run_id": indexing_run_id,
+        "shard": indexing_shard.index,
+        "document_count": len(indexing_shard.document_ids),
+        "page_range": indexing_shard.page_range,
+        "beam_version": BEAM_VERSION,
+    })
+
+    # Keeps the shard from being reaped as lost while it is still processing
+    heartbeat = asyncio.create_task(heartbeat_shard(coordinator.ledger, indexing_run_id, indexing_shard.index))
+    error_message = None
+    try:
+        document_results = await run_shard(indexing_run_id, indexing_shard, user_id, project_id, db=db)
+    except Exception as e:
+        logger.error("shard_processing_error", extra={
+            "run_id": indexing_run_id,
+            "shard": indexing_shard.index,
+            "error": str(e)
+        }, exc_info=True)
+        document_results, error_message = {}, str(e)
+    finally:
+        heartbeat.cancel()
+
+    status = "completed" if any(document_results.values()) else "failed"
+    return await complete_indexing_shard(
+        coordinator, indexing_run_id, indexing_shard, status, document_results, error_message,
+        webhook_url, webhook_api_key,
+    )
+
+
+async def complete_indexing_shard(
+    coordinator: ShardCoordinator,
+    indexing_run_id: str,
+    indexing_shard: IndexingShard,
+    status: str,
+    document_results: dict[str, bool],
+    error_message: str = None,
+    webhook_url: str = None,
+    webhook_api_key: str = None,
+) -> dict[str, Any]:
+    """Record a shard's outcome; if it was the last shard, notify Railway about the run.
+
+    While other shards are still open, those that stopped reporting are recorded as
+    failed, so a lost shard doesn't keep the run open.
+    """
+    run_succeeded = await coordinator.complete_shard(
+        indexing_run_id, indexing_shard.index, status, document_results, error_message
+    )
+    if run_succeeded is None:
+        run_succeeded = await coordinator.reap_stale_shards(indexing_run_id)
+    await notify_indexing_run_finalized(indexing_run_id, run_succeeded, webhook_url, webhook_api_key)
+
+    return {
+        "status": status,
+        "indexing_run_id": indexing_run_id,
+        "shard": indexing_shard.index,
+        "document_results": document_results,
+        "run_finalized": run_succeeded is not None,
+    }
+
+
+async def notify_indexing_run_finalized(
+    indexing_run_id: str, run_succeeded: bool | None, webhook_url: str = None, webhook_api_key: str = None
+) -> None:
+    """Trigger wiki generation (or the error webhook) once a sharded run is finalized."""
+    if run_succeeded is True:
+        if webhook_url and webhook_api_key:
+            await trigger_wiki_generation(indexing_run_id, webhook_url, webhook_api_key)
+    elif run_succeeded is False:
+        await trigger_error_webhook(
+            indexing_run_id, "Indexing pipeline failed during processing", webhook_url, webhook_api_key
+        )
+
+
+async def reap_stale_indexing_shards() -> dict[str, Any]:
+    """
+    Fail shards of every sharded run that stopped reporting, finalizing runs they kept open.
+
+    Covers runs whose remaining shards all died: no shard is left to reap them on
+    completion. The webhook is configured from the environment, as on Railway.
+    """
+    db = get_supabase_admin_client()
+    coordinator = ShardCoordinator(SupabaseShardLedger(db), PipelineService(use_admin_client=True), db=db)
+    backend_url = os.getenv("BACKEND_API_URL")
+    webhook_url = f"{backend_url}/api/wiki/internal/webhook" if backend_url else None
+    webhook_api_key = os.getenv("BEAM_WEBHOOK_API_KEY")
+
+    finalized = {}
+    for indexing_run_id in await coordinator.ledger.list_unfinished_runs():
+        try:
+            run_succeeded = await coordinator.reap_stale_shards(indexing_run_id)
+        except Exception as e:
+            logger.error("shard_reaping_failed", extra={"run_id": indexing_run_id, "error": str(e)}, exc_info=True)
+            continue
+        if run_succeeded is not None:
+            finalized[indexing_run_id] = run_succeeded
+            await notify_indexing_run_finalized(indexing_run_id, run_succeeded, webhook_url, webhook_api_key)
+    logger.info("stale_shards_reaped", extra={"finalized_runs": finalized})
+    return {"finalized_runs": finalized}
+
+
+async def run_indexing_shard_with_timeout_buffer(
+    indexing_run_id: str,
+    shard: dict[str, Any],
+    user_id: str = None,
+    project_id: str = None,
+    webhook_url: str = None,
+    webhook_api_key: str = None,
+) -> dict[str, Any]:
+    """Shard counterpart of run_indexing_pipeline_with_timeout_buffer (3.5h of Beam's 4h)."""
+    internal_timeout = 3.5 * 3600
+
+    try:
+        return await asyncio.wait_for(
+            run_indexing_shard_on_beam(
+                indexing_run_id, shard, user_id, project_id, webhook_url, webhook_api_key
+            ),
+            timeout=internal_timeout
+        )
+    except asyncio.TimeoutError:
+        timeout_error_message = "Processing timeout: Shard exceeded 3.5 hour limit (Beam has 4h hard timeout)"
+        logger.error("shard_internal_timeout_reached", extra={
+            "run_id": indexing_run_id,
+            "shard": shard.get("index"),
+            "timeout_hours": 3.5
+        })
+
+        # Record the shard as failed so the remaining shards can still finalize the run
+        db = get_supabase_admin_client()
+        coordinator = ShardCoordinator(SupabaseShardLedger(db), PipelineService(use_admin_client=True), db=db)
+        await complete_indexing_shard(
+            coordinator, indexing_run_id, IndexingShard.from_payload(shard), "failed", {},
+            timeout_error_message, webhook_url, webhook_api_key,
+        )
+        raise Exception(timeout_error_message)
+
+
 @task_queue(
     name="construction-rag-indexing",
     cpu=10,  # Optimized: 10 cores for 5 workers (2 cores each)
@@ -610,3 +802,77 @@ def process_documents(
             "document_count": len(document_ids)
         })
         return {"status": "local_dev_mode", "document_count": len(document_ids)}
+
+
+@task_queue(
+    name="construction-rag-indexing-shard",
+    cpu=10,
+    memory="20Gi",
+    workers=5,
+    image=Image(
+        python_version="python3.11",
+        python_packages="beam_requirements.txt",
+        commands=[
+            "apt-get update",
+            "apt-get install -y libgl1-mesa-glx libglib2.0-0 libsm6 libxext6 libxrender-dev libxrender1 libgomp1",
+            "apt-get install -y libgcc-s1 libstdc++6 fonts-liberation",
+            "apt-get install -y poppler-utils tesseract-ocr tesseract-ocr-dan tesseract-ocr-eng",
+            "apt-get install -y libjpeg-dev libpng-dev libtiff-dev libwebp-dev",
+            "tesseract --version && pdfinfo -v || echo 'Warning: Some dependencies may not be properly installed'"
+        ],
+    ),
+    timeout=14400,
+)
+def process_indexing_shard(
+    indexing_run_id: str,
+    shard: dict,
+    user_id: str = None,
+    project_id: str = None,
+    webhook_url: str = None,
+    webhook_api_key: str = None,
+):
+    """
+    Beam task queue entry point for one shard of a sharded indexing run.
+
+    Submitted by process_documents when a run is split into shards (see
+    src/pipeline/indexing/sharding.py); each shard runs on its own container.
+    """
+    logger.info("beam_shard_task_started", extra={
+        "beam_version": BEAM_VERSION,
+        "run_id": indexing_run_id,
+        "shard": shard.get("index"),
+        "start_time": datetime.now().isoformat(),
+        "environment": "remote_beam" if env.is_remote() else "local"
+    })
+
+    if env.is_remote():
+        return asyncio.run(
+            run_indexing_shard_with_timeout_buffer(
+                indexing_run_id, shard, user_id, project_id, webhook_url, webhook_api_key
+            )
+        )
+
+    logger.info("local_development_mode", extra={
+        "run_id": indexing_run_id,
+        "shard": shard.get("index")
+    })
+    return {"status": "local_dev_mode", "shard": shard.get("index")}
+
+
+@schedule(
+    when="*/10 * * * *",
+    name="construction-rag-indexing-shard-reaper",
+    cpu=1,
+    memory="1Gi",
+    image=Image(python_version="python3.11", python_packages="beam_requirements.txt"),
+)
+def reap_indexing_shards():
+    """
+    Beam scheduled job that fails lost shards of sharded indexing runs.
+
+    A shard task killed by the platform (out of memory, preemption) never reports;
+    see ShardCoordinator.reap_stale_shards in src/pipeline/indexing/sharding.py.
+    """
+    if env.is_remote():
+        return asyncio.run(reap_stale_indexing_shards())
+    return {"status": "local_dev_mode"}
@@ -4,7 +4,12 @@ from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import HTTPAuthorizationCredentials
 from pydantic import BaseModel, EmailStr
 
-from src.services.auth_service import auth_service, get_current_user, security
+from src.services.auth_service import (
+    auth_service,
+    get_current_user,  # noqa: F401  # re-export: src.api.pipeline imports it from here
+    get_current_user_verified,
+    security,
+)
 from src.utils.exceptions import AppError, AuthenticationError
 from src.utils.logging import get_logger
 
@@ -107,9 +112,9 @@ async def reset_password(request: PasswordResetRequest):
 
 @router.get("/me", tags=["Authentication"])
 async def get_current_user_info(
-    current_user: dict[str, Any] = Depends(get_current_user),
+    current_user: dict[str, Any] = Depends(get_current_user_verified),
 ):
-    """Get current user information"""
+    """Get current user information (session checked with Supabase Auth)"""
     return current_user
 
 
@@ -12,6 +12,8 @@ except Exception:
     raise
 
 from ..config.database import get_db_client_for_request, get_supabase_client
+from ..pipeline.shared.progress_tracker import BATCH_OPERATIONS, split_run_step_key
+from ..services.async_db import aexecute, arun
 from ..services.auth_service import get_current_user_optional
 from ..services.pipeline_read_service import PipelineReadService
 from ..services.pipeline_service import PipelineService
@@ -90,7 +92,7 @@ async def list_indexing_runs_with_wikis(
         # Check if project_wikis table exists, fallback to old method if not
         try:
             test_query = db.table("project_wikis").select("id").limit(1)
-            test_res = test_query.execute()
+            test_res = await aexecute(test_query)
             logger.info("Using project_wikis junction table")
             use_junction_table = True
         except Exception as test_e:
@@ -117,7 +119,7 @@ async def list_indexing_runs_with_wikis(
                 .range(offset, offset + limit - 1)
             )
             
-            res = query.execute()
+            res = await aexecute(query)
             
             # Transform the response to flatten the wiki data
             result_data = []
@@ -171,7 +173,7 @@ async def list_user_projects_with_wikis(
         # Check if project_wikis table exists
         try:
             test_query = db.table("project_wikis").select("id").limit(1)
-            test_res = test_query.execute()
+            test_res = await aexecute(test_query)
             logger.info("✅ Using project_wikis junction table for user projects")
         except Exception as test_e:
             logger.warning(f"❌ project_wikis table not available: {test_e}")
@@ -188,7 +190,7 @@ async def list_user_projects_with_wikis(
         )
         
         logger.info(f"🔍 First checking basic query: user_id={current_user['id']}, upload_type=user_project")
-        basic_res = basic_query.execute()
+        basic_res = await aexecute(basic_query)
         logger.info(f"🔢 Basic query returned {len(basic_res.data or [])} rows")
         
         for row in basic_res.data or []:
@@ -215,7 +217,7 @@ async def list_user_projects_with_wikis(
         logger.info(f"🔍 Full query filters: user_id={current_user['id']}, upload_type=user_project, wiki_status=completed, pages_count>0")
         
         logger.info(f"📊 Executing query for user {current_user['id']}")
-        res = query.execute()
+        res = await aexecute(query)
         logger.info(f"🔢 Query returned {len(res.data or [])} rows")
         
         # Group by project_id and take the latest wiki for each project
@@ -264,7 +266,7 @@ async def list_user_projects_with_wikis(
                 .in_("id", list(project_ids))
                 .is_("deleted_at", "null")
             )
-            projects_res = projects_query.execute()
+            projects_res = await aexecute(projects_query)
             
             # Update project names and descriptions
             for project_row in projects_res.data or []:
@@ -315,13 +317,12 @@ async def list_indexing_runs(
         
         if current_user is None:
             # Anonymous access: only show email uploads
-            res = (
+            res = await aexecute(
                 db.table("indexing_runs")
                 .select("id, upload_type, project_id, status, started_at, completed_at, error_message")
                 .eq("upload_type", "email")
                 .order("started_at", desc=True)
                 .range(offset, offset + limit - 1)
-                .execute()
             )
             return list(res.data or [])
         
@@ -329,27 +330,25 @@ async def list_indexing_runs(
         reader = PipelineReadService(client=db_client)
         if project_id is None:
             # Fallback to recent runs across all user's projects
-            runs = reader.list_recent_runs_for_user(current_user["id"], limit=min(limit, 50))
+            runs = await arun(reader.list_recent_runs_for_user, current_user["id"], limit=min(limit, 50))
             return runs
         # Filter by specific project
         # Simple select with ownership check similar to get_run_for_user
-        proj = (
+        proj = await aexecute(
             db.table("projects")
             .select("id")
             .eq("id", str(project_id))
             .eq("user_id", current_user["id"])
             .limit(1)
-            .execute()
         )
         if not proj.data:
             return []
-        res = (
+        res = await aexecute(
             db.table("indexing_runs")
             .select("id, upload_type, project_id, status, started_at, completed_at, error_message")
             .eq("project_id", str(project_id))
             .order("started_at", desc=True)
             .range(offset, offset + limit - 1)
-            .execute()
         )
         return list(res.data or [])
     except HTTPException as exc:
@@ -381,7 +380,7 @@ async def get_indexing_run(
         raise AppError("Indexing run not found", error_code=ErrorCode.NOT_FOUND)
 
     if current_user:
-        allowed = reader.get_run_for_user(str(run_id), current_user["id"])
+        allowed = await arun(reader.get_run_for_user, str(run_id), current_user["id"])
         if not allowed:
             from ..shared.errors import ErrorCode
             from ..utils.exceptions import AppError
@@ -423,7 +422,7 @@ async def get_flat_indexing_run_progress(
 
         raise AppError("Indexing run not found", error_code=ErrorCode.NOT_FOUND)
     if current_user:
-        allowed = reader.get_run_for_user(str(run_id), current_user["id"])
+        allowed = await arun(reader.get_run_for_user, str(run_id), current_user["id"])
         if not allowed:
             from ..shared.errors import ErrorCode
             from ..utils.exceptions import AppError
@@ -436,19 +435,20 @@ async def get_flat_indexing_run_progress(
 
             raise AppError("Access denied: Authentication required", error_code=ErrorCode.ACCESS_DENIED)
 
-    documents_result = (
-        svc.supabase.table("indexing_run_documents").select("document_id").eq("indexing_run_id", str(run_id)).execute()
+    documents_result = await aexecute(
+        svc.supabase.table("indexing_run_documents").select("document_id").eq("indexing_run_id", str(run_id))
     )
     document_ids = [doc["document_id"] for doc in (documents_result.data or [])]
 
     document_status: dict[str, Any] = {}
     if document_ids:
-        documents_result = (
-            svc.supabase.table("documents").select("id, filename, step_results").in_("id", document_ids).execute()
+        documents_result = await aexecute(
+            svc.supabase.table("documents").select("id, filename").in_("id", document_ids)
         )
+        latest_step_results = await svc.get_latest_document_step_results(document_ids)
         for doc in documents_result.data or []:
             doc_id = doc["id"]
-            step_results = doc.get("step_results", {})
+            step_results = latest_step_results.get(doc_id, {})
             completed_steps = len([s for s in step_results.values() if s.get("status") == "completed"])
             total_steps = 5
             document_status[doc_id] = {
@@ -477,8 +477,9 @@ async def get_flat_indexing_run_progress(
         }
     else:
         run_step_results_dict = run_step_results
+    run_step_results_dict = _group_shard_step_results(run_step_results_dict)
 
-    completed_run_steps = len([s for s in run_step_results_dict.values() if s.get("status") == "completed"])
+    completed_run_steps = _count_completed_run_steps(run_step_results_dict)
     total_run_steps = 1
 
     all_step_results: dict[str, Any] = {}
@@ -524,6 +525,43 @@ async def get_flat_indexing_run_progress(
     }
 
 
+def _group_shard_step_results(run_step_results: dict[str, Any]) -> dict[str, Any]:
+    """Nest the per-shard entries of sharded runs (``embedding:shard_0``) under their step.
+
+    The step's status is failed if any shard's is, completed if all shards' are, else running.
+    """
+    grouped: dict[str, Any] = {}
+    shard_entries: dict[str, dict[int, Any]] = {}
+    for key, entry in run_step_results.items():
+        step, shard_index = split_run_step_key(key)
+        if shard_index is None:
+            grouped[step] = {**grouped.get(step, {}), **entry}
+        else:
+            shard_entries.setdefault(step, {})[shard_index] = entry
+
+    for step, entries in shard_entries.items():
+        statuses = {entry.get("status") for entry in entries.values()}
+        if "failed" in statuses:
+            status = "failed"
+        elif statuses == {"completed"}:
+            status = "completed"
+        else:
+            status = "running"
+        grouped[step] = {
+            "status": status,
+            **grouped.get(step, {}),
+            "shards": {str(index): entries[index] for index in sorted(entries)},
+        }
+    return grouped
+
+
+def _count_completed_run_steps(run_step_results: dict[str, Any]) -> int:
+    """Completed run steps: the batch embedding only (admission, resource_usage and sharding are diagnostics)"""
+    return int(
+        any(step in BATCH_OPERATIONS and entry.get("status") == "completed" for step, entry in run_step_results.items())
+    )
+
+
 def _infer_current_step(step_results: dict) -> str:
     if not step_results:
         return "waiting"
@@ -558,7 +596,7 @@ async def get_flat_indexing_run_summary(
         
         # Access control (same logic as progress endpoint)
         if current_user:
-            allowed = reader.get_run_for_user(str(run_id), current_user["id"])
+            allowed = await arun(reader.get_run_for_user, str(run_id), current_user["id"])
             if not allowed:
                 from ..shared.errors import ErrorCode
                 from ..utils.exceptions import AppError
@@ -572,8 +610,8 @@ async def get_flat_indexing_run_summary(
                 raise AppError("Access denied: Authentication required", error_code=ErrorCode.ACCESS_DENIED)
 
         # Get documents linked to this indexing run
-        documents_result = (
-            svc.supabase.table("indexing_run_documents").select("document_id").eq("indexing_run_id", str(run_id)).execute()
+        documents_result = await aexecute(
+            svc.supabase.table("indexing_run_documents").select("document_id").eq("indexing_run_id", str(run_id))
         )
         document_ids = [doc["document_id"] for doc in (documents_result.data or [])]
 
@@ -585,13 +623,14 @@ async def get_flat_indexing_run_summary(
         total_chunks = 0
 
         if document_ids:
-            documents_result = (
-                svc.supabase.table("documents").select("id, filename, step_results").in_("id", document_ids).execute()
+            documents_result = await aexecute(
+                svc.supabase.table("documents").select("id, filename").in_("id", document_ids)
             )
-            
+            latest_step_results = await svc.get_latest_document_step_results(document_ids)
+
             for doc in documents_result.data or []:
                 pdf_names.append(doc["filename"])
-                step_results = doc.get("step_results", {})
+                step_results = latest_step_results.get(doc["id"], {})
                 
                 # Extract page count from PartitionStep
                 partition_step = step_results.get("PartitionStep", {})
@@ -645,13 +684,12 @@ async def create_indexing_run(
         # Basic ownership check if project specified
         if project_id is not None:
             db = get_supabase_client()
-            proj = (
+            proj = await aexecute(
                 db.table("projects")
                 .select("id")
                 .eq("id", str(project_id))
                 .eq("user_id", current_user["id"])
                 .limit(1)
-                .execute()
             )
             if not proj.data:
                 from ..shared.errors import ErrorCode
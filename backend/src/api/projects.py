@@ -11,13 +11,15 @@ from pydantic import BaseModel
 from src.config.database import get_db_client_for_request, get_supabase_client
 from src.models.base import AccessLevel
 from src.models.pipeline import ProjectCreate, ProjectUpdate
-from src.services.auth_service import get_current_user
+from src.services.auth_service import get_current_user, get_current_user_verified
 from src.services.project_service import ProjectService
 
 router = APIRouter(prefix="/api", tags=["Projects"])
 
 DB_CLIENT_DEP = Depends(get_db_client_for_request)
 CURRENT_USER_DEP = Depends(get_current_user)
+# Destructive endpoints re-check the session with Supabase Auth (revoked sessions fail immediately)
+VERIFIED_USER_DEP = Depends(get_current_user_verified)
 
 
 class ProjectResponse(BaseModel):
@@ -160,7 +162,7 @@ async def update_project(
 @router.delete("/projects/{project_id}", response_model=dict[str, Any])
 async def delete_project(
     project_id: UUID,
-    current_user: dict[str, Any] = CURRENT_USER_DEP,
+    current_user: dict[str, Any] = VERIFIED_USER_DEP,
     db_client=DB_CLIENT_DEP,
 ):
     """Soft delete a project (marks as deleted but keeps data for recovery)."""
@@ -14,7 +14,7 @@ from src.config.database import (
     get_supabase_client,
 )
 from src.pipeline.querying.models import QueryRequest
-from src.pipeline.querying.orchestrator import QueryPipelineOrchestrator
+from src.pipeline.querying.orchestrator import QueryPipelineOrchestrator, get_query_pipeline
 from src.services.auth_service import get_current_user_optional
 from src.services.query_service import QueryReadService, QueryService
 from src.shared.errors import ErrorCode
@@ -31,11 +31,9 @@ DB_CLIENT_DEP = Depends(get_db_client_for_request)
 CURRENT_USER_DEP = Depends(get_current_user_optional)
 
 
-async def get_query_orchestrator(
-    db_client=DB_CLIENT_DEP,
-) -> QueryPipelineOrchestrator:
-    """Provide orchestrator bound to request-scoped client for RLS-aware retrieval."""
-    return QueryPipelineOrchestrator(db_client=db_client)
+async def get_query_orchestrator() -> QueryPipelineOrchestrator:
+    """Provide the application-scoped pipeline; the request-scoped client is passed per query."""
+    return get_query_pipeline()
 
 
 ## Legacy endpoint cluster removed in v2
@@ -57,6 +55,7 @@ async def create_query(
     payload: CreateQueryRequest,
     current_user: dict[str, Any] | None = CURRENT_USER_DEP,
     orchestrator: QueryPipelineOrchestrator = ORCH_DEP,
+    db_client=DB_CLIENT_DEP,
 ):
     svc = QueryService()
     result = await svc.create_query(
@@ -64,6 +63,7 @@ async def create_query(
         query_text=payload.query,
         indexing_run_id=payload.indexing_run_id,
         orchestrator=orchestrator,
+        db_client=db_client,
     )
     return result
 
@@ -76,7 +76,7 @@ async def list_queries(
     db_client=DB_CLIENT_DEP,
 ):
     reader = QueryReadService(client=db_client)
-    return reader.list_queries(user=current_user, limit=min(limit, 100), offset=max(offset, 0))
+    return await reader.list_queries(user=current_user, limit=min(limit, 100), offset=max(offset, 0))
 
 
 @flat_router.get("/queries/{query_id}", response_model=dict)
@@ -86,7 +86,7 @@ async def get_query(
     db_client=DB_CLIENT_DEP,
 ):
     reader = QueryReadService(client=db_client)
-    row = reader.get_query(query_id=query_id, user=current_user)
+    row = await reader.get_query(query_id=query_id, user=current_user)
     if not row:
         raise AppError("Query not found", error_code=ErrorCode.NOT_FOUND)
     return row
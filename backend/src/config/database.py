@@ -1,5 +1,13 @@
+import threading
+import time
+from typing import Any
+
+import httpx
+from postgrest import SyncPostgrestClient
+from postgrest.constants import DEFAULT_POSTGREST_CLIENT_HEADERS
+
 from src.config.settings import get_settings
-from supabase import Client, create_client
+from supabase import Client
 
 try:
     # Only imported when used inside FastAPI context
@@ -7,29 +15,151 @@ try:
 except Exception:
     Header = None  # type: ignore[assignment]
 
-# Global Supabase client
+# Global Supabase clients (process-wide, sharing one HTTP connection pool)
 _supabase_client: Client | None = None
+_supabase_admin_client: Client | None = None
+_transport: httpx.HTTPTransport | None = None
+_pool_settings: dict[str, Any] = {}
+_lock = threading.RLock()
+
+
+def _get_transport() -> httpx.HTTPTransport:
+    """Keep-alive HTTP/2 connection pool shared by every PostgREST session in this process"""
+    global _transport
+    if _transport is None:
+        with _lock:
+            if _transport is None:
+                settings = get_settings()
+                _pool_settings.update(
+                    url=settings.supabase_url,
+                    anon_key=settings.supabase_anon_key,
+                    pool_size=settings.supabase_pool_size,
+                    keepalive_seconds=settings.supabase_keepalive_seconds,
+                    timeout_seconds=settings.supabase_timeout_seconds,
+                )
+                _transport = httpx.HTTPTransport(
+                    http2=True,
+                    retries=1,
+                    limits=httpx.Limits(
+                        max_connections=settings.supabase_pool_size,
+                        max_keepalive_connections=settings.supabase_pool_size,
+                        keepalive_expiry=settings.supabase_keepalive_seconds,
+                    ),
+                )
+    return _transport
+
+
+def _pooled_session() -> httpx.Client:
+    """httpx session on the shared pool: no new TLS context or sockets, so cheap per client"""
+    transport = _get_transport()
+    return httpx.Client(transport=transport, timeout=_pool_settings["timeout_seconds"], follow_redirects=True)
+
+
+class PooledClient(Client):
+    """supabase Client whose PostgREST session runs on the shared connection pool"""
+
+    @property
+    def postgrest(self):
+        if self._postgrest is None:
+            self._postgrest = SyncPostgrestClient(
+                self.rest_url,
+                headers=self.options.headers,
+                schema=self.options.schema,
+                http_client=_pooled_session(),
+            )
+        return self._postgrest
+
+
+class ScopedClient:
+    """Request-scoped PostgREST access authenticated with the caller's JWT.
+
+    table()/from_()/rpc() send the caller's Authorization header so RLS evaluates
+    with auth.uid(), over the shared connection pool. Other attributes (storage,
+    auth) are served by the anon client.
+    """
+
+    def __init__(self, token: str):
+        _get_transport()
+        url, anon_key = _pool_settings["url"], _pool_settings["anon_key"]
+        if not url or not anon_key:
+            raise ValueError("Supabase URL and anon key are required")
+        self.postgrest = SyncPostgrestClient(
+            f"{url}/rest/v1",
+            headers={**DEFAULT_POSTGREST_CLIENT_HEADERS, "apiKey": anon_key, "Authorization": f"Bearer {token}"},
+            http_client=_pooled_session(),
+        )
+
+    def table(self, table_name: str):
+        return self.postgrest.from_(table_name)
+
+    def from_(self, table_name: str):
+        return self.postgrest.from_(table_name)
+
+    def rpc(self, fn: str, params: dict | None = None, **kwargs: Any):
+        return self.postgrest.rpc(fn, params or {}, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(get_supabase_client(), name)
 
 
 def get_supabase_client() -> Client:
     """Get Supabase client singleton"""
     global _supabase_client
     if _supabase_client is None:
-        settings = get_settings()
-        if not settings.supabase_url or not settings.supabase_anon_key:
-            raise ValueError("Supabase URL and anon key are required")
+        with _lock:
+            if _supabase_client is None:
+                settings = get_settings()
+                if not settings.supabase_url or not settings.supabase_anon_key:
+                    raise ValueError("Supabase URL and anon key are required")
 
-        _supabase_client = create_client(settings.supabase_url, settings.supabase_anon_key)
+                _supabase_client = PooledClient.create(settings.supabase_url, settings.supabase_anon_key)
     return _supabase_client
 
 
 def get_supabase_admin_client() -> Client:
-    """Get Supabase admin client with service role key"""
-    settings = get_settings()
-    if not settings.supabase_url or not settings.supabase_service_role_key:
-        raise ValueError("Supabase URL and service role key are required")
+    """Get the process-wide Supabase admin client (service role key) on the shared connection pool"""
+    global _supabase_admin_client
+    if _supabase_admin_client is None:
+        with _lock:
+            if _supabase_admin_client is None:
+                settings = get_settings()
+                if not settings.supabase_url or not settings.supabase_service_role_key:
+                    raise ValueError("Supabase URL and service role key are required")
+
+                _supabase_admin_client = PooledClient.create(settings.supabase_url, settings.supabase_service_role_key)
+    return _supabase_admin_client
+
+
+def reset_supabase_clients() -> None:
+    """Drop cached clients and close the connection pool; the next call rebuilds them"""
+    global _supabase_client, _supabase_admin_client, _transport
+    with _lock:
+        transport, _transport = _transport, None
+        _supabase_client = None
+        _supabase_admin_client = None
+        _pool_settings.clear()
+    if transport is not None:
+        transport.close()
+
+
+def check_supabase_health() -> dict[str, Any]:
+    """Round-trip a minimal admin query over the pool and report its latency"""
+    started = time.perf_counter()
+    try:
+        get_supabase_admin_client().table("indexing_runs").select("id").limit(1).execute()
+        healthy, error = True, None
+    except Exception as e:
+        healthy, error = False, str(e)
 
-    return create_client(settings.supabase_url, settings.supabase_service_role_key)
+    health: dict[str, Any] = {
+        "healthy": healthy,
+        "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+        "pool_size": _pool_settings.get("pool_size"),
+        "keepalive_seconds": _pool_settings.get("keepalive_seconds"),
+    }
+    if error:
+        health["error"] = error
+    return health
 
 
 async def test_database_connection() -> bool:
@@ -66,22 +196,20 @@ def get_anon_client() -> Client:
     return get_supabase_client()
 
 
-def get_supabase_client_for_token(token: str | None) -> Client:
-    """Return an anon client authenticated with a bearer token when provided.
+def get_supabase_client_for_token(token: str | None) -> Client | ScopedClient:
+    """Return a client authenticated with a bearer token when provided.
 
-    This enables per-request RLS-enforced access using the caller's auth context.
+    This enables per-request RLS-enforced access using the caller's auth context,
+    without mutating the shared anon client or opening new connections.
     Falls back to anon when token is missing/invalid.
     """
-    client = get_supabase_client()
-    try:
-        if token:
-            # Authenticate PostgREST with the user's JWT so RLS evaluates with auth.uid()
-            # supabase-py exposes postgrest.auth(token) for request-scoped auth
-            client.postgrest.auth(token)  # type: ignore[attr-defined]
-    except Exception:
-        # Non-fatal: keep anon client
-        pass
-    return client
+    if token:
+        try:
+            return ScopedClient(token)
+        except Exception:
+            # Non-fatal: keep anon client
+            pass
+    return get_supabase_client()
 
 
 def get_db_client_for_request(authorization: str | None = Header(None)) -> Client:  # type: ignore[valid-type]
@@ -14,6 +14,18 @@ class Settings(BaseSettings):
     supabase_url: str | None = None
     supabase_anon_key: str | None = None
     supabase_service_role_key: str | None = None
+    # Threads available to async code for blocking supabase-py calls (see services/async_db.py)
+    supabase_max_concurrent_queries: int = 16
+    # Shared HTTP connection pool for PostgREST (admin and request-scoped clients)
+    supabase_pool_size: int = 20
+    supabase_keepalive_seconds: float = 60.0
+    supabase_timeout_seconds: float = 120.0
+    # Local access-token verification: HS256 with the project's JWT secret, or the
+    # project's JWKS for asymmetric signing keys (see services/token_verifier.py)
+    supabase_jwt_secret: str | None = None
+    auth_jwks_cache_seconds: float = 600.0
+    auth_profile_cache_size: int = 1024
+    auth_profile_cache_ttl_seconds: float = 60.0
 
     # AI/ML APIs
     openai_api_key: str | None = None
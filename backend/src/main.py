@@ -75,6 +75,19 @@ async def validate_startup_config() -> None:
     cfg.validate_startup()
 
 
+@app.on_event("startup")
+async def warm_query_pipeline() -> None:
+    """Build the shared query pipeline before the first query arrives."""
+    from src.pipeline.querying.orchestrator import get_query_pipeline
+    from src.utils.logging import get_logger
+
+    try:
+        get_query_pipeline()
+    except Exception as e:
+        # Not fatal: the first query builds it (and surfaces the error) instead
+        get_logger(__name__).warning(f"Query pipeline warm-up failed: {e}")
+
+
 @app.on_event("shutdown")
 async def shutdown_services() -> None:
     """Clean shutdown of services."""
@@ -110,6 +123,20 @@ async def api_health():
     }
 
 
+@app.get("/api/health/db")
+async def api_health_db():
+    """Database health: admin query round-trip over the shared connection pool"""
+    from src.config.database import check_supabase_health
+    from src.services.async_db import arun
+
+    health = await arun(check_supabase_health)
+    return {
+        "status": "healthy" if health["healthy"] else "unhealthy",
+        "database": health,
+        "timestamp": datetime.utcnow().isoformat(),
+    }
+
+
 @app.get("/api/debug/env")
 async def debug_env():
     """Debug endpoint to check environment variables (guarded)."""
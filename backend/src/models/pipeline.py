@@ -72,6 +72,9 @@ class StepResult(BaseModel):
     error_message: str | None = Field(None, description="Error message if failed")
     error_details: dict[str, Any] | None = Field(None, description="Detailed error info")
 
+    # Resource usage while the step ran (mean/p95/peak CPU, RSS, open FDs, threads)
+    resource_usage: dict[str, Any] | None = Field(None, description="Sampled resource usage during execute")
+
     # Timestamps
     started_at: datetime = Field(default_factory=datetime.utcnow)
     completed_at: datetime | None = Field(None)
@@ -25,13 +25,12 @@ async def retrieve_chunks_for_query(
     try:
         # Initialize Voyage client (following wiki generation pattern)
         settings = get_settings()
-        voyage_client = VoyageEmbeddingClient(
+        async with VoyageEmbeddingClient(
             api_key=settings.voyage_api_key,
             model="voyage-multilingual-2"
-        )
-        
-        # Generate query embedding
-        embeddings = await voyage_client.get_embeddings([query])
+        ) as voyage_client:
+            # Generate query embedding
+            embeddings = await voyage_client.get_embeddings([query])
         query_embedding = embeddings[0] if embeddings else []
         
         if not query_embedding:
@@ -171,14 +170,13 @@ async def retrieve_chunks_for_queries_batch(
     try:
         # Initialize Voyage client (following wiki generation pattern)
         settings = get_settings()
-        voyage_client = VoyageEmbeddingClient(
+        async with VoyageEmbeddingClient(
             api_key=settings.voyage_api_key,
             model="voyage-multilingual-2"
-        )
-        
-        # Generate embeddings for all queries in batch (key optimization!)
-        logger.info(f"🚀 Generating embeddings for {len(queries)} queries in batch")
-        query_embeddings = await voyage_client.get_embeddings(queries)
+        ) as voyage_client:
+            # Generate embeddings for all queries in batch (key optimization!)
+            logger.info(f"🚀 Generating embeddings for {len(queries)} queries in batch")
+            query_embeddings = await voyage_client.get_embeddings(queries)
         
         if not query_embeddings or len(query_embeddings) != len(queries):
             logger.warning(f"Failed to generate embeddings for all queries")
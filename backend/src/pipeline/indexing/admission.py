@@ -0,0 +1,200 @@
+"""Resource-adaptive admission of documents into an indexing run.
+
+A fixed number of concurrent documents is wrong in both directions: one large
+scanned PDF can exhaust the worker's memory, while a batch of small PDFs leaves
+it idle. ``AdmissionController`` admits the next document only when the
+projected memory use stays below ``1 - min_headroom_fraction`` of the
+container limit:
+
+- current usage comes from ``ResourceMonitor.sample()`` (RSS of this process
+  and its pool workers), taken at most every ``poll_interval_seconds``
+- each document reserves an estimate from its page and image counts — a cheap
+  PyMuPDF pre-scan before partitioning, refined from the partition step's
+  stage 1 statistics
+- projected use is ``max(measured RSS, baseline + reservations) + estimate``
+
+Documents that do not fit are deferred until a running document finishes or a
+new sample shows enough headroom. One document is always admitted when none are
+running, so an oversized document still makes progress. ``decisions`` records
+every admission (each is also logged); the run's step results get the counts
+from ``summary()``.
+"""
+
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from src.utils.logging import get_logger
+from src.utils.resource_monitor import ResourceMonitor, get_monitor, memory_limit_bytes
+
+from ..shared.models import DocumentInput
+
+logger = get_logger(__name__)
+
+_MB = 1024 * 1024
+
+
+def scan_document_cost(file_path: str) -> Optional[Dict[str, int]]:
+    """Page and image counts of a local PDF without rendering it (None if unavailable)"""
+    if not file_path or file_path.startswith(("http://", "https://")) or not os.path.exists(file_path):
+        return None
+    try:
+        import fitz
+
+        with fitz.open(file_path) as doc:
+            return {"pages": doc.page_count, "images": sum(len(page.get_images()) for page in doc)}
+    except Exception as e:
+        logger.warning(f"Could not pre-scan {file_path} for admission: {e}")
+        return None
+
+
+class AdmissionController:
+    """Admit documents while the memory headroom allows it"""
+
+    def __init__(
+        self,
+        monitor: Optional[ResourceMonitor] = None,
+        memory_limit: Optional[int] = None,
+        min_headroom_fraction: float = 0.2,
+        max_cpu_percent: float = 95.0,
+        max_concurrent: int = 16,
+        base_document_mb: float = 150.0,
+        mb_per_page: float = 4.0,
+        mb_per_image: float = 8.0,
+        default_pages: int = 50,
+        poll_interval_seconds: float = 0.5,
+    ):
+        self.monitor = monitor or get_monitor()
+        self.memory_limit = memory_limit or memory_limit_bytes()
+        self.min_headroom_fraction = min_headroom_fraction
+        self.max_cpu_percent = max_cpu_percent
+        self.max_concurrent = max(1, max_concurrent)
+        self.base_document_bytes = base_document_mb * _MB
+        self.bytes_per_page = mb_per_page * _MB
+        self.bytes_per_image = mb_per_image * _MB
+        self.default_pages = default_pages
+        self.poll_interval_seconds = poll_interval_seconds
+
+        self._reservations: Dict[str, float] = {}
+        self._condition: Optional[asyncio.Condition] = None
+        self._sample: Optional[Dict[str, Any]] = None
+        self._sampled_at = 0.0
+        self._baseline_rss: Optional[int] = None
+
+        self.decisions: List[Dict[str, Any]] = []
+        self.stats: Dict[str, Any] = {"admitted": 0, "deferrals": 0, "max_in_flight": 0, "peak_rss_mb": 0.0}
+
+    # --- Cost model ---
+
+    def estimate_bytes(self, pages: Optional[int], images: Optional[int]) -> float:
+        pages = self.default_pages if pages is None else pages
+        return self.base_document_bytes + pages * self.bytes_per_page + (images or 0) * self.bytes_per_image
+
+    def update_estimate(self, document_id: Any, pages: Optional[int], images: Optional[int]) -> None:
+        """Replace a running document's reservation with one based on stage 1 statistics"""
+        key = str(document_id)
+        if key in self._reservations:
+            self._reservations[key] = self.estimate_bytes(pages, images)
+
+    # --- Admission ---
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._reservations)
+
+    @property
+    def memory_ceiling(self) -> float:
+        return self.memory_limit * (1 - self.min_headroom_fraction)
+
+    def _current_sample(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        if self._sample is None or now - self._sampled_at >= self.poll_interval_seconds:
+            self._sample = self.monitor.sample()
+            self._sampled_at = now
+            if self._baseline_rss is None:
+                self._baseline_rss = self._sample["rss_bytes"]
+            self.stats["peak_rss_mb"] = max(self.stats["peak_rss_mb"], round(self._sample["rss_bytes"] / _MB, 1))
+        return self._sample
+
+    def projected_bytes(self, estimate: float) -> float:
+        sample = self._current_sample()
+        reserved = self._baseline_rss + sum(self._reservations.values())
+        return max(sample["rss_bytes"], reserved) + estimate
+
+    def _deferral_reason(self, estimate: float) -> Optional[str]:
+        if self.in_flight == 0:
+            return None
+        if self.in_flight >= self.max_concurrent:
+            return "max_concurrent"
+        if self.projected_bytes(estimate) > self.memory_ceiling:
+            return "memory_headroom"
+        if self._current_sample()["cpu_percent"] > self.max_cpu_percent:
+            return "cpu_saturated"
+        return None
+
+    @asynccontextmanager
+    async def admit(self, document_input: DocumentInput):
+        """Hold an admission slot for one document"""
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+
+        key = str(document_input.document_id)
+        cost = await asyncio.to_thread(scan_document_cost, document_input.file_path)
+        estimate = self.estimate_bytes(cost and cost["pages"], cost and cost["images"])
+
+        started = time.monotonic()
+        deferrals = 0
+        reasons: List[str] = []
+        async with self._condition:
+            while (reason := self._deferral_reason(estimate)) is not None:
+                deferrals += 1
+                if not reasons or reasons[-1] != reason:
+                    reasons.append(reason)
+                try:
+                    # Re-check when a document finishes or after the next sample interval
+                    await asyncio.wait_for(self._condition.wait(), timeout=self.poll_interval_seconds)
+                except asyncio.TimeoutError:
+                    pass
+
+            self._reservations[key] = estimate
+            sample = self._current_sample()
+            self._record(document_input, estimate, cost, sample, time.monotonic() - started, deferrals, reasons)
+
+        try:
+            yield self
+        finally:
+            async with self._condition:
+                self._reservations.pop(key, None)
+                self._condition.notify_all()
+
+    def _record(self, document_input, estimate, cost, sample, waited, deferrals, reasons) -> None:
+        self.stats["admitted"] += 1
+        self.stats["deferrals"] += deferrals
+        self.stats["max_in_flight"] = max(self.stats["max_in_flight"], self.in_flight)
+        decision = {
+            "document_id": str(document_input.document_id),
+            "filename": getattr(document_input, "filename", None),
+            "admitted_at": datetime.utcnow().isoformat(),
+            "waited_seconds": round(waited, 3),
+            "deferrals": deferrals,
+            "deferral_reasons": reasons,
+            "pages": cost["pages"] if cost else None,
+            "images": cost["images"] if cost else None,
+            "estimated_mb": round(estimate / _MB, 1),
+            "rss_mb": round(sample["rss_bytes"] / _MB, 1),
+            "cpu_percent": sample["cpu_percent"],
+            "in_flight": self.in_flight,
+        }
+        self.decisions.append(decision)
+        logger.info("document_admitted", extra={"step": "admission", **decision})
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "memory_limit_mb": round(self.memory_limit / _MB, 1),
+            "memory_ceiling_mb": round(self.memory_ceiling / _MB, 1),
+            "documents_deferred": sum(1 for decision in self.decisions if decision["deferrals"]),
+        }
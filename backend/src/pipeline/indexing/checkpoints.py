@@ -0,0 +1,206 @@
+"""Per-document step checkpoints for resuming interrupted indexing runs.
+
+A Beam task that hits its timeout buffer, runs out of memory or is preempted
+used to restart every document of the run from partition. The orchestrator now
+saves each completed step's ``StepResult`` per document:
+
+- PartitionStep: text/table elements and the extracted page assets (the page
+  images themselves are already uploaded to storage; the checkpoint keeps their
+  storage paths and signed URLs)
+- MetadataStep / EnrichmentStep: structural metadata and VLM captions
+- ChunkingStep: the stored chunks with their ``document_chunks`` row ids
+- EmbeddingStep: marks the document as finished
+
+On a retry of the same indexing run, ``IndexingOrchestrator`` continues each
+document after its latest checkpoint. Checkpoints are pickled (the partition
+output holds a columnar ``TextElementStore``) and zlib-compressed. They are only
+ever read back by the pipeline that wrote them, from a private bucket or a local
+directory. A failed save is logged and never fails the step.
+"""
+
+import asyncio
+import os
+import pickle
+import shutil
+import tempfile
+import zlib
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+from uuid import UUID
+
+from src.models import StepResult
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+CHECKPOINT_SUFFIX = ".ckpt"
+CHECKPOINT_BUCKET = "pipeline-checkpoints"
+_COMPRESSION_LEVEL = 1
+
+
+def serialize_checkpoint(result: StepResult) -> bytes:
+    return zlib.compress(pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL), _COMPRESSION_LEVEL)
+
+
+def deserialize_checkpoint(payload: bytes) -> StepResult:
+    return pickle.loads(zlib.decompress(payload))
+
+
+class CheckpointStore(ABC):
+    """Step results per (indexing run, document, step)"""
+
+    @abstractmethod
+    async def completed_steps(self, run_id: UUID, document_id: UUID) -> Set[str]:
+        """Names of the steps with a checkpoint for the document"""
+
+    @abstractmethod
+    async def load(self, run_id: UUID, document_id: UUID, step_name: str) -> Optional[StepResult]:
+        """The step's checkpointed result (None if missing or unreadable)"""
+
+    @abstractmethod
+    async def save(self, run_id: UUID, document_id: UUID, step_name: str, result: StepResult) -> bool:
+        """Store the step's result; failures are logged and return False"""
+
+    @abstractmethod
+    async def clear_run(self, run_id: UUID) -> None:
+        """Delete every checkpoint of the run"""
+
+    @abstractmethod
+    async def clear_documents(self, run_id: UUID, document_ids: Iterable[UUID]) -> None:
+        """Delete the checkpoints of the given documents"""
+
+    async def latest(
+        self, run_id: UUID, document_id: UUID, step_names: Iterable[str]
+    ) -> Optional[Tuple[str, StepResult]]:
+        """(step name, result) of the last step in ``step_names`` order with a checkpoint, if any"""
+        completed = await self.completed_steps(run_id, document_id)
+        for step_name in reversed(list(step_names)):
+            if step_name in completed:
+                result = await self.load(run_id, document_id, step_name)
+                if result is not None:
+                    return step_name, result
+        return None
+
+
+class LocalCheckpointStore(CheckpointStore):
+    """Checkpoints on local disk (a mounted volume when running on Beam)"""
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = Path(directory or os.path.join(tempfile.gettempdir(), "indexing-checkpoints"))
+
+    def _document_dir(self, run_id: UUID, document_id: UUID) -> Path:
+        return self.directory / str(run_id) / str(document_id)
+
+    async def completed_steps(self, run_id: UUID, document_id: UUID) -> Set[str]:
+        document_dir = self._document_dir(run_id, document_id)
+        if not document_dir.is_dir():
+            return set()
+        return {path.name[: -len(CHECKPOINT_SUFFIX)] for path in document_dir.glob(f"*{CHECKPOINT_SUFFIX}")}
+
+    async def load(self, run_id: UUID, document_id: UUID, step_name: str) -> Optional[StepResult]:
+        path = self._document_dir(run_id, document_id) / f"{step_name}{CHECKPOINT_SUFFIX}"
+        try:
+            return deserialize_checkpoint(await asyncio.to_thread(path.read_bytes))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable checkpoint {path}: {e}")
+            return None
+
+    async def save(self, run_id: UUID, document_id: UUID, step_name: str, result: StepResult) -> bool:
+        path = self._document_dir(run_id, document_id) / f"{step_name}{CHECKPOINT_SUFFIX}"
+        try:
+            await asyncio.to_thread(self._write_atomic, path, result)
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to save checkpoint {path}: {e}")
+            return False
+
+    async def clear_run(self, run_id: UUID) -> None:
+        await asyncio.to_thread(shutil.rmtree, self.directory / str(run_id), True)
+
+    async def clear_documents(self, run_id: UUID, document_ids: Iterable[UUID]) -> None:
+        for document_id in document_ids:
+            await asyncio.to_thread(shutil.rmtree, self._document_dir(run_id, document_id), True)
+
+    @staticmethod
+    def _write_atomic(path: Path, result: StepResult) -> None:
+        payload = serialize_checkpoint(result)
+        # A task killed mid-write must not leave a truncated checkpoint behind
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+
+class StorageCheckpointStore(CheckpointStore):
+    """Checkpoints in the private ``pipeline-checkpoints`` Supabase Storage bucket"""
+
+    def __init__(self, storage_service=None, prefix: str = "index-runs"):
+        if storage_service is None:
+            from src.services.storage_service import StorageService
+
+            storage_service = StorageService(bucket_name=CHECKPOINT_BUCKET)
+        self.storage_service = storage_service
+        self.prefix = prefix
+
+    def _document_path(self, run_id: UUID, document_id: UUID) -> str:
+        return f"{self.prefix}/{run_id}/{document_id}"
+
+    async def completed_steps(self, run_id: UUID, document_id: UUID) -> Set[str]:
+        files = await self.storage_service.list_files(self._document_path(run_id, document_id))
+        names = {file.get("name", "") if isinstance(file, dict) else str(file) for file in files or []}
+        return {name[: -len(CHECKPOINT_SUFFIX)] for name in names if name.endswith(CHECKPOINT_SUFFIX)}
+
+    async def load(self, run_id: UUID, document_id: UUID, step_name: str) -> Optional[StepResult]:
+        path = f"{self._document_path(run_id, document_id)}/{step_name}{CHECKPOINT_SUFFIX}"
+        payload = await self.storage_service.download_bytes(path)
+        if not payload:
+            return None
+        try:
+            return await asyncio.to_thread(deserialize_checkpoint, payload)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable checkpoint {path}: {e}")
+            return None
+
+    async def save(self, run_id: UUID, document_id: UUID, step_name: str, result: StepResult) -> bool:
+        path = f"{self._document_path(run_id, document_id)}/{step_name}{CHECKPOINT_SUFFIX}"
+        try:
+            payload = await asyncio.to_thread(serialize_checkpoint, result)
+            # Storage uploads replace the object in one request, so readers never see a partial file
+            await self.storage_service.upload_bytes(payload, path)
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to save checkpoint {path}: {e}")
+            return False
+
+    async def clear_run(self, run_id: UUID) -> None:
+        folders = await self.storage_service.list_files(f"{self.prefix}/{run_id}") or []
+        names = [folder.get("name") if isinstance(folder, dict) else str(folder) for folder in folders]
+        await self.clear_documents(run_id, [name for name in names if name])
+
+    async def clear_documents(self, run_id: UUID, document_ids: Iterable[UUID]) -> None:
+        paths = []
+        for document_id in document_ids:
+            document_path = self._document_path(run_id, document_id)
+            for file in await self.storage_service.list_files(document_path) or []:
+                file_name = file.get("name") if isinstance(file, dict) else str(file)
+                if file_name:
+                    paths.append(f"{document_path}/{file_name}")
+        await self.storage_service.delete_files(paths)
+
+
+def create_checkpoint_store(config: Dict[str, Any], storage_service=None) -> Optional[CheckpointStore]:
+    """CheckpointStore from ``orchestration.checkpointing`` config (None if disabled)"""
+    if not config.get("enabled", False):
+        return None
+    backend = config.get("backend", "storage")
+    if backend == "local":
+        return LocalCheckpointStore(config.get("directory"))
+    if backend == "storage":
+        return StorageCheckpointStore(storage_service)
+    raise ValueError(f"Unknown checkpoint backend: {backend}")
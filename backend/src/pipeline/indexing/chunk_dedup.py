@@ -0,0 +1,189 @@
+"""Exact and near-duplicate detection for chunks before embedding.
+
+Tender packages repeat boilerplate (title blocks, standard clauses, general
+conditions) across many documents, and every copy used to be sent to Voyage.
+``ChunkDeduplicator`` keeps the first copy of a chunk as the canonical one and
+marks later copies:
+
+- exact duplicates: same SHA-1 of the normalized text (NFKC, case folded,
+  whitespace collapsed)
+- near duplicates: MinHash signatures of word shingles, bucketed with LSH and
+  confirmed when the estimated Jaccard similarity reaches ``threshold``
+
+Duplicates are still stored (citations need their document and page) but carry
+``metadata["duplicate_of"]`` (the canonical chunk's document and ``chunk_id``),
+keep a NULL embedding and are not sent to Voyage, so the index holds one vector
+per group. One deduplicator is shared by all documents of an indexing run. When
+the run's documents are done, ``resolve_duplicates`` adds the canonical chunk's
+row id to each mark; ``match_accessible_chunks`` follows that back-reference to
+return each group once, with its duplicates' documents and pages for citation.
+Duplicates whose canonical never got an embedding (its document failed) lose
+the mark and are returned for embedding.
+"""
+
+import hashlib
+import re
+import unicodedata
+import zlib
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from src.services.async_db import aexecute
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+_WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+_HASH_SHIFT = np.uint64(32)
+
+
+def normalize_text(text: str) -> str:
+    """Normalized form used for exact duplicate hashing"""
+    text = unicodedata.normalize("NFKC", text or "").casefold()
+    return " ".join(text.split())
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha1(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class MinHasher:
+    """MinHash signatures over word shingles (multiply-shift hashing, vectorized)"""
+
+    def __init__(self, num_perm: int = 64, shingle_size: int = 5, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self._a = rng.integers(1, 2**63, size=(num_perm, 1), dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2**63, size=(num_perm, 1), dtype=np.uint64)
+
+    def shingles(self, text: str) -> List[str]:
+        words = _WORD_PATTERN.findall(normalize_text(text))
+        if len(words) <= self.shingle_size:
+            return [" ".join(words)] if words else []
+        return [" ".join(words[i : i + self.shingle_size]) for i in range(len(words) - self.shingle_size + 1)]
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        shingles = self.shingles(text)
+        if not shingles:
+            return None
+        hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in set(shingles)), dtype=np.uint64)
+        # (a * x + b) mod 2^64, top 32 bits; one row per permutation
+        permuted = (self._a * hashes[None, :] + self._b) >> _HASH_SHIFT
+        return permuted.min(axis=1).astype(np.uint32)
+
+
+class ChunkDeduplicator:
+    """Marks chunks that repeat (or nearly repeat) an earlier chunk of the run"""
+
+    def __init__(
+        self,
+        threshold: float = 0.9,
+        num_perm: int = 64,
+        bands: int = 16,
+        shingle_size: int = 5,
+        min_words: int = 8,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+        self.min_words = min_words
+        self.hasher = MinHasher(num_perm=num_perm, shingle_size=shingle_size)
+
+        self._exact: Dict[str, Dict[str, Any]] = {}
+        self._buckets: Dict[tuple, List[Dict[str, Any]]] = {}
+
+        self.stats: Dict[str, int] = {"chunks_seen": 0, "exact_duplicates": 0, "near_duplicates": 0}
+
+    def deduplicate(self, chunks: List[Dict[str, Any]], document_id: Any = None) -> Dict[str, int]:
+        """Mark duplicates in ``chunks`` in place; returns counts for this call"""
+        exact = near = 0
+        for chunk in chunks:
+            self.stats["chunks_seen"] += 1
+            chunk.setdefault("metadata", {})
+            record = {"chunk": chunk, "document_id": str(document_id) if document_id else None}
+
+            key = content_hash(chunk.get("content", ""))
+            canonical = self._exact.get(key)
+            similarity = 1.0
+            exact_match = canonical is not None
+
+            signature = None
+            if canonical is None and len(_WORD_PATTERN.findall(chunk.get("content", ""))) >= self.min_words:
+                signature = self.hasher.signature(chunk.get("content", ""))
+                if signature is not None:
+                    canonical, similarity = self._find_near_duplicate(signature)
+
+            if canonical is None:
+                self._exact[key] = record
+                if signature is not None:
+                    record["signature"] = signature
+                    for band_key in self._band_keys(signature):
+                        self._buckets.setdefault(band_key, []).append(record)
+                continue
+
+            if exact_match:
+                exact += 1
+            else:
+                near += 1
+            self._link(canonical, record, similarity)
+
+        self.stats["exact_duplicates"] += exact
+        self.stats["near_duplicates"] += near
+        return {"exact_duplicates": exact, "near_duplicates": near, "unique_chunks": len(chunks) - exact - near}
+
+    def _band_keys(self, signature: np.ndarray):
+        for band in range(self.bands):
+            start = band * self.rows_per_band
+            yield band, signature[start : start + self.rows_per_band].tobytes()
+
+    def _find_near_duplicate(self, signature: np.ndarray) -> tuple[Optional[Dict[str, Any]], float]:
+        best, best_similarity = None, 0.0
+        seen = set()
+        for band_key in self._band_keys(signature):
+            for candidate in self._buckets.get(band_key, ()):
+                if id(candidate) in seen:
+                    continue
+                seen.add(id(candidate))
+                similarity = float(np.mean(candidate["signature"] == signature))
+                if similarity > best_similarity:
+                    best, best_similarity = candidate, similarity
+        if best is not None and best_similarity >= self.threshold:
+            return best, best_similarity
+        return None, 0.0
+
+    def _link(self, canonical: Dict[str, Any], duplicate: Dict[str, Any], similarity: float) -> None:
+        # Linked by chunk_id, which exists before the canonical chunk is stored;
+        # resolve_duplicates adds the canonical row id once it is
+        duplicate["chunk"]["metadata"]["duplicate_of"] = {
+            "chunk_id": canonical["chunk"]["chunk_id"],
+            "document_id": canonical["document_id"],
+            "similarity": round(similarity, 3),
+        }
+
+
+async def resolve_duplicates(db, indexing_run_id: Any, document_ids: List[Any]) -> List[Dict[str, Any]]:
+    """Point the documents' duplicate chunks at their canonical chunk's row.
+
+    Returns the duplicates that could not be resolved (``id``, ``document_id``,
+    ``content``); their ``duplicate_of`` mark is removed so they are embedded
+    like any other chunk.
+    """
+    if not document_ids:
+        return []
+    result = await aexecute(
+        db.rpc(
+            "resolve_duplicate_chunks",
+            {"run_id": str(indexing_run_id), "document_ids": [str(document_id) for document_id in document_ids]},
+        )
+    )
+    return result.data or []
+
+
+def is_duplicate(chunk: Dict[str, Any]) -> bool:
+    """True for chunks that are searched through their canonical chunk"""
+    return bool((chunk.get("metadata") or {}).get("duplicate_of"))
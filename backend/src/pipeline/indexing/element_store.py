@@ -0,0 +1,353 @@
+"""Columnar store for text elements produced by the partition step.
+
+Stage 2 of the partitioner emits one element per PyMuPDF text block. Held as
+dicts, every element costs an outer dict, a nested metadata dict, a bbox list
+and boxed floats — hundreds of thousands of small objects for large documents.
+``TextElementStore`` keeps the same data in columns instead:
+
+- numeric fields (page, bbox, font size, bold flag) in NumPy arrays
+- repeated strings (category, font name, extraction method) interned in a
+  symbol table and stored as integer codes
+- ids and texts in plain lists
+- keys added by later steps (``structural_metadata``, ``element_type``, ...)
+  in lazily created per-key columns
+
+The store is a read-only ``Sequence`` of lightweight ``TextElementView``
+mappings, so the metadata, enrichment and chunking steps read it exactly like
+the list of dicts they used to receive (``el["text"]``, ``el.get("metadata")``,
+``el["structural_metadata"] = ...``). Use ``to_dicts()`` at JSON boundaries.
+"""
+
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from typing import Any
+
+import numpy as np
+
+
+class _Missing:
+    """Marker for rows without a value in a dynamic column (pickles as the module singleton)"""
+
+    __slots__ = ()
+
+    def __reduce__(self):
+        return "_MISSING"
+
+    def __repr__(self) -> str:
+        return "<missing>"
+
+
+_MISSING = _Missing()
+
+_INITIAL_CAPACITY = 256
+
+# Element metadata keys backed by columns (in legacy dict order)
+_METADATA_KEYS = ("page_number", "bbox", "font_size", "font_name", "is_bold", "extraction_method")
+_METADATA_PREFIX = "metadata."
+
+
+class TextElementStore(Sequence):
+    """Array-backed list of partition text elements"""
+
+    def __init__(self, capacity: int = _INITIAL_CAPACITY):
+        capacity = max(1, capacity)
+        self._size = 0
+        self._ids: list[str] = []
+        self._texts: list[str] = []
+        self._pages = np.zeros(capacity, dtype=np.int32)
+        self._bboxes = np.zeros((capacity, 4), dtype=np.float64)
+        self._font_sizes = np.zeros(capacity, dtype=np.float64)
+        self._is_bold = np.zeros(capacity, dtype=np.bool_)
+        self._category_codes = np.zeros(capacity, dtype=np.int32)
+        self._font_codes = np.zeros(capacity, dtype=np.int32)
+        self._method_codes = np.zeros(capacity, dtype=np.int32)
+
+        # Interned strings shared by all rows
+        self._symbols: list[str] = []
+        self._symbol_codes: dict[str, int] = {}
+
+        # Keys set after construction (e.g. structural_metadata), one list per key
+        self._dynamic: dict[str, list[Any]] = {}
+
+    # --- Building ---
+
+    def append(
+        self,
+        element_id: str,
+        category: str,
+        page: int,
+        text: str,
+        bbox: Iterable[float],
+        font_size: float,
+        font_name: str,
+        is_bold: bool,
+        extraction_method: str,
+    ) -> int:
+        """Append one element and return its row index"""
+        row = self._size
+        if row == len(self._pages):
+            self._grow()
+
+        self._ids.append(element_id)
+        self._texts.append(text)
+        self._pages[row] = page
+        self._bboxes[row] = tuple(bbox)[:4]
+        self._font_sizes[row] = font_size
+        self._is_bold[row] = bool(is_bold)
+        self._category_codes[row] = self._intern(category)
+        self._font_codes[row] = self._intern(font_name)
+        self._method_codes[row] = self._intern(extraction_method)
+        for column in self._dynamic.values():
+            column.append(_MISSING)
+
+        self._size += 1
+        return row
+
+    def _grow(self) -> None:
+        capacity = len(self._pages) * 2
+        self._pages = np.resize(self._pages, capacity)
+        self._bboxes = np.resize(self._bboxes, (capacity, 4))
+        self._font_sizes = np.resize(self._font_sizes, capacity)
+        self._is_bold = np.resize(self._is_bold, capacity)
+        self._category_codes = np.resize(self._category_codes, capacity)
+        self._font_codes = np.resize(self._font_codes, capacity)
+        self._method_codes = np.resize(self._method_codes, capacity)
+
+    def _intern(self, value: str) -> int:
+        value = "" if value is None else str(value)
+        code = self._symbol_codes.get(value)
+        if code is None:
+            code = len(self._symbols)
+            self._symbols.append(value)
+            self._symbol_codes[value] = code
+        return code
+
+    def select(self, rows: Sequence[int], texts: Sequence[str] | None = None) -> "TextElementStore":
+        """New compact store with only ``rows`` (optionally replacing their texts)"""
+        index = np.asarray(rows, dtype=np.intp)
+        selected = TextElementStore(capacity=len(index))
+        selected._size = len(index)
+        selected._ids = [self._ids[i] for i in index]
+        selected._texts = list(texts) if texts is not None else [self._texts[i] for i in index]
+        selected._pages = self._pages[index]
+        selected._bboxes = self._bboxes[index]
+        selected._font_sizes = self._font_sizes[index]
+        selected._is_bold = self._is_bold[index]
+        selected._category_codes = self._category_codes[index]
+        selected._font_codes = self._font_codes[index]
+        selected._method_codes = self._method_codes[index]
+        selected._symbols = self._symbols
+        selected._symbol_codes = self._symbol_codes
+        selected._dynamic = {key: [column[i] for i in index] for key, column in self._dynamic.items()}
+        return selected
+
+    # --- Column access (NumPy views over the filled rows) ---
+
+    @property
+    def pages(self) -> np.ndarray:
+        return self._pages[: self._size]
+
+    @property
+    def bboxes(self) -> np.ndarray:
+        return self._bboxes[: self._size]
+
+    @property
+    def font_sizes(self) -> np.ndarray:
+        return self._font_sizes[: self._size]
+
+    @property
+    def texts(self) -> list[str]:
+        return self._texts
+
+    @property
+    def symbols(self) -> list[str]:
+        """Interned strings; category, font and extraction method names share one table"""
+        return self._symbols
+
+    # --- Row access ---
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [TextElementView(self, row) for row in range(*index.indices(self._size))]
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("element index out of range")
+        return TextElementView(self, index)
+
+    def __iter__(self) -> Iterator["TextElementView"]:
+        for row in range(self._size):
+            yield TextElementView(self, row)
+
+    def _get_dynamic(self, key: str, row: int) -> Any:
+        column = self._dynamic.get(key)
+        if column is None:
+            return _MISSING
+        return column[row]
+
+    def _set_dynamic(self, key: str, row: int, value: Any) -> None:
+        column = self._dynamic.get(key)
+        if column is None:
+            column = self._dynamic[key] = [_MISSING] * self._size
+        column[row] = value
+
+    def _dynamic_keys(self, row: int, prefix: str = "") -> list[str]:
+        keys = []
+        for key, column in self._dynamic.items():
+            if column[row] is _MISSING:
+                continue
+            if prefix:
+                if key.startswith(prefix):
+                    keys.append(key[len(prefix) :])
+            elif not key.startswith(_METADATA_PREFIX):
+                keys.append(key)
+        return keys
+
+    def metadata_value(self, row: int, key: str) -> Any:
+        """Column-backed element metadata value; KeyError if unknown"""
+        if key == "page_number":
+            return int(self._pages[row])
+        if key == "bbox":
+            return self._bboxes[row].tolist()
+        if key == "font_size":
+            return float(self._font_sizes[row])
+        if key == "font_name":
+            return self._symbols[self._font_codes[row]]
+        if key == "is_bold":
+            return bool(self._is_bold[row])
+        if key == "extraction_method":
+            return self._symbols[self._method_codes[row]]
+        value = self._get_dynamic(_METADATA_PREFIX + key, row)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def row_dict(self, row: int) -> dict[str, Any]:
+        """Materialize one row as the legacy element dict"""
+        return TextElementView(self, row).to_dict()
+
+    def to_dicts(self) -> list[dict[str, Any]]:
+        """Materialize all rows as legacy element dicts (JSON boundaries, debugging)"""
+        return [self.row_dict(row) for row in range(self._size)]
+
+    @classmethod
+    def from_dicts(cls, elements: Iterable[Mapping[str, Any]]) -> "TextElementStore":
+        """Build a store from legacy element dicts"""
+        elements = list(elements)
+        store = cls(capacity=len(elements))
+        for element in elements:
+            metadata = element.get("metadata") or {}
+            row = store.append(
+                element_id=element.get("id"),
+                category=element.get("category"),
+                page=element.get("page") or metadata.get("page_number") or 0,
+                text=element.get("text", ""),
+                bbox=metadata.get("bbox") or (0, 0, 0, 0),
+                font_size=metadata.get("font_size") or 0.0,
+                font_name=metadata.get("font_name", ""),
+                is_bold=metadata.get("is_bold", False),
+                extraction_method=metadata.get("extraction_method", ""),
+            )
+            for key, value in element.items():
+                if key not in ("id", "category", "page", "text", "metadata"):
+                    store._set_dynamic(key, row, value)
+            for key, value in metadata.items():
+                if key not in _METADATA_KEYS:
+                    store._set_dynamic(_METADATA_PREFIX + key, row, value)
+        return store
+
+
+class TextElementView(Mapping):
+    """Dict-like view of one row of a TextElementStore (writes go back to the store)"""
+
+    __slots__ = ("_store", "_row")
+
+    _FIXED_KEYS = ("id", "category", "page", "text", "metadata")
+
+    def __init__(self, store: TextElementStore, row: int):
+        self._store = store
+        self._row = row
+
+    def __getitem__(self, key: str) -> Any:
+        store, row = self._store, self._row
+        if key == "id":
+            return store._ids[row]
+        if key == "category":
+            return store._symbols[store._category_codes[row]]
+        if key == "page":
+            return int(store._pages[row])
+        if key == "text":
+            return store._texts[row]
+        if key == "metadata":
+            return ElementMetadataView(store, row)
+        value = store._get_dynamic(key, row)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        store, row = self._store, self._row
+        if key == "text":
+            store._texts[row] = value
+        elif key == "id":
+            store._ids[row] = value
+        elif key == "category":
+            store._category_codes[row] = store._intern(value)
+        elif key == "page":
+            store._pages[row] = value
+        elif key == "metadata":
+            raise TypeError("element metadata is column-backed; set individual keys instead")
+        else:
+            store._set_dynamic(key, row, value)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._FIXED_KEYS
+        yield from self._store._dynamic_keys(self._row)
+
+    def __len__(self) -> int:
+        return len(self._FIXED_KEYS) + len(self._store._dynamic_keys(self._row))
+
+    def copy(self) -> dict[str, Any]:
+        """Shallow dict copy (the metadata stays a view)"""
+        return dict(self)
+
+    def to_dict(self) -> dict[str, Any]:
+        element = dict(self)
+        element["metadata"] = dict(element["metadata"])
+        return element
+
+    def __repr__(self) -> str:
+        return f"TextElementView({self.to_dict()!r})"
+
+
+class ElementMetadataView(Mapping):
+    """Dict-like view of an element's metadata"""
+
+    __slots__ = ("_store", "_row")
+
+    def __init__(self, store: TextElementStore, row: int):
+        self._store = store
+        self._row = row
+
+    def __getitem__(self, key: str) -> Any:
+        return self._store.metadata_value(self._row, key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in _METADATA_KEYS:
+            raise TypeError(f"element metadata '{key}' is column-backed and read-only")
+        self._store._set_dynamic(_METADATA_PREFIX + key, self._row, value)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from _METADATA_KEYS
+        yield from self._store._dynamic_keys(self._row, prefix=_METADATA_PREFIX)
+
+    def __len__(self) -> int:
+        return len(_METADATA_KEYS) + len(self._store._dynamic_keys(self._row, prefix=_METADATA_PREFIX))
+
+    def copy(self) -> dict[str, Any]:
+        return dict(self)
+
+    def __repr__(self) -> str:
+        return f"ElementMetadataView({dict(self)!r})"
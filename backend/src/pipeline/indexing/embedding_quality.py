@@ -0,0 +1,166 @@
+"""Vectorized quality checks for a document's embeddings.
+
+All checks run on one float32 matrix with a single norm pass:
+
+- zero and non-finite vectors
+- exact duplicates, found by hashing each row's float32 bytes to a 64-bit key
+- near duplicates, found by pairwise cosine similarity on a random sample
+  (at most ``sample_size`` rows, so very large runs stay cheap)
+- outliers: vectors whose norm or cosine to the mean direction is more than
+  ``outlier_z`` standard deviations from the rest
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+# Outlier indices reported in the metrics (the count covers all of them)
+_MAX_REPORTED_OUTLIERS = 20
+
+
+def embedding_matrix(embeddings: Sequence[Sequence[float]]) -> np.ndarray:
+    """(n, dim) float32 matrix of the embeddings"""
+    if isinstance(embeddings, np.ndarray):
+        return np.ascontiguousarray(embeddings, dtype=np.float32)
+    return np.asarray(embeddings, dtype=np.float32)
+
+
+def row_hashes(matrix: np.ndarray) -> np.ndarray:
+    """64-bit hash of each row's bytes (equal rows always get equal hashes)"""
+    words = np.ascontiguousarray(matrix).view(np.uint32).astype(np.uint64)
+    # Multiply-add with fixed odd 64-bit coefficients; uint64 arithmetic wraps
+    coefficients = np.random.default_rng(0x5EED).integers(1, 2**63, size=words.shape[1], dtype=np.uint64) | np.uint64(1)
+    return words @ coefficients
+
+
+def count_duplicates(matrix: np.ndarray) -> int:
+    """Number of rows that repeat an earlier row exactly"""
+    if len(matrix) < 2:
+        return 0
+    return int(len(matrix) - len(np.unique(row_hashes(matrix))))
+
+
+def compute_quality_metrics(
+    embeddings: Sequence[Sequence[float]],
+    sample_size: int = 2000,
+    near_duplicate_threshold: float = 0.98,
+    outlier_z: float = 4.0,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """Quality metrics and score for a list (or matrix) of embeddings"""
+    matrix = embedding_matrix(embeddings)
+    total = len(matrix)
+    metrics: Dict[str, Any] = {
+        "total_embeddings": total,
+        "embedding_dimensions": int(matrix.shape[1]) if total else 0,
+        "zero_vectors": 0,
+        "non_finite_vectors": 0,
+        "duplicate_embeddings": 0,
+        "near_duplicate_pairs": 0,
+        "near_duplicate_rate": 0.0,
+        "outlier_vectors": 0,
+        "outlier_indices": [],
+        "sample_size": 0,
+        "embedding_stats": {},
+        "similarity_analysis": {},
+        "quality_score": 0.0,
+        "validation_timestamp": datetime.now().isoformat(),
+    }
+    if total == 0:
+        return metrics
+
+    finite = np.isfinite(matrix).all(axis=1)
+    metrics["non_finite_vectors"] = int(total - finite.sum())
+    if not finite.all():
+        matrix = np.where(np.isfinite(matrix), matrix, 0.0).astype(np.float32)
+
+    # Single norm pass, reused for zero vectors, normalization and outliers
+    norms = np.linalg.norm(matrix, axis=1)
+    zero = norms == 0
+    metrics["zero_vectors"] = int(zero.sum())
+    normalized = matrix / np.where(zero, 1.0, norms)[:, None]
+
+    metrics["embedding_stats"] = {
+        "mean": float(matrix.mean(dtype=np.float64)),
+        "std": float(matrix.std(dtype=np.float64)),
+        "min": float(matrix.min()),
+        "max": float(matrix.max()),
+        "norm_mean": float(norms.mean(dtype=np.float64)),
+        "norm_std": float(norms.std(dtype=np.float64)),
+    }
+
+    metrics["duplicate_embeddings"] = count_duplicates(matrix)
+
+    if total >= 2:
+        metrics["similarity_analysis"] = {
+            "first_two_similarity": float(normalized[0] @ normalized[1]),
+            "self_similarity_check": float(normalized[0] @ normalized[0]),
+        }
+        metrics.update(_near_duplicates(normalized, sample_size, near_duplicate_threshold, seed))
+
+    outliers = _outliers(normalized, norms, outlier_z)
+    metrics["outlier_vectors"] = int(len(outliers))
+    metrics["outlier_indices"] = outliers[:_MAX_REPORTED_OUTLIERS].tolist()
+
+    quality_score = 0.0
+    if metrics["zero_vectors"] == 0:
+        quality_score += 0.3
+    if metrics["duplicate_embeddings"] == 0:
+        quality_score += 0.3
+    if metrics["embedding_stats"]["norm_mean"] > 0.9:
+        quality_score += 0.2
+    if metrics["embedding_stats"]["std"] > 0.01:
+        quality_score += 0.2
+    metrics["quality_score"] = quality_score
+
+    return metrics
+
+
+def _near_duplicates(normalized: np.ndarray, sample_size: int, threshold: float, seed: int) -> Dict[str, Any]:
+    total = len(normalized)
+    if sample_size and total > sample_size:
+        rows = np.sort(np.random.default_rng(seed).choice(total, size=sample_size, replace=False))
+        sample = normalized[rows]
+    else:
+        sample = normalized
+
+    similarities = sample @ sample.T
+    upper = np.triu_indices(len(sample), k=1)
+    pairs = int(np.count_nonzero(similarities[upper] >= threshold))
+    sampled_pairs = len(upper[0])
+    return {
+        "sample_size": int(len(sample)),
+        "near_duplicate_pairs": pairs,
+        "near_duplicate_rate": pairs / sampled_pairs if sampled_pairs else 0.0,
+    }
+
+
+def _outliers(normalized: np.ndarray, norms: np.ndarray, outlier_z: float) -> np.ndarray:
+    if len(normalized) < 3:
+        return np.array([], dtype=np.int64)
+
+    direction = normalized.mean(axis=0)
+    length = np.linalg.norm(direction)
+    to_mean = normalized @ (direction / length) if length > 0 else np.zeros(len(normalized), dtype=np.float32)
+
+    flagged = np.zeros(len(normalized), dtype=bool)
+    for values in (norms, to_mean):
+        std = values.std()
+        if std > 0:
+            flagged |= np.abs(values - values.mean()) > outlier_z * std
+    return np.flatnonzero(flagged)
+
+
+def summarize(metrics: Dict[str, Any]) -> List[str]:
+    """Human-readable warnings for a metrics dict (empty if nothing stands out)"""
+    warnings = []
+    if metrics.get("zero_vectors"):
+        warnings.append(f"{metrics['zero_vectors']} zero vectors")
+    if metrics.get("non_finite_vectors"):
+        warnings.append(f"{metrics['non_finite_vectors']} vectors with NaN/inf")
+    if metrics.get("duplicate_embeddings"):
+        warnings.append(f"{metrics['duplicate_embeddings']} duplicate embeddings")
+    if metrics.get("outlier_vectors"):
+        warnings.append(f"{metrics['outlier_vectors']} outlier vectors")
+    return warnings
@@ -0,0 +1,192 @@
+"""Run-wide embedding queue that packs Voyage batches across documents.
+
+Documents of an indexing run are embedded independently, so a run with many
+small PDFs used to send one small, underfilled request per document. The
+queue collects the texts of every document that is currently embedding and a
+background packer fills requests up to the text-count and token limits before
+sending them. Results are routed back to each caller in input order.
+
+``EmbeddingQueue.get_embeddings`` has the same contract as
+``VoyageEmbeddingClient.get_embeddings`` (including ``VoyageBatchError`` for
+failed batches), so ``EmbeddingStep`` can use either.
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from src.utils.logging import get_logger
+
+from .steps.embedding import VoyageBatchError, VoyageEmbeddingClient
+
+logger = get_logger(__name__)
+
+_CLOSE = object()
+
+
+class _EmbeddingRequest:
+    """One caller's texts; resolved once every text has been embedded (or failed)"""
+
+    def __init__(self, size: int):
+        self.embeddings: List[Optional[List[float]]] = [None] * size
+        self.remaining = size
+        self.failed_batches: List[int] = []
+        self.errors: List[Exception] = []
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+    def resolve(self, index: int, embedding: Optional[List[float]]) -> None:
+        self.embeddings[index] = embedding
+        self.remaining -= 1
+        if self.remaining == 0 and not self.future.done():
+            if self.failed_batches:
+                self.future.set_exception(VoyageBatchError(self.embeddings, self.failed_batches, self.errors))
+            else:
+                self.future.set_result(self.embeddings)
+
+
+class EmbeddingQueue:
+    """Pack texts from concurrent callers into full Voyage batches"""
+
+    def __init__(
+        self,
+        voyage_client: VoyageEmbeddingClient,
+        max_batch_texts: int = 100,
+        max_batch_tokens: int = 100000,
+        max_wait_seconds: float = 0.5,
+    ):
+        self.voyage_client = voyage_client
+        self.max_batch_texts = max(1, max_batch_texts)
+        self.max_batch_tokens = max_batch_tokens
+        self.max_wait_seconds = max_wait_seconds
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._packer: Optional[asyncio.Task] = None
+        self._carry: Optional[tuple] = None
+        self._in_flight: set = set()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._next_batch = 0
+
+        self.stats: Dict[str, Any] = {"requests_sent": 0, "texts_sent": 0, "callers": 0, "failed_batches": 0}
+
+    def _ensure_started(self) -> None:
+        if self._packer is None:
+            self._queue = asyncio.Queue()
+            self._semaphore = asyncio.Semaphore(self.voyage_client.max_concurrency)
+            self._packer = asyncio.create_task(self._pack_loop())
+
+    async def get_embeddings(
+        self,
+        texts: List[str],
+        batch_size: Optional[int] = None,
+        token_counts: Optional[List[Optional[int]]] = None,
+    ) -> List[List[float]]:
+        """Embed texts through the shared queue (``batch_size`` is ignored; the queue packs batches)"""
+        if not texts:
+            return []
+        self._ensure_started()
+
+        request = _EmbeddingRequest(len(texts))
+        self.stats["callers"] += 1
+        for index, text in enumerate(texts):
+            tokens = token_counts[index] if token_counts is not None else None
+            if tokens is None:
+                tokens = self.voyage_client.estimate_tokens(text)
+            self._queue.put_nowait((request, index, text, tokens))
+        return await request.future
+
+    async def close(self) -> None:
+        """Flush queued texts, wait for in-flight batches and stop the packer"""
+        if self._packer is None:
+            return
+        self._queue.put_nowait(_CLOSE)
+        await self._packer
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+        self._packer = None
+
+        requests_sent = self.stats["requests_sent"]
+        logger.info(
+            "embedding_queue_closed",
+            extra={
+                "step": "embedding",
+                **self.stats,
+                "avg_batch_fill": round(self.stats["texts_sent"] / requests_sent, 1) if requests_sent else 0,
+            },
+        )
+
+    async def _next_item(self, timeout: Optional[float]):
+        if self._carry is not None:
+            item, self._carry = self._carry, None
+            return item
+        if timeout is None:
+            return await self._queue.get()
+        if not self._queue.empty():
+            return self._queue.get_nowait()
+        if timeout <= 0:
+            return None
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def _pack_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        closing = False
+
+        while True:
+            # After close() only what is already queued is flushed, without lingering
+            first = await self._next_item(0 if closing else None)
+            if first is None:
+                break
+            if first is _CLOSE:
+                closing = True
+                continue
+
+            batch = [first]
+            batch_tokens = first[3]
+            deadline = loop.time() + self.max_wait_seconds
+
+            # Fill the batch with whatever is queued; linger briefly for other documents
+            while len(batch) < self.max_batch_texts:
+                item = await self._next_item(0 if closing else deadline - loop.time())
+                if item is None:
+                    break
+                if item is _CLOSE:
+                    closing = True
+                    continue
+                if batch_tokens + item[3] > self.max_batch_tokens:
+                    self._carry = item
+                    break
+                batch.append(item)
+                batch_tokens += item[3]
+
+            await self._semaphore.acquire()
+            task = asyncio.create_task(self._dispatch(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _dispatch(self, batch: List[tuple]) -> None:
+        batch_num = self._next_batch = self._next_batch + 1
+        try:
+            texts = [item[2] for item in batch]
+            self.stats["requests_sent"] += 1
+            self.stats["texts_sent"] += len(texts)
+            try:
+                embeddings = await self.voyage_client.embed_batch(
+                    texts, batch_num, batch_num, sum(item[3] for item in batch)
+                )
+                if len(embeddings) != len(texts):
+                    raise ValueError(f"Voyage returned {len(embeddings)} embeddings for {len(texts)} texts")
+            except Exception as e:
+                self.stats["failed_batches"] += 1
+                logger.error(f"❌ Queued embedding batch {batch_num} failed ({len(texts)} texts): {e}")
+                for request, index, _text, _tokens in batch:
+                    if batch_num not in request.failed_batches:
+                        request.failed_batches.append(batch_num)
+                        request.errors.append(e)
+                    request.resolve(index, None)
+                return
+
+            for (request, index, _text, _tokens), embedding in zip(batch, embeddings, strict=True):
+                request.resolve(index, embedding)
+        finally:
+            self._semaphore.release()
@@ -2,6 +2,8 @@ from typing import Any
 
 from pydantic import BaseModel, ConfigDict, Field
 
+from .element_store import TextElementStore
+
 
 class PartitionOutput(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -85,3 +87,139 @@ def to_chunking_output(data: dict[str, Any]) -> ChunkingOutput:
 
 def to_embedding_output(data: dict[str, Any]) -> EmbeddingOutput:
     return EmbeddingOutput(**data)
+
+
+# --- Zero-copy step hand-off ---
+#
+# The adapters above validate every element dict and the orchestrator used to
+# dump the model straight back to a dict, copying the whole document twice per
+# step. The StepData types below are the in-memory contract between steps: a
+# dict subclass (so existing step code keeps working unchanged) with typed
+# accessors and an O(number of keys) shape check. Element dicts are passed by
+# reference, never copied or re-validated. Use the pydantic adapters where a
+# full validation is wanted (tests, API boundaries).
+
+
+class StepData(dict):
+    """Typed, zero-copy view over a step's ``StepResult.data``"""
+
+    __slots__ = ()
+
+    # field -> (expected type(s), default factory)
+    FIELDS: dict[str, tuple[type | tuple[type, ...], type]] = {}
+
+    @classmethod
+    def wrap(cls, data: dict[str, Any]) -> "StepData":
+        """Wrap step output without copying elements; fill missing fields with empty defaults.
+
+        Raises ValueError when a field has the wrong container type.
+        """
+        if isinstance(data, cls):
+            return data
+        if not isinstance(data, dict):
+            raise ValueError(f"{cls.__name__} expects a dict, got {type(data).__name__}")
+
+        wrapped = cls(data)
+        for field, (expected_type, default_factory) in cls.FIELDS.items():
+            value = wrapped.get(field)
+            if value is None:
+                wrapped[field] = default_factory()
+            elif not isinstance(value, expected_type):
+                expected = expected_type if isinstance(expected_type, tuple) else (expected_type,)
+                raise ValueError(
+                    f"{cls.__name__}.{field} must be {' or '.join(t.__name__ for t in expected)}, "
+                    f"got {type(value).__name__}"
+                )
+        return wrapped
+
+
+class _DocumentStepData(StepData):
+    __slots__ = ()
+
+    FIELDS = {
+        # PyMuPDF partitioning hands over a columnar TextElementStore, OCR paths a list of dicts
+        "text_elements": ((list, TextElementStore), list),
+        "table_elements": (list, list),
+        "extracted_pages": (dict, dict),
+        "page_analysis": (dict, dict),
+        "document_metadata": (dict, dict),
+        "metadata": (dict, dict),
+    }
+
+    @property
+    def text_elements(self) -> list[dict[str, Any]] | TextElementStore:
+        return self["text_elements"]
+
+    @property
+    def table_elements(self) -> list[dict[str, Any]]:
+        return self["table_elements"]
+
+    @property
+    def extracted_pages(self) -> dict[int, dict[str, Any]]:
+        return self["extracted_pages"]
+
+    @property
+    def page_analysis(self) -> dict[int, dict[str, Any]]:
+        return self["page_analysis"]
+
+    @property
+    def document_metadata(self) -> dict[str, Any]:
+        return self["document_metadata"]
+
+    @property
+    def metadata(self) -> dict[str, Any]:
+        return self["metadata"]
+
+
+class PartitionData(_DocumentStepData):
+    __slots__ = ()
+
+
+class MetadataData(_DocumentStepData):
+    __slots__ = ()
+
+    FIELDS = {**_DocumentStepData.FIELDS, "page_sections": (dict, dict)}
+
+    @property
+    def page_sections(self) -> dict[int, str]:
+        return self["page_sections"]
+
+
+class EnrichmentData(MetadataData):
+    __slots__ = ()
+
+
+class ChunkingData(StepData):
+    __slots__ = ()
+
+    FIELDS = {
+        "chunks": (list, list),
+        "chunking_metadata": (dict, dict),
+    }
+
+    @property
+    def chunks(self) -> list[dict[str, Any]]:
+        return self["chunks"]
+
+    @property
+    def chunking_metadata(self) -> dict[str, Any]:
+        return self["chunking_metadata"]
+
+
+def as_partition_data(data: dict[str, Any]) -> PartitionData:
+    return PartitionData.wrap(data)
+
+
+def as_metadata_data(data: dict[str, Any]) -> MetadataData:
+    return MetadataData.wrap(data)
+
+
+def as_enrichment_data(data: dict[str, Any]) -> EnrichmentData:
+    return EnrichmentData.wrap(data)
+
+
+def as_chunking_data(data: dict[str, Any] | list[dict[str, Any]]) -> ChunkingData:
+    # Accept direct list of chunks for flexibility (same as to_chunking_output)
+    if isinstance(data, list):
+        return ChunkingData.wrap({"chunks": data, "chunking_metadata": {}})
+    return ChunkingData.wrap(data)
@@ -18,6 +18,7 @@ except Exception as e:
 
 try:
     from ..shared.progress_tracker import ProgressTracker
+    from ..shared.progress_writer import ProgressWriter
 except Exception as e:
     raise
 
@@ -68,14 +69,59 @@ try:
 except Exception as e:
     raise
 
+from src.utils.resource_monitor import ResourceSampler, get_sampler, start_sampler
+
+from src.services.async_db import aexecute
+
+from .admission import AdmissionController
+from .checkpoints import CheckpointStore, create_checkpoint_store
+from .chunk_dedup import ChunkDeduplicator, resolve_duplicates
+from .embedding_queue import EmbeddingQueue
+from .scheduler import StageScheduler, run_partition_in_process
+from .streaming import StreamingDocumentProcessor
 from .models import (
-    to_partition_output,
-    to_metadata_output,
-    to_enrichment_output,
-    to_chunking_output,
+    as_partition_data,
+    as_metadata_data,
+    as_enrichment_data,
+    as_chunking_data,
 )
 
 
+async def finalize_indexing_run(
+    pipeline_service: PipelineService, indexing_run_id: UUID, document_results: Dict[Any, bool]
+) -> bool:
+    """Set the run's final status from per-document outcomes; False if every document failed"""
+    total_documents = len(document_results)
+    successful = sum(1 for result in document_results.values() if result)
+    failed = total_documents - successful
+    success_rate = successful / total_documents if total_documents > 0 else 0
+
+    if not successful:
+        # ALL documents failed - mark as failed
+        logger.error("All documents failed processing")
+        await pipeline_service.update_indexing_run_status(
+            indexing_run_id=indexing_run_id,
+            status="failed",
+            error_message=f"All {total_documents} documents failed during processing",
+        )
+        return False
+
+    if failed:
+        # PARTIAL success - mark as completed with warning
+        success_message = f"Completed with partial success: {successful}/{total_documents} documents succeeded ({success_rate:.1%} success rate)"
+        logger.warning(success_message)
+        await pipeline_service.update_indexing_run_status(
+            indexing_run_id=indexing_run_id,
+            status="completed",  # Changed from "failed" to "completed"
+            error_message=f"{failed} of {total_documents} documents failed",
+        )
+    else:
+        # ALL documents succeeded
+        logger.info(f"Successfully completed processing all {total_documents} documents")
+        await pipeline_service.update_indexing_run_status(indexing_run_id=indexing_run_id, status="completed")
+    return True
+
+
 class IndexingOrchestrator:
     """Orchestrator with explicit dependency injection for indexing pipeline"""
 
@@ -126,6 +172,8 @@ class IndexingOrchestrator:
         self.storage_step = None
 
         self.steps = []
+        self.orchestration_config: Dict[str, Any] = {}
+        self.document_results: Dict[UUID, bool] = {}
 
     async def initialize_steps(self, user_id: Optional[UUID] = None, indexing_run_id: Optional[UUID] = None):
         """Initialize pipeline steps with configuration"""
@@ -133,7 +181,9 @@ class IndexingOrchestrator:
             # CRITICAL: If we have an indexing run ID, use the stored config instead of ConfigManager
             if indexing_run_id and self.db:
                 logger.info(f"🔄 Attempting to load stored config for run {indexing_run_id}")
-                run_result = self.db.table("indexing_runs").select("pipeline_config").eq("id", str(indexing_run_id)).execute()
+                run_result = await aexecute(
+                    self.db.table("indexing_runs").select("pipeline_config").eq("id", str(indexing_run_id))
+                )
                 logger.info(f"🔍 Config query result: {run_result}")
                 
                 if run_result.data and run_result.data[0].get("pipeline_config"):
@@ -143,6 +193,7 @@ class IndexingOrchestrator:
                     
                     # Use stored config directly instead of ConfigManager
                     indexing_config = stored_config.get("indexing", {})
+                    self.orchestration_config = indexing_config.get("orchestration", {})
                     
                     # Initialize steps with stored config
                     partition_config = indexing_config.get("partition", {})
@@ -210,6 +261,7 @@ class IndexingOrchestrator:
 
             config = await self.config_manager.get_indexing_config(user_id)
             language = "english"  # default fallback
+            self.orchestration_config = config.orchestration or {}
 
             # Initialize real partition step with language
             partition_config = config.steps.get("partition", {})
@@ -363,7 +415,9 @@ class IndexingOrchestrator:
             )
 
             # Fetch the stored pipeline_config from the indexing run (already stored by upload API)
-            run_result = self.db.table("indexing_runs").select("pipeline_config").eq("id", str(indexing_run.id)).execute()
+            run_result = await aexecute(
+                self.db.table("indexing_runs").select("pipeline_config").eq("id", str(indexing_run.id))
+            )
             logger.info(f"🔍 Database query result for run {indexing_run.id}: {run_result}")
             
             if run_result.data and run_result.data[0].get("pipeline_config"):
@@ -419,6 +473,7 @@ class IndexingOrchestrator:
                     document_id=document_input.document_id,
                     step_name=step.get_step_name(),
                     step_result=result,
+                    indexing_run_id=indexing_run.id,
                 )
 
                 if result.status == "failed":
@@ -435,21 +490,13 @@ class IndexingOrchestrator:
                 # Update current data for next step using typed adapters
                 if hasattr(result, "data") and result.data is not None:
                     if isinstance(step, PartitionStep):
-                        current_data = to_partition_output(result.data).model_dump(
-                            exclude_none=True
-                        )
+                        current_data = as_partition_data(result.data)
                     elif isinstance(step, MetadataStep):
-                        current_data = to_metadata_output(result.data).model_dump(
-                            exclude_none=True
-                        )
+                        current_data = as_metadata_data(result.data)
                     elif isinstance(step, EnrichmentStep):
-                        current_data = to_enrichment_output(result.data).model_dump(
-                            exclude_none=True
-                        )
+                        current_data = as_enrichment_data(result.data)
                     elif isinstance(step, ChunkingStep):
-                        current_data = to_chunking_output(result.data).model_dump(
-                            exclude_none=True
-                        )
+                        current_data = as_chunking_data(result.data)
                     else:
                         current_data = result.data
                     logger.info(
@@ -495,12 +542,19 @@ class IndexingOrchestrator:
         self,
         document_inputs: List[DocumentInput],
         existing_indexing_run_id: Optional[UUID] = None,
+        finalize_run: bool = True,
+        shard_index: Optional[int] = None,
     ) -> bool:
         """
         Process multiple documents in a single index run with intelligent batching.
 
         This method provides a unified interface for processing 1→N documents,
         with optimized parallel processing for individual steps and batch embedding.
+        Per-document outcomes are kept in ``self.document_results``.
+
+        With ``finalize_run=False`` the documents are one shard of a larger run: the
+        run's final status is left to the shard coordinator. ``shard_index`` keys the
+        shard's run-level step results, so shards don't replace each other's entries.
         """
         if not document_inputs:
             logger.warning("No documents provided for processing")
@@ -548,7 +602,9 @@ class IndexingOrchestrator:
             )
 
             # Fetch the stored pipeline_config from the indexing run (already stored by upload API)
-            run_result = self.db.table("indexing_runs").select("pipeline_config").eq("id", str(indexing_run.id)).execute()
+            run_result = await aexecute(
+                self.db.table("indexing_runs").select("pipeline_config").eq("id", str(indexing_run.id))
+            )
             if run_result.data and run_result.data[0].get("pipeline_config"):
                 stored_config = run_result.data[0]["pipeline_config"]
                 language = stored_config.get("defaults", {}).get("language", "unknown")
@@ -562,17 +618,50 @@ class IndexingOrchestrator:
                 indexing_run_id=indexing_run.id, status="running"
             )
 
+            # Progress writes of all documents are batched per interval instead of awaited per step
+            progress_writer = self._create_progress_writer()
+
             # Create progress tracker for this run
-            progress_tracker = ProgressTracker(indexing_run.id, self.db)
+            progress_tracker = ProgressTracker(
+                indexing_run.id, self.db, progress_writer=progress_writer, shard_index=shard_index
+            )
 
             logger.info(
                 f"Starting unified indexing pipeline for {len(document_inputs)} documents (run: {indexing_run.id})"
             )
 
             # Phase 1: Process each document through individual steps (partition → metadata → enrichment → chunking)
-            document_results = await self._process_documents_individual_steps(
-                document_inputs, indexing_run.id, progress_tracker
-            )
+            # Embedding requests of concurrently processed documents are packed into shared batches
+            # Repeated boilerplate across the run's documents is embedded once
+            embedding_queue = self._create_embedding_queue()
+            deduplicator = self._create_chunk_deduplicator()
+            # Completed steps of an earlier attempt of this run are skipped per document
+            checkpoints = self._create_checkpoint_store()
+            try:
+                document_results = await self._process_documents_individual_steps(
+                    document_inputs,
+                    indexing_run.id,
+                    progress_tracker,
+                    checkpoints=checkpoints,
+                    progress_writer=progress_writer,
+                )
+                if deduplicator is not None:
+                    await self._resolve_duplicates(indexing_run.id, document_results, progress_writer)
+            finally:
+                if embedding_queue is not None:
+                    self.embedding_step.embedding_queue = None
+                    await embedding_queue.close()
+                # The pooled Voyage connections are reopened lazily by the next run
+                if isinstance(self.embedding_step, EmbeddingStep):
+                    await self.embedding_step.voyage_client.aclose()
+                if deduplicator is not None:
+                    self.chunking_step.deduplicator = None
+                    logger.info("chunk_deduplication_completed", extra={"step": "chunking", **deduplicator.stats})
+                if progress_writer is not None:
+                    # Raises if queued progress could not be written, which fails the run
+                    await progress_writer.close()
+
+            self.document_results = document_results
 
             # Check if any documents failed
             failed_document_ids = [
@@ -582,66 +671,37 @@ class IndexingOrchestrator:
                 doc_id for doc_id, result in document_results.items() if result
             ]
 
-            if not successful_document_ids:
-                logger.error("All documents failed processing")
-                await self.pipeline_service.update_indexing_run_status(
-                    indexing_run_id=indexing_run.id,
-                    status="failed",
-                    error_message="All documents failed during individual step processing",
-                )
-                return False
-
             # Phase 2: Embedding now handled per-document above (no batch embedding needed)
             # Batch embedding has been moved to per-document processing for better parallelization
 
             # Generate embedding summary
-            total_documents = len(document_inputs)
-            successful_embeddings = len(successful_document_ids)  # Assumes embeddings succeeded if document succeeded
-            failed_embeddings = len(failed_document_ids)
-            
             logger.info("embedding_batch_summary", extra={
                 "step": "orchestrator",
                 "embedding_results": {
-                    "successful_embeddings": successful_embeddings,
-                    "failed_embeddings": failed_embeddings,
+                    "successful_embeddings": len(successful_document_ids),  # Assumes embeddings succeeded if document succeeded
+                    "failed_embeddings": len(failed_document_ids),
                     "total_documents": len(document_inputs)
                 }
             })
 
-            # Update final status with more sensible logic
-            total_documents = len(document_inputs)
-            success_rate = len(successful_document_ids) / total_documents if total_documents > 0 else 0
-            
-            if not successful_document_ids:
-                # ALL documents failed - mark as failed
-                logger.error("All documents failed processing")
-                await self.pipeline_service.update_indexing_run_status(
-                    indexing_run_id=indexing_run.id,
-                    status="failed",
-                    error_message=f"All {total_documents} documents failed during processing",
-                )
-            elif failed_document_ids:
-                # PARTIAL success - mark as completed with warning
-                success_message = f"Completed with partial success: {len(successful_document_ids)}/{total_documents} documents succeeded ({success_rate:.1%} success rate)"
-                logger.warning(success_message)
-                await self.pipeline_service.update_indexing_run_status(
-                    indexing_run_id=indexing_run.id,
-                    status="completed",  # Changed from "failed" to "completed"
-                    error_message=f"{len(failed_document_ids)} of {total_documents} documents failed",
-                )
-            else:
-                # ALL documents succeeded
-                logger.info(f"Successfully completed processing all {total_documents} documents")
-                await self.pipeline_service.update_indexing_run_status(
-                    indexing_run_id=indexing_run.id, 
-                    status="completed"
-                )
+            # Failed documents keep their checkpoints for a retry of the run
+            if checkpoints is not None and not failed_document_ids:
+                try:
+                    if finalize_run:
+                        await checkpoints.clear_run(indexing_run.id)
+                    else:
+                        await checkpoints.clear_documents(indexing_run.id, successful_document_ids)
+                except Exception as e:
+                    logger.warning(f"Failed to clear checkpoints for run {indexing_run.id}: {e}")
 
-            return True
+            if not finalize_run:
+                return bool(successful_document_ids)
+
+            return await finalize_indexing_run(self.pipeline_service, indexing_run.id, document_results)
 
         except Exception as e:
             logger.error(f"Unified indexing pipeline failed: {e}")
-            if indexing_run:
+            if indexing_run and finalize_run:
                 await self.pipeline_service.update_indexing_run_status(
                     indexing_run_id=indexing_run.id,
                     status="failed",
@@ -649,11 +709,54 @@ class IndexingOrchestrator:
                 )
             return False
 
+    def _create_embedding_queue(self) -> Optional[EmbeddingQueue]:
+        """Attach a run-wide EmbeddingQueue to the embedding step (if enabled)"""
+        queue_config = self.orchestration_config.get("embedding_queue", {})
+        if not queue_config.get("enabled", False) or not isinstance(self.embedding_step, EmbeddingStep):
+            return None
+
+        embedding_queue = EmbeddingQueue(
+            self.embedding_step.voyage_client,
+            max_batch_texts=queue_config.get("max_batch_texts", self.embedding_step.batch_size),
+            max_batch_tokens=queue_config.get("max_batch_tokens", 100000),
+            max_wait_seconds=queue_config.get("max_wait_seconds", 0.5),
+        )
+        self.embedding_step.embedding_queue = embedding_queue
+        return embedding_queue
+
+    def _create_progress_writer(self) -> Optional[ProgressWriter]:
+        """Run-wide ProgressWriter from orchestration config (None if disabled)"""
+        writer_config = self.orchestration_config.get("progress_writer", {})
+        if not writer_config.get("enabled", False):
+            return None
+        return ProgressWriter(
+            self.pipeline_service.supabase,
+            interval_seconds=writer_config.get("interval_seconds", 2.0),
+            max_attempts=writer_config.get("max_attempts", 3),
+        )
+
+    def _create_checkpoint_store(self) -> Optional[CheckpointStore]:
+        """CheckpointStore from orchestration config (None if disabled or in streaming mode)"""
+        if self.orchestration_config.get("streaming", {}).get("enabled", False):
+            return None
+        return create_checkpoint_store(self.orchestration_config.get("checkpointing", {}))
+
+    def _create_chunk_deduplicator(self) -> Optional[ChunkDeduplicator]:
+        """Attach a run-wide ChunkDeduplicator to the chunking step (if enabled)"""
+        if not isinstance(self.chunking_step, ChunkingStep):
+            return None
+
+        deduplicator = self.chunking_step.create_deduplicator()
+        self.chunking_step.deduplicator = deduplicator
+        return deduplicator
+
     async def _process_documents_individual_steps(
         self,
         document_inputs: List[DocumentInput],
         indexing_run_id: UUID,
         progress_tracker: ProgressTracker,
+        checkpoints: Optional[CheckpointStore] = None,
+        progress_writer: Optional[ProgressWriter] = None,
     ) -> Dict[UUID, bool]:
         """
         Process each document through individual pipeline steps using continuous queue processing.
@@ -661,21 +764,45 @@ class IndexingOrchestrator:
         """
         results = {}
 
+        # Background sampling attaches per-step resource windows to every StepResult
+        sampler = self._start_resource_sampler()
+        sampling_started = time.monotonic()
+
+        # Stage-aware scheduling limits CPU and I/O steps separately instead of whole documents
+        scheduler = self._create_stage_scheduler()
+
         # Continuous processing with semaphore (no batch boundaries)
-        max_concurrent = 5  # Process up to 5 concurrent documents
+        if scheduler is not None:
+            max_concurrent = self.orchestration_config.get("scheduler", {}).get(
+                "max_documents_in_flight", scheduler.cpu_workers + scheduler.io_concurrency
+            )
+        else:
+            max_concurrent = 5  # Process up to 5 concurrent documents
         semaphore = asyncio.Semaphore(max_concurrent)
+
+        # Resource-adaptive admission replaces the fixed limit when enabled
+        admission = self._create_admission_controller(max_concurrent)
+        admission_started_at = datetime.utcnow()
         
         logger.info("batch_processing_started", extra={
             "document_count": len(document_inputs),
-            "max_concurrent": max_concurrent
+            "max_concurrent": max_concurrent,
+            "stage_scheduler": scheduler is not None,
+            "adaptive_admission": admission is not None,
         })
 
         async def process_with_semaphore(doc_input: DocumentInput) -> tuple[UUID, bool]:
             """Process a single document with semaphore control"""
-            async with semaphore:
+            async with (admission.admit(doc_input) if admission is not None else semaphore):
                 try:
                     result = await self._process_single_document_steps(
-                        doc_input, indexing_run_id, progress_tracker
+                        doc_input,
+                        indexing_run_id,
+                        progress_tracker,
+                        scheduler=scheduler,
+                        admission=admission,
+                        checkpoints=checkpoints,
+                        progress_writer=progress_writer,
                     )
                     logger.info("document_processed", extra={
                         "document_id": str(doc_input.document_id),
@@ -699,55 +826,233 @@ class IndexingOrchestrator:
 
         # Process results as they complete (no waiting for batches)
         completed_count = 0
-        for coro in asyncio.as_completed(tasks):
-            doc_id, result = await coro
-            results[doc_id] = result
-            completed_count += 1
+        try:
+            for coro in asyncio.as_completed(tasks):
+                doc_id, result = await coro
+                results[doc_id] = result
+                completed_count += 1
+        finally:
+            if scheduler is not None:
+                await asyncio.to_thread(scheduler.close)
+
+        if admission is not None:
+            await self._store_run_step_result(
+                indexing_run_id,
+                progress_tracker.run_step_key("admission"),
+                admission_started_at,
+                # Counts only; every decision is logged as document_admitted
+                admission.summary(),
+            )
+        if sampler is not None:
+            await self._store_resource_usage(
+                indexing_run_id, progress_tracker, sampler, sampling_started, admission_started_at
+            )
 
         return results
 
+    def _start_resource_sampler(self) -> Optional[ResourceSampler]:
+        """Start the process-wide resource sampler from orchestration config (None if disabled)"""
+        sampling_config = self.orchestration_config.get("resource_sampling", {})
+        if not sampling_config.get("enabled", False):
+            return None
+        return start_sampler(
+            interval_seconds=sampling_config.get("interval_seconds", 0.5),
+            capacity=sampling_config.get("capacity", 7200),
+        )
+
+    def _create_admission_controller(self, max_concurrent: int) -> Optional[AdmissionController]:
+        """AdmissionController from orchestration config (None if disabled)"""
+        admission_config = self.orchestration_config.get("admission", {})
+        if not admission_config.get("enabled", False):
+            return None
+        memory_limit_gb = admission_config.get("memory_limit_gb")
+        return AdmissionController(
+            memory_limit=int(memory_limit_gb * 1024**3) if memory_limit_gb else None,
+            min_headroom_fraction=admission_config.get("min_headroom_fraction", 0.2),
+            max_cpu_percent=admission_config.get("max_cpu_percent", 95.0),
+            max_concurrent=admission_config.get("max_concurrent", max_concurrent),
+            base_document_mb=admission_config.get("base_document_mb", 150.0),
+            mb_per_page=admission_config.get("mb_per_page", 4.0),
+            mb_per_image=admission_config.get("mb_per_image", 8.0),
+            poll_interval_seconds=admission_config.get("poll_interval_seconds", 0.5),
+        )
+
+    async def _store_run_step_result(
+        self, indexing_run_id: UUID, step_name: str, started_at: datetime, summary_stats: Dict[str, Any]
+    ) -> None:
+        """Export run-level diagnostics (admission decisions, resource usage) as a step result on the run"""
+        completed_at = datetime.utcnow()
+        result = StepResult(
+            step=step_name,
+            status="completed",
+            duration_seconds=(completed_at - started_at).total_seconds(),
+            summary_stats=summary_stats,
+            started_at=started_at,
+            completed_at=completed_at,
+        )
+        try:
+            await self.pipeline_service.store_step_result(
+                indexing_run_id=indexing_run_id, step_name=step_name, step_result=result
+            )
+        except Exception as e:
+            logger.warning(f"Failed to store {step_name} step result for run {indexing_run_id}: {e}")
+
+    async def _store_resource_usage(
+        self,
+        indexing_run_id: UUID,
+        progress_tracker: ProgressTracker,
+        sampler: ResourceSampler,
+        sampling_started: float,
+        started_at: datetime,
+    ) -> None:
+        """Mean and peak per metric as a run step result; the time series goes to its own table"""
+        window = sampler.window(sampling_started)
+        summary = {
+            metric: ({"mean": value["mean"], "peak": value["peak"]} if isinstance(value, dict) else value)
+            for metric, value in window.items()
+        }
+        await self._store_run_step_result(
+            indexing_run_id, progress_tracker.run_step_key("resource_usage"), started_at, summary
+        )
+        try:
+            await self.pipeline_service.store_resource_timeseries(
+                indexing_run_id, sampler.export(since=sampling_started), shard_index=progress_tracker.shard_index
+            )
+        except Exception as e:
+            logger.warning(f"Failed to store resource usage time series for run {indexing_run_id}: {e}")
+
+    def _create_stage_scheduler(self) -> Optional[StageScheduler]:
+        """StageScheduler from orchestration config (None if disabled)"""
+        scheduler_config = self.orchestration_config.get("scheduler", {})
+        if not scheduler_config.get("enabled", False):
+            return None
+        return StageScheduler(
+            cpu_workers=scheduler_config.get("cpu_workers"),
+            io_concurrency=scheduler_config.get("io_concurrency", 16),
+            use_process_pool=scheduler_config.get("process_pool", True),
+        )
+
+    async def _execute_document_step(
+        self,
+        step,
+        current_data: Any,
+        document_input: DocumentInput,
+        indexing_run_id: UUID,
+        progress_tracker: ProgressTracker,
+        scheduler: Optional[StageScheduler] = None,
+    ) -> StepResult:
+        """Run one step for one document, in the scheduler's CPU or I/O stage if given"""
+
+        async def execute() -> StepResult:
+            # Special handling for steps that need run information
+            if isinstance(step, ChunkingStep):
+                return await step.execute(current_data, indexing_run_id, document_input.document_id)
+            if isinstance(step, EmbeddingStep):
+                return await step.execute(
+                    current_data,
+                    indexing_run_id=indexing_run_id,
+                    document_id=document_input.document_id,
+                )
+            return await StepExecutor(step, progress_tracker).execute_with_tracking(current_data)
+
+        if scheduler is None:
+            return await execute()
+
+        if isinstance(step, PartitionStep) and scheduler.use_process_pool:
+            started = time.monotonic()
+            result = await scheduler.run_in_process(
+                run_partition_in_process, step.config, current_data, step.storage_service.worker_settings()
+            )
+            sampler = get_sampler()
+            if sampler is not None:
+                # Pool workers are children of this process, so the process-tree window covers them
+                result.resource_usage = sampler.window(started)
+            if progress_tracker:
+                await progress_tracker.update_step_progress_async(step.get_step_name(), result.status, result)
+            return result
+
+        return await scheduler.run(scheduler.stage_of(step), execute)
+
     async def _process_single_document_steps(
         self,
         document_input: DocumentInput,
         indexing_run_id: UUID,
         progress_tracker: ProgressTracker,
+        scheduler: Optional[StageScheduler] = None,
+        admission: Optional[AdmissionController] = None,
+        checkpoints: Optional[CheckpointStore] = None,
+        progress_writer: Optional[ProgressWriter] = None,
     ) -> bool:
         """
         Process a single document through individual pipeline steps.
-        Stops before embedding step - that's handled separately in batch.
+
+        With a checkpoint store, each completed step's result is saved and a retry of
+        the run continues after the document's latest checkpoint.
         """
+        streaming_config = self.orchestration_config.get("streaming", {})
+        # Page shards of a document split across tasks always stream their page range
+        if streaming_config.get("enabled", False) or document_input.page_range:
+            try:
+                processor = StreamingDocumentProcessor(
+                    partition_step=self.partition_step,
+                    metadata_step=self.metadata_step,
+                    enrichment_step=self.enrichment_step,
+                    chunking_step=self.chunking_step,
+                    embedding_step=self.embedding_step,
+                    pipeline_service=self.pipeline_service,
+                    page_window=streaming_config.get("page_window", 10),
+                    max_windows_in_flight=streaming_config.get("max_windows_in_flight", 2),
+                    progress_writer=progress_writer,
+                )
+                return await processor.process(document_input, indexing_run_id)
+            except Exception as e:
+                logger.error(
+                    f"Streaming step processing failed for document {document_input.document_id}: {e}"
+                )
+                return False
+
         try:
             current_data = document_input
+            steps = list(self.steps)
 
-            # Process through all individual steps (partition → metadata → enrichment → chunking → embedding)
-            for step in self.steps:  # Include ALL steps including embedding
-                step_executor = StepExecutor(step, progress_tracker)
+            if checkpoints is not None:
+                checkpoint = await checkpoints.latest(
+                    indexing_run_id, document_input.document_id, [step.get_step_name() for step in steps]
+                )
+                if checkpoint is not None:
+                    step_name, result = checkpoint
+                    completed = [step.get_step_name() for step in steps].index(step_name) + 1
+                    logger.info("document_resumed_from_checkpoint", extra={
+                        "document_id": str(document_input.document_id),
+                        "run_id": str(indexing_run_id),
+                        "checkpoint": step_name,
+                        "skipped_steps": completed,
+                    })
+                    last_step, steps = steps[completed - 1], steps[completed:]
+                    if isinstance(last_step, ChunkingStep):
+                        # Embed whatever the interrupted attempt left without an embedding
+                        current_data = None
+                    else:
+                        current_data = self._next_step_input(last_step, result)
 
+                # A failed checkpoint save can leave chunks of an earlier attempt behind
+                # even when the resume point is before the step right ahead of chunking
+                if any(isinstance(step, ChunkingStep) for step in steps):
+                    await self._discard_stored_chunks(indexing_run_id, document_input.document_id)
 
-                # Special handling for steps that need run information
-                if isinstance(step, ChunkingStep):
-                    result = await step.execute(
-                        current_data, indexing_run_id, document_input.document_id
-                    )
-                elif isinstance(step, EmbeddingStep):
-                    # Enhanced logging for embedding step
-                    result = await step.execute(
-                        current_data, 
-                        indexing_run_id=indexing_run_id, 
-                        document_id=document_input.document_id
-                    )
-                    if result.status == "completed":
-                        embeddings_count = result.summary_stats.get("embeddings_generated", 0)
-                    else:
-                        embeddings_count = 0
-                else:
-                    result = await step_executor.execute_with_tracking(current_data)
+            # Process through all individual steps (partition → metadata → enrichment → chunking → embedding)
+            for step in steps:  # Include ALL steps including embedding
+                result = await self._execute_document_step(
+                    step, current_data, document_input, indexing_run_id, progress_tracker, scheduler
+                )
 
                 # Store step result in document's metadata (for individual document processing)
                 await self.pipeline_service.store_document_step_result(
                     document_id=document_input.document_id,
                     step_name=step.get_step_name(),
                     step_result=result,
+                    indexing_run_id=indexing_run_id,
+                    progress_writer=progress_writer,
                 )
 
                 if result.status == "failed":
@@ -756,28 +1061,22 @@ class IndexingOrchestrator:
                     )
                     return False
 
+                # Stage 1 page/image counts replace the admission pre-scan estimate
+                if admission is not None and isinstance(step, PartitionStep):
+                    stats = result.summary_stats or {}
+                    admission.update_estimate(
+                        document_input.document_id,
+                        (stats.get("document_metadata") or {}).get("total_pages") or stats.get("pages_analyzed"),
+                        stats.get("original_image_count"),
+                    )
+
                 # Prepare typed data for next step
-                if hasattr(result, "data") and result.data is not None:
-                    if isinstance(step, PartitionStep):
-                        current_data = to_partition_output(result.data).model_dump(
-                            exclude_none=True
-                        )
-                    elif isinstance(step, MetadataStep):
-                        current_data = to_metadata_output(result.data).model_dump(
-                            exclude_none=True
-                        )
-                    elif isinstance(step, EnrichmentStep):
-                        current_data = to_enrichment_output(result.data).model_dump(
-                            exclude_none=True
-                        )
-                    elif isinstance(step, ChunkingStep):
-                        current_data = to_chunking_output(result.data).model_dump(
-                            exclude_none=True
-                        )
-                    else:
-                        current_data = result.data
-                else:
-                    current_data = result
+                current_data = self._next_step_input(step, result)
+
+                if checkpoints is not None:
+                    await checkpoints.save(
+                        indexing_run_id, document_input.document_id, step.get_step_name(), result
+                    )
 
             return True
 
@@ -787,6 +1086,89 @@ class IndexingOrchestrator:
             )
             return False
 
+    @staticmethod
+    def _next_step_input(step, result: StepResult) -> Any:
+        """Typed input for the step after ``step`` from its result"""
+        if not (hasattr(result, "data") and result.data is not None):
+            return result
+        if isinstance(step, PartitionStep):
+            return as_partition_data(result.data)
+        if isinstance(step, MetadataStep):
+            return as_metadata_data(result.data)
+        if isinstance(step, EnrichmentStep):
+            return as_enrichment_data(result.data)
+        if isinstance(step, ChunkingStep):
+            return as_chunking_data(result.data)
+        return result.data
+
+    async def _resolve_duplicates(
+        self,
+        indexing_run_id: UUID,
+        document_results: Dict[Any, bool],
+        progress_writer: Optional[ProgressWriter] = None,
+    ) -> None:
+        """Link the run's duplicate chunks to their canonical chunk's row.
+
+        Duplicates whose canonical chunk has no embedding are embedded here; a
+        document whose duplicates cannot be embedded is marked failed.
+        """
+        successful_document_ids = [doc_id for doc_id, result in document_results.items() if result]
+        try:
+            orphans = await resolve_duplicates(
+                self.chunking_step.db, indexing_run_id, successful_document_ids
+            )
+        except Exception as e:
+            # Unresolved duplicates stay marked and unsearchable; fail the documents so a retry resolves them
+            logger.error(f"Failed to resolve duplicate chunks for run {indexing_run_id}: {e}")
+            orphans = None
+
+        chunks_by_document: Dict[str, List[Dict[str, Any]]] = {}
+        for chunk in orphans or []:
+            chunks_by_document.setdefault(str(chunk["document_id"]), []).append(chunk)
+        logger.info("duplicate_chunks_resolved", extra={
+            "step": "embedding",
+            "run_id": str(indexing_run_id),
+            "orphaned_duplicates": len(orphans or []),
+        })
+
+        for document_id in successful_document_ids:
+            if orphans is None:
+                result = StepResult(
+                    step="embedding",
+                    status="failed",
+                    duration_seconds=0.0,
+                    error_message="Duplicate chunks could not be resolved",
+                    started_at=datetime.utcnow(),
+                    completed_at=datetime.utcnow(),
+                )
+            elif str(document_id) in chunks_by_document:
+                result = await self.embedding_step.execute(
+                    {"chunks": chunks_by_document[str(document_id)]}, indexing_run_id, document_id
+                )
+            else:
+                continue
+            if result.status == "failed":
+                document_results[document_id] = False
+                await self.pipeline_service.store_document_step_result(
+                    document_id=document_id,
+                    step_name=self.embedding_step.get_step_name(),
+                    step_result=result,
+                    indexing_run_id=indexing_run_id,
+                    progress_writer=progress_writer,
+                )
+
+    async def _discard_stored_chunks(self, indexing_run_id: UUID, document_id: UUID) -> None:
+        """Delete chunks an interrupted chunking attempt stored, so re-chunking doesn't duplicate them"""
+        db = getattr(self.chunking_step, "db", None) or self.db
+        if db is None:
+            return
+        await aexecute(
+            db.table("document_chunks")
+            .delete()
+            .eq("indexing_run_id", str(indexing_run_id))
+            .eq("document_id", str(document_id))
+        )
+
     async def _batch_embed_all_chunks(
         self,
         indexing_run_id: UUID,
@@ -796,11 +1178,11 @@ class IndexingOrchestrator:
         Batch embed all chunks from all documents in the index run.
         This is the optimization that reduces API calls and improves efficiency.
         """
+        embedding_step = None
         try:
             logger.info(f"Starting batch embedding for index run {indexing_run_id}")
 
             # Get the embedding step
-            embedding_step = None
             for step in self.steps:
                 if isinstance(step, EmbeddingStep):
                     embedding_step = step
@@ -836,6 +1218,9 @@ class IndexingOrchestrator:
         except Exception as e:
             logger.error(f"Batch embedding failed: {e}")
             return False
+        finally:
+            if embedding_step is not None:
+                await embedding_step.voyage_client.aclose()
 
     async def process_multiple_documents_async(
         self, document_inputs: List[DocumentInput]
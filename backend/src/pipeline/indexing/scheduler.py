@@ -0,0 +1,175 @@
+"""Stage-aware scheduling of indexing steps across documents.
+
+The orchestrator used to hold one of five document slots for the whole
+partition → metadata → enrichment → chunking → embedding chain, so a document
+waiting minutes on VLM captions blocked partitioning of the next one.
+``StageScheduler`` limits steps by the resource they use instead:
+
+- CPU stages (partition, metadata, chunking) share ``cpu_workers`` slots
+  (default: available cores). Partitioning, the heaviest of them, runs in a
+  spawned process pool so PyMuPDF work of several documents runs in parallel.
+  Metadata and chunking stay in the main process: they are comparatively cheap
+  and chunking shares run-wide state (chunk deduplication, embedding queue).
+- I/O stages (enrichment, embedding) get ``io_concurrency`` slots.
+
+Each document is its own task and moves to its next stage as soon as the
+previous one finishes, so CPU and network work of different documents overlap.
+``stats`` reports busy time per stage and how long both were busy at once.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from src.models import StepResult
+from src.utils.logging import get_logger
+
+from ..shared.base_step import StepExecutor
+from ..shared.models import DocumentInput
+
+logger = get_logger(__name__)
+
+CPU_STAGE = "cpu"
+IO_STAGE = "io"
+
+_STAGE_BY_STEP = {
+    "PartitionStep": CPU_STAGE,
+    "MetadataStep": CPU_STAGE,
+    "ChunkingStep": CPU_STAGE,
+    "EnrichmentStep": IO_STAGE,
+    "EmbeddingStep": IO_STAGE,
+}
+
+
+def available_cores() -> int:
+    """Cores this process may use (respects CPU affinity / container limits where exposed)"""
+    if hasattr(os, "sched_getaffinity"):
+        return max(1, len(os.sched_getaffinity(0)))
+    return max(1, os.cpu_count() or 1)
+
+
+def run_partition_in_process(
+    config: Dict[str, Any], document_input: DocumentInput, storage_settings: Dict[str, Any]
+) -> StepResult:
+    """Process-pool entry point: partition one document with a fresh PartitionStep.
+
+    Clients cannot cross the process boundary, so the orchestrator's storage
+    service is rebuilt from ``StorageService.worker_settings()`` (bucket and
+    Supabase credentials) instead of falling back to the worker's defaults.
+    """
+    from src.services.storage_service import StorageService
+
+    from .steps.partition import PartitionStep
+
+    step = PartitionStep(config, storage_service=StorageService.from_worker_settings(storage_settings))
+    return asyncio.run(StepExecutor(step).execute_with_tracking(document_input))
+
+
+class StageScheduler:
+    """Separate CPU and I/O concurrency limits for indexing steps"""
+
+    def __init__(
+        self,
+        cpu_workers: Optional[int] = None,
+        io_concurrency: int = 16,
+        use_process_pool: bool = True,
+    ):
+        self.cpu_workers = cpu_workers or available_cores()
+        self.io_concurrency = io_concurrency
+        self.use_process_pool = use_process_pool
+
+        self._limits = {
+            CPU_STAGE: asyncio.Semaphore(self.cpu_workers),
+            IO_STAGE: asyncio.Semaphore(self.io_concurrency),
+        }
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+        self._active = {CPU_STAGE: 0, IO_STAGE: 0}
+        self._last_change = time.perf_counter()
+        self.stats: Dict[str, Any] = {
+            "cpu_workers": self.cpu_workers,
+            "io_concurrency": self.io_concurrency,
+            "cpu_busy_seconds": 0.0,
+            "io_busy_seconds": 0.0,
+            "overlap_seconds": 0.0,
+            "max_cpu_active": 0,
+            "max_io_active": 0,
+            "steps_run": {CPU_STAGE: 0, IO_STAGE: 0},
+            "process_pool_tasks": 0,
+        }
+
+    @staticmethod
+    def stage_of(step: Any) -> str:
+        return _STAGE_BY_STEP.get(type(step).__name__, CPU_STAGE)
+
+    async def run(self, stage: str, work: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``work()`` in a slot of ``stage``"""
+        async with self._limits[stage]:
+            self._enter(stage)
+            try:
+                return await work()
+            finally:
+                self._leave(stage)
+
+    async def run_in_process(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a picklable CPU-bound function in the process pool (holding a CPU slot)"""
+        if not self.use_process_pool:
+            raise RuntimeError("process pool disabled for this scheduler")
+        loop = asyncio.get_running_loop()
+
+        async def submit():
+            self.stats["process_pool_tasks"] += 1
+            return await loop.run_in_executor(self._get_pool(), func, *args)
+
+        return await self.run(CPU_STAGE, submit)
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Spawn: the parent has an event loop, HTTP clients and threads that must not be forked
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.cpu_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+        self._account()
+        logger.info("stage_scheduler_closed", extra={"step": "orchestration", **self.summary()})
+
+    def summary(self) -> Dict[str, Any]:
+        summary = dict(self.stats)
+        summary["steps_run"] = dict(self.stats["steps_run"])
+        for key in ("cpu_busy_seconds", "io_busy_seconds", "overlap_seconds"):
+            summary[key] = round(summary[key], 3)
+        return summary
+
+    # --- Busy-time accounting ---
+
+    def _account(self) -> None:
+        now = time.perf_counter()
+        elapsed = now - self._last_change
+        self._last_change = now
+        cpu_busy = self._active[CPU_STAGE] > 0
+        io_busy = self._active[IO_STAGE] > 0
+        if cpu_busy:
+            self.stats["cpu_busy_seconds"] += elapsed
+        if io_busy:
+            self.stats["io_busy_seconds"] += elapsed
+        if cpu_busy and io_busy:
+            self.stats["overlap_seconds"] += elapsed
+
+    def _enter(self, stage: str) -> None:
+        self._account()
+        self._active[stage] += 1
+        self.stats["steps_run"][stage] += 1
+        key = f"max_{stage}_active"
+        self.stats[key] = max(self.stats[key], self._active[stage])
+
+    def _leave(self, stage: str) -> None:
+        self._account()
+        self._active[stage] -= 1
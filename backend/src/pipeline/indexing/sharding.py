@@ -0,0 +1,574 @@
+"""Split one indexing run across several indexing tasks.
+
+A whole run used to be processed by a single Beam task, so a 200-document
+project ran at the speed of one container however many workers the task queue
+had. ``plan_shards`` splits the run into shards:
+
+- document shards: the run's documents, bin-packed by estimated page count
+  (largest first onto the lightest shard)
+- page shards: page ranges of one very large PDF, processed by the streaming
+  partitioner (``DocumentInput.page_range``)
+
+The coordinator registers the shards in ``indexing_run_shards`` and submits one
+task per shard. Every shard runs ``IndexingOrchestrator.process_documents`` on
+its documents with ``finalize_run=False`` and reports its outcome through
+``complete_indexing_run_shard``; the shard that completes last merges the
+per-document results into the run's final status. All shards report progress
+to the same indexing run; run-level step results are merged in the database and
+keyed per shard, and a page shard embeds only the chunks it created. Each shard
+task batches its documents' embeddings in its own run-level ``EmbeddingQueue``
+(the queue lives in-process).
+
+A shard task that dies without reporting (out of memory, preempted container)
+never calls ``complete_indexing_run_shard``. Running shards refresh a heartbeat
+(``heartbeat_shard``); ``ShardCoordinator.reap_stale_shards`` records shards whose
+heartbeat is older than ``STALE_SHARD_SECONDS`` (or that never started within
+``PENDING_SHARD_SECONDS``) as failed, so the run is still finalized.
+
+``ShardCoordinator.run_locally`` emulates the Beam fan-out with a process pool,
+for testing sharding without Beam.
+"""
+
+import asyncio
+import heapq
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from src.models import StepResult
+from src.services.async_db import aexecute
+from src.utils.logging import get_logger
+
+from ..shared.models import DocumentInput, UploadType
+
+logger = get_logger(__name__)
+
+# Page count estimate for documents without page_count (typical scanned/drawing-heavy PDF page)
+BYTES_PER_PAGE_ESTIMATE = 150_000
+TERMINAL_STATUSES = ("completed", "failed")
+# A running shard refreshes its heartbeat this often, and is presumed dead after STALE_SHARD_SECONDS without one
+SHARD_HEARTBEAT_SECONDS = 60
+STALE_SHARD_SECONDS = 15 * 60
+# A shard that has not started this long after dispatch is presumed lost (Beam's task timeout)
+PENDING_SHARD_SECONDS = 4 * 3600
+
+
+@dataclass
+class IndexingShard:
+    """Documents (or one document's page range) processed by one indexing task"""
+
+    index: int
+    document_ids: List[str]
+    page_range: Optional[Tuple[int, int]] = None
+    estimated_pages: int = 0
+
+    def to_payload(self) -> Dict[str, Any]:
+        return {
+            "index": self.index,
+            "document_ids": list(self.document_ids),
+            "page_range": list(self.page_range) if self.page_range else None,
+            "estimated_pages": self.estimated_pages,
+        }
+
+    @classmethod
+    def from_payload(cls, payload: Dict[str, Any]) -> "IndexingShard":
+        page_range = payload.get("page_range")
+        return cls(
+            index=int(payload["index"]),
+            document_ids=[str(document_id) for document_id in payload["document_ids"]],
+            page_range=(int(page_range[0]), int(page_range[1])) if page_range else None,
+            estimated_pages=int(payload.get("estimated_pages") or 0),
+        )
+
+
+def estimate_pages(document: Dict[str, Any]) -> int:
+    """Page count of a documents row, estimated from the file size if unknown"""
+    if document.get("page_count"):
+        return int(document["page_count"])
+    if document.get("file_size"):
+        return max(1, math.ceil(document["file_size"] / BYTES_PER_PAGE_ESTIMATE))
+    return 1
+
+
+def plan_shards(
+    documents: Iterable[Dict[str, Any]],
+    max_shards: int = 5,
+    min_pages_per_shard: int = 50,
+    page_shard_threshold: int = 400,
+    pages_per_shard: int = 200,
+) -> List[IndexingShard]:
+    """Split documents rows (``id``, ``page_count``/``file_size``) into indexing shards.
+
+    Documents with a known page count above ``page_shard_threshold`` get page shards
+    of ``pages_per_shard`` pages. The rest are packed into at most ``max_shards``
+    document shards, each worth at least ``min_pages_per_shard`` pages.
+    """
+    shards: List[IndexingShard] = []
+    packed: List[Tuple[str, int]] = []
+    for document in documents:
+        pages = estimate_pages(document)
+        if document.get("page_count") and pages > page_shard_threshold:
+            for start in range(1, pages + 1, pages_per_shard):
+                end = min(start + pages_per_shard - 1, pages)
+                shards.append(IndexingShard(0, [str(document["id"])], (start, end), end - start + 1))
+        else:
+            packed.append((str(document["id"]), pages))
+
+    if packed:
+        total_pages = sum(pages for _, pages in packed)
+        shard_count = max(1, min(max_shards, len(packed), total_pages // max(1, min_pages_per_shard)))
+        bins = [IndexingShard(0, []) for _ in range(shard_count)]
+        heap = [(0, position) for position in range(shard_count)]
+        for document_id, pages in sorted(packed, key=lambda item: item[1], reverse=True):
+            load, position = heapq.heappop(heap)
+            bins[position].document_ids.append(document_id)
+            bins[position].estimated_pages += pages
+            heapq.heappush(heap, (load + pages, position))
+        shards.extend(shard for shard in bins if shard.document_ids)
+
+    for index, shard in enumerate(shards):
+        shard.index = index
+    return shards
+
+
+def merge_document_results(shards: Iterable[Dict[str, Any]]) -> Dict[str, bool]:
+    """Per-document outcome over all shards; a document split into page shards needs all of them"""
+    results: Dict[str, bool] = {}
+    for shard in shards:
+        reported = shard.get("document_results") or {}
+        for document_id in shard.get("document_ids") or []:
+            document_id = str(document_id)
+            succeeded = shard.get("status") == "completed" and bool(reported.get(document_id))
+            results[document_id] = results.get(document_id, True) and succeeded
+    return results
+
+
+def _as_utc(value: Any) -> Optional[datetime]:
+    """Naive UTC datetime from a timestamp column (ISO string from PostgREST, or datetime)"""
+    if not value:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def find_stale_shards(
+    shards: Iterable[Dict[str, Any]],
+    now: datetime,
+    stale_after: timedelta = timedelta(seconds=STALE_SHARD_SECONDS),
+    pending_after: timedelta = timedelta(seconds=PENDING_SHARD_SECONDS),
+) -> List[Dict[str, Any]]:
+    """Unfinished shards that stopped reporting: running without a recent heartbeat, or never started"""
+    stale = []
+    for shard in shards:
+        if shard.get("status") == "running":
+            last_seen = _as_utc(shard.get("heartbeat_at")) or _as_utc(shard.get("started_at"))
+            deadline = stale_after
+        elif shard.get("status") == "pending":
+            last_seen = _as_utc(shard.get("created_at"))
+            deadline = pending_after
+        else:
+            continue
+        if last_seen is not None and now - last_seen > deadline:
+            stale.append(shard)
+    return stale
+
+
+class SupabaseShardLedger:
+    """Shard bookkeeping in the indexing_run_shards table"""
+
+    def __init__(self, db):
+        self.db = db
+
+    async def register(self, run_id: str, shards: List[IndexingShard]) -> None:
+        rows = [
+            {
+                "indexing_run_id": str(run_id),
+                "shard_index": shard.index,
+                "document_ids": shard.document_ids,
+                "page_start": shard.page_range[0] if shard.page_range else None,
+                "page_end": shard.page_range[1] if shard.page_range else None,
+                "status": "pending",
+            }
+            for shard in shards
+        ]
+        # A retried coordinator task must not reset shards that are already running
+        await aexecute(
+            self.db.table("indexing_run_shards").upsert(
+                rows, on_conflict="indexing_run_id,shard_index", ignore_duplicates=True
+            )
+        )
+
+    async def mark_running(self, run_id: str, shard_index: int) -> None:
+        now = datetime.utcnow().isoformat()
+        await aexecute(
+            self.db.table("indexing_run_shards")
+            .update({"status": "running", "started_at": now, "heartbeat_at": now})
+            .eq("indexing_run_id", str(run_id))
+            .eq("shard_index", shard_index)
+            .in_("status", ["pending", "running"])
+        )
+
+    async def heartbeat(self, run_id: str, shard_index: int) -> None:
+        await aexecute(
+            self.db.table("indexing_run_shards")
+            .update({"heartbeat_at": datetime.utcnow().isoformat()})
+            .eq("indexing_run_id", str(run_id))
+            .eq("shard_index", shard_index)
+            .eq("status", "running")
+        )
+
+    async def complete(
+        self,
+        run_id: str,
+        shard_index: int,
+        status: str,
+        document_results: Dict[str, bool],
+        error_message: Optional[str] = None,
+    ) -> int:
+        """Record the shard's outcome; returns the number of unfinished shards (-1 if already recorded)"""
+        result = await aexecute(
+            self.db.rpc(
+                "complete_indexing_run_shard",
+                {
+                    "run_id": str(run_id),
+                    "shard": shard_index,
+                    "shard_status": status,
+                    "results": document_results,
+                    "error": error_message,
+                },
+            )
+        )
+        return int(result.data)
+
+    async def list_shards(self, run_id: str) -> List[Dict[str, Any]]:
+        result = await aexecute(
+            self.db.table("indexing_run_shards")
+            .select(
+                "shard_index, document_ids, page_start, page_end, status, document_results, error_message, "
+                "created_at, started_at, heartbeat_at"
+            )
+            .eq("indexing_run_id", str(run_id))
+            .order("shard_index")
+        )
+        return result.data or []
+
+    async def list_unfinished_runs(self) -> List[str]:
+        """Ids of runs with shards that are still pending or running"""
+        result = await aexecute(
+            self.db.table("indexing_run_shards").select("indexing_run_id").in_("status", ["pending", "running"])
+        )
+        return sorted({str(row["indexing_run_id"]) for row in result.data or []})
+
+
+class InMemoryShardLedger:
+    """Shard bookkeeping for the local emulation, where one process collects every outcome"""
+
+    def __init__(self):
+        self.shards: Dict[Tuple[str, int], Dict[str, Any]] = {}
+
+    async def register(self, run_id: str, shards: List[IndexingShard]) -> None:
+        for shard in shards:
+            self.shards.setdefault(
+                (str(run_id), shard.index),
+                {
+                    "shard_index": shard.index,
+                    "document_ids": shard.document_ids,
+                    "page_start": shard.page_range[0] if shard.page_range else None,
+                    "page_end": shard.page_range[1] if shard.page_range else None,
+                    "status": "pending",
+                    "document_results": {},
+                    "error_message": None,
+                    "created_at": datetime.utcnow(),
+                    "started_at": None,
+                    "heartbeat_at": None,
+                },
+            )
+
+    async def mark_running(self, run_id: str, shard_index: int) -> None:
+        shard = self.shards[(str(run_id), shard_index)]
+        if shard["status"] not in TERMINAL_STATUSES:
+            now = datetime.utcnow()
+            shard.update(status="running", started_at=now, heartbeat_at=now)
+
+    async def heartbeat(self, run_id: str, shard_index: int) -> None:
+        shard = self.shards[(str(run_id), shard_index)]
+        if shard["status"] == "running":
+            shard["heartbeat_at"] = datetime.utcnow()
+
+    async def complete(
+        self,
+        run_id: str,
+        shard_index: int,
+        status: str,
+        document_results: Dict[str, bool],
+        error_message: Optional[str] = None,
+    ) -> int:
+        shard = self.shards[(str(run_id), shard_index)]
+        if shard["status"] in TERMINAL_STATUSES:
+            return -1
+        shard.update(status=status, document_results=document_results, error_message=error_message)
+        return sum(
+            1
+            for (shard_run_id, _), row in self.shards.items()
+            if shard_run_id == str(run_id) and row["status"] not in TERMINAL_STATUSES
+        )
+
+    async def list_shards(self, run_id: str) -> List[Dict[str, Any]]:
+        rows = [row for (shard_run_id, _), row in self.shards.items() if shard_run_id == str(run_id)]
+        return sorted(rows, key=lambda row: row["shard_index"])
+
+    async def list_unfinished_runs(self) -> List[str]:
+        return sorted({run_id for (run_id, _), row in self.shards.items() if row["status"] not in TERMINAL_STATUSES})
+
+
+async def heartbeat_shard(
+    ledger, indexing_run_id: str, shard_index: int, interval_seconds: float = SHARD_HEARTBEAT_SECONDS
+) -> None:
+    """Refresh the shard's heartbeat until cancelled (run it as a task next to the shard's processing)"""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await ledger.heartbeat(indexing_run_id, shard_index)
+        except Exception as e:
+            logger.warning(f"Heartbeat of shard {shard_index} of run {indexing_run_id} failed: {e}")
+
+
+def build_document_input(
+    document: Dict[str, Any],
+    indexing_run_id: str,
+    user_id: Optional[str] = None,
+    project_id: Optional[str] = None,
+    page_range: Optional[Tuple[int, int]] = None,
+) -> DocumentInput:
+    """DocumentInput for a documents row of an indexing run"""
+    return DocumentInput(
+        document_id=UUID(str(document["id"])),
+        run_id=UUID(str(indexing_run_id)),
+        user_id=UUID(user_id) if user_id else None,
+        file_path=document.get("file_path", ""),
+        filename=document.get("filename", ""),
+        upload_type=(UploadType.EMAIL if not user_id else UploadType.USER_PROJECT),
+        project_id=UUID(project_id) if project_id else None,
+        index_run_id=UUID(str(indexing_run_id)),
+        metadata={"project_id": str(project_id)} if project_id else {},
+        page_range=page_range,
+    )
+
+
+async def run_shard(
+    indexing_run_id: str,
+    shard: IndexingShard,
+    user_id: Optional[str] = None,
+    project_id: Optional[str] = None,
+    db=None,
+) -> Dict[str, bool]:
+    """Process one shard's documents; returns success per document id"""
+    from src.config.database import get_supabase_admin_client
+    from src.services.storage_service import StorageService
+
+    from .orchestrator import IndexingOrchestrator
+
+    db = db or get_supabase_admin_client()
+    rows = await aexecute(db.table("documents").select("*").in_("id", shard.document_ids))
+    document_inputs = [
+        build_document_input(row, indexing_run_id, user_id, project_id, shard.page_range) for row in rows.data or []
+    ]
+    results = {document_id: False for document_id in shard.document_ids}
+    if not document_inputs:
+        logger.error("shard_has_no_documents", extra={"run_id": indexing_run_id, "shard": shard.index})
+        return results
+
+    orchestrator = IndexingOrchestrator(
+        db=db,
+        storage=StorageService(),
+        use_test_storage=False,
+        upload_type=document_inputs[0].upload_type,
+    )
+    await orchestrator.process_documents(
+        document_inputs,
+        existing_indexing_run_id=UUID(str(indexing_run_id)),
+        finalize_run=False,
+        shard_index=shard.index,
+    )
+    results.update({str(document_id): bool(ok) for document_id, ok in orchestrator.document_results.items()})
+    return results
+
+
+def run_shard_in_process(indexing_run_id: str, shard_payload: Dict[str, Any], task_kwargs: Dict[str, Any]):
+    """Process pool entry point of the local emulation"""
+    return asyncio.run(
+        run_shard(
+            indexing_run_id,
+            IndexingShard.from_payload(shard_payload),
+            user_id=task_kwargs.get("user_id"),
+            project_id=task_kwargs.get("project_id"),
+        )
+    )
+
+
+class ShardCoordinator:
+    """Registers a run's shards, fans them out and merges their outcomes"""
+
+    def __init__(self, ledger, pipeline_service=None, db=None):
+        self.ledger = ledger
+        self.pipeline_service = pipeline_service
+        self.db = db
+
+    async def dispatch(
+        self,
+        indexing_run_id: str,
+        shards: List[IndexingShard],
+        submit: Callable[[Dict[str, Any]], Awaitable[Any]],
+        task_kwargs: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Register the shards and submit one task per shard (``submit`` receives the task kwargs)"""
+        await self.ledger.register(indexing_run_id, shards)
+        for shard in shards:
+            await submit({"indexing_run_id": str(indexing_run_id), "shard": shard.to_payload(), **(task_kwargs or {})})
+        logger.info("indexing_run_sharded", extra={
+            "run_id": str(indexing_run_id),
+            "shard_count": len(shards),
+            "page_shards": sum(1 for shard in shards if shard.page_range),
+            "estimated_pages": [shard.estimated_pages for shard in shards],
+        })
+
+    async def complete_shard(
+        self,
+        indexing_run_id: str,
+        shard_index: int,
+        status: str,
+        document_results: Dict[str, bool],
+        error_message: Optional[str] = None,
+    ) -> Optional[bool]:
+        """Record a shard's outcome; the last shard finalizes the run.
+
+        Returns None while other shards are unfinished (or if this shard was already
+        recorded), else the run's outcome as returned by ``finalize``.
+        """
+        remaining = await self.ledger.complete(indexing_run_id, shard_index, status, document_results, error_message)
+        logger.info("indexing_shard_completed", extra={
+            "run_id": str(indexing_run_id),
+            "shard": shard_index,
+            "status": status,
+            "remaining_shards": remaining,
+        })
+        if remaining != 0:
+            return None
+        return await self.finalize(indexing_run_id)
+
+    async def reap_stale_shards(
+        self,
+        indexing_run_id: str,
+        stale_after: timedelta = timedelta(seconds=STALE_SHARD_SECONDS),
+        pending_after: timedelta = timedelta(seconds=PENDING_SHARD_SECONDS),
+        now: Optional[datetime] = None,
+    ) -> Optional[bool]:
+        """Record shards that stopped reporting as failed.
+
+        Returns the run's outcome if that finalized the run, else None.
+        """
+        shards = await self.ledger.list_shards(indexing_run_id)
+        outcome: Optional[bool] = None
+        for shard in find_stale_shards(shards, now or datetime.utcnow(), stale_after, pending_after):
+            if shard["status"] == "running":
+                minutes = stale_after.total_seconds() / 60
+                error_message = f"Shard task stopped reporting (no heartbeat for {minutes:.0f} min)"
+            else:
+                minutes = pending_after.total_seconds() / 60
+                error_message = f"Shard task never started (pending for {minutes:.0f} min)"
+            logger.error("indexing_shard_lost", extra={
+                "run_id": str(indexing_run_id),
+                "shard": shard["shard_index"],
+                "shard_status": shard["status"],
+            })
+            result = await self.complete_shard(indexing_run_id, shard["shard_index"], "failed", {}, error_message)
+            if result is not None:
+                outcome = result
+        return outcome
+
+    async def finalize(self, indexing_run_id: str) -> bool:
+        """Merge all shard outcomes into the run's final status"""
+        from .orchestrator import finalize_indexing_run
+
+        shards = await self.ledger.list_shards(indexing_run_id)
+        document_results = merge_document_results(shards)
+
+        # Page-sharded documents were marked completed by whichever shard chunked first
+        if self.db is not None:
+            for document_id in {str(d) for shard in shards if shard.get("page_start") for d in shard["document_ids"]}:
+                update = {"indexing_status": "completed" if document_results.get(document_id) else "failed"}
+                await aexecute(self.db.table("documents").update(update).eq("id", document_id))
+
+        if self.pipeline_service is not None:
+            now = datetime.utcnow()
+            summary = {
+                "shards": len(shards),
+                "failed_shards": [shard["shard_index"] for shard in shards if shard.get("status") != "completed"],
+                "page_shards": sum(1 for shard in shards if shard.get("page_start")),
+                "errors": {
+                    shard["shard_index"]: shard["error_message"] for shard in shards if shard.get("error_message")
+                },
+            }
+            try:
+                await self.pipeline_service.store_step_result(
+                    indexing_run_id=UUID(str(indexing_run_id)),
+                    step_name="sharding",
+                    step_result=StepResult(
+                        step="sharding",
+                        status="completed",
+                        duration_seconds=0.0,
+                        summary_stats=summary,
+                        started_at=now,
+                        completed_at=now,
+                    ),
+                )
+            except Exception as e:
+                logger.warning(f"Failed to store sharding summary for run {indexing_run_id}: {e}")
+            return await finalize_indexing_run(self.pipeline_service, UUID(str(indexing_run_id)), document_results)
+
+        return any(document_results.values())
+
+    async def run_locally(
+        self,
+        indexing_run_id: str,
+        shards: List[IndexingShard],
+        task_kwargs: Optional[Dict[str, Any]] = None,
+        max_workers: Optional[int] = None,
+        shard_runner: Callable[[str, Dict[str, Any], Dict[str, Any]], Dict[str, bool]] = run_shard_in_process,
+        mp_context: str = "spawn",
+    ) -> Optional[bool]:
+        """Emulate the Beam fan-out: run each shard in its own process and finalize here"""
+        await self.ledger.register(indexing_run_id, shards)
+        loop = asyncio.get_running_loop()
+        outcome: Optional[bool] = None
+        with ProcessPoolExecutor(
+            max_workers=max_workers or len(shards), mp_context=multiprocessing.get_context(mp_context)
+        ) as executor:
+
+            async def run(shard: IndexingShard):
+                await self.ledger.mark_running(indexing_run_id, shard.index)
+                try:
+                    document_results = await loop.run_in_executor(
+                        executor, shard_runner, str(indexing_run_id), shard.to_payload(), task_kwargs or {}
+                    )
+                    return shard, document_results, None
+                except Exception as e:
+                    logger.error(f"Shard {shard.index} of run {indexing_run_id} failed: {e}")
+                    return shard, {}, str(e)
+
+            for completed in asyncio.as_completed([run(shard) for shard in shards]):
+                shard, document_results, error_message = await completed
+                status = "completed" if any(document_results.values()) else "failed"
+                result = await self.complete_shard(
+                    indexing_run_id, shard.index, status, document_results, error_message
+                )
+                if result is not None:
+                    outcome = result
+        return outcome
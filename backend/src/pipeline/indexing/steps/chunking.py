@@ -9,19 +9,18 @@ from uuid import UUID
 import logging
 from pathlib import Path
 
-try:
-    from langchain.text_splitter import RecursiveCharacterTextSplitter
-except ImportError:
-    # Fallback if langchain is not available
-    RecursiveCharacterTextSplitter = None
-
 from ...shared.base_step import PipelineStep
 from src.models import StepResult
 from ...shared.models import PipelineError
 from src.shared.errors import ErrorCode
 from src.utils.exceptions import AppError
+from src.services.async_db import aexecute
 from src.services.storage_service import StorageService
 
+from ..chunk_dedup import ChunkDeduplicator
+from ..text_splitter import RecursiveTextSplitter
+from ..token_counter import count_pieces
+
 # Initialize structured logger
 from src.utils.logging import get_logger
 logger = get_logger(__name__)
@@ -70,6 +69,13 @@ class IntelligentChunker:
             logger.warning(f"chunking_config_inconsistent: overlap ({self.overlap}) >= chunk_size ({self.chunk_size}), reducing overlap")
             self.overlap = max(50, self.chunk_size // 4)  # Ensure reasonable overlap
 
+        # Same boundaries as LangChain's RecursiveCharacterTextSplitter, built once per chunker
+        self.text_splitter = RecursiveTextSplitter(
+            chunk_size=self.chunk_size,
+            chunk_overlap=self.overlap,
+            separators=self.separators,
+        )
+
     def extract_structural_metadata(self, el: dict) -> dict:
         """Extract structural metadata from element, handling various formats"""
         element_type = el.get("element_type", "unknown")
@@ -509,18 +515,9 @@ class IntelligentChunker:
     ) -> tuple[List[Dict[str, Any]], Dict[str, Any]]:
         """Apply semantic text splitting to composed chunks that exceed max_chunk_size"""
 
-        if self.strategy != "semantic" or RecursiveCharacterTextSplitter is None:
+        if self.strategy != "semantic":
             return chunks, {"semantic_splitting_enabled": False}
 
-        # Initialize text splitter
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=self.chunk_size,
-            chunk_overlap=self.overlap,
-            separators=self.separators,
-            length_function=len,
-            is_separator_regex=False,
-        )
-
         split_chunks = []
         splitting_stats = {
             "chunks_processed": 0,
@@ -552,7 +549,7 @@ class IntelligentChunker:
             # Split large content
 
             try:
-                text_chunks = text_splitter.split_text(content)
+                text_chunks = self.text_splitter.split_text(content)
 
                 if len(text_chunks) <= 1:
                     # No splitting occurred
@@ -566,32 +563,26 @@ class IntelligentChunker:
                 splitting_stats["chunks_split"] += 1
                 splitting_stats["total_new_chunks"] += len(text_chunks)
 
-                # Create new chunks from splits
-                original_bbox = chunk["metadata"].get("bbox")
+                # Create new chunks from splits (one metadata dict per split; bbox and other fields carry over)
+                metadata = chunk["metadata"]
+                total_splits = len(text_chunks)
 
                 for i, chunk_text in enumerate(text_chunks):
-                    new_chunk = chunk.copy()
-                    new_chunk["chunk_id"] = f"{chunk['chunk_id']}_split_{i}"
-                    new_chunk["content"] = chunk_text
-
-                    # Update metadata for split chunk
-                    new_metadata = chunk["metadata"].copy()
-                    new_metadata["content_length"] = len(chunk_text)
-                    new_metadata["is_semantic_split"] = True
-                    new_metadata["split_index"] = i
-                    new_metadata["total_splits"] = len(text_chunks)
-                    new_metadata["original_chunk_id"] = chunk["chunk_id"]
-
-                    # EXPLICIT FIX: Ensure bbox is preserved in split chunks
-                    if original_bbox is not None:
-                        new_metadata["bbox"] = original_bbox
-
-                    new_chunk["metadata"] = new_metadata
-
-                    # Verify bbox is preserved
-                    split_bbox = new_metadata.get("bbox")
-
-                    split_chunks.append(new_chunk)
+                    split_chunks.append(
+                        {
+                            **chunk,
+                            "chunk_id": f"{chunk['chunk_id']}_split_{i}",
+                            "content": chunk_text,
+                            "metadata": {
+                                **metadata,
+                                "content_length": len(chunk_text),
+                                "is_semantic_split": True,
+                                "split_index": i,
+                                "total_splits": total_splits,
+                                "original_chunk_id": chunk["chunk_id"],
+                            },
+                        }
+                    )
 
                     # Track largest chunk after splitting
                     if len(chunk_text) > splitting_stats["largest_chunk_after"]:
@@ -605,8 +596,6 @@ class IntelligentChunker:
 
         splitting_stats["semantic_splitting_enabled"] = True
 
-        # BEAM DEBUG: Final summary
-        final_sizes = [len(chunk["content"]) for chunk in split_chunks]
         logger.info(f"Semantic splitting complete: {splitting_stats}")
         return split_chunks, splitting_stats
 
@@ -913,6 +902,10 @@ class ChunkingStep(PipelineStep):
         self.db = db
         self.pipeline_service = pipeline_service
         self.storage_service = storage_service or StorageService()
+        self.insert_batch_size = config.get("insert_batch_size", 500)
+        self.deduplication_config = config.get("deduplication", {})
+        # Optional run-wide ChunkDeduplicator (set by the orchestrator); otherwise one per document
+        self.deduplicator = None
 
         # Create database client if not provided
         if self.db is None:
@@ -979,6 +972,14 @@ class ChunkingStep(PipelineStep):
             # Create chunks using intelligent chunking
             final_chunks, processing_stats = self.chunker.create_final_chunks(all_elements)
 
+            # Cache piece counts so embedding batches are packed without re-tokenizing;
+            # the calibration is applied when the batches are built
+            for chunk in final_chunks:
+                chunk["metadata"]["token_pieces"] = count_pieces(chunk["content"])
+
+            # Mark repeated boilerplate so only one copy is embedded
+            deduplication_stats = self.deduplicate_chunks(final_chunks, document_id)
+
             # Generate analysis and validation
             analysis = self.chunker.analyze_chunks(final_chunks)
             validation = self.chunker.validate_chunks(final_chunks)
@@ -1003,6 +1004,7 @@ class ChunkingStep(PipelineStep):
                 "very_large_chunks": analysis.get("very_large_chunks", 0),
                 "list_grouping_stats": processing_stats.get("grouping_stats", {}),
                 "noise_filtering_stats": processing_stats.get("filtering_stats", {}),
+                "deduplication_stats": deduplication_stats,
             }
 
             # Create enhanced sample outputs for debugging
@@ -1068,8 +1070,38 @@ class ChunkingStep(PipelineStep):
                 details={"reason": str(e)},
             ) from e
 
+    def create_deduplicator(self) -> Optional[ChunkDeduplicator]:
+        """ChunkDeduplicator from the chunking config (None if disabled)"""
+        if not self.deduplication_config.get("enabled", False):
+            return None
+        return ChunkDeduplicator(
+            threshold=self.deduplication_config.get("near_duplicate_threshold", 0.9),
+            num_perm=self.deduplication_config.get("num_perm", 64),
+            bands=self.deduplication_config.get("bands", 16),
+            shingle_size=self.deduplication_config.get("shingle_size", 5),
+            min_words=self.deduplication_config.get("min_words", 8),
+        )
+
+    def deduplicate_chunks(self, chunks: List[Dict[str, Any]], document_id: UUID = None) -> Dict[str, int]:
+        """Mark exact and near-duplicate chunks (across the run when a shared deduplicator is set)"""
+        deduplicator = self.deduplicator or self.create_deduplicator()
+        if deduplicator is None:
+            return {"exact_duplicates": 0, "near_duplicates": 0, "unique_chunks": len(chunks)}
+
+        stats = deduplicator.deduplicate(chunks, document_id)
+        if stats["exact_duplicates"] or stats["near_duplicates"]:
+            logger.info(
+                f"Deduplicated chunks: {stats['exact_duplicates']} exact and "
+                f"{stats['near_duplicates']} near duplicates of {len(chunks)}"
+            )
+        return stats
+
     async def store_chunks_in_database(self, chunks: List[Dict[str, Any]], indexing_run_id: UUID, document_id: UUID):
-        """Store chunks in document_chunks table for embedding step"""
+        """Store chunks in document_chunks table for embedding step.
+
+        Chunks are bulk inserted and the returned row ids are set as ``chunk["id"]``,
+        so the embedding step can use the in-memory chunks without reading them back.
+        """
         if not self.db:
             logger.warning("No database client available, skipping chunk storage")
             return
@@ -1077,23 +1109,34 @@ class ChunkingStep(PipelineStep):
         try:
             logger.info(f"Storing {len(chunks)} chunks in document_chunks table")
 
-            # Store each chunk in database
-            for chunk_index, chunk in enumerate(chunks):
-                self.db.table("document_chunks").insert(
-                    {
-                        "indexing_run_id": str(indexing_run_id),
-                        "document_id": str(document_id),
-                        "chunk_id": chunk["chunk_id"],
-                        "content": chunk["content"],
-                        "metadata": chunk["metadata"],
-                        # Embedding fields will be NULL initially
-                        "embedding_1024": None,
-                        "embedding_model": None,
-                        "embedding_provider": None,
-                        "embedding_metadata": {},
-                        "embedding_created_at": None,
-                    }
-                ).execute()
+            for start in range(0, len(chunks), self.insert_batch_size):
+                batch = chunks[start : start + self.insert_batch_size]
+                query = self.db.table("document_chunks").insert(
+                    [
+                        {
+                            "indexing_run_id": str(indexing_run_id),
+                            "document_id": str(document_id),
+                            "chunk_id": chunk["chunk_id"],
+                            "content": chunk["content"],
+                            "metadata": chunk["metadata"],
+                            # Embedding fields will be NULL initially
+                            "embedding_1024": None,
+                            "embedding_model": None,
+                            "embedding_provider": None,
+                            "embedding_metadata": {},
+                            "embedding_created_at": None,
+                        }
+                        for chunk in batch
+                    ]
+                )
+                # Only return the generated ids, not the inserted content
+                query.params = query.params.set("select", "id,chunk_id")
+                result = await aexecute(query)
+
+                row_ids = {row["chunk_id"]: row["id"] for row in result.data or []}
+                for chunk in batch:
+                    if chunk["chunk_id"] in row_ids:
+                        chunk["id"] = row_ids[chunk["chunk_id"]]
 
             logger.info(f"Successfully stored {len(chunks)} chunks in database")
 
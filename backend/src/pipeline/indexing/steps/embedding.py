@@ -1,6 +1,7 @@
 """Production embedding step for document processing pipeline."""
 
 import asyncio
+import importlib.util
 import json
 import time
 from datetime import datetime
@@ -15,42 +16,98 @@ from src.models import StepResult
 from ...shared.models import PipelineError
 from src.shared.errors import ErrorCode
 from src.utils.exceptions import AppError
+from src.services.async_db import aexecute
 from src.services.storage_service import StorageService
 
+from ..chunk_dedup import is_duplicate
+from ..embedding_quality import compute_quality_metrics, summarize as summarize_quality
+from ..token_counter import TokenCounter, get_token_counter
+
 # Initialize structured logger
 from src.utils.logging import get_logger
 logger = get_logger(__name__)
 
 
+# HTTP/2 needs the optional h2 package (httpx[http2]); fall back to pooled HTTP/1.1 keep-alive
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Status codes worth retrying for a single batch
+_RETRYABLE_STATUS_CODES = {408, 409, 425, 429, 500, 502, 503, 504}
+
+
+class VoyageBatchError(Exception):
+    """Raised when some batches still fail after their per-batch retries.
+
+    ``embeddings`` is aligned with the input texts; entries of failed batches are None,
+    so callers can keep the successful batches and re-embed only the failed ones.
+    """
+
+    def __init__(self, embeddings: List[Optional[List[float]]], failed_batches: List[int], errors: List[Exception]):
+        self.embeddings = embeddings
+        self.failed_batches = failed_batches
+        self.errors = errors
+        super().__init__(
+            f"{len(failed_batches)} embedding batch(es) failed after retries: {errors[0] if errors else 'unknown error'}"
+        )
+
+
 class VoyageEmbeddingClient:
-    """Client for Voyage AI embedding API"""
+    """Client for Voyage AI embedding API.
+
+    Batches are dispatched concurrently (bounded by ``max_concurrency``) over one
+    long-lived pooled HTTP client, retried individually, and reassembled in input order.
+    """
 
-    def __init__(self, api_key: str, model: str):
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        max_concurrency: int = 4,
+        max_retries: int = 3,
+        retry_delay: float = 1.0,
+        timeout: float = 90.0,
+        base_url: str = "https://api.voyageai.com/v1/embeddings",
+        token_counter: Optional[TokenCounter] = None,
+    ):
         self.api_key = api_key
         self.model = model
-        self.base_url = "https://api.voyageai.com/v1/embeddings"
+        self.base_url = base_url
         self.dimensions = 1024  # voyage-multilingual-2 dimensions
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max(1, max_retries)
+        self.retry_delay = retry_delay
+        self.timeout = timeout
+        self.token_counter = token_counter or get_token_counter()
+
+        # Pooled client, created lazily per event loop (httpx clients are loop-bound)
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
 
     def estimate_tokens(self, text: str) -> int:
-        """Estimate token count for Danish/multilingual text"""
-        # Conservative estimate for voyage-multilingual-2:
-        # - Danish text has longer compound words and special chars
-        # - Technical construction text is token-dense
-        # - Use 1.8x multiplier for safety (Danish factor + technical content)
-        return int(len(text) * 1.8)
-
-    def split_batch_by_tokens(self, texts: List[str], max_tokens: int = 100000) -> List[List[str]]:
+        """Token count for text (exact with a local tokenizer, otherwise calibrated from API usage)"""
+        return self.token_counter.count(text)
+
+    def split_batch_by_tokens(
+        self, texts: List[str], max_tokens: int = 100000, token_counts: Optional[List[Optional[int]]] = None
+    ) -> List[List[str]]:
         """Split texts into batches that don't exceed token limits"""
+        return [batch for batch, _tokens in self._split_by_tokens(texts, max_tokens, token_counts)]
+
+    def _split_by_tokens(
+        self, texts: List[str], max_tokens: int, token_counts: Optional[List[Optional[int]]] = None
+    ) -> List[tuple[List[str], int]]:
+        """Token-limited batches with their token totals; cached counts (chunk metadata) are used when given"""
         batches = []
         current_batch = []
         current_tokens = 0
         
-        for text in texts:
-            text_tokens = self.estimate_tokens(text)
+        for index, text in enumerate(texts):
+            cached = token_counts[index] if token_counts is not None else None
+            text_tokens = cached if cached is not None else self.estimate_tokens(text)
             
             # If adding this text would exceed limit, start new batch
             if current_batch and (current_tokens + text_tokens) > max_tokens:
-                batches.append(current_batch)
+                batches.append((current_batch, current_tokens))
                 current_batch = [text]
                 current_tokens = text_tokens
             else:
@@ -59,109 +116,200 @@ class VoyageEmbeddingClient:
                 
         # Add final batch if not empty
         if current_batch:
-            batches.append(current_batch)
+            batches.append((current_batch, current_tokens))
             
         return batches
 
-    async def get_embeddings(
-        self, texts: List[str], batch_size: int = 100
-    ) -> List[List[float]]:
-        """Generate embeddings for a list of texts using Voyage AI with token-aware batching"""
-        all_embeddings = []
-        
-        # Split texts by token limits first (120K limit for voyage-multilingual-2)
-        token_batches = self.split_batch_by_tokens(texts, max_tokens=100000)
-        log_msg = f"📊 Split {len(texts)} texts into {len(token_batches)} token-limited batches"
-        logger.info(log_msg)
-        
-        # Process each token-limited batch
-        for token_batch_idx, token_batch in enumerate(token_batches):
-            estimated_tokens = sum(self.estimate_tokens(text) for text in token_batch)
-            log_msg = f"🔄 Processing token batch {token_batch_idx + 1}/{len(token_batches)}: {len(token_batch)} texts, ~{estimated_tokens:,} estimated tokens"
-            logger.info(log_msg)
-            
-            # Further split by batch_size within token limits
-            for i in range(0, len(token_batch), batch_size):
-                batch_texts = token_batch[i : i + batch_size]
-                batch_tokens = sum(self.estimate_tokens(text) for text in batch_texts)
-                batch_num = i // batch_size + 1
-                total_batches = (len(token_batch) + batch_size - 1) // batch_size
+    def plan_batches(
+        self, texts: List[str], batch_size: int = 100, token_counts: Optional[List[Optional[int]]] = None
+    ) -> List[tuple[List[str], int]]:
+        """Token-limited batches (120K limit for voyage-multilingual-2) with token totals.
+
+        Batches are filled greedily up to 100K tokens and ``batch_size`` texts.
+        """
+        batches = []
+        current_batch = []
+        current_tokens = 0
+        for text, text_tokens in zip(texts, self._token_counts(texts, token_counts), strict=True):
+            if current_batch and (len(current_batch) >= batch_size or current_tokens + text_tokens > 100000):
+                batches.append((current_batch, current_tokens))
+                current_batch = []
+                current_tokens = 0
+            current_batch.append(text)
+            current_tokens += text_tokens
+        if current_batch:
+            batches.append((current_batch, current_tokens))
+        return batches
 
+    def _token_counts(self, texts: List[str], token_counts: Optional[List[Optional[int]]] = None) -> List[int]:
+        if token_counts is None:
+            return [self.estimate_tokens(text) for text in texts]
+        return [
+            count if count is not None else self.estimate_tokens(text)
+            for text, count in zip(texts, token_counts, strict=True)
+        ]
+
+    def _get_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(
+                http2=_HTTP2_AVAILABLE,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json",
+                },
+            )
+            self._client_loop = loop
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+        self._client_loop = None
+
+    async def __aenter__(self) -> "VoyageEmbeddingClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code in _RETRYABLE_STATUS_CODES
+        return isinstance(error, (httpx.TimeoutException, httpx.RequestError))
+
+    @staticmethod
+    def _is_token_limit_error(error: Exception) -> bool:
+        if not isinstance(error, httpx.HTTPStatusError) or error.response.status_code != 400:
+            return False
+        return "token" in error.response.text.lower()
+
+    def _retry_delay_for(self, error: Exception, attempt: int) -> float:
+        if isinstance(error, httpx.HTTPStatusError):
+            retry_after = error.response.headers.get("retry-after")
+            if retry_after:
                 try:
-                    api_msg = f"🌐 Sending API request for batch {batch_num}/{total_batches}: {len(batch_texts)} texts, ~{batch_tokens:,} estimated tokens"
-                    logger.info(api_msg)
-                    async with httpx.AsyncClient(timeout=90.0) as client:
-                        response = await client.post(
-                            self.base_url,
-                            headers={
-                                "Authorization": f"Bearer {self.api_key}",
-                                "Content-Type": "application/json",
-                            },
-                            json={"model": self.model, "input": batch_texts},
-                        )
-
-                        if response.status_code != 200:
-                            raise Exception(
-                                f"Voyage API error: {response.status_code} - {response.text}"
-                            )
-
-                        result = response.json()
-                        batch_embeddings = [item["embedding"] for item in result["data"]]
-                        all_embeddings.extend(batch_embeddings)
-
-                        success_msg = f"✅ Generated embeddings for batch {batch_num}/{total_batches}: {len(batch_texts)} texts, ~{batch_tokens:,} estimated tokens"
-                        logger.info(success_msg)
-
-                except httpx.HTTPStatusError as http_err:
-                    status_code = http_err.response.status_code
-                    response_text = http_err.response.text[:500]
-                    
-                    error_msg = f"❌ HTTP {status_code} error for batch {batch_num}/{total_batches}"
-                    logger.error(error_msg)
-                    
-                    details_msg = f"Voyage API request details: model={self.model}, batch_size={len(batch_texts)}, estimated_tokens={batch_tokens:,}"
-                    logger.error(details_msg)
-                    
-                    response_msg = f"API Response: {response_text}"
-                    logger.error(response_msg)
-                    
+                    return min(60.0, float(retry_after))
+                except ValueError:
+                    pass
+        return min(30.0, self.retry_delay * (2**attempt))
+
+    async def _post_batch(self, batch_texts: List[str]) -> List[List[float]]:
+        response = await self._get_client().post(
+            self.base_url, json={"model": self.model, "input": batch_texts}
+        )
+        response.raise_for_status()
+        result = response.json()
+        # Billed tokens calibrate the estimator used for packing later batches
+        self.token_counter.observe(batch_texts, (result.get("usage") or {}).get("total_tokens"))
+        embeddings = [item["embedding"] for item in sorted(result["data"], key=lambda item: item.get("index", 0))]
+        if len(embeddings) != len(batch_texts):
+            raise ValueError(f"Voyage API returned {len(embeddings)} embeddings for {len(batch_texts)} texts")
+        return embeddings
+
+    async def embed_batch(
+        self,
+        batch_texts: List[str],
+        batch_num: int = 1,
+        total_batches: int = 1,
+        batch_tokens: Optional[int] = None,
+    ) -> List[List[float]]:
+        """Embed one batch, retrying only this batch on transient errors.
+
+        A batch rejected for exceeding the token limit is split in half and retried.
+        """
+        if batch_tokens is None:
+            batch_tokens = sum(self.estimate_tokens(text) for text in batch_texts)
+
+        for attempt in range(self.max_retries):
+            try:
+                embeddings = await self._post_batch(batch_texts)
+                logger.info(
+                    f"✅ Generated embeddings for batch {batch_num}/{total_batches}: "
+                    f"{len(batch_texts)} texts, ~{batch_tokens:,} estimated tokens"
+                )
+                return embeddings
+
+            except Exception as e:
+                if isinstance(e, httpx.HTTPStatusError):
+                    status_code = e.response.status_code
+                    response_text = e.response.text[:500]
+                    logger.error(f"❌ HTTP {status_code} error for batch {batch_num}/{total_batches}: {response_text}")
                     if status_code == 429:
-                        rate_limit_msg = f"😢 Rate limit hit! Batch had {len(batch_texts)} texts, ~{batch_tokens:,} estimated tokens"
-                        logger.error(rate_limit_msg)
+                        logger.error(f"😢 Rate limit hit! Batch had {len(batch_texts)} texts, ~{batch_tokens:,} estimated tokens")
                     elif "token" in response_text.lower() or "limit" in response_text.lower():
-                        limit_msg = f"⚠️ Token limit suspected! Batch had ~{batch_tokens:,} estimated tokens (voyage-multilingual-2 limit: 120K)"
-                        logger.error(limit_msg)
-                    
-                    raise http_err
-                    
-                except httpx.TimeoutException as timeout_err:
-                    timeout_msg = f"⏰ Timeout error for batch {batch_num}/{total_batches}: {timeout_err}"
-                    logger.error(timeout_msg)
-                    
-                    details_msg = f"Request details: {len(batch_texts)} texts, ~{batch_tokens:,} estimated tokens, 90s timeout"
-                    logger.error(details_msg)
-                    
-                    raise timeout_err
-                    
-                except httpx.RequestError as req_err:
-                    network_msg = f"🌐 Network error for batch {batch_num}/{total_batches}: {req_err}"
-                    logger.error(network_msg)
-                    
-                    raise req_err
-                    
-                except Exception as e:
-                    error_msg = f"❌ Unknown error for batch {batch_num}/{total_batches}: {e}"
-                    logger.error(error_msg)
-                    
-                    # Enhanced error logging for better debugging
-                    details_msg = f"Voyage API request details: model={self.model}, batch_size={len(batch_texts)}, estimated_tokens={batch_tokens:,}"
-                    logger.error(details_msg)
-                    
-                    sample_msg = f"Sample batch content: {[text[:100] + '...' if len(text) > 100 else text for text in batch_texts[:3]]}"
-                    logger.error(sample_msg)
-                    
+                        logger.error(f"⚠️ Token limit suspected! Batch had ~{batch_tokens:,} estimated tokens (voyage-multilingual-2 limit: 120K)")
+                else:
+                    logger.error(f"❌ {type(e).__name__} for batch {batch_num}/{total_batches}: {e}")
+
+                if self._is_token_limit_error(e) and len(batch_texts) > 1:
+                    middle = len(batch_texts) // 2
+                    logger.warning(f"✂️ Splitting batch {batch_num}/{total_batches} in half after token limit error")
+                    first = await self.embed_batch(batch_texts[:middle], batch_num, total_batches)
+                    second = await self.embed_batch(batch_texts[middle:], batch_num, total_batches)
+                    return first + second
+
+                if not self._is_retryable(e) or attempt == self.max_retries - 1:
+                    logger.error(
+                        f"Voyage API request details: model={self.model}, batch_size={len(batch_texts)}, "
+                        f"estimated_tokens={batch_tokens:,}, attempts={attempt + 1}"
+                    )
                     raise
 
+                delay = self._retry_delay_for(e, attempt)
+                logger.info(f"⏱️ Retrying batch {batch_num}/{total_batches} in {delay}s (attempt {attempt + 2}/{self.max_retries})")
+                await asyncio.sleep(delay)
+
+    async def get_embeddings(
+        self, texts: List[str], batch_size: int = 100, token_counts: Optional[List[Optional[int]]] = None
+    ) -> List[List[float]]:
+        """Generate embeddings for a list of texts using Voyage AI with token-aware batching.
+
+        ``token_counts`` (e.g. cached on chunks at chunking time) avoid recounting.
+        Raises VoyageBatchError (carrying the successful embeddings) if any batch fails.
+        """
+        batches = self.plan_batches(texts, batch_size, token_counts)
+        logger.info(
+            f"📊 Split {len(texts)} texts into {len(batches)} batches "
+            f"(max {self.max_concurrency} in flight, http2={_HTTP2_AVAILABLE})"
+        )
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run(batch_index: int, batch_texts: List[str], batch_tokens: int) -> List[List[float]]:
+            async with semaphore:
+                return await self.embed_batch(batch_texts, batch_index + 1, len(batches), batch_tokens)
+
+        results = await asyncio.gather(
+            *(run(batch_index, batch_texts, batch_tokens) for batch_index, (batch_texts, batch_tokens) in enumerate(batches)),
+            return_exceptions=True,
+        )
+
+        # Reassemble in input order
+        all_embeddings: List[Optional[List[float]]] = []
+        failed_batches = []
+        errors = []
+        for batch_index, ((batch_texts, _batch_tokens), result) in enumerate(zip(batches, results, strict=True)):
+            if isinstance(result, BaseException):
+                if not isinstance(result, Exception):
+                    raise result
+                failed_batches.append(batch_index)
+                errors.append(result)
+                all_embeddings.extend([None] * len(batch_texts))
+            else:
+                all_embeddings.extend(result)
+
+        if failed_batches:
+            raise VoyageBatchError(all_embeddings, failed_batches, errors)
+
         return all_embeddings
 
 
@@ -206,7 +354,6 @@ class EmbeddingStep(PipelineStep):
         model_name = config.get("model", "voyage-multilingual-2")  # Safe fallback
         if "model" not in config:
             logger.warning("embedding_config_missing_model", extra={"using_default": model_name})
-        self.voyage_client = VoyageEmbeddingClient(api_key=api_key, model=model_name)
 
         # Configuration - use config values with safe fallbacks
         self.batch_size = config.get("batch_size", 100)
@@ -214,6 +361,22 @@ class EmbeddingStep(PipelineStep):
         self.retry_delay = config.get("retry_delay", 1.0)
         self.timeout_seconds = config.get("timeout_seconds", 30)
         self.resume_capability = config.get("resume_capability", True)
+        self.max_concurrent_batches = config.get("max_concurrent_batches", 4)
+        self.quality_sample_size = config.get("quality_sample_size", 2000)
+        self.near_duplicate_threshold = config.get("near_duplicate_threshold", 0.98)
+        self.outlier_z = config.get("outlier_z", 4.0)
+
+        # The only retry layer: each batch is retried individually inside the client
+        self.voyage_client = VoyageEmbeddingClient(
+            api_key=api_key,
+            model=model_name,
+            max_concurrency=self.max_concurrent_batches,
+            max_retries=self.max_retries,
+            retry_delay=self.retry_delay,
+        )
+
+        # Optional run-wide EmbeddingQueue (set by the orchestrator) that packs batches across documents
+        self.embedding_queue = None
         
         # Warn about missing config values
         missing_fields = [field for field in ["batch_size", "max_retries", "timeout_seconds"] if field not in config]
@@ -226,7 +389,8 @@ class EmbeddingStep(PipelineStep):
             "model": model_name,
             "batch_size": self.batch_size,
             "max_retries": self.max_retries,
-            "timeout_seconds": self.timeout_seconds
+            "timeout_seconds": self.timeout_seconds,
+            "max_concurrent_batches": self.max_concurrent_batches,
         })
 
     async def execute(
@@ -248,10 +412,12 @@ class EmbeddingStep(PipelineStep):
             if not indexing_run_id:
                 raise ValueError("indexing_run_id is required for embedding step")
 
-            # Get chunks that need embedding from database
-            chunks_to_embed = await self.get_chunks_for_embedding(
-                indexing_run_id, document_id
-            )
+            # Use the chunks ChunkingStep just stored; the database is only read on resume/batch runs
+            chunks_to_embed = self.get_chunks_from_input(input_data) if document_id else None
+            if chunks_to_embed is None:
+                chunks_to_embed = await self.get_chunks_for_embedding(
+                    indexing_run_id, document_id
+                )
 
             if not chunks_to_embed:
                 logger.info("No chunks found that need embedding")
@@ -267,8 +433,12 @@ class EmbeddingStep(PipelineStep):
 
             logger.info(f"Found {len(chunks_to_embed)} chunks that need embedding")
 
-            # Generate embeddings (may return empty list on failure)
+            # Generate embeddings (None for chunks whose batch failed after all retries)
             embeddings = await self.generate_embeddings(chunks_to_embed)
+            pairs = list(zip(chunks_to_embed, embeddings, strict=True))
+            embedded_chunks = [chunk for chunk, embedding in pairs if embedding is not None]
+            failed_chunks = [chunk for chunk, embedding in pairs if embedding is None]
+            embeddings = [embedding for embedding in embeddings if embedding is not None]
 
             # Handle embedding failure gracefully
             if not embeddings:
@@ -294,16 +464,15 @@ class EmbeddingStep(PipelineStep):
                 logger.warning(f"Partial embedding success: {len(embeddings)}/{len(chunks_to_embed)} chunks embedded")
 
             # Store successful embeddings back to database
-            await self.store_embeddings(chunks_to_embed[:len(embeddings)], embeddings, indexing_run_id)
+            await self.store_embeddings(embedded_chunks, embeddings, indexing_run_id)
             
-            # Mark remaining chunks as failed if any
-            if len(embeddings) < len(chunks_to_embed):
-                failed_chunks = chunks_to_embed[len(embeddings):]
+            # Mark chunks of failed batches as failed if any
+            if failed_chunks:
                 await self.store_failed_embeddings(failed_chunks, "Embedding generation partially failed", indexing_run_id)
 
             # Validate embedding quality
             quality_metrics = await self.validate_embedding_quality(
-                chunks_to_embed, embeddings
+                embedded_chunks, embeddings
             )
 
             # Verify final indexes and optimization
@@ -342,13 +511,16 @@ class EmbeddingStep(PipelineStep):
                 "quality_score": quality_metrics.get("quality_score", 0.0),
                 "zero_vectors": quality_metrics.get("zero_vectors", 0),
                 "duplicate_embeddings": quality_metrics.get("duplicate_embeddings", 0),
+                "near_duplicate_pairs": quality_metrics.get("near_duplicate_pairs", 0),
+                "outlier_vectors": quality_metrics.get("outlier_vectors", 0),
             }
 
             # Create sample outputs
             sample_outputs = {
                 "sample_embeddings": [
                     {
-                        "chunk_id": chunk["chunk_id"],
+                        # Chunks read back from the database (resume, batch, dedup orphans) only carry their row id
+                        "chunk_id": chunk.get("chunk_id", chunk["id"]),
                         "embedding_preview": f"Vector[{len(embedding)} dimensions]",
                         "content_preview": (
                             chunk["content"][:100] + "..."
@@ -356,7 +528,7 @@ class EmbeddingStep(PipelineStep):
                             else chunk["content"]
                         ),
                     }
-                    for chunk, embedding in zip(chunks_to_embed[:3], embeddings[:3])
+                    for chunk, embedding in zip(embedded_chunks[:3], embeddings[:3], strict=True)
                 ]
             }
 
@@ -411,15 +583,30 @@ class EmbeddingStep(PipelineStep):
                 completed_at=datetime.utcnow(),
             )
 
+    def get_chunks_from_input(self, input_data: Any) -> Optional[List[Dict[str, Any]]]:
+        """Chunks from the chunking step output, if every chunk carries its database id"""
+        data = input_data.data if isinstance(input_data, StepResult) else input_data
+        if not isinstance(data, dict):
+            return None
+
+        chunks = data.get("chunks")
+        if not chunks or any(not chunk.get("id") for chunk in chunks):
+            return None
+
+        # Duplicates reuse their canonical chunk's embedding
+        chunks = [chunk for chunk in chunks if not is_duplicate(chunk)]
+        logger.info(f"Using {len(chunks)} in-memory chunks from chunking step")
+        return chunks
+
     async def get_chunks_for_embedding(
         self, indexing_run_id: UUID, document_id: UUID = None
     ) -> List[Dict[str, Any]]:
-        """Get chunks from database that need embedding"""
+        """Get chunks from database that need embedding (resume and batch path)"""
         try:
             # Query chunks that don't have embeddings yet
             query = (
                 self.db.table("document_chunks")
-                .select("*")
+                .select("id, content")
                 .eq("indexing_run_id", str(indexing_run_id))
             )
 
@@ -427,11 +614,14 @@ class EmbeddingStep(PipelineStep):
             if document_id:
                 query = query.eq("document_id", str(document_id))
 
+            # Duplicate chunks reuse their canonical chunk's embedding
+            query = query.is_("metadata->duplicate_of", "null")
+
             if self.resume_capability:
                 # Only get chunks without embeddings for resume capability
                 query = query.is_("embedding_1024", "null")
 
-            result = query.execute()
+            result = await aexecute(query)
 
             if not result.data:
                 return []
@@ -465,66 +655,47 @@ class EmbeddingStep(PipelineStep):
         else:
             return "unknown", str(error)
     
-    def calculate_retry_delay(self, error_type: str, attempt: int) -> int:
-        """Calculate smart retry delay based on error type"""
-        if error_type == "rate_limit":
-            # Rate limit errors: 30s, 60s, 120s, 240s, 300s max
-            return min(300, 30 * (2 ** attempt))
-        elif error_type in ["timeout", "network"]:
-            # Network/timeout errors: 5s, 10s, 20s, 40s, 60s max
-            return min(60, 5 * (2 ** attempt))
-        else:
-            # Other errors: Standard exponential backoff (2s, 4s, 8s, 16s, 30s max)
-            return min(30, 2 ** attempt)
-
     async def generate_embeddings(
         self, chunks: List[Dict[str, Any]]
-    ) -> List[List[float]]:
-        """Generate embeddings for chunks with smart retry logic"""
+    ) -> List[Optional[List[float]]]:
+        """Generate embeddings for chunks.
+
+        Returns one entry per chunk in input order. Retries happen once, per batch,
+        inside the client (``max_retries`` attempts); chunks whose batch still failed
+        are None.
+        """
         texts = [chunk["content"] for chunk in chunks]
-        start_time = datetime.now()
-        max_total_time = 600  # 10 minutes maximum per document
+        # Piece counts cached at chunking time, calibrated now (None: the client counts the text)
+        token_counter = self.voyage_client.token_counter
+        token_counts = [
+            token_counter.count_from_pieces((chunk.get("metadata") or {}).get("token_pieces")) for chunk in chunks
+        ]
+        embeddings: List[Optional[List[float]]] = [None] * len(texts)
 
-        for attempt in range(self.max_retries):
-            try:
-                attempt_msg = f"🔄 Generating embeddings (attempt {attempt + 1}/{self.max_retries})"
-                logger.info(attempt_msg)
-                
-                embeddings = await self.voyage_client.get_embeddings(
-                    texts, self.batch_size
+        try:
+            logger.info(f"🔄 Generating embeddings for {len(texts)} texts")
+            embedder = self.embedding_queue or self.voyage_client
+            batch_embeddings = await embedder.get_embeddings(texts, self.batch_size, token_counts)
+            if len(batch_embeddings) != len(texts):
+                raise ValueError(f"Got {len(batch_embeddings)} embeddings for {len(texts)} texts")
+            logger.info("✅ Embedding generation successful")
+            return batch_embeddings
+
+        except Exception as e:
+            # Keep the batches that succeeded; the failed ones were already retried by the client
+            if isinstance(e, VoyageBatchError):
+                embeddings = list(e.embeddings)
+                logger.warning(
+                    f"⚠️ {len(e.failed_batches)} batch(es) failed after {self.max_retries} attempts; "
+                    f"{sum(embedding is None for embedding in embeddings)}/{len(texts)} texts not embedded"
                 )
-                success_msg = f"✅ Embedding generation successful on attempt {attempt + 1}"
-                logger.info(success_msg)
-                return embeddings
+                e = e.errors[0]
 
-            except Exception as e:
-                # Check total time limit to prevent infinite hanging
-                elapsed = (datetime.now() - start_time).total_seconds()
-                if elapsed > max_total_time:
-                    timeout_msg = f"⏰ Embedding generation timeout after {elapsed:.1f}s (limit: {max_total_time}s)"
-                    logger.error(timeout_msg)
-                    return []  # Return empty list for graceful failure handling
-                
-                # Categorize error and calculate smart delay
-                error_type, error_details = self.categorize_error(e)
-                delay = self.calculate_retry_delay(error_type, attempt) if attempt < self.max_retries - 1 else 0
-                
-                error_msg = f"❌ Embedding generation failed (attempt {attempt + 1}/{self.max_retries}): {error_type}"
-                logger.error(error_msg)
-                
-                details_msg = f"Error details: {error_details}"
-                logger.error(details_msg)
-                
-                if attempt < self.max_retries - 1:
-                    delay_msg = f"⏱️ Waiting {delay}s before retry (error type: {error_type})"
-                    logger.info(delay_msg)
-                    await asyncio.sleep(delay)
-                else:
-                    # CRITICAL FIX: Return empty list instead of raising exception
-                    # This prevents the entire document processing from being killed
-                    final_msg = f"😵 All embedding attempts failed after {self.max_retries} retries. Returning empty embeddings for graceful failure handling."
-                    logger.error(final_msg)
-                    return []  # Return empty list for graceful failure handling
+            # Return instead of raising so the whole document isn't killed; failed chunks stay None
+            error_type, error_details = self.categorize_error(e)
+            logger.error(f"❌ Embedding generation failed: {error_type}")
+            logger.error(f"Error details: {error_details}")
+            return embeddings
 
     async def store_embeddings(
         self,
@@ -537,21 +708,23 @@ class EmbeddingStep(PipelineStep):
             logger.info(f"Storing {len(embeddings)} embeddings in database")
 
             # Update each chunk with its embedding
-            for chunk, embedding in zip(chunks, embeddings):
-                self.db.table("document_chunks").update(
-                    {
-                        "embedding_1024": embedding,
-                        "embedding_model": self.voyage_client.model,
-                        "embedding_provider": "voyage",
-                        "embedding_metadata": {
-                            "status": "completed",
-                            "dimensions": len(embedding),
-                            "model": self.voyage_client.model,
-                            "generated_at": datetime.now().isoformat(),
-                        },
-                        "embedding_created_at": datetime.now().isoformat(),
-                    }
-                ).eq("id", chunk["id"]).execute()
+            for chunk, embedding in zip(chunks, embeddings, strict=True):
+                await aexecute(
+                    self.db.table("document_chunks").update(
+                        {
+                            "embedding_1024": embedding,
+                            "embedding_model": self.voyage_client.model,
+                            "embedding_provider": "voyage",
+                            "embedding_metadata": {
+                                "status": "completed",
+                                "dimensions": len(embedding),
+                                "model": self.voyage_client.model,
+                                "generated_at": datetime.now().isoformat(),
+                            },
+                            "embedding_created_at": datetime.now().isoformat(),
+                        }
+                    ).eq("id", chunk["id"])
+                )
 
             logger.info(f"Successfully stored {len(embeddings)} embeddings in database")
 
@@ -571,16 +744,18 @@ class EmbeddingStep(PipelineStep):
 
             # Update each chunk with failure information
             for chunk in chunks:
-                self.db.table("document_chunks").update(
-                    {
-                        "embedding_metadata": {
-                            "status": "failed",
-                            "error": error_message,
-                            "model": self.voyage_client.model,
-                            "failed_at": datetime.now().isoformat(),
-                        },
-                    }
-                ).eq("id", chunk["id"]).execute()
+                await aexecute(
+                    self.db.table("document_chunks").update(
+                        {
+                            "embedding_metadata": {
+                                "status": "failed",
+                                "error": error_message,
+                                "model": self.voyage_client.model,
+                                "failed_at": datetime.now().isoformat(),
+                            },
+                        }
+                    ).eq("id", chunk["id"])
+                )
 
             logger.info(f"Successfully marked {len(chunks)} chunks as embedding failed")
 
@@ -595,77 +770,22 @@ class EmbeddingStep(PipelineStep):
         try:
             logger.info("Validating embedding quality...")
 
-            import numpy as np
-
-            # Basic quality checks
-            quality_metrics = {
-                "total_embeddings": len(embeddings),
-                "embedding_dimensions": len(embeddings[0]) if embeddings else 0,
-                "zero_vectors": 0,
-                "duplicate_embeddings": 0,
-                "embedding_stats": {},
-                "similarity_analysis": {},
-                "quality_score": 0.0,
-                "validation_timestamp": datetime.now().isoformat(),
-            }
-
-            if not embeddings:
-                return quality_metrics
-
-            # Convert to numpy for calculations
-            embedding_array = np.array(embeddings)
-
-            # Check for zero vectors
-            zero_vectors = np.sum(np.all(embedding_array == 0, axis=1))
-            quality_metrics["zero_vectors"] = int(zero_vectors)
-
-            # Calculate embedding statistics
-            quality_metrics["embedding_stats"] = {
-                "mean": float(np.mean(embedding_array)),
-                "std": float(np.std(embedding_array)),
-                "min": float(np.min(embedding_array)),
-                "max": float(np.max(embedding_array)),
-                "norm_mean": float(np.mean(np.linalg.norm(embedding_array, axis=1))),
-                "norm_std": float(np.std(np.linalg.norm(embedding_array, axis=1))),
-            }
-
-            # Check for duplicate embeddings (simple check)
-            unique_embeddings = len(set(tuple(emb) for emb in embeddings))
-            quality_metrics["duplicate_embeddings"] = (
-                len(embeddings) - unique_embeddings
+            quality_metrics = compute_quality_metrics(
+                embeddings,
+                sample_size=self.quality_sample_size,
+                near_duplicate_threshold=self.near_duplicate_threshold,
+                outlier_z=self.outlier_z,
             )
+            quality_metrics["outlier_chunk_ids"] = [
+                chunks[index].get("id") for index in quality_metrics["outlier_indices"] if index < len(chunks)
+            ]
 
-            # Calculate similarity between first few embeddings
-            if len(embeddings) >= 2:
-                # Normalize embeddings for cosine similarity
-                normalized_embeddings = embedding_array / np.linalg.norm(
-                    embedding_array, axis=1, keepdims=True
-                )
-
-                # Calculate similarity between first two embeddings
-                similarity = np.dot(normalized_embeddings[0], normalized_embeddings[1])
-                quality_metrics["similarity_analysis"] = {
-                    "first_two_similarity": float(similarity),
-                    "self_similarity_check": float(
-                        np.dot(normalized_embeddings[0], normalized_embeddings[0])
-                    ),
-                }
-
-            # Calculate overall quality score
-            quality_score = 0.0
-            if quality_metrics["zero_vectors"] == 0:
-                quality_score += 0.3
-            if quality_metrics["duplicate_embeddings"] == 0:
-                quality_score += 0.3
-            if quality_metrics["embedding_stats"]["norm_mean"] > 0.9:
-                quality_score += 0.2
-            if quality_metrics["embedding_stats"]["std"] > 0.01:
-                quality_score += 0.2
-
-            quality_metrics["quality_score"] = quality_score
+            quality_warnings = summarize_quality(quality_metrics)
+            if quality_warnings:
+                logger.warning(f"⚠️ Embedding quality issues: {', '.join(quality_warnings)}")
 
             logger.info(
-                f"Embedding quality validation completed. Score: {quality_score:.2f}"
+                f"Embedding quality validation completed. Score: {quality_metrics['quality_score']:.2f}"
             )
             return quality_metrics
 
@@ -701,12 +821,11 @@ class EmbeddingStep(PipelineStep):
             logger.info("Verifying final indexes...")
 
             # Get a sample embedding to test with
-            result = (
+            result = await aexecute(
                 self.db.table("document_chunks")
                 .select("embedding_1024")
                 .eq("indexing_run_id", str(indexing_run_id))
                 .limit(1)
-                .execute()
             )
 
             if result.data and result.data[0].get("embedding_1024"):
@@ -714,12 +833,11 @@ class EmbeddingStep(PipelineStep):
                 test_embedding = result.data[0]["embedding_1024"]
 
                 # Simple test: count embeddings for this run
-                count_result = (
+                count_result = await aexecute(
                     self.db.table("document_chunks")
                     .select("id", count="exact")
                     .eq("indexing_run_id", str(indexing_run_id))
                     .not_.is_("embedding_1024", "null")
-                    .execute()
                 )
 
                 embedding_count = count_result.count if count_result.count else 0
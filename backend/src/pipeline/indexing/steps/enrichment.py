@@ -465,11 +465,22 @@ class EnrichmentStep(PipelineStep):
         # Separate tables that need VLM processing from those that don't
         tables_to_process = []
         tables_skipped = 0
+        tables_direct = 0
 
         for i, table_element in enumerate(table_elements):
             table_page = table_element.get("page")
             table_id = table_element.get("id", f"table_{i}")
 
+            # Clean tables were extracted directly from the PDF structure - no VLM needed
+            if table_element.get("metadata", {}).get("direct_extraction"):
+                tables_direct += 1
+                table_element["enrichment_metadata"] = {
+                    "vlm_processed": False,
+                    "skip_reason": "direct_structured_extraction",
+                    "vlm_processing_timestamp": datetime.now().isoformat(),
+                }
+                continue
+
             # Fix data type comparison - try both int and str versions
             has_full_page = table_page in extracted_pages or str(table_page) in extracted_pages
 
@@ -511,6 +522,10 @@ class EnrichmentStep(PipelineStep):
                     tables_to_process[i + j]["enrichment_metadata"] = enrichment_metadata
 
         tables_processed_with_vlm = len(tables_to_process)
+        logger.info(
+            f"Tables: {tables_processed_with_vlm} captioned with VLM, {tables_direct} direct structured extraction, "
+            f"{tables_skipped} covered by full-page extraction"
+        )
 
 
         # Process full-page images
@@ -507,7 +507,7 @@ class MetadataStep(PipelineStep):
 
         logger.info("MetadataStep initialized")
 
-    async def execute(self, input_data: Any) -> StepResult:
+    async def execute(self, input_data: Any, continue_sections: bool = False) -> StepResult:
         """Execute the metadata step with async operations"""
         start_time = datetime.utcnow()
 
@@ -580,7 +580,7 @@ class MetadataStep(PipelineStep):
 
             # Execute metadata analysis
             logger.info("🚀 Executing metadata analysis...")
-            enriched_elements = await self._analyze_metadata_async(partition_data)
+            enriched_elements = await self._analyze_metadata_async(partition_data, continue_sections)
 
             # Calculate duration
             duration = (datetime.utcnow() - start_time).total_seconds()
@@ -772,20 +772,29 @@ class MetadataStep(PipelineStep):
         except Exception:
             return 30  # Default 30 seconds
 
-    async def _analyze_metadata_async(self, partition_data: dict[str, Any]) -> list[dict[str, Any]]:
+    async def _analyze_metadata_async(
+        self, partition_data: dict[str, Any], continue_sections: bool = False
+    ) -> list[dict[str, Any]]:
         """Execute the metadata analysis asynchronously"""
 
         # Run the CPU-intensive analysis in a thread pool
         loop = asyncio.get_running_loop()
-        result = await loop.run_in_executor(None, self._analyze_metadata_sync, partition_data)
+        result = await loop.run_in_executor(None, self._analyze_metadata_sync, partition_data, continue_sections)
 
         return result
 
-    def _analyze_metadata_sync(self, partition_data: dict[str, Any]) -> list[dict[str, Any]]:
-        """Synchronous metadata analysis with pure JSON processing"""
+    def _analyze_metadata_sync(
+        self, partition_data: dict[str, Any], continue_sections: bool = False
+    ) -> list[dict[str, Any]]:
+        """Synchronous metadata analysis with pure JSON processing.
+
+        With ``continue_sections`` the section tracking from the previous call is kept,
+        so page windows of one document (streaming mode) inherit section titles.
+        """
 
         # Reset analyzer state for new document
-        self.analyzer.reset_section_tracking()
+        if not continue_sections:
+            self.analyzer.reset_section_tracking()
 
         # Get document-level metadata for filename
         document_metadata = partition_data.get("metadata", {})
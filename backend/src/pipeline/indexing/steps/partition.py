@@ -9,7 +9,7 @@ import requests
 import concurrent.futures
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
 from collections import Counter
 from uuid import UUID, uuid4
 import logging
@@ -37,6 +37,14 @@ from src.models import StepResult
 from ...shared.models import DocumentInput, PipelineError
 from src.shared.errors import ErrorCode
 from src.utils.exceptions import AppError
+from ..element_store import TextElementStore
+from ..vlm_budget import (
+    PLAN_FULL_PAGE_VLM,
+    PLAN_TEXT_WITH_IMAGE_CAPTION,
+    VLMBudgetPlanner,
+    compute_image_coverage,
+    score_text_quality,
+)
 
 
 class PartitionStep(PipelineStep):
@@ -73,6 +81,7 @@ class PartitionStep(PipelineStep):
         self.repetition_threshold = self.table_validation.get("repetition_threshold", 0.7)
         self.min_confidence = self.table_validation.get("min_confidence", 0.3)
         self.reject_on_drawing_pages = self.table_validation.get("reject_on_drawing_pages", True)
+        self.direct_extraction_confidence = self.table_validation.get("direct_extraction_confidence", 0.7)
 
         # Create temporary directories for processing
         self.temp_dir = Path(tempfile.mkdtemp(prefix="partition_"))
@@ -1214,15 +1223,21 @@ class PartitionStep(PipelineStep):
 
         return cleaned_result
 
+    def _create_partitioner(self) -> "UnifiedPartitionerV2":
+        """Create a partitioner with the step's table validation and VLM budget config"""
+        table_validation_config = self.config.get("table_validation", {})
+        vlm_budget_config = self.config.get("vlm_budget", {})
+        return UnifiedPartitionerV2(
+            str(self.tables_dir), str(self.images_dir), table_validation_config, vlm_budget_config
+        )
+
     def _partition_document_sync(self, filepath: str) -> Dict[str, Any]:
         """Synchronous partitioning implementation (runs in thread pool)"""
 
         logger.info(f"Processing PDF: {os.path.basename(filepath)}")
 
         # Initialize partitioner
-        # Pass table validation config to partitioner
-        table_validation_config = self.config.get("table_validation", {})
-        partitioner = UnifiedPartitionerV2(str(self.tables_dir), str(self.images_dir), table_validation_config)
+        partitioner = self._create_partitioner()
 
         # Stage 1: PyMuPDF analysis
         stage1_results = partitioner.stage1_pymupdf_analysis(filepath)
@@ -1247,7 +1262,8 @@ class PartitionStep(PipelineStep):
                 "total_images_detected": total_images,
                 "meaningful_images": meaningful_images,
                 "tables_detected": len(stage1_results['table_locations']),
-                "pages_needing_extraction": pages_needing_extraction
+                "pages_needing_extraction": pages_needing_extraction,
+                "vlm_plan": stage1_results.get("vlm_plan_summary", {}),
             }
         })
 
@@ -1272,6 +1288,126 @@ class PartitionStep(PipelineStep):
             "stage1_results": stage1_results,
         }
 
+    def _partition_pages_sync(self, partitioner, filepath: str, pages: set) -> Dict[str, Any]:
+        """Run stages 2-4 for a subset of pages (streaming mode, runs in thread pool)"""
+        stage1_results = partitioner._stage1_results
+
+        text_elements, raw_elements = partitioner.stage2_fast_text_extraction(filepath, pages=pages)
+
+        extracted_pages = {}
+        if self.extract_images:
+            extracted_pages = partitioner.stage4_full_page_extraction(
+                filepath, stage1_results["page_analysis"], pages=pages
+            )
+
+        enhanced_tables = []
+        if self.extract_tables:
+            enhanced_tables = partitioner.stage3_create_table_elements_only(
+                filepath, stage1_results["table_locations"], pages=pages
+            )
+
+        return {
+            "text_elements": text_elements,
+            "raw_elements": raw_elements,
+            "enhanced_tables": enhanced_tables,
+            "extracted_pages": extracted_pages,
+            "stage1_results": {
+                **stage1_results,
+                "page_analysis": {p: a for p, a in stage1_results["page_analysis"].items() if p in pages},
+                "image_locations": [i for i in stage1_results["image_locations"] if i["page"] in pages],
+            },
+        }
+
+    async def iter_page_windows(
+        self, document_input: DocumentInput, page_window: int = 10
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield partition data one window of pages at a time (streaming mode).
+
+        Stage 1 analysis (and the VLM budget plan) still covers the whole document,
+        but text/table/page-image extraction and uploads run per window so downstream
+        steps can start on the first pages while later pages are still being processed.
+        Each yielded dict has the same shape as ``execute(...).data`` plus ``page_window``.
+
+        Scanned documents and forced OCR strategies are not windowed; they are yielded
+        as a single window.
+
+        With ``document_input.page_range`` only those pages are yielded (one page shard
+        of a document split across indexing tasks). Documents that can't be windowed are
+        processed whole by the shard that starts at page 1; other shards yield nothing.
+        """
+        downloaded_file_path = None
+        try:
+            file_path = await self._get_local_file_path(document_input.file_path)
+            if file_path != document_input.file_path:
+                downloaded_file_path = file_path
+
+            windowed = self.ocr_strategy in ("auto", "pymupdf_only")
+            if windowed and self.ocr_strategy == "auto":
+                windowed = not self._detect_document_type(file_path)["is_likely_scanned"]
+
+            page_range = getattr(document_input, "page_range", None)
+            if not windowed:
+                if page_range and page_range[0] > 1:
+                    logger.warning(
+                        f"Document {document_input.document_id} can't be split by pages; "
+                        f"pages {page_range[0]}-{page_range[1]} are processed by the first page shard"
+                    )
+                    return
+                result = await self._partition_document_hybrid(file_path, document_input)
+                total_pages = result.get("document_metadata", {}).get("total_pages", 0)
+                result["page_window"] = {"index": 0, "total_windows": 1, "start_page": 1, "end_page": total_pages}
+                yield result
+                return
+
+            loop = asyncio.get_running_loop()
+            partitioner = self._create_partitioner()
+            stage1_results = await loop.run_in_executor(None, partitioner.stage1_pymupdf_analysis, file_path)
+
+            total_pages = stage1_results["document_metadata"].get("total_pages", 0)
+            first_page, last_page = 1, total_pages
+            if page_range:
+                first_page, last_page = max(1, page_range[0]), min(page_range[1], total_pages)
+            page_window = max(1, page_window)
+            total_windows = max(0, (last_page - first_page + page_window) // page_window)
+
+            for index, start_page in enumerate(range(first_page, last_page + 1, page_window)):
+                end_page = min(start_page + page_window - 1, last_page)
+                pages = set(range(start_page, end_page + 1))
+
+                raw = await loop.run_in_executor(None, self._partition_pages_sync, partitioner, file_path, pages)
+                result = await self._post_process_results_async(
+                    text_elements=raw["text_elements"],
+                    raw_elements=raw["raw_elements"],
+                    enhanced_tables=raw["enhanced_tables"],
+                    extracted_pages=raw["extracted_pages"],
+                    stage1_results=raw["stage1_results"],
+                    filepath=file_path,
+                    document_input=document_input,
+                )
+                result["metadata"]["processing_strategy"] = "pymupdf_only_streaming"
+                result["page_window"] = {
+                    "index": index,
+                    "total_windows": total_windows,
+                    "start_page": start_page,
+                    "end_page": end_page,
+                }
+                yield result
+
+        except Exception as e:
+            doc_id = getattr(document_input, "document_id", "unknown")
+            logger.error(f"Streaming partition failed for document {doc_id}: {e}")
+            raise AppError(
+                f"Partition step failed for document {doc_id}",
+                error_code=ErrorCode.INTERNAL_ERROR,
+                details={"reason": str(e), "document_id": doc_id},
+            ) from e
+        finally:
+            if downloaded_file_path and os.path.exists(downloaded_file_path):
+                try:
+                    os.unlink(downloaded_file_path)
+                except Exception as cleanup_error:
+                    logger.error(f"Error cleaning up downloaded file: {cleanup_error}")
+
     async def _post_process_results_async(
         self,
         text_elements,
@@ -1326,6 +1462,7 @@ class PartitionStep(PipelineStep):
                             "original_image_count": page_info["original_image_count"],
                             "original_table_count": page_info["original_table_count"],
                             "image_type": "extracted_page",
+                            "vlm_plan": page_info.get("vlm_plan", PLAN_FULL_PAGE_VLM),
                         }
 
                         logger.info(f"Uploaded page {page_num}: {upload_result['url']}")
@@ -1359,6 +1496,7 @@ class PartitionStep(PipelineStep):
                 "pages_analyzed": len(cleaned_page_analysis),
                 "original_raw_count": len(raw_elements),  # Keep for reference
                 "original_image_count": len(stage1_results["image_locations"]),  # Keep for reference
+                "vlm_plan_summary": stage1_results.get("vlm_plan_summary", {}),
             }
 
             # 7. Combine cleaned results
@@ -1379,6 +1517,9 @@ class PartitionStep(PipelineStep):
 
     def _filter_text_elements(self, text_elements):
         """Filter text elements to remove tiny fragments and improve quality"""
+        if isinstance(text_elements, TextElementStore):
+            return self._filter_text_element_store(text_elements)
+
         filtered_elements = []
 
         for element in text_elements:
@@ -1407,6 +1548,24 @@ class PartitionStep(PipelineStep):
 
         return filtered_elements
 
+    def _filter_text_element_store(self, store: TextElementStore) -> TextElementStore:
+        """Columnar variant of _filter_text_elements (store metadata is already clean)"""
+        keep_rows = []
+        kept_texts = []
+
+        for row, raw_text in enumerate(store.texts):
+            text = raw_text.strip()
+
+            if len(text) < 10 and not self._is_meaningful_small_element(text):
+                continue
+            if text and not text.isalnum() and len(text) < 5:
+                continue
+
+            keep_rows.append(row)
+            kept_texts.append(text)
+
+        return store.select(keep_rows, texts=kept_texts)
+
     def _is_meaningful_small_element(self, text):
         """Check if a small text element is meaningful enough to keep"""
         text = text.strip()
@@ -1448,6 +1607,8 @@ class PartitionStep(PipelineStep):
             "processing_strategy",
             "table_id",
             "text_as_html",
+            "direct_extraction",
+            "table_confidence",
         ]
 
         for field in essential_fields:
@@ -1470,6 +1631,10 @@ class PartitionStep(PipelineStep):
                 "complexity": analysis.get("complexity"),
                 "needs_extraction": analysis.get("needs_extraction"),
                 "is_fragmented": analysis.get("is_fragmented"),
+                "vlm_plan": analysis.get("vlm_plan"),
+                "text_quality": analysis.get("text_quality"),
+                "image_coverage": analysis.get("image_coverage"),
+                "table_confidence": analysis.get("table_confidence"),
             }
 
         return cleaned_analysis
@@ -1518,7 +1683,7 @@ class PartitionStep(PipelineStep):
 class UnifiedPartitionerV2:
     """Improved unified PDF partitioning using PyMuPDF analysis + unstructured fast"""
 
-    def __init__(self, tables_dir, images_dir, table_validation_config=None):
+    def __init__(self, tables_dir, images_dir, table_validation_config=None, vlm_budget_config=None):
         self.tables_dir = Path(tables_dir)
         self.images_dir = Path(images_dir)
         self.tables_dir.mkdir(exist_ok=True)
@@ -1540,6 +1705,14 @@ class UnifiedPartitionerV2:
         self.repetition_threshold = table_validation_config.get("repetition_threshold", 0.7)
         self.min_confidence = table_validation_config.get("min_confidence", 0.3)
         self.reject_on_drawing_pages = table_validation_config.get("reject_on_drawing_pages", True)
+        # Tables at or above this confidence are emitted as markdown without VLM captioning
+        self.direct_extraction_confidence = table_validation_config.get("direct_extraction_confidence", 0.7)
+
+        # Per-document VLM budget planner (decides text-only / image caption / full-page VLM per page)
+        self.vlm_planner = VLMBudgetPlanner(vlm_budget_config)
+
+        # Meaningful image regions per page, used to crop caption-only renders in stage 4
+        self._page_image_regions = {}
 
     def _count_meaningful_images(self, doc, page, images):
         """Count images that are large enough to be meaningful (not logos/icons)"""
@@ -1660,6 +1833,38 @@ class UnifiedPartitionerV2:
                 complexity = "text_only"
                 needs_extraction = False
 
+            # Signals for the VLM budget planner: text-layer quality, image coverage, table cleanliness
+            try:
+                text_quality = score_text_quality(page.get_text("text"), self.vlm_planner.min_text_chars)
+            except Exception as e:
+                logger.debug(f"Could not score text layer on page {page_index}: {e}")
+                text_quality = 0.0
+
+            image_regions = []
+            try:
+                for info in page.get_image_info():
+                    bbox = info.get("bbox")
+                    width, height = info.get("width", 0), info.get("height", 0)
+                    if (
+                        bbox
+                        and width >= self.min_image_width
+                        and height >= self.min_image_height
+                        and width * height >= self.min_image_pixels
+                    ):
+                        image_regions.append(tuple(bbox))
+            except Exception as e:
+                logger.debug(f"Could not get image info on page {page_index}: {e}")
+            self._page_image_regions[page_index] = image_regions
+            image_coverage = compute_image_coverage(image_regions, page.rect.width, page.rect.height)
+
+            table_page_analysis = {
+                "image_count": meaningful_images,
+                "text_blocks": len(page.get_text_blocks()) if hasattr(page, "get_text_blocks") else 0,
+                "complexity": complexity,
+            }
+            table_validations = [self._validate_table(table, table_page_analysis) for table in tables]
+            table_confidence = min((v["confidence"] for _, v in table_validations), default=1.0)
+
             # Store page analysis
             page_analysis[page_index] = {
                 "image_count": len(images),
@@ -1670,6 +1875,9 @@ class UnifiedPartitionerV2:
                 "complexity": complexity,
                 "needs_extraction": needs_extraction,
                 "is_fragmented": is_fragmented,
+                "text_quality": text_quality,
+                "image_coverage": image_coverage,
+                "table_confidence": table_confidence,
             }
 
             # Add detailed logging for extraction decisions (first 3 pages + any extracted)
@@ -1697,18 +1905,18 @@ class UnifiedPartitionerV2:
             # Store table locations
             for i, table in enumerate(tables):
                 table_bbox = table.bbox  # (x0, y0, x1, y1)
+                rows, markdown = self._read_table_content(table)
                 table_locations.append(
                     {
                         "id": f"table_page{page_index}_table{i}",
                         "page": page_index,
                         "bbox": table_bbox,
                         "table_data": table,
+                        "rows": rows,
+                        "markdown": markdown,
                         "complexity": complexity,
-                        "page_analysis": {
-                            "image_count": meaningful_images,
-                            "text_blocks": len(page.get_text_blocks()) if hasattr(page, "get_text_blocks") else 0,
-                            "complexity": complexity,
-                        },
+                        "page_analysis": table_page_analysis,
+                        "validation": table_validations[i],
                     }
                 )
 
@@ -1753,11 +1961,16 @@ class UnifiedPartitionerV2:
 
         logger.info(f"Stage 1 complete: {len(table_locations)} tables, {len(image_locations)} images")
 
+        # Decide per-page VLM processing under the document budget
+        vlm_plan_summary = self.vlm_planner.plan_document(page_analysis)
+        logger.info("vlm_plan_created", extra={"step": "partition", "vlm_plan": vlm_plan_summary})
+
         results = {
             "page_analysis": page_analysis,
             "table_locations": table_locations,
             "image_locations": image_locations,
             "document_metadata": document_metadata,
+            "vlm_plan_summary": vlm_plan_summary,
         }
 
         # Store for stage2 access
@@ -1785,13 +1998,12 @@ class UnifiedPartitionerV2:
             "page_dimensions": {"width": page_rect.width, "height": page_rect.height},
         }
 
-    def stage2_fast_text_extraction(self, filepath):
-        """Stage 2: PyMuPDF text extraction with visual page skipping"""
+    def stage2_fast_text_extraction(self, filepath, pages=None):
+        """Stage 2: PyMuPDF text extraction with visual page skipping (optionally limited to ``pages``)"""
         logger.info("Stage 2: PyMuPDF text extraction...")
 
         doc = fitz.open(filepath)
-        text_elements = []
-        raw_elements = []
+        text_elements = TextElementStore()
 
         # Get page analysis from stage1 results (passed as instance variable)
         page_analysis = getattr(self, "_stage1_results", {}).get("page_analysis", {})
@@ -1799,10 +2011,15 @@ class UnifiedPartitionerV2:
         for page_num in range(len(doc)):
             page = doc[page_num]
             page_index = page_num + 1  # 1-indexed
+            if pages is not None and page_index not in pages:
+                continue
 
-            # CHECK: Skip text extraction if page has visual content that needs VLM processing
+            # CHECK: Skip text extraction only if the page is planned for full-page VLM
             page_info = page_analysis.get(page_index, {})
-            if page_info.get("needs_extraction", False):
+            vlm_plan = page_info.get(
+                "vlm_plan", PLAN_FULL_PAGE_VLM if page_info.get("needs_extraction", False) else None
+            )
+            if vlm_plan == PLAN_FULL_PAGE_VLM:
                 logger.info(f"🔄 SKIPPING text extraction on page {page_index} - will be handled by VLM captions")
                 continue
 
@@ -1835,32 +2052,24 @@ class UnifiedPartitionerV2:
                     # Determine category based on text characteristics
                     category = self._determine_text_category(block_text, block)
 
-                    # Create metadata with bbox coordinates
-                    metadata = {
-                        "page_number": page_index,
-                        "bbox": block_bbox,  # Preserve bounding box coordinates
-                        "font_size": self._get_font_size(block),
-                        "font_name": self._get_font_name(block),
-                        "is_bold": self._is_bold_text(block),
-                        "extraction_method": "pymupdf_text_dict",
-                    }
-
-                    # Create text element similar to unstructured format
-                    text_element = {
-                        "id": element_id,
-                        "category": category,
-                        "page": page_index,
-                        "text": block_text,
-                        "metadata": metadata,
-                    }
-
-                    text_elements.append(text_element)
-                    raw_elements.append(text_element)
+                    # Store element columns (bbox, fonts, etc.) - read back as unstructured-style dicts
+                    text_elements.append(
+                        element_id=element_id,
+                        category=category,
+                        page=page_index,
+                        text=block_text,
+                        bbox=block_bbox,  # Preserve bounding box coordinates
+                        font_size=self._get_font_size(block),
+                        font_name=self._get_font_name(block),
+                        is_bold=self._is_bold_text(block),
+                        extraction_method="pymupdf_text_dict",
+                    )
 
         doc.close()
         logger.info(f"Found {len(text_elements)} text elements")
         logger.info(f"Processed {len(text_elements)} text elements")
-        return text_elements, raw_elements
+        # Raw and text elements were always the same objects; share the store
+        return text_elements, text_elements
 
     def stage3_targeted_table_processing(self, filepath, table_locations):
         """Stage 3: PyMuPDF table processing (replacing unstructured)"""
@@ -1947,8 +2156,16 @@ class UnifiedPartitionerV2:
         logger.info(f"Enhanced {len(enhanced_tables)} valid tables, rejected {len(rejected_tables)} invalid tables")
         return enhanced_tables
 
-    def stage3_create_table_elements_only(self, filepath, table_locations):
+    def stage3_create_table_elements_only(self, filepath, table_locations, pages=None):
         """Create table elements with metadata only (no individual image extraction)"""
+        if pages is not None:
+            # Keep the document-wide index so table ids stay stable across page windows
+            table_locations = [
+                (i, info) for i, info in enumerate(table_locations) if info["page"] in pages
+            ]
+        else:
+            table_locations = list(enumerate(table_locations))
+
         if not table_locations:
             logger.info("No tables detected")
             return []
@@ -1958,15 +2175,18 @@ class UnifiedPartitionerV2:
         doc = fitz.open(filepath)
         table_elements = []
         rejected_tables = []
+        direct_count = 0
 
-        for i, table_info in enumerate(table_locations):
+        for i, table_info in table_locations:
             try:
                 page_num = table_info["page"]
                 table_data = table_info["table_data"]
                 page_analysis = table_info.get("page_analysis", None)
 
-                # Validate table before processing
-                is_valid, validation_result = self._validate_table(table_data, page_analysis)
+                # Validate table before processing (reuse stage 1 validation when available)
+                is_valid, validation_result = table_info.get("validation") or self._validate_table(
+                    table_data, page_analysis
+                )
 
                 if not is_valid:
                     logger.warning(f"Table {i + 1} on page {page_num} rejected: {validation_result['issues']}")
@@ -1974,12 +2194,24 @@ class UnifiedPartitionerV2:
                     # Skip this table - it will be captured in full-page extraction
                     continue
 
+                # Fast path: clean, regular tables (schedules, bills of quantities) are
+                # emitted directly as markdown from the structured cells - no VLM needed
+                confidence = validation_result.get("confidence", 0.0)
+                direct_extraction = (
+                    confidence >= self.direct_extraction_confidence
+                    and table_info.get("complexity") != "complex_vector_drawing"
+                    and not self._is_drawing_page(page_analysis)
+                )
+
+                # Cell text was read in stage 1 while the table's page was loaded
+                table_text = ""
+                if direct_extraction:
+                    table_text = self._table_cells_to_markdown(table_info.get("rows"))
+                    direct_extraction = bool(table_text)
+
                 # Extract table text only (no HTML, no image)
-                try:
-                    table_text = table_data.to_markdown()
-                except AttributeError:
-                    # Fallback if to_markdown not available
-                    table_text = str(table_data) if table_data else ""
+                if not table_text:
+                    table_text = table_info.get("markdown") or ""
 
                 # Create table element with metadata only
                 table_id = f"table_{i + 1}"
@@ -1991,13 +2223,22 @@ class UnifiedPartitionerV2:
                     "metadata": {
                         "page_number": page_num,
                         "table_id": table_id,
-                        "extraction_method": "text_only_full_page_covers_image",
+                        "extraction_method": (
+                            "pymupdf_structured_table" if direct_extraction else "text_only_full_page_covers_image"
+                        ),
+                        "direct_extraction": direct_extraction,
+                        "table_confidence": round(confidence, 3),
                         # No image_path - covered by full-page extraction
                     },
                 }
 
                 table_elements.append(table_element)
-                logger.info(f"Created table element {table_id} on page {page_num} (no individual image)")
+                if direct_extraction:
+                    direct_count += 1
+                logger.info(
+                    f"Created table element {table_id} on page {page_num} "
+                    f"({'direct structured extraction' if direct_extraction else 'no individual image'})"
+                )
 
             except Exception as e:
                 logger.error(f"Error creating table element {i + 1}: {e}")
@@ -2011,14 +2252,63 @@ class UnifiedPartitionerV2:
                 logger.debug(f"  - Page {rejected['page']}: {rejected['validation']['issues']}")
 
         logger.info(
-            f"Created {len(table_elements)} valid table elements, rejected {len(rejected_tables)} invalid tables"
+            f"Created {len(table_elements)} valid table elements ({direct_count} via direct structured extraction), "
+            f"rejected {len(rejected_tables)} invalid tables"
         )
         return table_elements
 
-    def stage4_full_page_extraction(self, filepath, page_analysis):
+    @staticmethod
+    def _read_table_content(table) -> Tuple[List[List[Any]], str]:
+        """Cell rows and markdown of a table found by ``page.find_tables()``.
+
+        ``Table.extract()`` and ``Table.to_markdown()`` read the text of the page
+        of the most recent ``find_tables`` call, so they must run before the next
+        page is analyzed.
+        """
+        try:
+            rows = table.extract()
+        except Exception as e:
+            logger.debug(f"Structured extraction failed for table at {table.bbox}: {e}")
+            rows = []
+        try:
+            markdown = table.to_markdown()
+        except AttributeError:
+            # Fallback if to_markdown not available
+            markdown = str(table) if table else ""
+        except Exception as e:
+            logger.debug(f"Markdown extraction failed for table at {table.bbox}: {e}")
+            markdown = ""
+        return rows, markdown
+
+    @staticmethod
+    def _table_cells_to_markdown(rows) -> str:
+        """Render PyMuPDF ``Table.extract()`` rows as a markdown table (first row is the header)"""
+
+        def clean_cell(cell):
+            if cell is None:
+                return ""
+            return " ".join(str(cell).split()).replace("|", "\\|")
+
+        cleaned_rows = [[clean_cell(cell) for cell in row] for row in rows or []]
+        cleaned_rows = [row for row in cleaned_rows if any(row)]
+        if not cleaned_rows:
+            return ""
+
+        col_count = max(len(row) for row in cleaned_rows)
+        cleaned_rows = [row + [""] * (col_count - len(row)) for row in cleaned_rows]
+
+        lines = ["| " + " | ".join(cleaned_rows[0]) + " |", "|" + "---|" * col_count]
+        lines.extend("| " + " | ".join(row) + " |" for row in cleaned_rows[1:])
+        return "\n".join(lines)
+
+    def stage4_full_page_extraction(self, filepath, page_analysis, pages=None):
         """Stage 4: Extract full pages when images are detected (like partition_pdf.py)"""
         # Find pages that need full-page extraction
-        pages_to_extract = {page_num: info for page_num, info in page_analysis.items() if info["needs_extraction"]}
+        pages_to_extract = {
+            page_num: info
+            for page_num, info in page_analysis.items()
+            if info["needs_extraction"] and (pages is None or page_num in pages)
+        }
 
         if not pages_to_extract:
             logger.info("No pages need full-page extraction")
@@ -2043,8 +2333,20 @@ class UnifiedPartitionerV2:
                 else:
                     matrix = fitz.Matrix(1.5, 1.5)  # Lower DPI for simple
 
-                # Extract full page
-                pixmap = page.get_pixmap(matrix=matrix)
+                # Caption-only pages render just the image region(s); the text layer is kept
+                vlm_plan = info.get("vlm_plan", PLAN_FULL_PAGE_VLM)
+                clip = None
+                if vlm_plan == PLAN_TEXT_WITH_IMAGE_CAPTION:
+                    regions = self._page_image_regions.get(page_num, [])
+                    if regions:
+                        clip = fitz.Rect(regions[0])
+                        for region in regions[1:]:
+                            clip |= fitz.Rect(region)
+                        clip &= page.rect
+                        matrix = fitz.Matrix(2, 2)
+
+                # Extract full page (or image region)
+                pixmap = page.get_pixmap(matrix=matrix, clip=clip)
 
                 # Save image with UUID to avoid conflicts
                 unique_id = uuid4().hex[:8]  # Use first 8 chars of UUID
@@ -2061,9 +2363,10 @@ class UnifiedPartitionerV2:
                     "complexity": info["complexity"],
                     "original_image_count": info["image_count"],
                     "original_table_count": info["table_count"],
+                    "vlm_plan": vlm_plan,
                 }
 
-                logger.info(f"Page {page_num}: {filename} ({info['complexity']})")
+                logger.info(f"Page {page_num}: {filename} ({info['complexity']}, {vlm_plan})")
 
             except Exception as e:
                 logger.error(f"Error extracting page {page_num}: {e}")
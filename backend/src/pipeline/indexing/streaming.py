@@ -0,0 +1,299 @@
+"""Streaming (page-window) execution mode for the indexing pipeline.
+
+Instead of running partition → metadata → enrichment → chunking → embedding on
+whole-document dicts, the document is processed in windows of pages that flow
+through three concurrent stages connected by bounded queues:
+
+    partition(window) → [queue] → metadata + enrichment → [queue] → chunking + embedding
+
+Page window N can be chunked and embedded while later windows are still being
+partitioned or captioned, and memory is bounded by ``max_windows_in_flight``
+windows instead of the whole document.
+"""
+
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from src.models import StepResult
+from src.utils.logging import get_logger
+
+from ..shared.models import DocumentInput
+from .steps.metadata import MetadataStep
+
+logger = get_logger(__name__)
+
+_END_OF_STREAM = object()
+
+
+class _StepAggregate:
+    """Accumulate per-window StepResults into one document-level StepResult"""
+
+    def __init__(self, step: str):
+        self.step = step
+        self.windows = 0
+        self.duration_seconds = 0.0
+        self.summary_stats: Dict[str, Any] = {}
+        self.sample_outputs: Dict[str, Any] = {}
+        self.started_at: Optional[datetime] = None
+        self.failed_result: Optional[StepResult] = None
+
+    def add(self, result: StepResult) -> None:
+        self.windows += 1
+        self.duration_seconds += result.duration_seconds or 0.0
+        self.started_at = self.started_at or result.started_at
+        if not self.sample_outputs and result.sample_outputs:
+            self.sample_outputs = result.sample_outputs
+
+        # Integer counters are summed across windows; everything else keeps the latest value
+        for key, value in (result.summary_stats or {}).items():
+            previous = self.summary_stats.get(key)
+            if isinstance(value, int) and not isinstance(value, bool) and isinstance(previous, int):
+                self.summary_stats[key] = previous + value
+            else:
+                self.summary_stats[key] = value
+
+        if result.status == "failed" and self.failed_result is None:
+            self.failed_result = result
+
+    def to_step_result(self, extra_stats: Optional[Dict[str, Any]] = None) -> StepResult:
+        if self.failed_result is not None:
+            return self.failed_result
+
+        summary_stats = {**self.summary_stats, "streaming_windows": self.windows, **(extra_stats or {})}
+        return StepResult(
+            step=self.step,
+            status="completed",
+            duration_seconds=self.duration_seconds,
+            summary_stats=summary_stats,
+            sample_outputs=self.sample_outputs,
+            started_at=self.started_at or datetime.utcnow(),
+            completed_at=datetime.utcnow(),
+        )
+
+
+class StreamingDocumentProcessor:
+    """Process one document through the indexing steps window by window"""
+
+    def __init__(
+        self,
+        partition_step,
+        metadata_step,
+        enrichment_step,
+        chunking_step,
+        embedding_step,
+        pipeline_service,
+        page_window: int = 10,
+        max_windows_in_flight: int = 2,
+        progress_writer=None,
+    ):
+        self.partition_step = partition_step
+        # Section tracking is per document, so each streamed document gets its own analyzer
+        self.metadata_step = MetadataStep(
+            config=metadata_step.config,
+            storage_client=metadata_step.storage_client,
+            progress_tracker=metadata_step.tracker,
+            storage_service=metadata_step.storage_service,
+        )
+        self.enrichment_step = enrichment_step
+        self.chunking_step = chunking_step
+        self.embedding_step = embedding_step
+        self.pipeline_service = pipeline_service
+        # The run's ProgressWriter (None writes step results directly)
+        self.progress_writer = progress_writer
+        self.page_window = max(1, page_window)
+        self.max_windows_in_flight = max(1, max_windows_in_flight)
+
+    def _steps(self) -> List[Any]:
+        return [
+            self.partition_step,
+            self.metadata_step,
+            self.enrichment_step,
+            self.chunking_step,
+            self.embedding_step,
+        ]
+
+    async def process(self, document_input: DocumentInput, indexing_run_id: UUID) -> bool:
+        """Run the streaming pipeline; stores one aggregated step result per step.
+
+        Returns False (after storing the failed step result) if any window fails.
+        """
+        document_id = document_input.document_id
+        start = time.perf_counter()
+        aggregates = {step.get_step_name(): _StepAggregate(step.get_step_name()) for step in self._steps()}
+        timings: Dict[str, Optional[float]] = {"first_chunk_searchable_seconds": None}
+
+        partitioned: asyncio.Queue = asyncio.Queue(maxsize=self.max_windows_in_flight)
+        enriched: asyncio.Queue = asyncio.Queue(maxsize=self.max_windows_in_flight)
+
+        async def partition_stage():
+            name = self.partition_step.get_step_name()
+            window_started = time.perf_counter()
+            try:
+                async for window in self.partition_step.iter_page_windows(document_input, self.page_window):
+                    duration = time.perf_counter() - window_started
+                    aggregates[name].add(self._partition_window_result(window, duration))
+                    await partitioned.put(window)
+                    window_started = time.perf_counter()
+            except Exception as e:
+                raise _WindowFailed(name, e) from e
+            await partitioned.put(_END_OF_STREAM)
+
+        async def enrichment_stage():
+            while True:
+                window = await partitioned.get()
+                if window is _END_OF_STREAM:
+                    break
+                if not self._has_elements(window):
+                    continue
+
+                metadata_result = await self._run_step(
+                    aggregates, self.metadata_step, window, continue_sections=True
+                )
+                enrichment_result = await self._run_step(aggregates, self.enrichment_step, metadata_result.data)
+                await enriched.put(enrichment_result.data)
+            await enriched.put(_END_OF_STREAM)
+
+        async def chunking_stage():
+            while True:
+                window = await enriched.get()
+                if window is _END_OF_STREAM:
+                    break
+
+                chunking_result = await self._run_step(
+                    aggregates, self.chunking_step, window, indexing_run_id, document_id
+                )
+                await self._embed(aggregates, chunking_result, indexing_run_id, document_id, timings, start)
+
+        stages = [
+            asyncio.create_task(partition_stage()),
+            asyncio.create_task(enrichment_stage()),
+            asyncio.create_task(chunking_stage()),
+        ]
+
+        failed_step = None
+        try:
+            await asyncio.gather(*stages)
+        except _WindowFailed as e:
+            failed_step = e.step_name
+            if e.error is not None and aggregates[failed_step].failed_result is None:
+                aggregates[failed_step].failed_result = StepResult(
+                    step=failed_step,
+                    status="failed",
+                    duration_seconds=0,
+                    error_message=str(e.error),
+                    error_details={"exception_type": type(e.error).__name__, "streaming": True},
+                    started_at=datetime.utcnow(),
+                    completed_at=datetime.utcnow(),
+                )
+        finally:
+            # A failed stage leaves its neighbours blocked on the queues
+            for task in stages:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*stages, return_exceptions=True)
+
+        total_seconds = time.perf_counter() - start
+        logger.info(
+            "streaming_document_processed",
+            extra={
+                "document_id": str(document_id),
+                "run_id": str(indexing_run_id),
+                "windows": aggregates[self.partition_step.get_step_name()].windows,
+                "page_window": self.page_window,
+                "first_chunk_searchable_seconds": timings["first_chunk_searchable_seconds"],
+                "total_seconds": round(total_seconds, 2),
+                "status": "failed" if failed_step else "success",
+            },
+        )
+
+        # Store step results in pipeline order, stopping at the failed step
+        for step in self._steps():
+            name = step.get_step_name()
+            aggregate = aggregates[name]
+            extra_stats = None
+            if step is self.embedding_step:
+                extra_stats = {"first_chunk_searchable_seconds": timings["first_chunk_searchable_seconds"]}
+            await self.pipeline_service.store_document_step_result(
+                document_id=document_id,
+                step_name=name,
+                step_result=aggregate.to_step_result(extra_stats),
+                indexing_run_id=indexing_run_id,
+                progress_writer=self.progress_writer,
+            )
+            if name == failed_step:
+                logger.error(f"Step {name} failed for document {document_id} in streaming mode")
+                return False
+
+        return True
+
+    async def _run_step(self, aggregates, step, *args, **kwargs) -> StepResult:
+        """Execute a step on one window; failures are raised as _WindowFailed tagged with the step"""
+        name = step.get_step_name()
+        try:
+            result = await step.execute(*args, **kwargs)
+        except Exception as e:
+            raise _WindowFailed(name, e) from e
+
+        aggregates[name].add(result)
+        if result.status == "failed":
+            raise _WindowFailed(name)
+        return result
+
+    async def _embed(self, aggregates, chunking_result, indexing_run_id, document_id, timings, start) -> None:
+        """Embed the chunks one window stored.
+
+        Only the window's own chunks are passed: other page shards of the document
+        store chunks concurrently, and reading the document's unembedded chunks back
+        would embed theirs too.
+        """
+        chunks = [chunk for chunk in (chunking_result.data or {}).get("chunks") or [] if chunk.get("id")]
+        if not chunks:
+            return
+        embedding_result = await self._run_step(
+            aggregates,
+            self.embedding_step,
+            {"chunks": chunks},
+            indexing_run_id=indexing_run_id,
+            document_id=document_id,
+        )
+        if timings["first_chunk_searchable_seconds"] is None and embedding_result.summary_stats.get(
+            "embeddings_generated", 0
+        ):
+            timings["first_chunk_searchable_seconds"] = round(time.perf_counter() - start, 2)
+
+    @staticmethod
+    def _has_elements(window: Dict[str, Any]) -> bool:
+        return bool(window.get("text_elements") or window.get("table_elements") or window.get("extracted_pages"))
+
+    @staticmethod
+    def _partition_window_result(window: Dict[str, Any], duration: float) -> StepResult:
+        now = datetime.utcnow()
+        return StepResult(
+            step="partition",
+            status="completed",
+            duration_seconds=duration,
+            summary_stats={
+                "text_elements": len(window.get("text_elements", [])),
+                "table_elements": len(window.get("table_elements", [])),
+                "extracted_pages": len(window.get("extracted_pages", {})),
+                "pages_analyzed": len(window.get("page_analysis", {})),
+                "processing_strategy": window.get("metadata", {}).get("processing_strategy", "unknown"),
+                "document_metadata": {
+                    "total_pages": window.get("document_metadata", {}).get("total_pages", 0),
+                },
+            },
+            started_at=now,
+            completed_at=now,
+        )
+
+
+class _WindowFailed(Exception):
+    """Raised inside a stage when a step fails (or raises) for a window"""
+
+    def __init__(self, step_name: str, error: Optional[Exception] = None):
+        super().__init__(f"{step_name} failed: {error}" if error else f"{step_name} failed")
+        self.step_name = step_name
+        self.error = error
@@ -0,0 +1,111 @@
+"""Recursive character splitter used by IntelligentChunker.
+
+Produces the same chunks as LangChain's ``RecursiveCharacterTextSplitter``
+with the settings the chunker uses (``length_function=len``, literal
+separators, ``keep_separator=True`` so each piece starts with its separator,
+``strip_whitespace=True``), but works on offsets into the original text:
+
+- separators are located with ``str.find`` inside the current ``[start, end)``
+  range instead of ``re.split`` on a copied substring
+- pieces are ``(start, end)`` pairs; merged pieces are always contiguous, so a
+  chunk is a single slice of the text instead of a ``"".join`` of pieces
+- the splitter is built once per chunker, not once per call
+"""
+
+from typing import List, Sequence, Tuple
+
+Piece = Tuple[int, int]
+
+
+class RecursiveTextSplitter:
+    """Split text on the first separator present, recursing into pieces that are still too long"""
+
+    def __init__(
+        self,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        separators: Sequence[str] = ("\n\n", "\n", " ", ""),
+    ):
+        if chunk_overlap > chunk_size:
+            raise ValueError(f"chunk_overlap ({chunk_overlap}) must not exceed chunk_size ({chunk_size})")
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.separators = list(separators)
+
+    def split_text(self, text: str) -> List[str]:
+        chunks: List[str] = []
+        self._split(text, 0, len(text), 0, chunks)
+        return chunks
+
+    def _split(self, text: str, start: int, end: int, separator_index: int, out: List[str]) -> None:
+        separators = self.separators
+        separator = separators[-1] if separators else ""
+        next_index = len(separators)  # no finer separators unless one is found
+        for index in range(separator_index, len(separators)):
+            candidate = separators[index]
+            if candidate == "":
+                separator = candidate
+                break
+            if text.find(candidate, start, end) != -1:
+                separator = candidate
+                next_index = index + 1
+                break
+
+        chunk_size = self.chunk_size
+        good: List[Piece] = []
+        for piece_start, piece_end in self._pieces(text, start, end, separator):
+            if piece_end - piece_start < chunk_size:
+                good.append((piece_start, piece_end))
+                continue
+
+            if good:
+                self._merge(text, good, out)
+                good = []
+            if next_index >= len(separators):
+                out.append(text[piece_start:piece_end])
+            else:
+                self._split(text, piece_start, piece_end, next_index, out)
+
+        if good:
+            self._merge(text, good, out)
+
+    @staticmethod
+    def _pieces(text: str, start: int, end: int, separator: str) -> List[Piece]:
+        """Non-empty pieces of ``text[start:end]``; every piece but the first starts with ``separator``"""
+        if separator == "":
+            return [(offset, offset + 1) for offset in range(start, end)]
+
+        find = text.find
+        step = len(separator)
+        bounds = [start]
+        found = find(separator, start, end)
+        while found != -1:
+            bounds.append(found)
+            found = find(separator, found + step, end)
+        bounds.append(end)
+        return [
+            (piece_start, piece_end)
+            for piece_start, piece_end in zip(bounds[:-1], bounds[1:], strict=True)
+            if piece_end > piece_start
+        ]
+
+    def _merge(self, text: str, pieces: List[Piece], out: List[str]) -> None:
+        """Greedily combine contiguous pieces up to chunk_size, carrying chunk_overlap into the next chunk"""
+        chunk_size, chunk_overlap = self.chunk_size, self.chunk_overlap
+        first = 0
+        total = 0
+        for current, (piece_start, piece_end) in enumerate(pieces):
+            length = piece_end - piece_start
+            if total + length > chunk_size and current > first:
+                self._emit(text, pieces[first][0], pieces[current - 1][1], out)
+                while total > chunk_overlap or (total + length > chunk_size and total > 0):
+                    total -= pieces[first][1] - pieces[first][0]
+                    first += 1
+            total += length
+        self._emit(text, pieces[first][0], pieces[-1][1], out)
+
+    @staticmethod
+    def _emit(text: str, start: int, end: int, out: List[str]) -> None:
+        chunk = text[start:end].strip()
+        if chunk:
+            out.append(chunk)
@@ -0,0 +1,124 @@
+"""Token counting for Voyage embedding batches.
+
+Batches are packed against Voyage's per-request token limit, so the count has
+to be close to what the API bills without calling it. Two sources, best first:
+
+- the model's own tokenizer, when a local ``tokenizer.json`` is configured
+  (``tokenizer_path`` / ``VOYAGE_TOKENIZER_PATH``) and ``tokenizers`` is
+  installed: exact counts
+- otherwise a calibrated estimate: text is split into word and punctuation
+  pieces and multiplied by a tokens-per-piece ratio. The ratio starts from a
+  prior measured on Danish construction documents and is refined from the
+  ``usage.total_tokens`` field of every Voyage response
+
+The piece count of each chunk is computed once at chunking time and cached in
+``chunk["metadata"]["token_pieces"]``. It does not depend on the calibration, so
+the ratio learned by the time a chunk is embedded is applied then
+(``count_from_pieces``) rather than the prior it had while chunking.
+"""
+
+import math
+import os
+import re
+import threading
+from typing import Optional
+
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Words (letters/digits incl. æøå), single punctuation/symbol characters
+_PIECE_PATTERN = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+# Prior for voyage-multilingual-2 on Danish technical text (long compounds split into ~1.6 sub-words)
+DEFAULT_TOKENS_PER_PIECE = 1.6
+
+
+def count_pieces(text: str) -> int:
+    """Number of word and punctuation pieces in ``text``"""
+    return len(_PIECE_PATTERN.findall(text)) if text else 0
+
+
+class TokenCounter:
+    """Exact (local tokenizer) or calibrated token counts for one embedding model"""
+
+    def __init__(
+        self,
+        tokenizer_path: Optional[str] = None,
+        tokens_per_piece: float = DEFAULT_TOKENS_PER_PIECE,
+        safety_margin: float = 1.1,
+        calibration_weight: float = 0.2,
+    ):
+        self.tokens_per_piece = tokens_per_piece
+        self.safety_margin = safety_margin
+        self.calibration_weight = calibration_weight
+        self.calibration_samples = 0
+        self._lock = threading.Lock()
+        self._tokenizer = self._load_tokenizer(tokenizer_path or os.getenv("VOYAGE_TOKENIZER_PATH"))
+
+    @staticmethod
+    def _load_tokenizer(tokenizer_path: Optional[str]):
+        if not tokenizer_path:
+            return None
+        try:
+            from tokenizers import Tokenizer
+
+            tokenizer = Tokenizer.from_file(tokenizer_path)
+            logger.info("token_counter_tokenizer_loaded", extra={"tokenizer_path": tokenizer_path})
+            return tokenizer
+        except Exception as e:
+            logger.warning(
+                "token_counter_tokenizer_unavailable",
+                extra={"tokenizer_path": tokenizer_path, "error": str(e)},
+            )
+            return None
+
+    @property
+    def exact(self) -> bool:
+        return self._tokenizer is not None
+
+    def count(self, text: str) -> int:
+        """Token count for ``text`` (estimates include the safety margin)"""
+        if not text:
+            return 0
+        if self._tokenizer is not None:
+            return len(self._tokenizer.encode(text, add_special_tokens=False).ids)
+        return self._estimate(count_pieces(text))
+
+    def count_from_pieces(self, pieces: Optional[int]) -> Optional[int]:
+        """Calibrated token estimate from a cached piece count.
+
+        None if there is no cached count, or if a local tokenizer gives exact counts
+        (the text is counted instead).
+        """
+        if pieces is None or self._tokenizer is not None:
+            return None
+        return self._estimate(pieces)
+
+    def _estimate(self, pieces: int) -> int:
+        return math.ceil(pieces * self.tokens_per_piece * self.safety_margin)
+
+    def observe(self, texts: list[str], actual_tokens: Optional[int]) -> None:
+        """Refine the tokens-per-piece ratio from a response's ``usage.total_tokens``"""
+        if self._tokenizer is not None or not actual_tokens:
+            return
+        pieces = sum(count_pieces(text) for text in texts)
+        if pieces == 0:
+            return
+
+        observed = actual_tokens / pieces
+        with self._lock:
+            weight = 1.0 if self.calibration_samples == 0 else self.calibration_weight
+            self.tokens_per_piece += weight * (observed - self.tokens_per_piece)
+            self.calibration_samples += 1
+
+
+_default_counter: Optional[TokenCounter] = None
+
+
+def get_token_counter() -> TokenCounter:
+    """Process-wide counter shared by the chunking step and the Voyage client (so calibration carries over)"""
+    global _default_counter
+    if _default_counter is None:
+        _default_counter = TokenCounter()
+    return _default_counter
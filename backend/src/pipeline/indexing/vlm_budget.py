@@ -0,0 +1,197 @@
+"""Per-document VLM budget planner for the partition step.
+
+Stage 1 of the partitioner collects cheap PyMuPDF signals for every page
+(text-layer quality, image area coverage, table cleanliness). The planner
+turns those signals into one of three processing plans per page and keeps
+the document within a configurable VLM call/token budget:
+
+- ``text_only``: the text layer is trusted, no VLM call is made
+- ``text_with_image_caption``: keep the text layer and caption only the
+  image region(s) of the page
+- ``full_page_vlm``: the page is rendered and captioned as a whole; its
+  text layer is dropped (legacy behaviour for visual pages)
+"""
+
+from typing import Any, Dict, List, Optional
+
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+PLAN_TEXT_ONLY = "text_only"
+PLAN_TEXT_WITH_IMAGE_CAPTION = "text_with_image_caption"
+PLAN_FULL_PAGE_VLM = "full_page_vlm"
+
+VLM_PLANS = (PLAN_TEXT_ONLY, PLAN_TEXT_WITH_IMAGE_CAPTION, PLAN_FULL_PAGE_VLM)
+
+
+def score_text_quality(text: str, min_text_chars: int = 200) -> float:
+    """Score a page's text layer between 0 (unusable) and 1 (clean and dense).
+
+    Penalises replacement/control characters (broken font encodings) and
+    scales down pages that carry only a few characters of text.
+    """
+    if not text:
+        return 0.0
+
+    stripped = text.strip()
+    if not stripped:
+        return 0.0
+
+    bad_chars = 0
+    for char in stripped:
+        if char == "\ufffd" or (not char.isprintable() and char not in "\n\r\t"):
+            bad_chars += 1
+
+    clean_ratio = 1.0 - (bad_chars / len(stripped))
+    density = min(1.0, len(stripped) / max(1, min_text_chars))
+    return round(clean_ratio * density, 3)
+
+
+def compute_image_coverage(image_bboxes: List[Any], page_width: float, page_height: float) -> float:
+    """Fraction of the page area covered by images (clipped to the page, capped at 1)."""
+    page_area = page_width * page_height
+    if page_area <= 0 or not image_bboxes:
+        return 0.0
+
+    covered = 0.0
+    for bbox in image_bboxes:
+        if not bbox or len(bbox) < 4:
+            continue
+        x0, y0, x1, y1 = (float(v) for v in bbox[:4])
+        x0, y0 = max(0.0, x0), max(0.0, y0)
+        x1, y1 = min(page_width, x1), min(page_height, y1)
+        if x1 > x0 and y1 > y0:
+            covered += (x1 - x0) * (y1 - y0)
+
+    return round(min(1.0, covered / page_area), 3)
+
+
+class VLMBudgetPlanner:
+    """Choose a VLM processing plan per page under a per-document budget."""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        config = config or {}
+        self.enabled = config.get("enabled", True)
+
+        # Budget (None = unlimited)
+        self.max_vlm_calls = config.get("max_vlm_calls")
+        self.max_vlm_tokens = config.get("max_vlm_tokens")
+
+        # Estimated cost per VLM call (prompt + image + caption)
+        self.full_page_tokens = config.get("full_page_tokens", 1800)
+        self.image_caption_tokens = config.get("image_caption_tokens", 900)
+
+        # Thresholds
+        self.min_text_chars = config.get("min_text_chars", 200)
+        self.min_text_quality = config.get("min_text_quality", 0.6)
+        self.full_page_image_coverage = config.get("full_page_image_coverage", 0.5)
+        self.min_table_confidence = config.get("min_table_confidence", 0.7)
+
+    def desired_plan(self, page_info: Dict[str, Any]) -> str:
+        """Plan a page would get with an unlimited budget."""
+        if not page_info.get("needs_extraction", False):
+            return PLAN_TEXT_ONLY
+
+        if not self.enabled:
+            return PLAN_FULL_PAGE_VLM
+
+        # Visual content the text layer cannot describe
+        if page_info.get("has_vector_drawings") or page_info.get("complexity") in ("diagram", "fragmented"):
+            return PLAN_FULL_PAGE_VLM
+        if page_info.get("table_confidence", 1.0) < self.min_table_confidence:
+            return PLAN_FULL_PAGE_VLM
+        # Sparse text is fine when the page content is a clean, structurally extracted table
+        clean_table_page = page_info.get("table_count", 0) > 0 and not page_info.get("meaningful_images", 0)
+        if page_info.get("text_quality", 0.0) < self.min_text_quality and not clean_table_page:
+            return PLAN_FULL_PAGE_VLM
+        if page_info.get("image_coverage", 0.0) >= self.full_page_image_coverage:
+            return PLAN_FULL_PAGE_VLM
+
+        # Good text layer: caption the images only, or nothing at all for clean tables
+        if page_info.get("meaningful_images", 0) > 0 and page_info.get("image_coverage", 0.0) > 0:
+            return PLAN_TEXT_WITH_IMAGE_CAPTION
+        return PLAN_TEXT_ONLY
+
+    def _visual_need(self, page_info: Dict[str, Any]) -> float:
+        """Priority score used to spend the budget on the most visual pages first."""
+        need = max(
+            1.0 - page_info.get("text_quality", 0.0),
+            page_info.get("image_coverage", 0.0),
+            1.0 - page_info.get("table_confidence", 1.0),
+        )
+        if page_info.get("has_vector_drawings"):
+            need += 1.0
+        return need
+
+    def _plan_cost(self, plan: str) -> int:
+        if plan == PLAN_FULL_PAGE_VLM:
+            return self.full_page_tokens
+        if plan == PLAN_TEXT_WITH_IMAGE_CAPTION:
+            return self.image_caption_tokens
+        return 0
+
+    def plan_document(self, page_analysis: Dict[int, Dict[str, Any]]) -> Dict[str, Any]:
+        """Assign ``vlm_plan`` to every page in ``page_analysis`` (in place).
+
+        ``needs_extraction`` is updated to reflect whether a page image must be
+        rendered, so downstream stages keep working off the same flag.
+
+        Returns a summary with plan counts, estimated calls/tokens and pages
+        that were downgraded because the budget ran out.
+        """
+        desired = {page_num: self.desired_plan(info) for page_num, info in page_analysis.items()}
+
+        calls_used = 0
+        tokens_used = 0
+        downgraded_pages = []
+
+        ordered = sorted(
+            (page_num for page_num, plan in desired.items() if plan != PLAN_TEXT_ONLY),
+            key=lambda page_num: (-self._visual_need(page_analysis[page_num]), page_num),
+        )
+
+        final_plans = {page_num: PLAN_TEXT_ONLY for page_num in page_analysis}
+        for page_num in ordered:
+            info = page_analysis[page_num]
+            candidates = [desired[page_num]]
+            if desired[page_num] == PLAN_FULL_PAGE_VLM and info.get("meaningful_images", 0) > 0:
+                candidates.append(PLAN_TEXT_WITH_IMAGE_CAPTION)
+
+            for plan in candidates:
+                cost = self._plan_cost(plan)
+                if self.max_vlm_calls is not None and calls_used + 1 > self.max_vlm_calls:
+                    continue
+                if self.max_vlm_tokens is not None and tokens_used + cost > self.max_vlm_tokens:
+                    continue
+                final_plans[page_num] = plan
+                calls_used += 1
+                tokens_used += cost
+                break
+
+            if final_plans[page_num] != desired[page_num]:
+                downgraded_pages.append(page_num)
+
+        plan_counts = {plan: 0 for plan in VLM_PLANS}
+        for page_num, plan in final_plans.items():
+            page_analysis[page_num]["vlm_plan"] = plan
+            page_analysis[page_num]["needs_extraction"] = plan != PLAN_TEXT_ONLY
+            plan_counts[plan] += 1
+
+        if downgraded_pages:
+            logger.warning(
+                "vlm_budget_exhausted",
+                extra={
+                    "step": "partition",
+                    "downgraded_pages": sorted(downgraded_pages),
+                    "max_vlm_calls": self.max_vlm_calls,
+                    "max_vlm_tokens": self.max_vlm_tokens,
+                },
+            )
+
+        return {
+            "plan_counts": plan_counts,
+            "estimated_vlm_calls": calls_used,
+            "estimated_vlm_tokens": tokens_used,
+            "downgraded_pages": sorted(downgraded_pages),
+        }
@@ -1,5 +1,5 @@
 """Query pipeline for real-time question answering."""
 
-from .orchestrator import QueryPipelineOrchestrator
+from .orchestrator import QueryPipelineOrchestrator, get_query_pipeline
 
-__all__ = ["QueryPipelineOrchestrator"]
+__all__ = ["QueryPipelineOrchestrator", "get_query_pipeline"]
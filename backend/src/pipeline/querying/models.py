@@ -27,6 +27,7 @@ class SearchResult(BaseModel):
     chunk_id: str | None = None
     document_id: str | None = None
     bbox: list[float] | None = None  # Bounding box coordinates for PDF highlighting
+    duplicates: list[dict[str, Any]] = []  # Same content elsewhere (id, document_id, page_number), for citation
 
 
 class QualityMetrics(BaseModel):
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import threading
 from datetime import datetime
 from typing import Any
 from uuid import uuid4
@@ -9,7 +10,8 @@ from uuid import uuid4
 from src.config.database import get_supabase_admin_client
 from src.config.settings import get_settings
 from src.middleware.request_id import get_request_id
-from src.services.config_service import ConfigService
+from src.services.async_db import aexecute
+from src.services.config_service import ConfigService, get_config_service
 from src.utils.logging import get_logger
 
 from .models import (
@@ -31,94 +33,136 @@ logger = get_logger(__name__)
 class QueryPipelineOrchestrator:
     """Orchestrates the complete query pipeline from input to response"""
 
-    def __init__(self, config: dict[str, Any] | None = None, db_client=None):
-        if config is not None:
-            self.config = config
-        else:
-            # Load from SoT and build effective query config
-            effective = ConfigService().get_effective_config("query")
-            logger.info(f"🔧 ConfigService loaded effective config: {effective}")
-            self.config = {
-                "query_processing": {
-                    "provider": "openrouter",
-                    "model": effective.get("query_processing", {}).get("model", "openai/gpt-3.5-turbo"),
-                    "fallback_models": effective.get("query_processing", {}).get(
-                        "fallback_models", ["anthropic/claude-3-haiku"]
-                    ),
-                    "timeout_seconds": effective.get("query_processing", {}).get("timeout_seconds", 1.0),
-                    "max_tokens": effective.get("query_processing", {}).get("max_tokens", 200),
-                    "temperature": effective.get("query_processing", {}).get("temperature", 0.1),
-                    "variations": effective.get("query_processing", {}).get(
-                        "variations",
-                        {
-                            "semantic_expansion": True,
-                            "hyde_document": True,
-                            "formal_variation": True,
-                            "parallel_generation": True,
-                        },
-                    ),
-                },
-                "retrieval": {
-                    "embedding_model": effective["embedding"]["model"],
-                    "dimensions": effective["embedding"]["dimensions"],
-                    "similarity_metric": effective.get("retrieval", {}).get("similarity_metric", "cosine"),
-                    "top_k": effective.get("retrieval", {}).get("top_k", 5),
-                    "similarity_thresholds": {
-                        "excellent": 0.75,
-                        "good": 0.60,
-                        "acceptable": 0.40,
-                        "minimum": 0.25,
-                    },
-                    "danish_thresholds": {
-                        "excellent": 0.70,
-                        "good": 0.55,
-                        "acceptable": 0.35,
-                        "minimum": 0.20,
-                    },
-                },
-                "generation": {
-                    "provider": effective.get("generation", {}).get("provider", "openrouter"),
-                    "model": effective.get("generation", {}).get("model", "google/gemini-2.5-flash-lite"),
-                    "fallback_models": effective.get("generation", {}).get(
-                        "fallback_models",
-                        [
-                            "anthropic/claude-3.5-haiku",
-                            "meta-llama/llama-3.1-8b-instruct",
-                        ],
-                    ),
-                    "timeout_seconds": effective.get("generation", {}).get("timeout_seconds", 5.0),
-                    "max_tokens": effective.get("generation", {}).get("max_tokens", 1000),
-                    "temperature": effective.get("generation", {}).get("temperature", 0.1),
-                    "response_format": effective.get("generation", {}).get(
-                        "response_format",
-                        {
-                            "include_citations": True,
-                            "include_confidence": True,
-                            "language": "danish",
-                        },
-                    ),
-                },
-            }
+    def __init__(self, config: dict[str, Any] | None = None, db_client=None, config_service: ConfigService | None = None):
+        """Build the pipeline steps once; per-request state is passed to ``process_query``.
+
+        Without an explicit ``config`` the query config is read from the SoT file
+        and rebuilt when the file's mtime changes (see ``_reload_config_if_changed``).
+        """
         self.settings = get_settings()
-        # Default to admin, but allow request-scoped client injection for RLS-aware reads
+        # Default client for storing runs and for calls that don't bring a request-scoped one
         self.db = db_client or get_supabase_admin_client()
+        self._config_service = None if config is not None else (config_service or get_config_service())
+        self._config_mtime: float | None = None
+        self._reload_lock = threading.Lock()
 
-        # Initialize pipeline steps
-        self.query_processor = QueryProcessor(QueryProcessingConfig(**self.config["query_processing"]))
-        # Keep admin by default; retrieval step supports DI for future anon usage
-        self.retriever = DocumentRetriever(
-            RetrievalConfig(self.config["retrieval"]), db_client=self.db, use_admin=False
-        )
-        self.generator = ResponseGenerator(GenerationConfig(**self.config["generation"]))
+        if config is None:
+            self._config_mtime = self._config_service.current_mtime()
+            config = self._build_config(self._config_service.get_effective_config("query"))
+        self._configure(config)
 
-        # Log the loaded configuration for debugging
-        logger.info(f"🔧 Query pipeline configured with generation model: {self.config['generation']['model']}")
-        logger.info(f"🔧 Generation fallback models: {self.config['generation']['fallback_models']}")
-        logger.info(f"🔧 Config source: {'ConfigService (SoT)' if config is None else 'Direct injection'}")
+        logger.info(f"🔧 Config source: {'ConfigService (SoT)' if self._config_service else 'Direct injection'}")
 
         # Progress tracking (simplified for query pipeline)
         self.progress_tracker = None
 
+    @staticmethod
+    def _build_config(effective: dict[str, Any]) -> dict[str, Any]:
+        """Map the effective SoT query config onto the step configs"""
+        return {
+            "query_processing": {
+                "provider": "openrouter",
+                "model": effective.get("query_processing", {}).get("model", "openai/gpt-3.5-turbo"),
+                "fallback_models": effective.get("query_processing", {}).get(
+                    "fallback_models", ["anthropic/claude-3-haiku"]
+                ),
+                "timeout_seconds": effective.get("query_processing", {}).get("timeout_seconds", 1.0),
+                "max_tokens": effective.get("query_processing", {}).get("max_tokens", 200),
+                "temperature": effective.get("query_processing", {}).get("temperature", 0.1),
+                "variations": effective.get("query_processing", {}).get(
+                    "variations",
+                    {
+                        "semantic_expansion": True,
+                        "hyde_document": True,
+                        "formal_variation": True,
+                        "parallel_generation": True,
+                    },
+                ),
+            },
+            "retrieval": {
+                "embedding_model": effective["embedding"]["model"],
+                "dimensions": effective["embedding"]["dimensions"],
+                "similarity_metric": effective.get("retrieval", {}).get("similarity_metric", "cosine"),
+                "top_k": effective.get("retrieval", {}).get("top_k", 5),
+                "match_count": effective.get("retrieval", {}).get("match_count", 15),
+                "ef_search": effective.get("retrieval", {}).get("ef_search"),
+                "similarity_thresholds": {
+                    "excellent": 0.75,
+                    "good": 0.60,
+                    "acceptable": 0.40,
+                    "minimum": 0.25,
+                },
+                "danish_thresholds": {
+                    "excellent": 0.70,
+                    "good": 0.55,
+                    "acceptable": 0.35,
+                    "minimum": 0.20,
+                },
+            },
+            "generation": {
+                "provider": effective.get("generation", {}).get("provider", "openrouter"),
+                "model": effective.get("generation", {}).get("model", "google/gemini-2.5-flash-lite"),
+                "fallback_models": effective.get("generation", {}).get(
+                    "fallback_models",
+                    [
+                        "anthropic/claude-3.5-haiku",
+                        "meta-llama/llama-3.1-8b-instruct",
+                    ],
+                ),
+                "timeout_seconds": effective.get("generation", {}).get("timeout_seconds", 5.0),
+                "max_tokens": effective.get("generation", {}).get("max_tokens", 1000),
+                "temperature": effective.get("generation", {}).get("temperature", 0.1),
+                "response_format": effective.get("generation", {}).get(
+                    "response_format",
+                    {
+                        "include_citations": True,
+                        "include_confidence": True,
+                        "language": "danish",
+                    },
+                ),
+            },
+        }
+
+    def _configure(self, config: dict[str, Any]) -> None:
+        """Create the step instances for ``config``; they are reused across requests"""
+        query_processor = QueryProcessor(QueryProcessingConfig(**config["query_processing"]))
+        # Requests pass their own RLS-scoped client to retrieval; this one is only the default
+        retriever = DocumentRetriever(RetrievalConfig(config["retrieval"]), db_client=self.db, use_admin=False)
+        generator = ResponseGenerator(GenerationConfig(**config["generation"]))
+        # Swap in one go so a concurrent query never mixes old and new steps
+        self.config, self.query_processor, self.retriever, self.generator = (
+            config,
+            query_processor,
+            retriever,
+            generator,
+        )
+
+        logger.info(f"🔧 Query pipeline configured with generation model: {config['generation']['model']}")
+        logger.info(f"🔧 Generation fallback models: {config['generation']['fallback_models']}")
+
+    def _reload_config_if_changed(self) -> None:
+        """Rebuild the steps when the SoT file changed since they were built.
+
+        A broken edit keeps the current config so queries keep working.
+        """
+        if self._config_service is None:
+            return
+        mtime = self._config_service.current_mtime()
+        if mtime == self._config_mtime:
+            return
+        with self._reload_lock:
+            if mtime == self._config_mtime:
+                return
+            try:
+                config = self._build_config(self._config_service.get_effective_config("query"))
+            except Exception as e:
+                logger.warning(f"Query config reload failed, keeping previous config: {e}")
+                self._config_mtime = mtime
+                return
+            self._configure(config)
+            self._config_mtime = mtime
+            logger.info("🔧 Query pipeline config reloaded")
+
     def _get_default_config(self) -> dict[str, Any]:
         """Get default configuration for the query pipeline"""
         return {
@@ -182,12 +226,25 @@ class QueryPipelineOrchestrator:
             },
         }
 
-    async def process_query(self, request: QueryRequest, language: str = "english") -> QueryResponse:
-        """Process a complete query through the entire pipeline"""
+    async def process_query(self, request: QueryRequest, language: str = "english", db_client=None) -> QueryResponse:
+        """Process a complete query through the entire pipeline.
+
+        ``db_client`` is the caller's request-scoped client (RLS) used for retrieval
+        and for storing the run; without it the orchestrator's default client is used.
+        """
 
         start_time = datetime.utcnow()
         query_run_id = str(uuid4())
 
+        self._reload_config_if_changed()
+        # One consistent set of steps for this run, even if a reload happens meanwhile
+        config, query_processor, retriever, generator = (
+            self.config,
+            self.query_processor,
+            self.retriever,
+            self.generator,
+        )
+
         # Bind structured context once per run
         rid = get_request_id()
         run_logger = logger.bind(request_id=rid, pipeline_type="query", run_id=query_run_id)
@@ -206,7 +263,7 @@ class QueryPipelineOrchestrator:
             run_logger.info("Step 1: Processing query variations...")
             step1_start = datetime.utcnow()
 
-            query_result = await self.query_processor.execute(request.query)
+            query_result = await query_processor.execute(request.query)
             if query_result.status != "completed":
                 raise Exception(f"Query processing failed: {query_result.error_message}")
 
@@ -224,11 +281,13 @@ class QueryPipelineOrchestrator:
             # Pass indexing_run_id and allowed_document_ids to retrieval step if provided
             if request.indexing_run_id:
                 run_logger.info(f"Querying specific indexing run: {request.indexing_run_id}")
-                retrieval_result = await self.retriever.execute(
-                    variations, str(request.indexing_run_id), request.allowed_document_ids
+                retrieval_result = await retriever.execute(
+                    variations, str(request.indexing_run_id), request.allowed_document_ids, db_client=db_client
                 )
             else:
-                retrieval_result = await self.retriever.execute(variations, None, request.allowed_document_ids)
+                retrieval_result = await retriever.execute(
+                    variations, None, request.allowed_document_ids, db_client=db_client
+                )
             if retrieval_result.status != "completed":
                 raise Exception(f"Retrieval failed: {retrieval_result.error_message}")
 
@@ -243,12 +302,7 @@ class QueryPipelineOrchestrator:
             run_logger.info(f"Step 3: Generating response in {language}...")
             step3_start = datetime.utcnow()
 
-            # Create language-aware generation config
-            generation_config = GenerationConfig(**self.config["generation"])
-            generation_config.response_format["language"] = language
-            language_aware_generator = ResponseGenerator(generation_config)
-            
-            generation_result = await language_aware_generator.execute((request.query, search_results))
+            generation_result = await generator.execute((request.query, search_results), language=language)
             if generation_result.status != "completed":
                 raise Exception(f"Generation failed: {generation_result.error_message}")
 
@@ -274,6 +328,8 @@ class QueryPipelineOrchestrator:
                 response=response,
                 response_time_ms=response_time_ms,
                 step_timings=step_timings,
+                pipeline_config=config,
+                db_client=db_client,
             )
 
             run_logger.info(f"Query pipeline completed successfully in {response_time_ms}ms")
@@ -290,6 +346,8 @@ class QueryPipelineOrchestrator:
                 request=request,
                 error_message=str(e),
                 response_time_ms=int((datetime.utcnow() - start_time).total_seconds() * 1000),
+                pipeline_config=config,
+                db_client=db_client,
             )
 
             # Return error response
@@ -321,9 +379,12 @@ class QueryPipelineOrchestrator:
         error_message: str | None = None,
         response_time_ms: int = 0,
         step_timings: dict[str, float] | None = None,
+        pipeline_config: dict[str, Any] | None = None,
+        db_client=None,
     ):
         """Store query run in the database"""
 
+        db = db_client or self.db
         try:
             logger.bind(run_id=query_run_id).info(f"🔍 Storing query run with ID: {query_run_id}")
             logger.info(f"🔍 Request user_id: {request.user_id}")
@@ -348,12 +409,12 @@ class QueryPipelineOrchestrator:
                 "response_time_ms": response_time_ms,
                 "error_message": error_message,
                 "step_timings": step_timings,
-                "pipeline_config": self.config,
+                "pipeline_config": pipeline_config or self.config,
                 "created_at": datetime.utcnow().isoformat(),
             }
 
             # Insert into query_runs table, with fallback if pipeline_config column is missing
-            result = self.db.table("query_runs").insert(query_run_data).execute()
+            result = await aexecute(db.table("query_runs").insert(query_run_data))
 
             if result.data:
                 logger.bind(run_id=query_run_id).info(f"Query run stored with ID: {query_run_id}")
@@ -364,7 +425,7 @@ class QueryPipelineOrchestrator:
                     f"Primary insert failed, attempting fallback without pipeline_config: {error_msg}"
                 )
                 fallback_data = {k: v for k, v in query_run_data.items() if k != "pipeline_config"}
-                fb_result = self.db.table("query_runs").insert(fallback_data).execute()
+                fb_result = await aexecute(db.table("query_runs").insert(fallback_data))
                 if fb_result.data:
                     logger.bind(run_id=query_run_id).info(f"Query run stored with ID (fallback): {query_run_id}")
                 else:
@@ -379,7 +440,7 @@ class QueryPipelineOrchestrator:
             )
             try:
                 fallback_data = {k: v for k, v in query_run_data.items() if k != "pipeline_config"}
-                fb_result = self.db.table("query_runs").insert(fallback_data).execute()
+                fb_result = await aexecute(db.table("query_runs").insert(fallback_data))
                 if fb_result.data:
                     logger.bind(run_id=query_run_id).info(
                         f"Query run stored with ID (exception fallback): {query_run_id}"
@@ -396,7 +457,7 @@ class QueryPipelineOrchestrator:
 
         try:
             # Get query run from database
-            result = self.db.table("query_runs").select("*").eq("id", query_run_id).execute()
+            result = await aexecute(self.db.table("query_runs").select("*").eq("id", query_run_id))
 
             if result.data:
                 query_run = result.data[0]
@@ -420,7 +481,7 @@ class QueryPipelineOrchestrator:
 
         try:
             # Get recent query runs
-            result = self.db.table("query_runs").select("*").order("created_at", desc=True).limit(100).execute()
+            result = await aexecute(self.db.table("query_runs").select("*").order("created_at", desc=True).limit(100))
 
             if not result.data:
                 return {"total_queries": 0, "avg_response_time": 0, "success_rate": 0}
@@ -451,3 +512,17 @@ class QueryPipelineOrchestrator:
         except Exception as e:
             logger.error(f"Error getting pipeline metrics: {e}")
             return {"error": str(e)}
+
+
+_pipeline: QueryPipelineOrchestrator | None = None
+_pipeline_lock = threading.Lock()
+
+
+def get_query_pipeline() -> QueryPipelineOrchestrator:
+    """Application-scoped query pipeline, built on first use (or at startup)"""
+    global _pipeline
+    if _pipeline is None:
+        with _pipeline_lock:
+            if _pipeline is None:
+                _pipeline = QueryPipelineOrchestrator()
+    return _pipeline
@@ -51,8 +51,8 @@ class ResponseGenerator(PipelineStep):
         logger.info(f"🤖 ResponseGenerator initialized with primary model: {self.config.model}")
         logger.info(f"🤖 Fallback models configured: {self.config.fallback_models}")
 
-    async def execute(self, input_data: tuple[str, List[SearchResult]]) -> StepResult:
-        """Execute the generation step"""
+    async def execute(self, input_data: tuple[str, List[SearchResult]], language: str | None = None) -> StepResult:
+        """Execute the generation step; ``language`` overrides the configured response language"""
         start_time = datetime.utcnow()
 
         # Unpack the query and search results
@@ -64,7 +64,7 @@ class ResponseGenerator(PipelineStep):
             )
 
             # Generate the response
-            response = await self.generate_response(query, search_results)
+            response = await self.generate_response(query, search_results, language)
 
             # Calculate quality metrics
             quality_metrics = await self.calculate_quality_metrics(search_results, response)
@@ -95,7 +95,9 @@ class ResponseGenerator(PipelineStep):
                 details={"reason": str(e)},
             ) from e
 
-    async def generate_response(self, query: str, search_results: List[SearchResult]) -> QueryResponse:
+    async def generate_response(
+        self, query: str, search_results: List[SearchResult], language: str | None = None
+    ) -> QueryResponse:
         """Generate a comprehensive response based on retrieved documents"""
 
         if not search_results:
@@ -120,7 +122,7 @@ class ResponseGenerator(PipelineStep):
         context = self._prepare_context(search_results)
 
         # Generate the response using OpenRouter
-        response_text, model_used, tokens_used = await self._call_openrouter(query, context)
+        response_text, model_used, tokens_used = await self._call_openrouter(query, context, language)
 
         # Extract sources from search results
         sources = [
@@ -170,11 +172,11 @@ class ResponseGenerator(PipelineStep):
         logger.info(f"📄 Final context length: {len(''.join(context_parts))} characters")
         return "\n".join(context_parts)
 
-    async def _call_openrouter(self, query: str, context: str) -> tuple[str, str, int]:
+    async def _call_openrouter(self, query: str, context: str, language: str | None = None) -> tuple[str, str, int]:
         """Call OpenRouter API to generate response"""
 
         # Prepare the prompt
-        prompt = self._create_prompt(query, context)
+        prompt = self._create_prompt(query, context, language)
 
         # Try primary model first, then fallbacks
         models_to_try = [self.config.model] + self.config.fallback_models
@@ -200,7 +202,7 @@ class ResponseGenerator(PipelineStep):
             0,
         )
 
-    def _create_prompt(self, query: str, context: str) -> str:
+    def _create_prompt(self, query: str, context: str, language: str | None = None) -> str:
         """Create language-aware prompt following plan guidelines"""
         
         # Map language codes to full names for clearer instruction
@@ -208,7 +210,7 @@ class ResponseGenerator(PipelineStep):
             "english": "English",
             "danish": "Danish",
         }
-        language = self.config.response_format.get("language", "english")
+        language = language or self.config.response_format.get("language", "english")
         output_language = language_names.get(language, "English")
 
         prompt = f"""You are an expert in construction and building engineering. Answer the following question based on the provided context:
@@ -23,6 +23,8 @@ class RetrievalConfig:
         self.dimensions = config.get("dimensions", 1024)
         self.similarity_metric = config.get("similarity_metric", "cosine")
         self.top_k = config.get("top_k", 15)  # Changed from 5 to 15 like test file
+        self.match_count = config.get("match_count", 15)
+        self.ef_search = config.get("ef_search")
         # Set all thresholds to 0.0 for no filtering
         self.similarity_thresholds = config.get(
             "similarity_thresholds",
@@ -53,6 +55,8 @@ class DocumentRetriever(PipelineStep):
             dimensions=self.config.dimensions,
             similarity_metric=self.config.similarity_metric,
             top_k=self.config.top_k,
+            match_count=self.config.match_count,
+            ef_search=self.config.ef_search,
             similarity_thresholds=self.config.similarity_thresholds,
             danish_thresholds=self.config.danish_thresholds
         )
@@ -68,8 +72,9 @@ class DocumentRetriever(PipelineStep):
         input_data: QueryVariations,
         indexing_run_id: str | None = None,
         allowed_document_ids: list[str] | None = None,
+        db_client=None,
     ) -> StepResult:
-        """Execute the retrieval step"""
+        """Execute the retrieval step; ``db_client`` scopes the search to the caller (RLS)"""
         start_time = datetime.utcnow()
 
         logger.info(f"🔍 RETRIEVAL EXECUTE: Starting search with run_id={indexing_run_id}")
@@ -78,7 +83,7 @@ class DocumentRetriever(PipelineStep):
 
         try:
             # Search documents using query variations
-            results = await self.search(input_data, indexing_run_id, allowed_document_ids)
+            results = await self.search(input_data, indexing_run_id, allowed_document_ids, db_client)
 
             # Create sample outputs for debugging
             sample_outputs = {
@@ -116,6 +121,7 @@ class DocumentRetriever(PipelineStep):
         variations: QueryVariations,
         indexing_run_id: str | None = None,
         allowed_document_ids: list[str] | None = None,
+        db_client=None,
     ) -> list[SearchResult]:
         """Search documents using best query variation"""
 
@@ -136,7 +142,7 @@ class DocumentRetriever(PipelineStep):
         logger.info(f"🔍 SEARCH: Starting shared retrieval core search")
         search_start = datetime.utcnow()
         search_results = await self.retrieval_core.search_with_fallback(
-            query_embedding, indexing_run_id, allowed_document_ids, language="danish"
+            query_embedding, indexing_run_id, allowed_document_ids, language="danish", db_client=db_client
         )
         search_duration = (datetime.utcnow() - search_start).total_seconds() * 1000
         logger.info(f"🔍 SEARCH: Shared core search completed in {search_duration:.1f}ms, found {len(search_results)} results")
@@ -195,6 +201,7 @@ class DocumentRetriever(PipelineStep):
                 chunk_id=str(result["id"]),
                 document_id=str(document_id) if document_id else None,
                 bbox=bbox,  # Add bbox to SearchResult
+                duplicates=result.get("duplicates") or [],
             )
             result_objects.append(search_result)
         
@@ -3,6 +3,7 @@
 from .base_step import PipelineStep
 from src.models import StepResult
 from .progress_tracker import ProgressTracker
+from .progress_writer import ProgressWriter
 from .config_manager import ConfigManager
 from .models import DocumentInput, PipelineError
 
@@ -16,6 +17,7 @@ __all__ = [
     "PipelineStep",
     "StepResult",
     "ProgressTracker",
+    "ProgressWriter",
     "ConfigManager",
     "DocumentInput",
     "PipelineError",
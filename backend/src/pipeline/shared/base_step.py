@@ -3,13 +3,33 @@
 from abc import ABC, abstractmethod
 from typing import Any, Dict, Optional
 from pydantic import BaseModel
+import functools
 import time
 import asyncio
 from datetime import datetime
 from src.models import StepResult
+from src.utils.resource_monitor import get_sampler
 from .models import DocumentInput, PipelineError
 
 
+def _with_resource_window(execute):
+    """Attach the background sampler's window for this call to the returned StepResult"""
+
+    @functools.wraps(execute)
+    async def execute_with_resource_window(self, *args, **kwargs):
+        sampler = get_sampler()
+        if sampler is None:
+            return await execute(self, *args, **kwargs)
+        started = time.monotonic()
+        result = await execute(self, *args, **kwargs)
+        if isinstance(result, StepResult):
+            result.resource_usage = sampler.window(started)
+        return result
+
+    execute_with_resource_window._resource_window = True
+    return execute_with_resource_window
+
+
 class PipelineStep(ABC):
     """Abstract base class for pipeline steps with functional implementation"""
 
@@ -17,6 +37,15 @@ class PipelineStep(ABC):
         self.config = config
         self.tracker = tracker
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Every concrete execute() reports resource usage when a sampler is running
+        execute = cls.__dict__.get("execute")
+        if execute is not None and not getattr(execute, "__isabstractmethod__", False) and not getattr(
+            execute, "_resource_window", False
+        ):
+            cls.execute = _with_resource_window(execute)
+
     @abstractmethod
     async def execute(self, input_data: Any) -> StepResult:
         """
@@ -1,6 +1,6 @@
 """Shared pipeline models and data structures."""
 
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 from pydantic import BaseModel, Field
 from uuid import UUID
 from pathlib import Path
@@ -32,6 +32,9 @@ class DocumentInput(BaseModel):
     metadata: Dict[str, Any] = Field(
         default_factory=dict, description="Additional document metadata"
     )
+    page_range: Optional[Tuple[int, int]] = Field(
+        None, description="Inclusive 1-based pages to process when the document is split across shards"
+    )
 
 
 class PipelineError(Exception):
@@ -13,13 +13,37 @@ from src.utils.logging import get_logger
 # Configure logging
 logger = get_logger(__name__)
 
+# Run-level steps (batch operations over all documents); other run-level entries
+# (admission, resource_usage, sharding) are diagnostics, not pipeline steps
+BATCH_OPERATIONS = (
+    "EmbeddingStep",
+    "embedding",
+    "batch_embedding",
+    "batch_embed_all_chunks",
+)
+
+# Run-level step_results key of one shard's entry: "<step>:shard_<index>"
+SHARD_KEY_SEPARATOR = ":shard_"
+
+
+def split_run_step_key(key: str) -> tuple[str, Optional[int]]:
+    """Step name and shard index of a run-level step_results key (index None if not per shard)"""
+    step, separator, shard_index = key.partition(SHARD_KEY_SEPARATOR)
+    if not separator or not shard_index.isdigit():
+        return key, None
+    return step, int(shard_index)
+
 
 class ProgressTracker:
     """Progress tracker with comprehensive async operations"""
 
-    def __init__(self, indexing_run_id: UUID, db=None):
+    def __init__(self, indexing_run_id: UUID, db=None, progress_writer=None, shard_index: Optional[int] = None):
         self.run_id = indexing_run_id
         self.db = db
+        # Optional ProgressWriter; batch step entries are queued instead of written inline
+        self.progress_writer = progress_writer
+        # Shards of one run report to the same run; their run-level entries are keyed per shard
+        self.shard_index = shard_index
         self.total_steps = 6  # partition, metadata, enrich, chunk, embed, store
         self.completed_steps = 0
         # Bind context for all tracker logs
@@ -46,58 +70,33 @@ class ProgressTracker:
 
     def _is_batch_operation(self, step: str) -> bool:
         """Determine if a step is a batch operation that affects all documents"""
-        batch_operations = [
-            "EmbeddingStep",
-            "embedding",
-            "batch_embedding",
-            "batch_embed_all_chunks",
-        ]
-        return step in batch_operations
+        return step in BATCH_OPERATIONS
+
+    def run_step_key(self, step: str) -> str:
+        """Key of a run-level entry in indexing_runs.step_results"""
+        if self.shard_index is None:
+            return step
+        return f"{step}{SHARD_KEY_SEPARATOR}{self.shard_index}"
 
     async def update_run_status_async(self, step: str, status: str, result: StepResult):
         """Async database update for run status - ONLY for batch operations"""
+        key = self.run_step_key(step)
+        if self.progress_writer is not None:
+            self.progress_writer.update_run_step(self.run_id, key, self._step_entry(step, status, result))
+            return
+
         if not self.db:
             return
 
         try:
-            # Get current step_results from database
-            current_result = (
-                self.db.table("indexing_runs")
-                .select("step_results")
-                .eq("id", str(self.run_id))
-                .execute()
-            )
-
-            if not current_result.data:
-                print(f"❌ Indexing run {self.run_id} not found for step update")
-                return
-
-            current_step_results = current_result.data[0].get("step_results", {})
-
-            # Add the new step result
-            current_step_results[step] = {
-                "step": step,  # Add the required step field
-                "status": status,
-                "duration_seconds": result.duration_seconds,
-                "summary_stats": result.summary_stats,
-                "completed_at": (
-                    result.completed_at.isoformat() if result.completed_at else None
-                ),
-                "error_message": (
-                    result.error_message if hasattr(result, "error_message") else None
-                ),
-            }
-
-            # Update the step_results field
-            update_result = (
-                self.db.table("indexing_runs")
-                .update({"step_results": current_step_results})
-                .eq("id", str(self.run_id))
-                .execute()
-            )
+            # Merged in the database, so concurrent shards don't overwrite each other's entries
+            update_result = self.db.rpc(
+                "merge_indexing_run_step_results",
+                {"run_id": str(self.run_id), "entries": {key: self._step_entry(step, status, result)}},
+            ).execute()
 
             if not update_result.data:
-                print(f"❌ Failed to update step results for run {self.run_id}")
+                print(f"❌ Indexing run {self.run_id} not found for step update")
                 return
 
             print(f"✅ Updated batch step results for {step} in run {self.run_id}")
@@ -105,6 +104,21 @@ class ProgressTracker:
         except Exception as e:
             print(f"❌ Failed to update run status: {e}")
 
+    def _step_entry(self, step: str, status: str, result: StepResult) -> Dict[str, Any]:
+        """indexing_runs.step_results entry for a batch step"""
+        return {
+            "step": step,  # Add the required step field
+            "status": status,
+            "duration_seconds": result.duration_seconds,
+            "summary_stats": result.summary_stats,
+            "completed_at": (
+                result.completed_at.isoformat() if result.completed_at else None
+            ),
+            "error_message": (
+                result.error_message if hasattr(result, "error_message") else None
+            ),
+        }
+
     async def log_progress_async(self, step: str, status: str, result: StepResult):
         """Async structured logging for progress updates"""
         try:
@@ -0,0 +1,184 @@
+"""Buffered progress writes for indexing runs.
+
+Every step of every document used to write its progress straight to the
+database: one ``document_step_results`` insert and one ``documents`` update per
+step, plus a read-modify-write of ``indexing_runs.step_results`` for batch
+steps. With several documents in flight those round-trips interleave with the
+pipeline work of the whole run.
+
+``ProgressWriter`` collects these updates instead. Steps only queue them (no
+await, so a step never waits on the database) and a background task writes
+them at most once per interval:
+
+- queued step result rows go out as one bulk insert, in queue order, so the
+  ``document_step_results_latest`` view resolves exactly as before
+- updates of one document are merged into one ``documents`` update (later
+  fields win, which is the state the sequential writes would have left)
+- run-level step entries are merged into ``indexing_runs.step_results`` with
+  one ``merge_indexing_run_step_results`` call per run
+
+Terminal states (a document completing or failing, a failed run step) are
+flushed right away, and ``close`` flushes whatever is left, so the progress
+view shows the same states as before with far fewer writes per run. A failed
+flush keeps its updates queued; if they still cannot be written when the
+writer is closed, ``close`` raises so the run is failed instead of finishing
+with progress that was never stored.
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from src.services.async_db import aexecute
+from src.utils.exceptions import DatabaseError
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+TERMINAL_STATUSES = ("completed", "failed")
+
+
+class ProgressWriter:
+    """Coalesce progress updates of indexing runs into periodic batched writes"""
+
+    def __init__(self, db, interval_seconds: float = 2.0, max_attempts: int = 3):
+        self.db = db
+        self.interval_seconds = interval_seconds
+        self.max_attempts = max(1, max_attempts)
+
+        self._rows: List[Dict[str, Any]] = []
+        self._documents: Dict[str, Dict[str, Any]] = {}
+        self._run_steps: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._failed_attempts = 0
+        self._last_error: Optional[Exception] = None
+
+        self._flush_requested: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+
+        self.stats: Dict[str, int] = {"updates_queued": 0, "writes": 0, "flushes": 0, "failed_flushes": 0}
+
+    def _ensure_started(self) -> None:
+        if self._task is None and not self._closing:
+            self._flush_requested = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+            self._task = asyncio.create_task(self._flush_loop())
+
+    def add_step_result(self, row: Dict[str, Any]) -> None:
+        """Queue a ``document_step_results`` row"""
+        self._ensure_started()
+        self._rows.append(row)
+        self.stats["updates_queued"] += 1
+
+    def update_document(self, document_id: Any, fields: Dict[str, Any]) -> None:
+        """Queue a ``documents`` update; a terminal indexing status is flushed right away"""
+        self._ensure_started()
+        self._documents.setdefault(str(document_id), {}).update(fields)
+        self.stats["updates_queued"] += 1
+        if fields.get("indexing_status") in TERMINAL_STATUSES:
+            self._flush_requested.set()
+
+    def update_run_step(self, indexing_run_id: Any, step: str, entry: Dict[str, Any]) -> None:
+        """Queue an ``indexing_runs.step_results[step]`` entry; failures are flushed right away"""
+        self._ensure_started()
+        self._run_steps.setdefault(str(indexing_run_id), {})[step] = entry
+        self.stats["updates_queued"] += 1
+        if entry.get("status") == "failed":
+            self._flush_requested.set()
+
+    @property
+    def pending(self) -> bool:
+        return bool(self._rows or self._documents or self._run_steps)
+
+    async def flush(self) -> None:
+        """Write everything queued so far"""
+        if self._flush_lock is None:
+            return
+        async with self._flush_lock:
+            if not self.pending:
+                return
+            rows, self._rows = self._rows, []
+            documents, self._documents = self._documents, {}
+            run_steps, self._run_steps = self._run_steps, {}
+            self.stats["flushes"] += 1
+
+            try:
+                if rows:
+                    result = await aexecute(self.db.table("document_step_results").insert(rows))
+                    if not result.data:
+                        raise RuntimeError("Failed to store document step results")
+                    self.stats["writes"] += 1
+                    rows = []
+                while documents:
+                    document_id, fields = next(iter(documents.items()))
+                    await aexecute(self.db.table("documents").update(fields).eq("id", document_id))
+                    self.stats["writes"] += 1
+                    del documents[document_id]
+                while run_steps:
+                    run_id, entries = next(iter(run_steps.items()))
+                    await self._write_run_steps(run_id, entries)
+                    del run_steps[run_id]
+                self._failed_attempts = 0
+            except Exception as e:
+                self.stats["failed_flushes"] += 1
+                self._failed_attempts += 1
+                self._last_error = e
+                logger.warning(f"Progress flush failed ({self._failed_attempts} in a row): {e}")
+                # Kept for the next flush; close() raises if they can never be written
+                self._requeue(rows, documents, run_steps)
+
+    async def _write_run_steps(self, run_id: str, entries: Dict[str, Dict[str, Any]]) -> None:
+        # Merged in the database: the shards of a run write to the same row
+        result = await aexecute(
+            self.db.rpc("merge_indexing_run_step_results", {"run_id": run_id, "entries": entries})
+        )
+        self.stats["writes"] += 1
+        if not result.data:
+            logger.warning(f"Indexing run {run_id} not found for step update")
+
+    def _requeue(self, rows, documents, run_steps) -> None:
+        """Put unwritten updates back in front of those queued during the flush"""
+        self._rows = rows + self._rows
+        for document_id, fields in self._documents.items():
+            documents.setdefault(document_id, {}).update(fields)
+        self._documents = documents
+        for run_id, entries in self._run_steps.items():
+            run_steps.setdefault(run_id, {}).update(entries)
+        self._run_steps = run_steps
+
+    async def _flush_loop(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(), timeout=self.interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_requested.clear()
+            if self._closing:
+                break
+            await self.flush()
+
+    async def close(self) -> None:
+        """Stop the background task and flush the remaining updates.
+
+        Raises DatabaseError if updates are still unwritten after ``max_attempts`` flushes.
+        """
+        if self._task is None:
+            return
+        self._closing = True
+        self._flush_requested.set()
+        await self._task
+        self._task = None
+        for _ in range(self.max_attempts):
+            await self.flush()
+            if not self.pending:
+                break
+
+        if self.pending:
+            message = (
+                f"Failed to write {len(self._rows)} step results, {len(self._documents)} document and "
+                f"{len(self._run_steps)} run progress updates after {self.max_attempts} attempts: {self._last_error}"
+            )
+            logger.error(message)
+            raise DatabaseError(message)
+
+        logger.info("progress_writer_closed", extra={"step": "orchestrator", **self.stats})
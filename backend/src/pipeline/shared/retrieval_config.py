@@ -5,7 +5,7 @@ This module provides common configuration settings for retrieval operations,
 ensuring consistency across different pipeline components.
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from pydantic import BaseModel
 
 
@@ -35,6 +35,10 @@ class SharedRetrievalConfig(BaseModel):
     # Search configuration  
     similarity_metric: str = "cosine"
     top_k: int = 15  # Increased to provide more context to LLM
+    # HNSW recall/latency knobs: neighbours returned by the search RPC (k, max 200)
+    # and the index candidate list size (hnsw.ef_search; None keeps the server default)
+    match_count: int = 15
+    ef_search: Optional[int] = None
     
     # Similarity thresholds
     similarity_thresholds: RetrievalThresholds = RetrievalThresholds()
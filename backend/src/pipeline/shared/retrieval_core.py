@@ -11,6 +11,7 @@ from typing import List, Dict, Any, Optional
 import ast
 
 from src.config.database import get_supabase_admin_client
+from src.services.async_db import aexecute
 
 from .retrieval_config import SharedRetrievalConfig
 from .embedding_service import VoyageEmbeddingService
@@ -66,38 +67,50 @@ class RetrievalCore:
         query_embedding: List[float],
         indexing_run_id: Optional[str] = None,
         allowed_document_ids: Optional[List[str]] = None,
-        similarity_threshold: float = 0.0
+        similarity_threshold: float = 0.0,
+        db_client=None
     ) -> List[Dict[str, Any]]:
         """
-        Search using pgvector HNSW optimization with match_chunks function.
+        Search using pgvector HNSW optimization with match_accessible_chunks function.
+        
+        Visibility is evaluated in Postgres for the client's JWT (anon and user
+        clients see what RLS would let them see; the admin client sees all), and
+        the HNSW scan continues until enough visible rows are found.
         
         Args:
             query_embedding: Query vector
             indexing_run_id: Filter to specific indexing run
-            allowed_document_ids: Filter to specific documents
+            allowed_document_ids: Filter to specific documents (applied in the RPC)
             similarity_threshold: Minimum similarity threshold
+            db_client: Client for this call (defaults to the one given at init)
             
         Returns:
             List of matching chunks with similarity scores
         """
-        logger.info(f"🔍 HNSW search with threshold={similarity_threshold}, count={self.config.top_k * 2}, top_k={self.config.top_k}")
+        logger.info(
+            f"🔍 HNSW search with threshold={similarity_threshold}, match_count={self.config.match_count}, "
+            f"ef_search={self.config.ef_search or 'default'}"
+        )
         
         try:
-            # Prepare RPC parameters - use 0.0 threshold and 15 results like test file
+            # Prepare RPC parameters - no threshold filtering; k and ef_search come from config
             rpc_params = {
                 'query_embedding': query_embedding,
-                'match_threshold': 0.0,  # No threshold filtering, like test file
-                'match_count': 15,  # Fixed 15 results like test file
+                'match_count': self.config.match_count,
             }
+            if self.config.ef_search:
+                rpc_params['ef_search'] = self.config.ef_search
             
             # Add optional filters
             if indexing_run_id:
                 rpc_params['indexing_run_id_filter'] = indexing_run_id
                 logger.info(f"🔍 Filtering to indexing run: {indexing_run_id}")
+            if allowed_document_ids:
+                rpc_params['document_ids_filter'] = allowed_document_ids
             
             # Execute HNSW search
             hnsw_start = datetime.utcnow()
-            response = self.db.rpc('match_chunks', rpc_params).execute()
+            response = await aexecute((db_client or self.db).rpc('match_accessible_chunks', rpc_params))
             hnsw_duration = (datetime.utcnow() - hnsw_start).total_seconds() * 1000
             
             # Debug response
@@ -105,15 +118,11 @@ class RetrievalCore:
             if response.data is not None:
                 logger.info(f"🔍 HNSW raw response count: {len(response.data)}")
             
-            # Filter by document IDs if specified (post-query filtering)
             results = response.data if response.data else []
-            if allowed_document_ids and results:
-                results = [r for r in results if r.get('document_id') in allowed_document_ids]
-                logger.info(f"🔍 After document ID filtering: {len(results)} results")
             
             if results:
                 logger.info(f"🔍 ✅ HNSW search SUCCESS in {hnsw_duration:.1f}ms - {len(results)} results")
-                return self._format_hnsw_results(results, query_embedding)
+                return self._format_hnsw_results(results)
             else:
                 logger.warning(f"🔍 ⚠️ HNSW returned no results in {hnsw_duration:.1f}ms")
                 return []
@@ -126,7 +135,8 @@ class RetrievalCore:
         self,
         query_embedding: List[float],
         indexing_run_id: Optional[str] = None,
-        allowed_document_ids: Optional[List[str]] = None
+        allowed_document_ids: Optional[List[str]] = None,
+        db_client=None
     ) -> List[Dict[str, Any]]:
         """
         Fallback Python-based similarity calculation.
@@ -135,6 +145,7 @@ class RetrievalCore:
             query_embedding: Query vector
             indexing_run_id: Filter to specific indexing run
             allowed_document_ids: Filter to specific documents
+            db_client: Client for this call (defaults to the one given at init)
             
         Returns:
             List of matching chunks with similarity scores
@@ -143,7 +154,7 @@ class RetrievalCore:
         
         # Build query
         query = (
-            self.db.table("document_chunks")
+            (db_client or self.db).table("document_chunks")
             .select("id,content,metadata,embedding_1024,document_id,indexing_run_id")
             .not_.is_("embedding_1024", "null")
         )
@@ -155,7 +166,7 @@ class RetrievalCore:
             query = query.in_("document_id", allowed_document_ids)
         
         # Execute query
-        response = query.execute()
+        response = await aexecute(query)
         chunks = response.data
         results_with_scores = []
         
@@ -178,15 +189,16 @@ class RetrievalCore:
         # Sort by similarity (highest first)
         results_with_scores.sort(key=lambda x: x["similarity_score"], reverse=True)
         
-        # Return top 15 results like HNSW
-        return results_with_scores[:15]
+        # Return as many results as the HNSW search would
+        return results_with_scores[:self.config.match_count]
     
     async def search_with_fallback(
         self,
         query_embedding: List[float],
         indexing_run_id: Optional[str] = None,
         allowed_document_ids: Optional[List[str]] = None,
-        language: str = "danish"
+        language: str = "danish",
+        db_client=None
     ) -> List[Dict[str, Any]]:
         """
         Search using Python similarity calculation as primary method.
@@ -197,6 +209,7 @@ class RetrievalCore:
             indexing_run_id: Filter to specific indexing run
             allowed_document_ids: Filter to specific documents
             language: Language for threshold selection
+            db_client: Client for this call, e.g. a request-scoped RLS client
             
         Returns:
             List of matching chunks with similarity scores
@@ -206,7 +219,7 @@ class RetrievalCore:
             # Try HNSW search first
             logger.info("🚀 Attempting HNSW search for better performance")
             results = await self.search_pgvector_hnsw(
-                query_embedding, indexing_run_id, allowed_document_ids, 0.0
+                query_embedding, indexing_run_id, allowed_document_ids, 0.0, db_client=db_client
             )
             
             if results:
@@ -220,7 +233,7 @@ class RetrievalCore:
         try:
             logger.info("🐍 Using Python similarity calculation as fallback")
             python_results = await self.search_pgvector_fallback(
-                query_embedding, indexing_run_id, allowed_document_ids
+                query_embedding, indexing_run_id, allowed_document_ids, db_client=db_client
             )
             
             return self._post_process_results(python_results, language)
@@ -229,28 +242,22 @@ class RetrievalCore:
             logger.error(f"Python similarity search failed: {e}")
             raise
     
-    def _format_hnsw_results(self, results: List[Dict], query_embedding: List[float]) -> List[Dict[str, Any]]:
-        """Format results from HNSW search with calculated similarity scores"""
+    def _format_hnsw_results(self, results: List[Dict]) -> List[Dict[str, Any]]:
+        """Format results from HNSW search; similarity is computed by Postgres"""
         formatted_results = []
         
         for result in results:
-            # Calculate actual similarity using stored embeddings
-            chunk_embedding = self._parse_embedding(result.get("embedding_1024"))
-            if chunk_embedding:
-                similarity = self.similarity_service.cosine_similarity(query_embedding, chunk_embedding)
-            else:
-                # Fallback to estimated similarity based on HNSW ordering
-                similarity = max(0.1, 1.0 - (len(formatted_results) * 0.05))
-            
             formatted_results.append({
                 "id": result["id"],
                 "content": result["content"],
                 "metadata": result.get("metadata", {}),
-                "similarity_score": max(similarity, 0.0),
+                "similarity_score": max(float(result.get("similarity") or 0.0), 0.0),
                 "source_filename": result.get("metadata", {}).get("source_filename", "unknown"),
                 "page_number": result.get("metadata", {}).get("page_number"),
                 "document_id": result.get("document_id"),
-                "indexing_run_id": result.get("indexing_run_id")
+                "indexing_run_id": result.get("indexing_run_id"),
+                # Deduplicated copies of this chunk (other documents/pages), for citation
+                "duplicates": result.get("duplicates") or [],
             })
         
         return formatted_results
@@ -263,15 +270,42 @@ class RetrievalCore:
         # Skip threshold filtering - let LLM decide relevance
         # filtered = self.similarity_service.filter_by_similarity_threshold(results, language)
         
+        # One hit per duplicate group; the other members become citations of that hit
+        results = self._collapse_duplicate_groups(results)
+        
         # Deduplicate by content
         deduplicated = self.similarity_service.deduplicate_by_content(results)
         
         # Sort by similarity (highest first)
         sorted_results = self.similarity_service.sort_by_similarity(deduplicated, descending=True)
         
-        # Return top 15 results like test file
-        return sorted_results[:15]
+        # Return the configured number of neighbours (15 by default)
+        return sorted_results[:self.config.match_count]
     
+    @staticmethod
+    def _collapse_duplicate_groups(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Keep the best hit of each duplicate group (canonical chunk plus its ``duplicate_of`` chunks).
+
+        Duplicates have no embedding, so match_accessible_chunks returns canonical
+        chunks only (with their duplicates attached); this keeps the guarantee for
+        duplicate rows that carry an embedding anyway, e.g. re-embedded by hand.
+        """
+        collapsed: Dict[str, Dict[str, Any]] = {}
+        for result in sorted(results, key=lambda r: r.get("similarity_score", 0.0), reverse=True):
+            duplicate_of = (result.get("metadata") or {}).get("duplicate_of") or {}
+            group = str(duplicate_of.get("id") or result["id"])
+            best = collapsed.get(group)
+            if best is None:
+                collapsed[group] = {**result, "duplicates": list(result.get("duplicates") or [])}
+                continue
+            best["duplicates"].append({
+                "id": result["id"],
+                "document_id": result.get("document_id"),
+                "page_number": result.get("page_number", (result.get("metadata") or {}).get("page_number")),
+            })
+            best["duplicates"].extend(result.get("duplicates") or [])
+        return list(collapsed.values())
+
     def _parse_embedding(self, embedding_str: str) -> Optional[List[float]]:
         """Parse embedding string to list of floats"""
         if not embedding_str:
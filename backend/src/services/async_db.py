@@ -0,0 +1,92 @@
+"""Async access to the synchronous supabase-py client.
+
+supabase-py's ``.execute()`` (and the storage API) does blocking HTTP, so
+calling it inside ``async def`` stalls the FastAPI / Beam event loop for the
+whole round-trip and every other request waits behind it. Services go through
+this module instead:
+
+    result = await aexecute(self.supabase.table("documents").select("id").eq("id", doc_id))
+    await arun(self.supabase.storage.from_(bucket).upload, path, content)
+
+Calls run on a dedicated, bounded thread pool (``supabase_max_concurrent_queries``
+threads), so slow queries overlap instead of serializing, and a burst of
+requests cannot exhaust the default executor used by ``asyncio.to_thread``.
+The caller's context variables (request ids for logging) are carried over.
+"""
+
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from src.config.settings import get_settings
+
+T = TypeVar("T")
+
+
+class AsyncQueryExecutor:
+    """Bounded thread pool for blocking database and storage calls"""
+
+    def __init__(self, max_workers: int = 16):
+        self.max_workers = max(1, max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="supabase-io")
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.stats: Dict[str, Any] = {"calls": 0, "max_in_flight": 0, "total_seconds": 0.0}
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run a blocking callable on the pool"""
+        context = contextvars.copy_context()
+        call = functools.partial(context.run, self._timed, func, *args, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(self._executor, call)
+
+    async def execute(self, query: Any) -> Any:
+        """Await a PostgREST request builder (anything with ``.execute()``)"""
+        return await self.run(query.execute)
+
+    def _timed(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        with self._lock:
+            self._in_flight += 1
+            self.stats["calls"] += 1
+            self.stats["max_in_flight"] = max(self.stats["max_in_flight"], self._in_flight)
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self.stats["total_seconds"] += time.perf_counter() - started
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_executor: Optional[AsyncQueryExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_query_executor() -> AsyncQueryExecutor:
+    """Process-wide executor sized from settings"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = AsyncQueryExecutor(get_settings().supabase_max_concurrent_queries)
+    return _executor
+
+
+async def aexecute(query: Any) -> Any:
+    """``await aexecute(builder)`` instead of ``builder.execute()`` inside async code"""
+    return await get_query_executor().execute(query)
+
+
+async def arun(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run any other blocking supabase call (storage, auth admin) off the event loop"""
+    return await get_query_executor().run(func, *args, **kwargs)
@@ -6,11 +6,16 @@ from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from src.config.database import get_supabase_admin_client, get_supabase_client
 from src.config.settings import get_settings
 from src.models.user import UserProfile
+from src.services.async_db import aexecute, arun
+from src.services.token_verifier import SupabaseTokenVerifier
 from src.utils.exceptions import AppError, AuthenticationError
 from src.utils.logging import get_logger
+from src.utils.ttl_cache import TTLCache
 
 logger = get_logger(__name__)
 
+_UNCACHED = object()
+
 # Security scheme for JWT tokens
 security = HTTPBearer()
 
@@ -31,6 +36,12 @@ class AuthService:
         self.settings = get_settings()
         self.supabase_client = get_supabase_client()
         self.admin_client = get_supabase_admin_client()
+        self.token_verifier = SupabaseTokenVerifier()
+        # Profiles change rarely; a short TTL bounds staleness for edits made elsewhere
+        self._profile_cache = TTLCache(
+            maxsize=self.settings.auth_profile_cache_size,
+            ttl_seconds=self.settings.auth_profile_cache_ttl_seconds,
+        )
 
     async def sign_up(self, email: str, password: str) -> dict[str, Any]:
         """Sign up a new user"""
@@ -150,28 +161,33 @@ class AuthService:
             logger.error("Password reset failed", email=email, error=str(e))
             raise AppError("Password reset failed")
 
-    async def get_current_user(self, access_token: str) -> dict[str, Any] | None:
-        """Verify the access token with Supabase and return a minimal user dict."""
+    async def get_current_user(self, access_token: str, *, verify_remote: bool = False) -> dict[str, Any] | None:
+        """Verify the access token and return a minimal user dict.
+
+        Tokens are verified locally (signature, expiry, audience) when the JWT
+        secret or the project's JWKS allows it. ``verify_remote=True`` asks
+        Supabase Auth instead, which also rejects sessions revoked before expiry.
+        """
         try:
-            # Use admin client to verify the JWT token
-            # The get_user method with access_token parameter verifies the token
-            response = self.admin_client.auth.get_user(access_token)
-            
-            if not response or not response.user:
-                logger.warning("Failed to verify access token - no user returned")
-                return None
+            claims = None if verify_remote else await self.token_verifier.verify(access_token)
+            if claims is not None:
+                user_id, email = claims["sub"], claims.get("email")
+            else:
+                response = await arun(self.admin_client.auth.get_user, access_token)
+
+                if not response or not response.user:
+                    logger.warning("Failed to verify access token - no user returned")
+                    return None
+
+                user_id, email = response.user.id, response.user.email
 
-            user = response.user
-            user_id = user.id
-            email = user.email
-            
             if not user_id:
                 logger.warning("User ID missing from token response")
                 return None
 
             profile = await self._get_user_profile(user_id)
-            logger.debug("Successfully authenticated user", user_id=user_id)
-            
+            logger.debug("Successfully authenticated user", user_id=user_id, verified_locally=claims is not None)
+
             return {
                 "id": user_id,
                 "email": email,
@@ -217,7 +233,9 @@ class AuthService:
 
             if response.data:
                 logger.info(f"User profile created for: {user_id}")
-                return UserProfile(**response.data[0])
+                profile = UserProfile(**response.data[0])
+                self._profile_cache.set(user_id, profile)
+                return profile
             else:
                 logger.error(f"No data returned when creating user profile for {user_id}")
                 raise Exception("Failed to create user profile - no data returned")
@@ -227,13 +245,17 @@ class AuthService:
             raise e
 
     async def _get_user_profile(self, user_id: str) -> UserProfile | None:
-        """Get user profile from database"""
+        """Get user profile from the cache or the database"""
+        cached = self._profile_cache.get(user_id, _UNCACHED)
+        if cached is not _UNCACHED:
+            return cached
         try:
-            response = self.supabase_client.table("user_profiles").select("*").eq("id", user_id).execute()
+            response = await aexecute(self.supabase_client.table("user_profiles").select("*").eq("id", user_id))
 
-            if response.data:
-                return UserProfile(**response.data[0])
-            return None
+            profile = UserProfile(**response.data[0]) if response.data else None
+            # Missing profiles are cached too, so they don't cost a query per request
+            self._profile_cache.set(user_id, profile)
+            return profile
 
         except Exception as e:
             logger.error(f"Failed to get user profile for {user_id}: {str(e)}")
@@ -292,6 +314,22 @@ async def get_current_user(
     return user
 
 
+async def get_current_user_verified(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+) -> dict[str, Any]:
+    """Like ``get_current_user`` but always checks the session with Supabase Auth.
+
+    For revocation-sensitive endpoints: a signed-out or revoked session is
+    rejected immediately rather than when its access token expires.
+    """
+    user = await auth_service.get_current_user(credentials.credentials, verify_remote=True)
+
+    if not user:
+        raise AuthenticationError("Invalid authentication credentials")
+
+    return user
+
+
 async def get_current_user_optional(
     credentials: HTTPAuthorizationCredentials | None = Depends(optional_security),
 ) -> dict[str, Any] | None:
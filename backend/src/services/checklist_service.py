@@ -13,6 +13,7 @@ from src.models.checklist import (
     ChecklistTemplateRequest,
     ChecklistTemplateResponse,
 )
+from src.services.async_db import aexecute
 from src.shared.errors import ErrorCode
 from src.utils.exceptions import AppError
 
@@ -36,11 +37,10 @@ class ChecklistService:
         """Create a new checklist analysis run."""
         try:
             # Fetch access level from indexing run
-            indexing_run_result = (
+            indexing_run_result = await aexecute(
                 self.supabase.table("indexing_runs")
                 .select("access_level")
                 .eq("id", indexing_run_id)
-                .execute()
             )
 
             if not indexing_run_result.data:
@@ -52,7 +52,7 @@ class ChecklistService:
             access_level = indexing_run_result.data[0]["access_level"]
 
             # Create analysis run
-            result = (
+            result = await aexecute(
                 self.supabase.table("checklist_analysis_runs")
                 .insert(
                     {
@@ -67,7 +67,6 @@ class ChecklistService:
                         "progress_total": 4,
                     }
                 )
-                .execute()
             )
 
             if not result.data:
@@ -87,11 +86,10 @@ class ChecklistService:
     ) -> Optional[ChecklistAnalysisRun]:
         """Get analysis run by ID."""
         try:
-            result = (
+            result = await aexecute(
                 self.supabase.table("checklist_analysis_runs")
                 .select("*")
                 .eq("id", analysis_run_id)
-                .execute()
             )
 
             if not result.data:
@@ -109,11 +107,10 @@ class ChecklistService:
         """Get analysis run with its results."""
         try:
             # Get analysis run
-            run_result = (
+            run_result = await aexecute(
                 self.supabase.table("checklist_analysis_runs")
                 .select("*")
                 .eq("id", run_id)
-                .execute()
             )
 
             if not run_result.data:
@@ -123,12 +120,11 @@ class ChecklistService:
 
             # Get results if completed
             if analysis_run.status == AnalysisStatus.COMPLETED:
-                results_result = (
+                results_result = await aexecute(
                     self.supabase.table("checklist_results")
                     .select("*")
                     .eq("analysis_run_id", run_id)
                     .order("item_number")
-                    .execute()
                 )
 
                 # Parse all_sources JSON field for each result
@@ -165,11 +161,10 @@ class ChecklistService:
         try:
             if indexing_run_id:
                 # First, check the access level of the indexing run
-                indexing_result = (
+                indexing_result = await aexecute(
                     self.supabase.table("indexing_runs")
                     .select("access_level, user_id")
                     .eq("id", indexing_run_id)
-                    .execute()
                 )
                 
                 if not indexing_result.data:
@@ -195,14 +190,14 @@ class ChecklistService:
                     # No access - return empty list
                     return []
                 
-                result = query.order("created_at", desc=True).execute()
+                result = await aexecute(query.order("created_at", desc=True))
                 return [ChecklistAnalysisRun(**run) for run in result.data]
             
             # If no indexing_run_id specified, return user's runs only
             if user_id:
                 query = self.supabase.table("checklist_analysis_runs").select("*")
                 query = query.eq("user_id", user_id)
-                result = query.order("created_at", desc=True).execute()
+                result = await aexecute(query.order("created_at", desc=True))
                 return [ChecklistAnalysisRun(**run) for run in result.data]
             
             return []
@@ -242,7 +237,7 @@ class ChecklistService:
 
             # Batch insert results
             if db_results:
-                self.supabase.table("checklist_results").insert(db_results).execute()
+                await aexecute(self.supabase.table("checklist_results").insert(db_results))
 
             logger.info(
                 f"Stored {len(db_results)} results for analysis {analysis_run_id}"
@@ -257,13 +252,15 @@ class ChecklistService:
     ):
         """Update analysis progress."""
         try:
-            self.supabase.table("checklist_analysis_runs").update(
-                {
-                    "progress_current": current,
-                    "progress_total": total,
-                    "updated_at": "NOW()",
-                }
-            ).eq("id", analysis_run_id).execute()
+            await aexecute(
+                self.supabase.table("checklist_analysis_runs").update(
+                    {
+                        "progress_current": current,
+                        "progress_total": total,
+                        "updated_at": "NOW()",
+                    }
+                ).eq("id", analysis_run_id)
+            )
 
         except Exception as e:
             logger.error(f"Error updating progress: {e}")
@@ -274,9 +271,11 @@ class ChecklistService:
     ):
         """Update analysis status."""
         try:
-            self.supabase.table("checklist_analysis_runs").update(
-                {"status": status.value, "updated_at": "NOW()"}
-            ).eq("id", analysis_run_id).execute()
+            await aexecute(
+                self.supabase.table("checklist_analysis_runs").update(
+                    {"status": status.value, "updated_at": "NOW()"}
+                ).eq("id", analysis_run_id)
+            )
 
             logger.info(f"Updated analysis {analysis_run_id} status to {status.value}")
 
@@ -289,9 +288,11 @@ class ChecklistService:
     ):
         """Store raw analysis output."""
         try:
-            self.supabase.table("checklist_analysis_runs").update(
-                {"raw_output": raw_output, "updated_at": "NOW()"}
-            ).eq("id", analysis_run_id).execute()
+            await aexecute(
+                self.supabase.table("checklist_analysis_runs").update(
+                    {"raw_output": raw_output, "updated_at": "NOW()"}
+                ).eq("id", analysis_run_id)
+            )
 
         except Exception as e:
             logger.error(f"Error updating raw output: {e}")
@@ -302,9 +303,11 @@ class ChecklistService:
     ):
         """Update analysis with error message."""
         try:
-            self.supabase.table("checklist_analysis_runs").update(
-                {"error_message": error_message, "updated_at": "NOW()"}
-            ).eq("id", analysis_run_id).execute()
+            await aexecute(
+                self.supabase.table("checklist_analysis_runs").update(
+                    {"error_message": error_message, "updated_at": "NOW()"}
+                ).eq("id", analysis_run_id)
+            )
 
         except Exception as e:
             logger.error(f"Error updating error message: {e}")
@@ -316,11 +319,10 @@ class ChecklistService:
         """Delete an analysis run."""
         try:
             # Check if user owns the run
-            run_result = (
+            run_result = await aexecute(
                 self.supabase.table("checklist_analysis_runs")
                 .select("user_id")
                 .eq("id", run_id)
-                .execute()
             )
 
             if not run_result.data:
@@ -336,9 +338,11 @@ class ChecklistService:
                 )
 
             # Delete the run (results will cascade delete)
-            self.supabase.table("checklist_analysis_runs").delete().eq(
-                "id", run_id
-            ).execute()
+            await aexecute(
+                self.supabase.table("checklist_analysis_runs").delete().eq(
+                    "id", run_id
+                )
+            )
 
             logger.info(f"Deleted analysis run {run_id}")
 
@@ -352,11 +356,10 @@ class ChecklistService:
         """Validate user has access to indexing run."""
         try:
             # Fetch indexing run with access level
-            result = (
+            result = await aexecute(
                 self.supabase.table("indexing_runs")
                 .select("id, access_level, user_id")
                 .eq("id", indexing_run_id)
-                .execute()
             )
 
             if not result.data:
@@ -388,11 +391,10 @@ class ChecklistService:
     async def get_language_from_indexing_run(self, indexing_run_id: str) -> str:
         """Fetch language from indexing run's stored pipeline_config."""
         try:
-            result = (
+            result = await aexecute(
                 self.supabase.table("indexing_runs")
                 .select("pipeline_config")
                 .eq("id", indexing_run_id)
-                .execute()
             )
 
             if result.data and result.data[0].get("pipeline_config"):
@@ -431,7 +433,7 @@ class ChecklistService:
                 is_public = request.is_public
                 access_level = "public" if is_public else "private"
 
-            result = (
+            result = await aexecute(
                 self.supabase.table("checklist_templates")
                 .insert(
                     {
@@ -443,7 +445,6 @@ class ChecklistService:
                         "access_level": access_level,
                     }
                 )
-                .execute()
             )
 
             if not result.data:
@@ -480,7 +481,7 @@ class ChecklistService:
                     .select("*")
                     .eq("user_id", user_id)
                 )
-                user_result = user_query.execute()
+                user_result = await aexecute(user_query)
                 
                 for template in user_result.data:
                     templates.append(ChecklistTemplateResponse(
@@ -494,7 +495,7 @@ class ChecklistService:
                     .select("*")
                     .eq("is_public", True)
                 )
-                public_result = public_query.execute()
+                public_result = await aexecute(public_query)
                 
                 for template in public_result.data:
                     templates.append(ChecklistTemplateResponse(
@@ -523,11 +524,10 @@ class ChecklistService:
         Validates access based on template visibility and ownership.
         """
         try:
-            result = (
+            result = await aexecute(
                 self.supabase.table("checklist_templates")
                 .select("*")
                 .eq("id", template_id)
-                .execute()
             )
 
             if not result.data:
@@ -564,11 +564,10 @@ class ChecklistService:
         """
         try:
             # Get existing template
-            existing = (
+            existing = await aexecute(
                 self.supabase.table("checklist_templates")
                 .select("*")
                 .eq("id", template_id)
-                .execute()
             )
 
             if not existing.data:
@@ -591,7 +590,7 @@ class ChecklistService:
             access_level = "public" if request.is_public else "private"
 
             # Update template
-            result = (
+            result = await aexecute(
                 self.supabase.table("checklist_templates")
                 .update(
                     {
@@ -604,7 +603,6 @@ class ChecklistService:
                     }
                 )
                 .eq("id", template_id)
-                .execute()
             )
 
             if not result.data:
@@ -631,11 +629,10 @@ class ChecklistService:
         """
         try:
             # Get existing template
-            existing = (
+            existing = await aexecute(
                 self.supabase.table("checklist_templates")
                 .select("*")
                 .eq("id", template_id)
-                .execute()
             )
 
             if not existing.data:
@@ -655,9 +652,11 @@ class ChecklistService:
                 )
 
             # Delete template
-            self.supabase.table("checklist_templates").delete().eq(
-                "id", template_id
-            ).execute()
+            await aexecute(
+                self.supabase.table("checklist_templates").delete().eq(
+                    "id", template_id
+                )
+            )
 
             logger.info(f"Deleted template {template_id}")
 
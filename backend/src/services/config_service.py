@@ -3,6 +3,7 @@ from __future__ import annotations
 import json
 from pathlib import Path
 import os
+import threading
 from typing import Any, Dict, Optional
 
 from pydantic import BaseModel, ValidationError
@@ -108,6 +109,17 @@ class ConfigService:
                     f"Missing required environment variables: {', '.join(missing)}"
                 )
 
+    def current_mtime(self) -> Optional[float]:
+        """Modification time of the SoT file now, or None when it is missing.
+
+        Cheap enough to call per request; long-lived consumers compare it with
+        the mtime they were built from to pick up edits without a restart.
+        """
+        try:
+            return self.config_path.stat().st_mtime
+        except OSError:
+            return None
+
     # ---------- Internals ----------
     def _load_config(self) -> Dict[str, Any]:
         if not self.config_path.exists():
@@ -192,3 +204,18 @@ class ConfigService:
                 raise ConfigServiceError(
                     f"Missing required section in effective config: '{k}'"
                 )
+
+
+
+_config_service: Optional[ConfigService] = None
+_config_service_lock = threading.Lock()
+
+
+def get_config_service() -> ConfigService:
+    """Process-wide ConfigService so the parsed SoT file is cached across requests"""
+    global _config_service
+    if _config_service is None:
+        with _config_service_lock:
+            if _config_service is None:
+                _config_service = ConfigService()
+    return _config_service
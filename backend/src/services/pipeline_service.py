@@ -15,6 +15,7 @@ from src.models.pipeline import (
     StepResult,
     UploadType,
 )
+from src.services.async_db import aexecute
 from src.utils.exceptions import DatabaseError
 
 logger = logging.getLogger(__name__)
@@ -64,7 +65,7 @@ class PipelineService:
             if data_dict.get("project_id"):
                 data_dict["project_id"] = str(data_dict["project_id"])
 
-            result = self.supabase.table("indexing_runs").insert(data_dict).execute()
+            result = await aexecute(self.supabase.table("indexing_runs").insert(data_dict))
 
             if not result.data:
                 raise DatabaseError("Failed to create indexing run")
@@ -94,19 +95,18 @@ class PipelineService:
             data_dict["document_id"] = str(data_dict["document_id"])
 
             # Check if the link already exists
-            existing_result = (
+            existing_result = await aexecute(
                 self.supabase.table("indexing_run_documents")
                 .select("id")
                 .eq("indexing_run_id", str(indexing_run_id))
                 .eq("document_id", str(document_id))
-                .execute()
             )
 
             if existing_result.data:
                 print(f"📋 Document {document_id} already linked")
                 return True
 
-            result = self.supabase.table("indexing_run_documents").insert(data_dict).execute()
+            result = await aexecute(self.supabase.table("indexing_run_documents").insert(data_dict))
 
             if not result.data:
                 raise DatabaseError("Failed to link document to indexing run")
@@ -128,7 +128,7 @@ class PipelineService:
             data_dict = project_data.model_dump()
             data_dict["user_id"] = str(data_dict["user_id"])
 
-            result = self.supabase.table("projects").insert(data_dict).execute()
+            result = await aexecute(self.supabase.table("projects").insert(data_dict))
 
             if not result.data:
                 raise DatabaseError("Failed to create project")
@@ -150,7 +150,7 @@ class PipelineService:
 
             data_dict = email_upload_data.model_dump()
 
-            result = self.supabase.table("email_uploads").insert(data_dict).execute()
+            result = await aexecute(self.supabase.table("email_uploads").insert(data_dict))
 
             if not result.data:
                 raise DatabaseError("Failed to create email upload")
@@ -195,7 +195,7 @@ class PipelineService:
 
             data_dict = update_data.model_dump(exclude_unset=True)
 
-            result = self.supabase.table("email_uploads").update(data_dict).eq("id", upload_id).execute()
+            result = await aexecute(self.supabase.table("email_uploads").update(data_dict).eq("id", upload_id))
 
             if not result.data:
                 raise DatabaseError("Failed to update email upload")
@@ -220,7 +220,7 @@ class PipelineService:
             # Convert UUIDs to strings for JSON serialization
             data_dict = update_data.model_dump(exclude_unset=True, mode="json")
 
-            result = self.supabase.table("indexing_runs").update(data_dict).eq("id", str(indexing_run_id)).execute()
+            result = await aexecute(self.supabase.table("indexing_runs").update(data_dict).eq("id", str(indexing_run_id)))
 
             if not result.data:
                 raise DatabaseError("Failed to update indexing run")
@@ -249,7 +249,20 @@ class PipelineService:
                 
                 # For ANY step with large data arrays, replace with statistics
                 for key, value in list(data.items()):
-                    if isinstance(value, list):
+                    if hasattr(value, "row_dict") and hasattr(value, "to_dicts"):
+                        # Columnar element store (partition text elements): materialize only the samples
+                        item_count = len(value)
+                        if item_count <= 5:
+                            data[key] = value.to_dicts()
+                        else:
+                            data[key] = {
+                                "count": item_count,
+                                "first_items": [value.row_dict(0), value.row_dict(1)],
+                                "last_item": value.row_dict(item_count - 1),
+                                "summary": f"{item_count} items (showing 2 first + 1 last)"
+                            }
+                            logger.info(f"Compressed {key}: {item_count} items -> sample + stats")
+                    elif isinstance(value, list):
                         if key == "chunks":
                             # For chunks, store detailed statistics but no content
                             chunk_count = len(value)
@@ -307,32 +320,25 @@ class PipelineService:
             }
 
     async def store_step_result(self, indexing_run_id: UUID, step_name: str, step_result: StepResult) -> bool:
-        """Store a step result in the indexing run's step_results JSONB field."""
+        """Store a step result in the indexing run's step_results JSONB field.
+
+        The entry is merged in the database, so concurrent writers (the shards of
+        a run) cannot overwrite each other's entries.
+        """
         try:
-            # First, get the current step_results
-            result = (
-                self.supabase.table("indexing_runs").select("step_results").eq("id", str(indexing_run_id)).execute()
+            result = await aexecute(
+                self.supabase.rpc(
+                    "merge_indexing_run_step_results",
+                    {
+                        "run_id": str(indexing_run_id),
+                        "entries": {step_name: self._serialize_step_result(step_result)},
+                    },
+                )
             )
 
             if not result.data:
                 raise DatabaseError("Indexing run not found")
 
-            current_step_results = result.data[0].get("step_results", {})
-
-            # Add the new step result with custom serialization
-            current_step_results[step_name] = self._serialize_step_result(step_result)
-
-            # Update the step_results field
-            update_result = (
-                self.supabase.table("indexing_runs")
-                .update({"step_results": current_step_results})
-                .eq("id", str(indexing_run_id))
-                .execute()
-            )
-
-            if not update_result.data:
-                raise DatabaseError("Failed to store step result")
-
             logger.info(f"Stored step result for {step_name} in indexing run {indexing_run_id}")
             return True
 
@@ -340,11 +346,25 @@ class PipelineService:
             logger.error(f"Error storing step result: {e}")
             raise DatabaseError(f"Failed to store step result: {str(e)}")
 
+    async def store_resource_timeseries(
+        self, indexing_run_id: UUID, points: list[dict[str, Any]], shard_index: int | None = None
+    ) -> None:
+        """Store a run's (or shard's) sampled resource usage time series in indexing_run_resource_usage."""
+        try:
+            await aexecute(
+                self.supabase.table("indexing_run_resource_usage").insert(
+                    {"indexing_run_id": str(indexing_run_id), "shard_index": shard_index, "points": points}
+                )
+            )
+        except Exception as e:
+            logger.error(f"Error storing resource usage time series: {e}")
+            raise DatabaseError(f"Failed to store resource usage time series: {str(e)}")
+
     async def get_step_result(self, indexing_run_id: UUID, step_name: str) -> StepResult | None:
         """Get a specific step result from an indexing run."""
         try:
             result = (
-                self.supabase.table("indexing_runs").select("step_results").eq("id", str(indexing_run_id)).execute()
+                await aexecute(self.supabase.table("indexing_runs").select("step_results").eq("id", str(indexing_run_id)))
             )
 
             if not result.data:
@@ -362,152 +382,113 @@ class PipelineService:
             logger.error(f"Error getting step result: {e}")
             raise DatabaseError(f"Failed to get step result: {str(e)}")
 
-    async def store_document_step_result(self, document_id: UUID, step_name: str, step_result: StepResult) -> bool:
-        """Store a step result in the document's step_results JSONB field with retry logic."""
+    async def store_document_step_result(
+        self,
+        document_id: UUID,
+        step_name: str,
+        step_result: StepResult,
+        indexing_run_id: UUID | None = None,
+        progress_writer: Any = None,
+    ) -> bool:
+        """Append a step result to document_step_results and update the document's indexing status.
+
+        Each step writes only its own row, so payloads stay small and concurrent
+        writers for the same document cannot overwrite each other's results.
+        With the run's ``progress_writer`` both writes are queued instead of awaited.
+        """
         import asyncio
-        
-        # Skip storing detailed results for data-heavy steps that aren't needed for debugging
-        skip_detailed_storage = {
-            "ChunkingStep": step_result.status == "completed",  # Skip if successful (data in document_chunks)
+
+        # ChunkingStep data lives in document_chunks; keep only the essentials when it succeeds
+        if step_name == "ChunkingStep" and step_result.status == "completed":
+            result_payload = self._minimal_step_result(step_result)
+        else:
+            result_payload = self._serialize_step_result(step_result)
+
+        row = {
+            "document_id": str(document_id),
+            "indexing_run_id": str(indexing_run_id) if indexing_run_id else None,
+            "step_name": step_name,
+            "status": step_result.status,
+            "duration_seconds": step_result.duration_seconds,
+            "summary_stats": result_payload.get("summary_stats") or {},
+            "error_message": step_result.error_message,
+            "started_at": result_payload.get("started_at"),
+            "completed_at": result_payload.get("completed_at"),
+            "result": result_payload,
         }
-        
-        # If step should be skipped and was successful, just update status without storing full result
-        if skip_detailed_storage.get(step_name, False):
-            return await self._store_minimal_step_success(document_id, step_name, step_result)
-        
+
+        # Determine indexing status based on step result
+        update_data: dict[str, Any] = {"indexing_status": "running"}
+        if step_result.status == "failed":
+            update_data["indexing_status"] = "failed"
+            update_data["error_message"] = step_result.error_message or f"{step_name} step failed"
+        elif step_name in ("ChunkingStep", "EmbeddingStep") and step_result.status == "completed":
+            # Chunking completes the document for batch embedding, embedding for single-document processing
+            update_data["indexing_status"] = "completed"
+
+        if progress_writer is not None:
+            # Written in the writer's next batch; terminal statuses are flushed right away
+            progress_writer.add_step_result(row)
+            progress_writer.update_document(document_id, update_data)
+            return True
+
         max_retries = 3
         base_delay = 1.0
-        
+
         for attempt in range(max_retries):
             try:
-                # First, get the current step_results
-                result = self.supabase.table("documents").select("step_results").eq("id", str(document_id)).execute()
-
-                if not result.data:
-                    raise DatabaseError("Document not found")
-
-                current_step_results = result.data[0].get("step_results", {})
-
-                # Add the new step result with custom serialization (size-optimized)
-                serialized_result = self._serialize_step_result(step_result)
-                current_step_results[step_name] = serialized_result
-
-                # Determine indexing status based on step result
-                indexing_status = "running"
-                error_message = None
-                
-                if step_result.status == "failed":
-                    indexing_status = "failed"
-                    error_message = getattr(step_result, 'error_message', f"{step_name} step failed")
-                elif step_name == "ChunkingStep" and step_result.status == "completed":
-                    # Document is completed after chunking (embedding happens in batch)
-                    indexing_status = "completed"
-                elif step_name == "EmbeddingStep" and step_result.status == "completed":
-                    # For single document processing, embedding completes the document
-                    indexing_status = "completed"
-
-                # Debug logging
-                logger.info(
-                    f"📊 Document {document_id} - Step: {step_name}, Status: {step_result.status}, Setting indexing_status: {indexing_status}"
-                )
-
-                # Prepare update data
-                update_data = {
-                    "step_results": current_step_results,
-                    "indexing_status": indexing_status,
-                }
-                
-                # Add error message if step failed
-                if error_message:
-                    update_data["error_message"] = error_message
-
-                # Update the step_results field and indexing_status
-                update_result = (
-                    self.supabase.table("documents")
-                    .update(update_data)
-                    .eq("id", str(document_id))
-                    .execute()
-                )
-
-                if not update_result.data:
+                insert_result = await aexecute(self.supabase.table("document_step_results").insert(row))
+                if not insert_result.data:
                     raise DatabaseError("Failed to store document step result")
-
-                logger.info(f"Stored step result for {step_name} in document {document_id}")
-                return True
-
+                break
             except Exception as e:
                 error_str = str(e).lower()
-                
-                # Check for retryable errors (size, timeouts, temporary failures)
-                is_retryable = any(keyword in error_str for keyword in [
-                    "json could not be generated",
-                    "520", "502", "503", "504",  # HTTP errors
-                    "timeout",
-                    "connection",
-                    "temporary",
-                    "payload too large"
-                ])
-                
+
+                # Check for retryable errors (timeouts, temporary failures)
+                is_retryable = any(
+                    keyword in error_str
+                    for keyword in ["520", "502", "503", "504", "timeout", "connection", "temporary"]
+                )
+
                 if attempt < max_retries - 1 and is_retryable:
-                    delay = base_delay * (2 ** attempt)  # Exponential backoff
+                    delay = base_delay * (2**attempt)  # Exponential backoff
                     logger.warning(
                         f"Retrying document step result storage (attempt {attempt + 1}/{max_retries}) after {delay}s delay. Error: {e}"
                     )
                     await asyncio.sleep(delay)
                     continue
-                else:
-                    # Final attempt failed or non-retryable error
-                    detailed_error = f"Failed to store {step_name} step result for document {document_id}: {str(e)}"
-                    logger.error(detailed_error)
-                    
-                    # Try to store minimal error information if the main storage failed
-                    try:
-                        await self._store_minimal_step_error(document_id, step_name, step_result.status, str(e))
-                    except:
-                        pass  # Don't fail if even minimal storage fails
-                    
-                    raise DatabaseError(detailed_error)
-
-    async def _store_minimal_step_success(self, document_id: UUID, step_name: str, step_result: StepResult) -> bool:
-        """Store minimal step success info without full result data (for data-heavy steps)."""
-        try:
-            # Get current step_results
-            result = self.supabase.table("documents").select("step_results").eq("id", str(document_id)).execute()
-            if not result.data:
-                raise DatabaseError("Document not found")
-
-            current_step_results = result.data[0].get("step_results", {})
-
-            # Store only essential info
-            current_step_results[step_name] = {
-                "step": step_result.step,
-                "status": step_result.status,
-                "duration_seconds": step_result.duration_seconds,
-                "started_at": step_result.started_at.isoformat() if step_result.started_at else None,
-                "completed_at": step_result.completed_at.isoformat() if step_result.completed_at else None,
-                "summary_stats": step_result.summary_stats,
-                "note": f"Full result data skipped to reduce storage size"
-            }
-
-            # Determine status
-            indexing_status = "completed" if step_name == "ChunkingStep" else "running"
-            
-            # Update database
-            update_result = self.supabase.table("documents").update({
-                "step_results": current_step_results,
-                "indexing_status": indexing_status,
-            }).eq("id", str(document_id)).execute()
-
-            if not update_result.data:
-                raise DatabaseError("Failed to store minimal step result")
-
-            logger.info(f"Stored minimal result for {step_name} in document {document_id} (size-optimized)")
-            return True
 
+                detailed_error = f"Failed to store {step_name} step result for document {document_id}: {str(e)}"
+                logger.error(detailed_error)
+                try:
+                    await self._store_minimal_step_error(document_id, step_name, step_result.status, str(e))
+                except Exception:
+                    pass  # Don't fail if even minimal storage fails
+                raise DatabaseError(detailed_error)
+
+        logger.info(
+            f"📊 Document {document_id} - Step: {step_name}, Status: {step_result.status}, Setting indexing_status: {update_data['indexing_status']}"
+        )
+        try:
+            await aexecute(self.supabase.table("documents").update(update_data).eq("id", str(document_id)))
         except Exception as e:
-            logger.error(f"Failed to store minimal step success: {e}")
-            # Fallback to full storage
-            return False
+            # The step result itself is stored; the status catches up with the next step
+            logger.warning(f"Failed to update indexing status for document {document_id}: {e}")
+
+        return True
+
+    def _minimal_step_result(self, step_result: StepResult) -> dict[str, Any]:
+        """Essential step info without result data (for data-heavy steps)."""
+        return {
+            "step": step_result.step,
+            "status": step_result.status,
+            "duration_seconds": step_result.duration_seconds,
+            "started_at": step_result.started_at.isoformat() if step_result.started_at else None,
+            "completed_at": step_result.completed_at.isoformat() if step_result.completed_at else None,
+            "summary_stats": step_result.summary_stats,
+            "resource_usage": step_result.resource_usage,
+            "note": "Full result data skipped to reduce storage size",
+        }
 
     async def _store_minimal_step_error(self, document_id: UUID, step_name: str, status: str, error: str) -> None:
         """Store minimal step error information when full step result storage fails."""
@@ -518,52 +499,57 @@ class PipelineService:
                 "indexing_status": "failed"
             }
             
-            self.supabase.table("documents").update(minimal_update).eq("id", str(document_id)).execute()
+            await aexecute(self.supabase.table("documents").update(minimal_update).eq("id", str(document_id)))
             logger.info(f"Stored minimal error info for document {document_id}")
             
         except Exception as e:
             logger.error(f"Failed to store even minimal error info: {e}")
 
-    async def get_document_step_result(self, document_id: UUID, step_name: str) -> StepResult | None:
-        """Get a specific step result from a document's step_results field."""
+    async def get_latest_document_step_results(
+        self, document_ids: list[str], include_result: bool = False
+    ) -> dict[str, dict[str, dict[str, Any]]]:
+        """Latest step result per document and step: {document_id: {step_name: record}}.
+
+        Without ``include_result`` only the small status/summary columns are read,
+        which is all progress and statistics endpoints need.
+        """
+        if not document_ids:
+            return {}
+        columns = "document_id, step_name, status, duration_seconds, summary_stats, error_message, started_at, completed_at"
+        if include_result:
+            columns += ", result"
         try:
-            result = self.supabase.table("documents").select("step_results").eq("id", str(document_id)).execute()
-
-            if not result.data:
-                return None
-
-            step_results = result.data[0].get("step_results", {})
-            step_data = step_results.get(step_name)
-
-            if not step_data:
-                return None
-
-            return StepResult(**step_data)
-
+            result = await aexecute(
+                self.supabase.table("document_step_results_latest")
+                .select(columns)
+                .in_("document_id", [str(document_id) for document_id in document_ids])
+            )
         except Exception as e:
-            logger.error(f"Error getting document step result: {e}")
-            raise DatabaseError(f"Failed to get document step result: {str(e)}")
-
-    async def get_document_step_results(self, document_id: UUID) -> dict[str, StepResult]:
-        """Get all step results for a document."""
-        try:
-            result = self.supabase.table("documents").select("step_results").eq("id", str(document_id)).execute()
-
-            if not result.data:
-                return {}
+            logger.error(f"Error getting document step results: {e}")
+            raise DatabaseError(f"Failed to get document step results: {str(e)}")
 
-            step_results = result.data[0].get("step_results", {})
+        latest: dict[str, dict[str, dict[str, Any]]] = {str(document_id): {} for document_id in document_ids}
+        for row in result.data or []:
+            latest.setdefault(row.pop("document_id"), {})[row.pop("step_name")] = row
+        return latest
 
-            return {step_name: StepResult(**step_data) for step_name, step_data in step_results.items()}
+    async def get_document_step_result(self, document_id: UUID, step_name: str) -> StepResult | None:
+        """Get the latest result of a specific step for a document."""
+        step_results = await self.get_document_step_results(document_id)
+        return step_results.get(step_name)
 
-        except Exception as e:
-            logger.error(f"Error getting document step results: {e}")
-            raise DatabaseError(f"Failed to get document step results: {str(e)}")
+    async def get_document_step_results(self, document_id: UUID) -> dict[str, StepResult]:
+        """Get the latest result of every step for a document."""
+        latest = await self.get_latest_document_step_results([str(document_id)], include_result=True)
+        return {
+            step_name: StepResult(**{"step": step_name, **record["result"]})
+            for step_name, record in latest.get(str(document_id), {}).items()
+        }
 
     async def get_indexing_run(self, indexing_run_id: UUID) -> IndexingRun | None:
         """Get a complete indexing run with all step results."""
         try:
-            result = self.supabase.table("indexing_runs").select("*").eq("id", str(indexing_run_id)).execute()
+            result = await aexecute(self.supabase.table("indexing_runs").select("*").eq("id", str(indexing_run_id)))
 
             if not result.data:
                 print(f"❌ No indexing run found for ID: {indexing_run_id}")
@@ -581,12 +567,11 @@ class PipelineService:
     async def get_document_indexing_runs(self, document_id: UUID) -> list[IndexingRun]:
         """Get all indexing runs for a document."""
         try:
-            result = (
+            result = await aexecute(
                 self.supabase.table("indexing_runs")
                 .select("*")
                 .eq("document_id", str(document_id))
                 .order("started_at", desc=True)
-                .execute()
             )
 
             return [IndexingRun(**run) for run in result.data]
@@ -598,14 +583,13 @@ class PipelineService:
     async def get_latest_successful_indexing_run(self, document_id: UUID) -> IndexingRun | None:
         """Get the latest successful indexing run for a document."""
         try:
-            result = (
+            result = await aexecute(
                 self.supabase.table("indexing_runs")
                 .select("*")
                 .eq("document_id", str(document_id))
                 .eq("status", "completed")
                 .order("started_at", desc=True)
                 .limit(1)
-                .execute()
             )
 
             if not result.data:
@@ -622,7 +606,7 @@ class PipelineService:
         logger.info("🔍 Getting all indexing runs from database...")
 
         try:
-            result = self.supabase.table("indexing_runs").select("*").order("started_at", desc=True).execute()
+            result = await aexecute(self.supabase.table("indexing_runs").select("*").order("started_at", desc=True))
 
             logger.info(f"📊 Raw database result: {result.data}")
             logger.info(f"📊 Number of runs found: {len(result.data) if result.data else 0}")
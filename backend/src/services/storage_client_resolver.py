@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from src.config.database import get_supabase_admin_client, get_supabase_client
-from supabase import Client
+from supabase import Client, create_client
 
 
 class StorageClientResolver:
@@ -11,9 +11,25 @@ class StorageClientResolver:
     trusted server-to-server operations where writes need elevated privileges.
     """
 
-    def __init__(self) -> None:
-        self._admin = get_supabase_admin_client()
-        self._anon = get_supabase_client()
+    def __init__(self, admin: Client | None = None, anon: Client | None = None) -> None:
+        self._admin = admin or get_supabase_admin_client()
+        self._anon = anon or get_supabase_client()
+
+    def credentials(self) -> dict[str, str]:
+        """URL and keys of the resolved clients (for rebuilding them in a worker process)"""
+        return {
+            "url": self._admin.supabase_url,
+            "service_role_key": self._admin.supabase_key,
+            "anon_key": self._anon.supabase_key,
+        }
+
+    @classmethod
+    def from_credentials(cls, credentials: dict[str, str]) -> StorageClientResolver:
+        """Resolver with clients built from ``credentials()`` of another resolver"""
+        return cls(
+            admin=create_client(credentials["url"], credentials["service_role_key"]),
+            anon=create_client(credentials["url"], credentials["anon_key"]),
+        )
 
     def get_client(
         self,
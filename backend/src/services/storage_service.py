@@ -6,6 +6,7 @@ from pathlib import Path
 from typing import Any
 from uuid import UUID
 
+from src.services.async_db import aexecute, arun
 from src.services.storage_client_resolver import StorageClientResolver
 from src.utils.exceptions import StorageError
 from src.utils.filename_utils import sanitize_filename
@@ -32,6 +33,17 @@ class StorageService:
         # Cache bucket existence to avoid repeated API calls
         self._bucket_exists: bool | None = None
 
+    def worker_settings(self) -> dict[str, Any]:
+        """Picklable bucket and credentials; ``from_worker_settings`` rebuilds this service in another process"""
+        return {"bucket_name": self.bucket_name, "credentials": self._resolver.credentials()}
+
+    @classmethod
+    def from_worker_settings(cls, settings: dict[str, Any]) -> "StorageService":
+        return cls(
+            bucket_name=settings["bucket_name"],
+            resolver=StorageClientResolver.from_credentials(settings["credentials"]),
+        )
+
     @classmethod
     def create_test_storage(cls):
         """Create a storage service instance for testing."""
@@ -46,14 +58,15 @@ class StorageService:
         try:
             # Use admin for bucket management
             admin = self._resolver.get_client(trusted=True, operation="ensure_bucket")
-            result = admin.storage.get_bucket(self.bucket_name)
+            result = await arun(admin.storage.get_bucket, self.bucket_name)
             logger.info(f"Storage bucket '{self.bucket_name}' exists")
             self._bucket_exists = True
             return True
         except Exception:
             try:
                 admin = self._resolver.get_client(trusted=True, operation="ensure_bucket")
-                result = admin.storage.create_bucket(
+                result = await arun(
+                    admin.storage.create_bucket,
                     self.bucket_name,
                     options={
                         "public": False,  # Private bucket
@@ -112,7 +125,8 @@ class StorageService:
 
             # Server-side uploads require admin client to bypass storage RLS
             client = self._resolver.get_client(trusted=True, operation="upload")
-            result = client.storage.from_(self.bucket_name).upload(
+            result = await arun(
+                client.storage.from_(self.bucket_name).upload,
                 path=storage_path,
                 file=file_content,
                 file_options={"content-type": content_type},
@@ -120,7 +134,8 @@ class StorageService:
 
             # Get signed URL (bucket is private) with admin privileges
             admin = self._resolver.get_client(trusted=True)
-            signed_url_response = admin.storage.from_(self.bucket_name).create_signed_url(
+            signed_url_response = await arun(
+                admin.storage.from_(self.bucket_name).create_signed_url,
                 storage_path,
                 expires_in=3600 * 24 * 7,  # 7 days
             )
@@ -454,12 +469,11 @@ class StorageService:
                 admin_db = get_supabase_admin_client()
 
                 # Get wiki run with pages metadata to extract actual storage path
-                wiki_result = (
+                wiki_result = await aexecute(
                     admin_db.table("wiki_generation_runs")
                     .select("pages_metadata")
                     .eq("id", str(wiki_run_id))
                     .limit(1)
-                    .execute()
                 )
 
                 if wiki_result.data and wiki_result.data[0].get("pages_metadata"):
@@ -496,7 +510,7 @@ class StorageService:
             # Get file content
             logger.info(f"Attempting to download wiki page from storage path: {storage_path}")
             admin = self._resolver.get_client(trusted=True)
-            result = admin.storage.from_(self.bucket_name).download(storage_path)
+            result = await arun(admin.storage.from_(self.bucket_name).download, storage_path)
 
             if result:
                 return result.decode("utf-8")
@@ -611,7 +625,7 @@ class StorageService:
             # Delete all files
             if file_paths:
                 admin = self._resolver.get_client(trusted=True, operation="delete")
-                result = admin.storage.from_(self.bucket_name).remove(file_paths)
+                result = await arun(admin.storage.from_(self.bucket_name).remove, file_paths)
                 logger.info(f"Deleted {len(file_paths)} files from wiki directory: {base_path}")
 
             return True
@@ -689,11 +703,54 @@ class StorageService:
         }
         return content_types.get(ext, "application/octet-stream")
 
+    async def upload_bytes(
+        self,
+        content: bytes,
+        storage_path: str,
+        content_type: str = "application/octet-stream",
+    ) -> str:
+        """Upload (or overwrite) raw bytes without creating a signed URL; returns the storage path."""
+        try:
+            await self.ensure_bucket_exists()
+            client = self._resolver.get_client(trusted=True, operation="upload")
+            await arun(
+                client.storage.from_(self.bucket_name).upload,
+                path=storage_path,
+                file=content,
+                file_options={"content-type": content_type, "upsert": "true"},
+            )
+            return storage_path
+        except Exception as e:
+            logger.error(f"Failed to upload {storage_path}: {e}")
+            raise StorageError(f"Failed to upload file: {str(e)}")
+
+    async def download_bytes(self, storage_path: str) -> bytes | None:
+        """Download a file's content, or None if it doesn't exist."""
+        try:
+            admin = self._resolver.get_client(trusted=True, operation="download")
+            return await arun(admin.storage.from_(self.bucket_name).download, storage_path)
+        except Exception as e:
+            logger.info(f"Could not download {storage_path}: {e}")
+            return None
+
+    async def delete_files(self, storage_paths: list[str]) -> bool:
+        """Delete several files from Supabase Storage in one request."""
+        if not storage_paths:
+            return True
+        try:
+            admin = self._resolver.get_client(trusted=True, operation="delete")
+            await arun(admin.storage.from_(self.bucket_name).remove, storage_paths)
+            logger.info(f"Deleted {len(storage_paths)} files from storage")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to delete {len(storage_paths)} files: {e}")
+            return False
+
     async def delete_file(self, storage_path: str) -> bool:
         """Delete a file from Supabase Storage."""
         try:
             admin = self._resolver.get_client(trusted=True, operation="delete")
-            result = admin.storage.from_(self.bucket_name).remove([storage_path])
+            result = await arun(admin.storage.from_(self.bucket_name).remove, [storage_path])
             logger.info(f"Deleted file from storage: {storage_path}")
             return True
         except Exception as e:
@@ -721,7 +778,7 @@ class StorageService:
 
             # Delete all files in the run directory
             if file_paths:
-                result = self.supabase.storage.from_(self.bucket_name).remove(file_paths)
+                result = await arun(self.supabase.storage.from_(self.bucket_name).remove, file_paths)
                 logger.info(f"Deleted {len(file_paths)} files from run directory: {run_path}")
 
             return True
@@ -734,7 +791,7 @@ class StorageService:
         """List files in a storage folder (admin context for private bucket)."""
         try:
             admin = self._resolver.get_client(trusted=True, operation="list")
-            result = admin.storage.from_(self.bucket_name).list(folder_path)
+            result = await arun(admin.storage.from_(self.bucket_name).list, folder_path)
             return result
         except Exception as e:
             logger.error(f"Failed to list files in {folder_path}: {e}")
@@ -0,0 +1,122 @@
+"""Local verification of Supabase access tokens.
+
+Supabase access tokens are JWTs signed either with the project's shared JWT
+secret (HS256, legacy) or with an asymmetric signing key published at
+``<SUPABASE_URL>/auth/v1/.well-known/jwks.json``. Verifying them here avoids a
+round-trip to Supabase Auth per request. The trade-off is that a revoked
+session stays valid until its token expires; endpoints that care use
+``AuthService.get_current_user(..., verify_remote=True)``.
+"""
+
+import threading
+import time
+from typing import Any
+
+import httpx
+from jose import JWTError, jwk, jwt
+
+from src.config.settings import get_settings
+from src.services.async_db import arun
+from src.utils.exceptions import AuthenticationError
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+ASYMMETRIC_ALGORITHMS = {"RS256", "ES256"}
+AUDIENCE = "authenticated"
+# Unknown key ids trigger a JWKS refetch (key rotation), at most this often
+MIN_JWKS_REFRESH_SECONDS = 30.0
+
+
+class SupabaseTokenVerifier:
+    """Verifies access tokens against the JWT secret or the project's JWKS"""
+
+    def __init__(
+        self,
+        supabase_url: str | None = None,
+        jwt_secret: str | None = None,
+        jwks_cache_seconds: float | None = None,
+        fetch_jwks=None,
+    ):
+        settings = get_settings()
+        supabase_url = (supabase_url or settings.supabase_url or "").rstrip("/")
+        self.issuer = f"{supabase_url}/auth/v1" if supabase_url else None
+        self.jwks_url = f"{self.issuer}/.well-known/jwks.json" if self.issuer else None
+        self.jwt_secret = jwt_secret if jwt_secret is not None else settings.supabase_jwt_secret
+        self.jwks_cache_seconds = (
+            jwks_cache_seconds if jwks_cache_seconds is not None else settings.auth_jwks_cache_seconds
+        )
+        self._fetch_jwks = fetch_jwks or self._download_jwks
+        self._keys: dict[str, Any] = {}
+        self._fetched_at: float | None = None
+        self._lock = threading.Lock()
+
+    async def verify(self, access_token: str) -> dict[str, Any] | None:
+        """Return the token's claims, or None when it can't be checked locally.
+
+        Raises AuthenticationError for tokens that are malformed, expired, signed
+        with the wrong key, or not issued to a signed-in user of this project.
+        """
+        try:
+            header = jwt.get_unverified_header(access_token)
+        except JWTError as e:
+            raise AuthenticationError("Malformed access token") from e
+
+        algorithm = header.get("alg")
+        if algorithm == "HS256":
+            if not self.jwt_secret:
+                return None
+            key = self.jwt_secret
+        elif algorithm in ASYMMETRIC_ALGORITHMS:
+            key = await self._signing_key(header.get("kid"))
+            if key is None:
+                return None
+        else:
+            raise AuthenticationError(f"Unsupported token algorithm: {algorithm}")
+
+        try:
+            claims = jwt.decode(
+                access_token,
+                key,
+                algorithms=[algorithm],
+                audience=AUDIENCE,
+                issuer=self.issuer,
+                options={"verify_at_hash": False},
+            )
+        except JWTError as e:
+            raise AuthenticationError(f"Invalid access token: {e}") from e
+
+        if not claims.get("sub") or claims.get("role") != AUDIENCE:
+            raise AuthenticationError("Access token is not for a signed-in user")
+        return claims
+
+    async def _signing_key(self, kid: str | None) -> Any | None:
+        now = time.monotonic()
+        expired = self._fetched_at is None or now - self._fetched_at > self.jwks_cache_seconds
+        unknown = kid not in self._keys
+        may_refetch = self._fetched_at is None or now - self._fetched_at > MIN_JWKS_REFRESH_SECONDS
+        if self.jwks_url and (expired or (unknown and may_refetch)):
+            await arun(self._refresh_jwks)
+        return self._keys.get(kid)
+
+    def _refresh_jwks(self) -> None:
+        with self._lock:
+            try:
+                document = self._fetch_jwks(self.jwks_url)
+                keys = {}
+                for key in document.get("keys", []):
+                    if key.get("alg") in ASYMMETRIC_ALGORITHMS and key.get("kid"):
+                        keys[key["kid"]] = jwk.construct(key, key["alg"])
+                self._keys = keys
+                logger.info("Loaded Supabase signing keys", key_ids=sorted(keys))
+            except Exception as e:
+                # Keep the previous keys; tokens we can't check fall back to Supabase Auth
+                logger.warning(f"Failed to load Supabase JWKS: {e}")
+            finally:
+                self._fetched_at = time.monotonic()
+
+    @staticmethod
+    def _download_jwks(url: str) -> dict[str, Any]:
+        response = httpx.get(url, timeout=5.0)
+        response.raise_for_status()
+        return response.json()
@@ -2,8 +2,31 @@
 
 import psutil
 import asyncio
+import threading
+import time
+from collections import deque
 from datetime import datetime
-from typing import Dict, Any
+from pathlib import Path
+from typing import Deque, Dict, Any, List, Optional, Tuple
+
+# cgroup v2 and v1 memory limits (Beam containers report host memory in /proc/meminfo)
+_CGROUP_MEMORY_LIMITS = (
+    Path("/sys/fs/cgroup/memory.max"),
+    Path("/sys/fs/cgroup/memory/memory.limit_in_bytes"),
+)
+
+
+def memory_limit_bytes() -> int:
+    """Memory available to this container: cgroup limit if set, otherwise physical memory"""
+    total = psutil.virtual_memory().total
+    for path in _CGROUP_MEMORY_LIMITS:
+        try:
+            value = path.read_text().strip()
+        except OSError:
+            continue
+        if value.isdigit() and 0 < int(value) < total:
+            return int(value)
+    return total
 
 
 class ResourceMonitor:
@@ -21,9 +44,27 @@ class ResourceMonitor:
         self.peak_cpu = 0
         self.peak_ram = 0
         
+    def sample(self, process: Optional[psutil.Process] = None) -> Dict[str, Any]:
+        """Non-blocking snapshot: system CPU since the previous call and RSS of this process tree."""
+        process = process or psutil.Process()
+        rss = process.memory_info().rss
+        for child in process.children(recursive=True):
+            try:
+                rss += child.memory_info().rss
+            except psutil.Error:
+                continue
+
+        cpu_percent = psutil.cpu_percent(interval=None)
+        self.peak_cpu = max(self.peak_cpu, cpu_percent)
+        return {
+            "cpu_percent": cpu_percent,
+            "rss_bytes": rss,
+            "memory_available_bytes": psutil.virtual_memory().available,
+        }
+
     def get_current_usage(self) -> Dict[str, Any]:
-        """Get current resource usage snapshot."""
-        cpu_percent = psutil.cpu_percent(interval=1)
+        """Get current resource usage snapshot (CPU is measured since the previous call, without blocking)."""
+        cpu_percent = psutil.cpu_percent(interval=None)
         memory = psutil.virtual_memory()
         
         # Track peaks
@@ -35,7 +76,7 @@ class ResourceMonitor:
             "cpu": {
                 "percent": cpu_percent,
                 "cores": psutil.cpu_count(),
-                "per_core": psutil.cpu_percent(interval=1, percpu=True),
+                "per_core": psutil.cpu_percent(interval=None, percpu=True),
             },
             "memory": {
                 "percent": memory.percent,
@@ -90,8 +131,131 @@ class ResourceMonitor:
         }
 
 
+# (monotonic time, CPU %, RSS bytes, open FDs, threads) of the process tree
+Sample = Tuple[float, float, int, int, int]
+_SAMPLE_FIELDS = ("cpu_percent", "rss_mb", "open_fds", "threads")
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+class ResourceSampler:
+    """Background thread sampling this process tree into a fixed-size ring buffer.
+
+    CPU is the summed ``cpu_percent`` of this process and its children (pool
+    workers), so it can exceed 100 on multi-core machines. ``window()`` gives
+    mean/p95/peak over a time range, e.g. one step's execution.
+    """
+
+    def __init__(self, interval_seconds: float = 0.5, capacity: int = 7200):
+        self.interval_seconds = interval_seconds
+        self._samples: Deque[Sample] = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._process = psutil.Process()
+        self._children: Dict[int, psutil.Process] = {}
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> "ResourceSampler":
+        if not self.running:
+            self._stop.clear()
+            self._process.cpu_percent(None)  # prime: the first reading is always 0
+            self._thread = threading.Thread(target=self._run, name="resource-sampler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval_seconds * 4)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                sample = self.take_sample()
+            except psutil.Error:
+                continue
+            with self._lock:
+                self._samples.append(sample)
+
+    def take_sample(self) -> Sample:
+        process = self._process
+        with process.oneshot():
+            cpu = process.cpu_percent(None)
+            rss = process.memory_info().rss
+            fds = process.num_fds() if hasattr(process, "num_fds") else 0
+            threads = process.num_threads()
+
+        # Keep Process objects of children between ticks: cpu_percent(None) is relative to the previous call
+        children = {}
+        for child in process.children(recursive=True):
+            child = self._children.get(child.pid, child)
+            try:
+                cpu += child.cpu_percent(None)
+                rss += child.memory_info().rss
+            except psutil.Error:
+                continue
+            children[child.pid] = child
+        self._children = children
+        return (time.monotonic(), cpu, rss, fds, threads)
+
+    def _snapshot(self) -> List[Sample]:
+        with self._lock:
+            return list(self._samples)
+
+    def window(self, start: float, end: Optional[float] = None) -> Dict[str, Any]:
+        """Mean/p95/peak of samples between two ``time.monotonic()`` values"""
+        end = time.monotonic() if end is None else end
+        samples = self._snapshot()
+        selected = [sample for sample in samples if start <= sample[0] <= end]
+        if not selected:
+            # Step shorter than the interval: use the last sample taken before it ended
+            earlier = [sample for sample in samples if sample[0] <= end]
+            selected = earlier[-1:]
+        if not selected:
+            return {"samples": 0, "seconds": round(end - start, 3)}
+
+        window: Dict[str, Any] = {"samples": len(selected), "seconds": round(end - start, 3)}
+        for index, field in enumerate(_SAMPLE_FIELDS, start=1):
+            values = sorted(sample[index] for sample in selected)
+            if field == "rss_mb":
+                values = [value / (1024**2) for value in values]
+            window[field] = {
+                "mean": round(sum(values) / len(values), 1),
+                "p95": round(_percentile(values, 0.95), 1),
+                "peak": round(values[-1], 1),
+            }
+        return window
+
+    def export(self, since: Optional[float] = None, max_points: int = 500) -> List[Dict[str, Any]]:
+        """Time series (oldest first), downsampled to at most ``max_points`` rows; ``t`` is seconds since ``since``"""
+        samples = [sample for sample in self._snapshot() if since is None or sample[0] >= since]
+        if not samples:
+            return []
+        origin = samples[0][0] if since is None else since
+        stride = max(1, -(-len(samples) // max_points))
+        return [
+            {
+                "t": round(timestamp - origin, 2),
+                "cpu_percent": round(cpu, 1),
+                "rss_mb": round(rss / (1024**2), 1),
+                "open_fds": fds,
+                "threads": threads,
+            }
+            for timestamp, cpu, rss, fds, threads in samples[::stride]
+        ]
+
+
 # Singleton instance for easy access
 _monitor = None
+_sampler: Optional[ResourceSampler] = None
+_sampler_lock = threading.Lock()
 
 def get_monitor() -> ResourceMonitor:
     """Get or create the resource monitor instance."""
@@ -101,6 +265,21 @@ def get_monitor() -> ResourceMonitor:
     return _monitor
 
 
+def start_sampler(interval_seconds: float = 0.5, capacity: int = 7200) -> ResourceSampler:
+    """Start the process-wide background sampler (no-op if it is already running)."""
+    global _sampler
+    with _sampler_lock:
+        if _sampler is None or not _sampler.running:
+            _sampler = ResourceSampler(interval_seconds, capacity).start()
+        return _sampler
+
+
+def get_sampler() -> Optional[ResourceSampler]:
+    """The running background sampler, or None if sampling is not enabled in this process."""
+    sampler = _sampler
+    return sampler if sampler is not None and sampler.running else None
+
+
 def log_resources(context: str = ""):
     """Quick function to log resources."""
     monitor = get_monitor()
@@ -0,0 +1,107 @@
+"""End-to-end throughput of IntelligentChunker.create_final_chunks.
+
+Runs the chunker over synthetic partition output (a mix of short elements and
+long narrative blocks that need semantic splitting) with the native splitter,
+then with LangChain's RecursiveCharacterTextSplitter built per call as before.
+
+Run from backend/:
+    python -m tests.benchmarks.bench_chunker [--elements 5000] [--repeat 3]
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from src.pipeline.indexing.steps.chunking import IntelligentChunker
+
+SENTENCES = [
+    "Entreprenøren skal levere og montere præfabrikerede betonelementer i henhold til DS/EN 13369.",
+    "Elementerne armeres med B550 og udføres i eksponeringsklasse XC3.",
+    "Samlinger udstøbes med fugebeton, jf. afsnit 4.2 i arbejdsbeskrivelsen.",
+    "Facaden udføres i blødstrøgne tegl med ventileret hulrum og 190 mm isolering.",
+]
+
+
+def build_elements(count: int) -> list:
+    elements = []
+    for i in range(count):
+        # Every fifth element is a long block that exceeds max_chunk_size
+        sentences = 60 if i % 5 == 0 else 3
+        text = "\n".join(SENTENCES[(i + j) % len(SENTENCES)] for j in range(sentences))
+        if i % 5 == 0:
+            text = text.replace(".\n", ".\n\n", 10)
+        page = i // 20 + 1
+        elements.append(
+            {
+                "id": f"text_{i}",
+                "category": "NarrativeText",
+                "page": page,
+                "text": text,
+                "metadata": {"page_number": page, "font_size": 10.0},
+                "structural_metadata": {
+                    "source_filename": "beskrivelse.pdf",
+                    "page_number": page,
+                    "element_category": "NarrativeText",
+                    "section_title_inherited": f"Afsnit {i // 50}",
+                    "text_complexity": "medium",
+                },
+            }
+        )
+    return elements
+
+
+class PerCallLangChainSplitter:
+    """Previous behaviour: a new LangChain splitter for every call"""
+
+    def __init__(self, chunker: IntelligentChunker):
+        self.chunker = chunker
+
+    def split_text(self, text: str) -> list:
+        return RecursiveCharacterTextSplitter(
+            chunk_size=self.chunker.chunk_size,
+            chunk_overlap=self.chunker.overlap,
+            separators=self.chunker.separators,
+            length_function=len,
+            is_separator_regex=False,
+        ).split_text(text)
+
+
+def run(chunker: IntelligentChunker, elements: list, repeat: int) -> tuple[float, list]:
+    best = float("inf")
+    chunks = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        chunks, _stats = chunker.create_final_chunks(elements)
+        best = min(best, time.perf_counter() - start)
+    return best, chunks
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--elements", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    config_path = Path(__file__).resolve().parents[2] / "src" / "config" / "pipeline" / "pipeline_config.json"
+    config = json.loads(config_path.read_text())["indexing"]["chunking"]
+    elements = build_elements(args.elements)
+    chars = sum(len(element["text"]) for element in elements)
+
+    chunker = IntelligentChunker(config)
+    native_seconds, native_chunks = run(chunker, elements, args.repeat)
+
+    chunker.text_splitter = PerCallLangChainSplitter(chunker)
+    langchain_seconds, langchain_chunks = run(chunker, elements, args.repeat)
+
+    assert [c["content"] for c in native_chunks] == [c["content"] for c in langchain_chunks]
+    print(f"elements={args.elements} chars={chars:,} chunks={len(native_chunks)}")
+    print(f"langchain: {langchain_seconds:.3f}s ({chars / langchain_seconds / 1e6:.1f} M chars/s)")
+    print(f"native:    {native_seconds:.3f}s ({chars / native_seconds / 1e6:.1f} M chars/s)")
+    print(f"speedup:   {langchain_seconds / native_seconds:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Peak-RSS benchmark for the columnar partition element store.
+
+Generates a large text-heavy PDF and runs partition stage 2, text filtering and
+metadata analysis in a fresh process per mode (peak RSS is measured on top of
+stage 1, which is the same for both):
+
+- ``dicts``: legacy representation (one dict + metadata dict + bbox list per element)
+- ``store``: TextElementStore (NumPy columns, interned strings)
+
+Run from backend/:
+    python -m tests.benchmarks.bench_element_store [--pages 400] [--blocks 60]
+"""
+
+import argparse
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+from unittest.mock import Mock
+
+
+def build_pdf(path: str, pages: int, blocks: int) -> None:
+    import fitz
+
+    doc = fitz.open()
+    for page_number in range(1, pages + 1):
+        page = doc.new_page(width=595, height=842)
+        page.insert_text((40, 40), f"{page_number}. Bygningsdel {page_number}", fontsize=14)
+        row_height = 780 / blocks
+        for block in range(blocks):
+            y = 50 + block * row_height
+            text = f"Pos {block}: murværk udføres i tegl, {block * 3} m2"
+            page.insert_text((40, y + row_height * 0.8), text, fontsize=6)
+    doc.save(path)
+    doc.close()
+
+
+def _max_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_mode(mode: str, pdf_path: str, queue) -> None:
+    from src.pipeline.indexing.steps.metadata import MetadataStep
+    from src.pipeline.indexing.steps.partition import PartitionStep, UnifiedPartitionerV2
+
+    with tempfile.TemporaryDirectory() as tmp:
+        partitioner = UnifiedPartitionerV2(os.path.join(tmp, "tables"), os.path.join(tmp, "images"))
+        partition_step = PartitionStep({"ocr_strategy": "pymupdf_only"}, storage_service=Mock())
+        metadata_step = MetadataStep({}, storage_service=Mock())
+
+        # Stage 1 (table/image detection) is identical in both modes; measure from here on
+        partitioner.stage1_pymupdf_analysis(pdf_path)
+        baseline = _max_rss_mb()
+        start = time.perf_counter()
+
+        text_elements, _ = partitioner.stage2_fast_text_extraction(pdf_path)
+        if mode == "dicts":
+            text_elements = text_elements.to_dicts()
+        text_elements = partition_step._filter_text_elements(text_elements)
+
+        data = {"text_elements": text_elements, "table_elements": [], "extracted_pages": {}, "metadata": {}}
+        enriched = metadata_step._analyze_metadata_sync(data)
+        for element, enriched_element in zip(text_elements, enriched, strict=True):
+            element["structural_metadata"] = enriched_element["structural_metadata"]
+
+        queue.put(
+            {
+                "mode": mode,
+                "elements": len(text_elements),
+                "seconds": time.perf_counter() - start,
+                "peak_rss_mb": _max_rss_mb() - baseline,
+            }
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=400)
+    parser.add_argument("--blocks", type=int, default=60)
+    args = parser.parse_args()
+
+    import logging
+
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = os.path.join(tmp, "large.pdf")
+        build_pdf(pdf_path, args.pages, args.blocks)
+
+        ctx = multiprocessing.get_context("spawn")
+        results = {}
+        for mode in ("dicts", "store"):
+            queue = ctx.Queue()
+            process = ctx.Process(target=run_mode, args=(mode, pdf_path, queue))
+            process.start()
+            results[mode] = queue.get()
+            process.join()
+
+    for mode in ("dicts", "store"):
+        r = results[mode]
+        print(f"{mode:6} elements={r['elements']} time={r['seconds']:.2f}s peak_rss_delta={r['peak_rss_mb']:.1f} MB")
+    before, after = results["dicts"]["peak_rss_mb"], results["store"]["peak_rss_mb"]
+    reduction = (1 - after / before) * 100 if before > 0 else 0.0
+    print(f"peak-RSS reduction: {before - after:.1f} MB ({reduction:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
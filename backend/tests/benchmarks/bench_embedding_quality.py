@@ -0,0 +1,60 @@
+"""Benchmark embedding quality validation on a large document.
+
+Compares the previous implementation (float64 matrix, two norm passes and a
+set of 1024-float tuples for duplicates) with compute_quality_metrics.
+
+Run from backend/:
+    python -m tests.benchmarks.bench_embedding_quality [--chunks 10000] [--dim 1024]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from src.pipeline.indexing.embedding_quality import compute_quality_metrics
+
+
+def legacy_metrics(embeddings: list) -> dict:
+    embedding_array = np.array(embeddings)
+    norms = np.linalg.norm(embedding_array, axis=1)
+    metrics = {
+        "zero_vectors": int(np.sum(np.all(embedding_array == 0, axis=1))),
+        "mean": float(np.mean(embedding_array)),
+        "std": float(np.std(embedding_array)),
+        "norm_mean": float(np.mean(norms)),
+        "norm_std": float(np.std(np.linalg.norm(embedding_array, axis=1))),
+        "duplicate_embeddings": len(embeddings) - len(set(tuple(emb) for emb in embeddings)),
+    }
+    normalized = embedding_array / np.linalg.norm(embedding_array, axis=1, keepdims=True)
+    metrics["first_two_similarity"] = float(np.dot(normalized[0], normalized[1]))
+    return metrics
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, default=10000)
+    parser.add_argument("--dim", type=int, default=1024)
+    args = parser.parse_args()
+
+    vectors = np.random.default_rng(0).normal(size=(args.chunks, args.dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    embeddings = vectors.tolist()  # Voyage responses arrive as lists of floats
+
+    start = time.perf_counter()
+    legacy = legacy_metrics(embeddings)
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    metrics = compute_quality_metrics(embeddings)
+    new_seconds = time.perf_counter() - start
+
+    assert legacy["duplicate_embeddings"] == metrics["duplicate_embeddings"]
+    print(f"chunks={args.chunks} dim={args.dim}")
+    print(f"legacy:     {legacy_seconds:.3f}s")
+    print(f"vectorized: {new_seconds:.3f}s (sample={metrics['sample_size']}, outliers={metrics['outlier_vectors']})")
+    print(f"speedup:    {legacy_seconds / new_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
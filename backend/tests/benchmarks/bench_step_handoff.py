@@ -0,0 +1,106 @@
+"""Benchmark the hand-off between indexing steps for a large document.
+
+Compares the pydantic round-trip (validate + model_dump per step) with the
+zero-copy StepData wrappers the orchestrator uses.
+
+Run from backend/:
+    python -m tests.benchmarks.bench_step_handoff [--elements 2000] [--repeat 20]
+"""
+
+import argparse
+import time
+
+from src.pipeline.indexing.models import (
+    as_chunking_data,
+    as_enrichment_data,
+    as_metadata_data,
+    as_partition_data,
+    to_chunking_output,
+    to_enrichment_output,
+    to_metadata_output,
+    to_partition_output,
+)
+
+
+def build_document(elements: int) -> dict:
+    pages = max(1, elements // 20)
+    text_elements = [
+        {
+            "id": f"text_{i}",
+            "category": "NarrativeText",
+            "page": i % pages + 1,
+            "text": "Facaden udføres i tegl med isolering og ventileret hulrum. " * 4,
+            "metadata": {
+                "page_number": i % pages + 1,
+                "font_size": 10.0,
+                "font_name": "Helvetica",
+                "bbox": [40.0, 40.0 + i % 40 * 18, 555.0, 56.0 + i % 40 * 18],
+                "section_title_inherited": f"Afsnit {i // 100}",
+            },
+        }
+        for i in range(elements)
+    ]
+    return {
+        "text_elements": text_elements,
+        "table_elements": [],
+        "extracted_pages": {},
+        "page_analysis": {p: {"needs_extraction": False, "vlm_plan": "text_only"} for p in range(1, pages + 1)},
+        "document_metadata": {"total_pages": pages},
+        "metadata": {"processing_strategy": "pymupdf_only"},
+        "page_sections": {p: f"Afsnit {p}" for p in range(1, pages + 1)},
+    }
+
+
+def chunks_for(document: dict) -> dict:
+    return {
+        "chunks": [
+            {"chunk_id": el["id"], "content": el["text"], "metadata": el["metadata"]}
+            for el in document["text_elements"]
+        ],
+        "chunking_metadata": {},
+    }
+
+
+def pydantic_round_trip(document: dict, chunks: dict) -> None:
+    data = to_partition_output(document).model_dump(exclude_none=True)
+    data = to_metadata_output(data).model_dump(exclude_none=True)
+    to_enrichment_output(data).model_dump(exclude_none=True)
+    to_chunking_output(chunks).model_dump(exclude_none=True)
+
+
+def zero_copy(document: dict, chunks: dict) -> None:
+    data = as_partition_data(document)
+    data = as_metadata_data(data)
+    as_enrichment_data(data)
+    as_chunking_data(chunks)
+
+
+def measure(fn, document: dict, chunks: dict, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(document, chunks)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--elements", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    document = build_document(args.elements)
+    chunks = chunks_for(document)
+
+    before = measure(pydantic_round_trip, document, chunks, args.repeat)
+    after = measure(zero_copy, document, chunks, args.repeat)
+
+    print(f"elements:            {args.elements}")
+    print(f"pydantic round-trip: {before * 1000:.2f} ms")
+    print(f"zero-copy hand-off:  {after * 1000:.3f} ms")
+    print(f"speedup:             {before / after:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
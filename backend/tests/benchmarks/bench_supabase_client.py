@@ -0,0 +1,80 @@
+"""Per-query cost of building a Supabase admin client vs the pooled one.
+
+Serves a minimal PostgREST stand-in on localhost and runs the same query
+either with a fresh ``create_client`` per call (what every service constructor
+used to do) or with the process-wide pooled client. Plain HTTP on localhost,
+so this measures client construction and TCP setup only; against Supabase the
+saved TLS handshakes add more.
+
+Run from backend/:
+    python -m tests.benchmarks.bench_supabase_client [--queries 200]
+"""
+
+import argparse
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import src.config.database as database
+from supabase import create_client
+
+KEY = "bench.service.key"
+
+
+class PostgrestStub(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        body = b"[]"
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def timed(queries: int, query) -> float:
+    started = time.perf_counter()
+    for _ in range(queries):
+        query()
+    return (time.perf_counter() - started) / queries * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PostgrestStub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}"
+    os.environ.update(SUPABASE_URL=url, SUPABASE_ANON_KEY=KEY, SUPABASE_SERVICE_ROLE_KEY=KEY)
+    database.reset_supabase_clients()
+
+    def fresh_client_query():
+        create_client(url, KEY).table("documents").select("id").limit(1).execute()
+
+    def pooled_query():
+        database.get_supabase_admin_client().table("documents").select("id").limit(1).execute()
+
+    def scoped_query():
+        database.get_supabase_client_for_token("user.jwt.token").table("documents").select("id").execute()
+
+    fresh_ms = timed(args.queries, fresh_client_query)
+    pooled_ms = timed(args.queries, pooled_query)
+    scoped_ms = timed(args.queries, scoped_query)
+    server.shutdown()
+
+    print(f"{args.queries} queries against a local PostgREST stub")
+    print(f"new client per query: {fresh_ms:.2f} ms/query")
+    print(f"pooled admin client:  {pooled_ms:.2f} ms/query")
+    print(f"request-scoped (RLS): {scoped_ms:.2f} ms/query")
+
+
+if __name__ == "__main__":
+    main()
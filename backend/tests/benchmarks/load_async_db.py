@@ -0,0 +1,98 @@
+"""Load test: do concurrent API requests serialize behind one slow query?
+
+Serves a small FastAPI app in-process (httpx ASGI transport) whose endpoints
+run a fake PostgREST query with a fixed latency — one slow query, many fast
+ones — once calling ``.execute()`` directly inside ``async def`` (as the
+services did) and once through ``aexecute``. With direct calls every request
+waits for the slow query and all fast queries before it; with the offload
+executor they overlap.
+
+Run from backend/:
+    python -m tests.benchmarks.load_async_db [--requests 100] [--slow 1.0] [--fast 0.02]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from src.services.async_db import aexecute, get_query_executor
+
+
+class FakeQuery:
+    """Stands in for a supabase-py request builder: ``execute()`` blocks for the round-trip"""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+
+    def execute(self):
+        time.sleep(self.seconds)
+        return {"data": []}
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/blocking")
+    async def blocking(seconds: float):
+        FakeQuery(seconds).execute()
+        return {"ok": True}
+
+    @app.get("/offloaded")
+    async def offloaded(seconds: float):
+        await aexecute(FakeQuery(seconds))
+        return {"ok": True}
+
+    return app
+
+
+async def run(path: str, requests: int, slow: float, fast: float) -> dict:
+    transport = httpx.ASGITransport(app=build_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+
+        # All requests are issued at once; latency is measured from that moment
+        started = time.perf_counter()
+
+        async def call(seconds: float) -> float:
+            response = await client.get(path, params={"seconds": seconds})
+            response.raise_for_status()
+            return time.perf_counter() - started
+
+        slow_task = asyncio.create_task(call(slow))
+        await asyncio.sleep(0)  # the slow query is in flight first
+        fast_latencies = await asyncio.gather(*(call(fast) for _ in range(requests)))
+        await slow_task
+        elapsed = time.perf_counter() - started
+
+    fast_latencies = sorted(fast_latencies)
+    return {
+        "wall_seconds": elapsed,
+        "fast_p50_ms": statistics.median(fast_latencies) * 1000,
+        "fast_p95_ms": fast_latencies[int(0.95 * (len(fast_latencies) - 1))] * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--slow", type=float, default=1.0)
+    parser.add_argument("--fast", type=float, default=0.02)
+    args = parser.parse_args()
+
+    executor = get_query_executor()
+    print(f"{args.requests} fast requests ({args.fast * 1000:.0f} ms) behind one slow query ({args.slow:.1f} s)")
+    print(f"offload pool: {executor.max_workers} threads")
+    for path in ("/blocking", "/offloaded"):
+        result = asyncio.run(run(path, args.requests, args.slow, args.fast))
+        print(
+            f"{path:11s} wall {result['wall_seconds']:.2f}s  "
+            f"fast p50 {result['fast_p50_ms']:.0f} ms  p95 {result['fast_p95_ms']:.0f} ms"
+        )
+    print(f"max concurrent queries: {executor.stats['max_in_flight']}")
+
+
+if __name__ == "__main__":
+    main()
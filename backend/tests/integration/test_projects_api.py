@@ -19,10 +19,10 @@ async def test_projects_crud_owner_only(monkeypatch):
     os.environ.setdefault("SUPABASE_ANON_KEY", "test-anon-key")
     os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "test-service-key")
 
-    from src.api.auth import get_current_user
     from src.api.projects import router as projects_router
     from src.config.database import get_db_client_for_request
     from src.main import app
+    from src.services.auth_service import get_current_user, get_current_user_verified
 
     # Mount only for test scope (already included in app, but kept explicit)
     app.include_router(projects_router)
@@ -153,6 +153,7 @@ async def test_projects_crud_owner_only(monkeypatch):
 
     async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
         app.dependency_overrides[get_current_user] = lambda: user_a
+        app.dependency_overrides[get_current_user_verified] = lambda: user_a
 
         # Create project
         r = await client.post("/api/projects", json={"name": "My Project", "description": "desc"})
@@ -177,6 +178,7 @@ async def test_projects_crud_owner_only(monkeypatch):
 
         # Switch to user B: access should be denied (404 by contract)
         app.dependency_overrides[get_current_user] = lambda: user_b
+        app.dependency_overrides[get_current_user_verified] = lambda: user_b
         r = await client.get(f"/api/projects/{pid}")
         assert r.status_code in (403, 404)
 
@@ -188,6 +190,7 @@ async def test_projects_crud_owner_only(monkeypatch):
 
         # Back to owner: delete succeeds
         app.dependency_overrides[get_current_user] = lambda: user_a
+        app.dependency_overrides[get_current_user_verified] = lambda: user_a
         r = await client.delete(f"/api/projects/{pid}")
         assert r.status_code == 200
 
@@ -0,0 +1,88 @@
+from types import SimpleNamespace
+
+import pytest
+from httpx import QueryParams
+
+
+class FakeQuery:
+    """One PostgREST request built on FakeSupabase; recorded in ``db.calls`` when executed."""
+
+    def __init__(self, db, table, method, payload=None):
+        self.db = db
+        self.table = table
+        self.method = method
+        self.payload = payload
+        self.params = QueryParams()
+        self.columns = None
+        self.filters = []
+
+    def eq(self, column, value):
+        self.filters.append(("eq", column, value))
+        return self
+
+    def in_(self, column, values):
+        self.filters.append(("in", column, values))
+        return self
+
+    def is_(self, column, value):
+        self.filters.append(("is", column, value))
+        return self
+
+    @property
+    def not_(self):
+        return self
+
+    def limit(self, count):
+        return self
+
+    def execute(self):
+        if self.db.fail_next:
+            self.db.fail_next -= 1
+            raise RuntimeError("503 Service Unavailable")
+        self.db.calls.append(self)
+        return SimpleNamespace(data=self.db.respond(self))
+
+
+class FakeTable:
+    def __init__(self, db, name):
+        self.db = db
+        self.name = name
+
+    def insert(self, rows):
+        return FakeQuery(self.db, self.name, "insert", rows)
+
+    def update(self, payload):
+        return FakeQuery(self.db, self.name, "update", payload)
+
+    def select(self, columns, count=None):
+        query = FakeQuery(self.db, self.name, "select", columns)
+        query.columns = columns
+        return query
+
+
+class FakeSupabase:
+    """In-memory stand-in for the sync supabase-py client.
+
+    ``respond(query)`` returns the rows of each executed query (``[{"id": 1}]`` by
+    default); the first ``fail_next`` executions raise like an unavailable PostgREST.
+    """
+
+    def __init__(self, respond=None, fail_next=0):
+        self.calls = []
+        self.fail_next = fail_next
+        self.respond = respond or (lambda query: [{"id": 1}])
+
+    def table(self, name):
+        return FakeTable(self, name)
+
+    def rpc(self, name, params):
+        return FakeQuery(self, name, "rpc", params)
+
+    def writes(self):
+        return [(call.table, call.method) for call in self.calls if call.method != "select"]
+
+
+@pytest.fixture
+def fake_supabase():
+    """FakeSupabase factory: ``fake_supabase(respond=..., fail_next=...)``."""
+    return FakeSupabase
@@ -0,0 +1,124 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import src.config.database as database
+from src.pipeline.querying.models import QueryResponse
+from src.pipeline.shared import RetrievalCore, SharedRetrievalConfig
+from src.services.query_service import QueryService
+
+
+class FakeClient:
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.tables = []
+        self.rpcs = []
+
+    def table(self, name):
+        self.tables.append(name)
+        return self
+
+    def rpc(self, name, params):
+        self.rpcs.append((name, params))
+        return self
+
+    def execute(self):
+        return SimpleNamespace(data=self.rows)
+
+
+class RecordingOrchestrator:
+    def __init__(self):
+        self.calls = []
+
+    async def process_query(self, request, language="english", db_client=None):
+        self.calls.append((request, db_client))
+        return QueryResponse(response="ok", search_results=[], performance_metrics={})
+
+
+@pytest.fixture
+def env(monkeypatch):
+    monkeypatch.setenv("SUPABASE_URL", "https://project.supabase.co")
+    monkeypatch.setenv("SUPABASE_ANON_KEY", "anon")
+    monkeypatch.setenv("SUPABASE_SERVICE_ROLE_KEY", "service")
+    database.reset_supabase_clients()
+    yield
+    database.reset_supabase_clients()
+
+
+@pytest.mark.parametrize("user", [None, {"id": "user-1"}], ids=["anonymous", "signed-in"])
+def test_queries_no_longer_list_accessible_documents(env, user):
+    caller = FakeClient()
+    orchestrator = RecordingOrchestrator()
+
+    asyncio.run(
+        QueryService(client=caller).create_query(
+            user=user, query_text="Hvor tykt skal betondækket være?", orchestrator=orchestrator, db_client=caller
+        )
+    )
+
+    request, db_client = orchestrator.calls[0]
+    assert "documents" not in caller.tables
+    assert request.allowed_document_ids is None
+    assert db_client is caller  # retrieval runs as the caller so Postgres applies visibility
+
+
+def test_anonymous_query_without_client_retrieves_as_anon(env):
+    orchestrator = RecordingOrchestrator()
+
+    asyncio.run(QueryService().create_query(user=None, query_text="q", orchestrator=orchestrator))
+
+    assert orchestrator.calls[0][1] is database.get_supabase_client()
+
+
+def test_hnsw_search_filters_in_the_rpc_and_keeps_every_row():
+    rows = [
+        {"id": f"c{i}", "content": f"chunk {i}", "metadata": {}, "document_id": f"d{i}", "similarity": 0.9 - i / 100}
+        for i in range(15)
+    ]
+    client = FakeClient(rows)
+    core = RetrievalCore(SharedRetrievalConfig(), db_client=client, embedding_service=object())
+
+    results = asyncio.run(core.search_pgvector_hnsw([0.1] * 1024, "run-1", ["d1", "d2"]))
+
+    name, params = client.rpcs[0]
+    assert name == "match_accessible_chunks"
+    assert params["indexing_run_id_filter"] == "run-1"
+    assert params["document_ids_filter"] == ["d1", "d2"]
+    assert len(results) == 15  # no Python post-filter dropping rows after the k-NN limit
+
+
+def test_k_and_ef_search_come_from_config_and_similarity_from_postgres():
+    rows = [
+        {"id": "c1", "content": "a", "metadata": {"page_number": 3}, "document_id": "d1", "similarity": 0.83},
+        {"id": "c2", "content": "b", "metadata": {}, "document_id": "d2", "similarity": 0.41},
+    ]
+    client = FakeClient(rows)
+    config = SharedRetrievalConfig(match_count=40, ef_search=200)
+    core = RetrievalCore(config, db_client=client, embedding_service=object())
+
+    results = asyncio.run(core.search_pgvector_hnsw([0.1] * 1024))
+
+    params = client.rpcs[0][1]
+    assert params["match_count"] == 40
+    assert params["ef_search"] == 200
+    assert [r["similarity_score"] for r in results] == [0.83, 0.41]
+    assert results[0]["page_number"] == 3
+
+
+def test_each_duplicate_group_is_one_hit_that_cites_every_copy():
+    canonical = {"id": "c1", "content": "Standard clause", "metadata": {"page_number": 2}, "document_id": "d1",
+                 "similarity": 0.91, "duplicates": [{"id": "c7", "document_id": "d3", "page_number": 5}]}
+    embedded_copy = {"id": "c9", "content": "Standard clause.", "document_id": "d4", "similarity": 0.90,
+                     "metadata": {"page_number": 1, "duplicate_of": {"id": "c1", "chunk_id": "a", "document_id": "d1"}}}
+    other = {"id": "c2", "content": "Fundament", "metadata": {}, "document_id": "d2", "similarity": 0.5}
+    client = FakeClient([canonical, embedded_copy, other])
+    core = RetrievalCore(SharedRetrievalConfig(), db_client=client, embedding_service=object())
+
+    results = asyncio.run(core.search_with_fallback([0.1] * 1024))
+
+    assert [r["id"] for r in results] == ["c1", "c2"]
+    assert results[0]["duplicates"] == [
+        {"id": "c7", "document_id": "d3", "page_number": 5},
+        {"id": "c9", "document_id": "d4", "page_number": 1},
+    ]
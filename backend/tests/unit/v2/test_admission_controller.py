@@ -0,0 +1,145 @@
+import asyncio
+from uuid import uuid4
+
+import fitz
+
+from src.pipeline.indexing.admission import AdmissionController, scan_document_cost
+from src.pipeline.indexing.orchestrator import IndexingOrchestrator
+from src.pipeline.shared.models import DocumentInput, UploadType
+
+MB = 1024 * 1024
+
+
+class FakeMonitor:
+    def __init__(self, rss_mb=100, cpu_percent=10.0):
+        self.rss_mb = rss_mb
+        self.cpu_percent = cpu_percent
+
+    def sample(self, process=None):
+        return {"cpu_percent": self.cpu_percent, "rss_bytes": self.rss_mb * MB, "memory_available_bytes": 0}
+
+
+def _document(name="doc.pdf"):
+    return DocumentInput(
+        document_id=uuid4(),
+        run_id=uuid4(),
+        file_path=f"/missing/{name}",
+        filename=name,
+        upload_type=UploadType.EMAIL,
+    )
+
+
+def _controller(monitor, limit_mb=1000, **kwargs):
+    defaults = dict(
+        memory_limit=limit_mb * MB,
+        min_headroom_fraction=0.2,
+        base_document_mb=100,
+        mb_per_page=0,
+        mb_per_image=0,
+        poll_interval_seconds=0.01,
+    )
+    return AdmissionController(monitor=monitor, **{**defaults, **kwargs})
+
+
+def test_defers_documents_that_exceed_memory_headroom():
+    # Ceiling 800 MB, baseline 100 MB, 100 MB per document: seven fit, the last two wait
+    controller = _controller(FakeMonitor(rss_mb=100))
+    documents = [_document(f"doc{i}.pdf") for i in range(9)]
+    peak = 0
+
+    async def process(document):
+        nonlocal peak
+        async with controller.admit(document):
+            peak = max(peak, controller.in_flight)
+            await asyncio.sleep(0.05)
+
+    async def main():
+        await asyncio.wait_for(asyncio.gather(*(process(d) for d in documents)), timeout=5)
+
+    asyncio.run(main())
+
+    assert peak == 7
+    assert controller.stats["admitted"] == 9
+    assert {reason for d in controller.decisions for reason in d["deferral_reasons"]} == {"memory_headroom"}
+    assert controller.summary()["documents_deferred"] == 2
+
+
+def test_measured_rss_above_reservations_blocks_admission():
+    monitor = FakeMonitor(rss_mb=100)
+    controller = _controller(monitor)
+
+    async def main():
+        async with controller.admit(_document()):
+            monitor.rss_mb = 750
+            controller._sampled_at = 0.0  # force a fresh sample
+            assert controller._deferral_reason(controller.estimate_bytes(None, None)) == "memory_headroom"
+
+    asyncio.run(main())
+
+
+def test_admits_one_document_even_without_headroom():
+    controller = _controller(FakeMonitor(rss_mb=2000, cpu_percent=100.0))
+
+    async def main():
+        async with controller.admit(_document()):
+            return controller.in_flight
+
+    assert asyncio.run(main()) == 1
+    assert controller.decisions[0]["deferrals"] == 0
+
+
+def test_cpu_saturation_and_concurrency_limits():
+    monitor = FakeMonitor(cpu_percent=99.0)
+    controller = _controller(monitor, max_concurrent=2, max_cpu_percent=95.0)
+
+    async def main():
+        async with controller.admit(_document()):
+            assert controller._deferral_reason(0) == "cpu_saturated"
+            monitor.cpu_percent = 10.0
+            controller._sampled_at = 0.0
+            async with controller.admit(_document()):
+                assert controller._deferral_reason(0) == "max_concurrent"
+
+    asyncio.run(main())
+
+
+def test_stage1_statistics_replace_the_estimate():
+    controller = _controller(FakeMonitor(), mb_per_page=2, mb_per_image=5)
+    document = _document()
+
+    async def main():
+        async with controller.admit(document):
+            controller.update_estimate(document.document_id, pages=10, images=4)
+            return dict(controller._reservations)
+
+    reservations = asyncio.run(main())
+
+    assert reservations[str(document.document_id)] == (100 + 20 + 20) * MB
+    assert controller.in_flight == 0
+
+
+def test_scan_document_cost_counts_pages_and_images(tmp_path):
+    path = tmp_path / "plan.pdf"
+    pdf = fitz.open()
+    for _ in range(3):
+        pdf.new_page()
+    pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 4, 4), False)
+    pdf[0].insert_image(fitz.Rect(0, 0, 50, 50), pixmap=pixmap)
+    pdf.save(str(path))
+    pdf.close()
+
+    assert scan_document_cost(str(path)) == {"pages": 3, "images": 1}
+    assert scan_document_cost("https://example.com/plan.pdf") is None
+
+
+def test_orchestrator_creates_admission_controller_from_config():
+    orchestrator = IndexingOrchestrator.__new__(IndexingOrchestrator)
+    orchestrator.orchestration_config = {"admission": {"enabled": True, "memory_limit_gb": 2, "mb_per_page": 6}}
+
+    controller = orchestrator._create_admission_controller(max_concurrent=7)
+
+    assert controller.memory_limit == 2 * 1024**3
+    assert controller.max_concurrent == 7
+    assert controller.bytes_per_page == 6 * MB
+    orchestrator.orchestration_config = {}
+    assert orchestrator._create_admission_controller(max_concurrent=7) is None
@@ -0,0 +1,68 @@
+import asyncio
+import contextvars
+import time
+
+from src.services.async_db import AsyncQueryExecutor
+
+request_id = contextvars.ContextVar("request_id", default=None)
+
+
+class SlowQuery:
+    def __init__(self, seconds, value=None):
+        self.seconds = seconds
+        self.value = value
+
+    def execute(self):
+        time.sleep(self.seconds)
+        return self.value if self.value is not None else request_id.get()
+
+
+def test_fast_queries_do_not_wait_for_a_slow_one():
+    executor = AsyncQueryExecutor(max_workers=4)
+    finished = []
+
+    async def query(name, seconds):
+        await executor.execute(SlowQuery(seconds))
+        finished.append(name)
+
+    async def main():
+        started = time.perf_counter()
+        await asyncio.gather(query("slow", 0.5), *(query(f"fast{i}", 0.02) for i in range(6)))
+        return time.perf_counter() - started
+
+    elapsed = asyncio.run(main())
+    executor.shutdown()
+
+    assert finished[-1] == "slow"
+    assert elapsed < 0.7  # serialized: 0.5 + 6 x 0.02 at best, plus the loop being blocked
+    assert executor.stats["max_in_flight"] == 4
+    assert executor.stats["calls"] == 7
+
+
+def test_event_loop_stays_responsive():
+    executor = AsyncQueryExecutor(max_workers=2)
+    ticks = []
+
+    async def heartbeat():
+        for _ in range(5):
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.05)
+
+    async def main():
+        await asyncio.gather(executor.execute(SlowQuery(0.3)), heartbeat())
+
+    asyncio.run(main())
+    executor.shutdown()
+
+    assert max(b - a for a, b in zip(ticks[:-1], ticks[1:], strict=True)) < 0.2
+
+
+def test_context_variables_reach_the_worker_thread():
+    executor = AsyncQueryExecutor(max_workers=1)
+
+    async def main():
+        request_id.set("req-42")
+        return await executor.execute(SlowQuery(0))
+
+    assert asyncio.run(main()) == "req-42"
+    executor.shutdown()
@@ -0,0 +1,127 @@
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+from uuid import uuid4
+
+from src.models import StepResult
+from src.pipeline.indexing.chunk_dedup import ChunkDeduplicator, is_duplicate
+from src.pipeline.indexing.orchestrator import IndexingOrchestrator
+from src.pipeline.indexing.steps.embedding import EmbeddingStep
+
+CLAUSE = (
+    "Entreprenøren skal inden arbejdets start fremsende en arbejdsplan til byggeledelsen. "
+    "Arbejdsplanen skal omfatte bemanding, materialeleverancer og tidsplan for samtlige "
+    "delarbejder, herunder koordinering med øvrige entrepriser på byggepladsen."
+)
+
+
+def _chunk(chunk_id, content, page=1):
+    return {"chunk_id": chunk_id, "content": content, "metadata": {"page_number": page, "source_filename": "x.pdf"}}
+
+
+def test_exact_duplicates_ignore_case_and_whitespace():
+    dedup = ChunkDeduplicator()
+    shouted = "  " + CLAUSE.upper().replace(" ", "   ")
+    chunks = [_chunk("a", CLAUSE), _chunk("b", shouted), _chunk("c", "Andet afsnit om tag.")]
+
+    stats = dedup.deduplicate(chunks, document_id="doc-1")
+
+    assert stats == {"exact_duplicates": 1, "near_duplicates": 0, "unique_chunks": 2}
+    assert chunks[1]["metadata"]["duplicate_of"] == {"chunk_id": "a", "document_id": "doc-1", "similarity": 1.0}
+    assert not is_duplicate(chunks[0]) and not is_duplicate(chunks[2])
+
+
+def test_near_duplicates_across_documents_are_linked():
+    dedup = ChunkDeduplicator(threshold=0.8)
+    first = [_chunk("a", CLAUSE + " Se afsnit 4.2.")]
+    second = [
+        _chunk("b", CLAUSE + " Se afsnit 4.3."),
+        _chunk("c", "Facaden udføres i tegl med ventileret hulrum og isolering."),
+    ]
+
+    dedup.deduplicate(first, document_id="doc-1")
+    stats = dedup.deduplicate(second, document_id="doc-2")
+
+    assert stats["near_duplicates"] == 1
+    assert second[0]["metadata"]["duplicate_of"]["document_id"] == "doc-1"
+    assert 0.8 <= second[0]["metadata"]["duplicate_of"]["similarity"] < 1.0
+    assert not is_duplicate(second[1])
+    # The canonical chunk is not modified, it may already be stored
+    assert first[0]["metadata"] == {"page_number": 1, "source_filename": "x.pdf"}
+
+
+class FakeEmbeddingStep:
+    def __init__(self, status="completed"):
+        self.status = status
+        self.calls = []
+
+    def get_step_name(self):
+        return "EmbeddingStep"
+
+    async def execute(self, input_data, indexing_run_id=None, document_id=None):
+        self.calls.append((document_id, input_data))
+        now = datetime.utcnow()
+        return StepResult(step="embedding", status=self.status, duration_seconds=0.0, started_at=now, completed_at=now)
+
+
+class FakePipelineService:
+    def __init__(self):
+        self.stored = []
+
+    async def store_document_step_result(
+        self, document_id, step_name, step_result, indexing_run_id=None, progress_writer=None
+    ):
+        self.stored.append((document_id, step_name, step_result.status))
+
+
+def _resolving_orchestrator(orphans, embedding_status="completed"):
+    rpc_calls = []
+
+    def rpc(name, params):
+        rpc_calls.append((name, params))
+        return SimpleNamespace(execute=lambda: SimpleNamespace(data=orphans))
+
+    orchestrator = IndexingOrchestrator.__new__(IndexingOrchestrator)
+    orchestrator.chunking_step = SimpleNamespace(db=SimpleNamespace(rpc=rpc))
+    orchestrator.embedding_step = FakeEmbeddingStep(embedding_status)
+    orchestrator.pipeline_service = FakePipelineService()
+    return orchestrator, rpc_calls
+
+
+def test_duplicates_are_linked_to_their_canonical_row_and_orphans_are_embedded():
+    run_id, doc_1, doc_2, failed_doc = uuid4(), uuid4(), uuid4(), uuid4()
+    orphan = {"id": "row-b", "document_id": str(doc_2), "content": CLAUSE}
+    orchestrator, rpc_calls = _resolving_orchestrator([orphan])
+    results = {doc_1: True, doc_2: True, failed_doc: False}
+
+    asyncio.run(orchestrator._resolve_duplicates(run_id, results))
+
+    assert rpc_calls == [
+        ("resolve_duplicate_chunks", {"run_id": str(run_id), "document_ids": [str(doc_1), str(doc_2)]})
+    ]
+    assert orchestrator.embedding_step.calls == [(doc_2, {"chunks": [orphan]})]
+    assert results == {doc_1: True, doc_2: True, failed_doc: False}
+
+
+def test_document_fails_when_its_orphaned_duplicates_cannot_be_embedded():
+    run_id, document_id = uuid4(), uuid4()
+    orphan = {"id": "row-b", "document_id": str(document_id), "content": CLAUSE}
+    orchestrator, _ = _resolving_orchestrator([orphan], embedding_status="failed")
+    results = {document_id: True}
+
+    asyncio.run(orchestrator._resolve_duplicates(run_id, results))
+
+    assert results == {document_id: False}
+    assert orchestrator.pipeline_service.stored == [(document_id, "EmbeddingStep", "failed")]
+
+
+def test_embedding_skips_duplicates_from_chunking_output():
+    step = EmbeddingStep.__new__(EmbeddingStep)
+    chunks = [_chunk("a", CLAUSE), _chunk("b", CLAUSE)]
+    ChunkDeduplicator().deduplicate(chunks, document_id="doc-1")
+    for index, chunk in enumerate(chunks):
+        chunk["id"] = f"row-{index}"
+
+    to_embed = step.get_chunks_from_input({"chunks": chunks})
+
+    assert [chunk["id"] for chunk in to_embed] == ["row-0"]
@@ -0,0 +1,103 @@
+import asyncio
+from unittest.mock import patch
+
+import fitz
+
+from src.pipeline.indexing.steps.enrichment import EnrichmentStep
+from src.pipeline.indexing.steps.partition import UnifiedPartitionerV2
+
+ROWS = [
+    ["Pos", "Beskrivelse", "Enhed", "Mængde"],
+    ["1", "Murværk", "m2", "120"],
+    ["2", "Isolering", "m2", "95"],
+    ["3", "Vinduer", "stk", "14"],
+]
+
+
+def _write_schedule_pdf(path, pages=(ROWS,)):
+    doc = fitz.open()
+    for rows in pages:
+        page = doc.new_page(width=595, height=842)
+        x0, y0, col_width, row_height = 50, 100, 120, 25
+        for r, row in enumerate(rows):
+            for c, cell in enumerate(row):
+                rect = fitz.Rect(
+                    x0 + c * col_width, y0 + r * row_height, x0 + (c + 1) * col_width, y0 + (r + 1) * row_height
+                )
+                page.draw_rect(rect, color=(0, 0, 0), width=0.8)
+                page.insert_text((rect.x0 + 4, rect.y1 - 8), cell, fontsize=10)
+    doc.save(str(path))
+    doc.close()
+
+
+def test_table_cells_to_markdown_handles_none_and_pipes():
+    md = UnifiedPartitionerV2._table_cells_to_markdown([["A", "B"], [None, "x|y"], [None, None], ["1"]])
+    assert md.splitlines() == ["| A | B |", "|---|---|", "|  | x\\|y |", "| 1 |  |"]
+    assert UnifiedPartitionerV2._table_cells_to_markdown([]) == ""
+
+
+def test_clean_table_is_extracted_directly(tmp_path):
+    pdf_path = tmp_path / "schedule.pdf"
+    _write_schedule_pdf(pdf_path)
+
+    partitioner = UnifiedPartitionerV2(str(tmp_path / "tables"), str(tmp_path / "images"))
+    stage1 = partitioner.stage1_pymupdf_analysis(str(pdf_path))
+    tables = partitioner.stage3_create_table_elements_only(str(pdf_path), stage1["table_locations"])
+
+    assert len(tables) == 1
+    meta = tables[0]["metadata"]
+    assert meta["direct_extraction"] is True
+    assert meta["extraction_method"] == "pymupdf_structured_table"
+    assert "| Pos | Beskrivelse | Enhed | Mængde |" in tables[0]["text"]
+    assert "| 3 | Vinduer | stk | 14 |" in tables[0]["text"]
+    # Clean table on a text page needs no full-page render either
+    assert stage1["page_analysis"][1]["needs_extraction"] is False
+
+
+def test_each_table_keeps_its_own_page_content(tmp_path):
+    pdf_path = tmp_path / "schedules.pdf"
+    names = ("ALPHA", "BRAVO", "CHARLIE")
+    pages = [[ROWS[0]] + [[str(r), f"{name}{r}", "m2", str(10 * r)] for r in (1, 2, 3)] for name in names]
+    _write_schedule_pdf(pdf_path, pages)
+
+    partitioner = UnifiedPartitionerV2(str(tmp_path / "tables"), str(tmp_path / "images"))
+    stage1 = partitioner.stage1_pymupdf_analysis(str(pdf_path))
+    tables = partitioner.stage3_create_table_elements_only(str(pdf_path), stage1["table_locations"])
+
+    assert [table["page"] for table in tables] == [1, 2, 3]
+    for table, name in zip(tables, names, strict=True):
+        assert table["metadata"]["direct_extraction"] is True
+        assert f"| 3 | {name}3 | m2 | 30 |" in table["text"]
+        assert all(other not in table["text"] for other in set(names) - {name})
+
+    # Pages outside the window are skipped, the remaining table still has its own rows
+    windowed = partitioner.stage3_create_table_elements_only(str(pdf_path), stage1["table_locations"], pages={1})
+    assert "ALPHA1" in windowed[0]["text"] and "CHARLIE" not in windowed[0]["text"]
+
+
+def test_threshold_above_confidence_keeps_vlm_path(tmp_path):
+    pdf_path = tmp_path / "schedule.pdf"
+    _write_schedule_pdf(pdf_path)
+
+    partitioner = UnifiedPartitionerV2(
+        str(tmp_path / "tables"), str(tmp_path / "images"), {"direct_extraction_confidence": 1.1}
+    )
+    stage1 = partitioner.stage1_pymupdf_analysis(str(pdf_path))
+    tables = partitioner.stage3_create_table_elements_only(str(pdf_path), stage1["table_locations"])
+
+    assert tables[0]["metadata"]["direct_extraction"] is False
+    assert tables[0]["metadata"]["extraction_method"] == "text_only_full_page_covers_image"
+
+
+def test_enrichment_skips_vlm_for_direct_tables():
+    # Bypass __init__ (needs OpenRouter settings); the routing logic does not use the captioner
+    step = EnrichmentStep.__new__(EnrichmentStep)
+
+    table = {"id": "table_1", "page": 1, "text": "| a |", "metadata": {"direct_extraction": True}}
+    with patch.object(step, "_enrich_table") as enrich_table:
+        result = asyncio.run(step._enrich_with_vlm_async({"table_elements": [table], "extracted_pages": {}}))
+
+    enrich_table.assert_not_called()
+    meta = result["table_elements"][0]["enrichment_metadata"]
+    assert meta["vlm_processed"] is False
+    assert meta["skip_reason"] == "direct_structured_extraction"
@@ -0,0 +1,73 @@
+import asyncio
+import json
+from datetime import datetime
+from uuid import uuid4
+
+from src.models import StepResult
+from src.services.pipeline_service import PipelineService
+
+
+def _result(step, status="completed", **kwargs):
+    now = datetime.utcnow()
+    return StepResult(step=step, status=status, duration_seconds=1.5, started_at=now, completed_at=now, **kwargs)
+
+
+def test_each_step_appends_one_row_without_reading_the_document(fake_supabase):
+    db = fake_supabase()
+    service = PipelineService(client=db)
+    document_id, run_id = uuid4(), uuid4()
+
+    asyncio.run(
+        service.store_document_step_result(
+            document_id, "PartitionStep", _result("partition", summary_stats={"pages_analyzed": 3}), run_id
+        )
+    )
+
+    assert db.writes() == [("document_step_results", "insert"), ("documents", "update")]
+    row = db.calls[0].payload
+    assert row["indexing_run_id"] == str(run_id)
+    assert row["summary_stats"] == {"pages_analyzed": 3}
+    json.dumps(row)  # payload is JSON-serializable as sent to PostgREST
+    assert db.calls[1].payload == {"indexing_status": "running"}
+
+
+def test_chunking_success_stores_minimal_result_and_completes_document(fake_supabase):
+    db = fake_supabase()
+    service = PipelineService(client=db)
+
+    asyncio.run(
+        service.store_document_step_result(
+            uuid4(), "ChunkingStep", _result("chunking", data={"chunks": [{"content": "x"}] * 50})
+        )
+    )
+
+    row = db.calls[0].payload
+    assert "data" not in row["result"]
+    assert db.calls[1].payload == {"indexing_status": "completed"}
+
+
+def test_failed_step_marks_document_failed(fake_supabase):
+    db = fake_supabase()
+    service = PipelineService(client=db)
+    result = _result("enrichment", "failed", error_message="VLM down")
+
+    asyncio.run(service.store_document_step_result(uuid4(), "EnrichmentStep", result))
+
+    assert db.calls[1].payload == {"indexing_status": "failed", "error_message": "VLM down"}
+
+
+def test_latest_step_results_are_grouped_per_document(fake_supabase):
+    rows = [
+        {"document_id": "d1", "step_name": "PartitionStep", "status": "completed", "summary_stats": {}},
+        {"document_id": "d1", "step_name": "MetadataStep", "status": "running", "summary_stats": {}},
+        {"document_id": "d2", "step_name": "PartitionStep", "status": "failed", "summary_stats": {}},
+    ]
+    db = fake_supabase(respond=lambda query: [dict(row) for row in rows])
+
+    latest = asyncio.run(PipelineService(client=db).get_latest_document_step_results(["d1", "d2", "d3"]))
+
+    assert db.calls[0].table == "document_step_results_latest"
+    assert "result" not in db.calls[0].columns
+    assert set(latest["d1"]) == {"PartitionStep", "MetadataStep"}
+    assert latest["d2"]["PartitionStep"]["status"] == "failed"
+    assert latest["d3"] == {}
@@ -0,0 +1,100 @@
+import asyncio
+from unittest.mock import Mock
+
+import fitz
+import numpy as np
+import pytest
+
+from src.pipeline.indexing.element_store import TextElementStore
+from src.pipeline.indexing.steps.chunking import IntelligentChunker
+from src.pipeline.indexing.steps.metadata import MetadataStep
+from src.pipeline.indexing.steps.partition import PartitionStep, UnifiedPartitionerV2
+
+
+def _element(i, page=1, text="Facaden udføres i tegl med isolering", **metadata):
+    return {
+        "id": f"text_page{page}_block{i}",
+        "category": "NarrativeText",
+        "page": page,
+        "text": text,
+        "metadata": {
+            "page_number": page,
+            "bbox": [40.5, 100.0 + i, 555.25, 120.0 + i],
+            "font_size": 10.0,
+            "font_name": "Helvetica",
+            "is_bold": False,
+            "extraction_method": "pymupdf_text_dict",
+            **metadata,
+        },
+    }
+
+
+def test_store_round_trips_legacy_dicts():
+    elements = [_element(i, page=i // 2 + 1) for i in range(600)]
+    store = TextElementStore.from_dicts(elements)
+
+    assert len(store) == 600
+    assert store.to_dicts() == elements
+    assert store[-1]["metadata"]["bbox"] == elements[-1]["metadata"]["bbox"]
+    assert isinstance(store.bboxes, np.ndarray) and store.bboxes.shape == (600, 4)
+    # Font, category and method names are stored once
+    assert sorted(store.symbols) == ["Helvetica", "NarrativeText", "pymupdf_text_dict"]
+
+
+def test_views_write_back_to_store():
+    store = TextElementStore.from_dicts([_element(0), _element(1)])
+
+    store[0]["structural_metadata"] = {"section_title_inherited": "1. Facade"}
+    store[1]["metadata"]["table_id"] = "t1"
+
+    assert store[0]["structural_metadata"]["section_title_inherited"] == "1. Facade"
+    assert "structural_metadata" not in store[1]
+    assert store[1]["metadata"]["table_id"] == "t1"
+    assert store[0].copy()["id"] == "text_page1_block0"
+    with pytest.raises(TypeError):
+        store[0]["metadata"]["bbox"] = [0, 0, 1, 1]
+
+
+def test_select_keeps_columns_and_replaces_texts():
+    store = TextElementStore.from_dicts([_element(i, text=f" tekst {i} ") for i in range(5)])
+    store[3]["element_type"] = "text"
+
+    selected = store.select([1, 3], texts=["tekst 1", "tekst 3"])
+
+    assert [el["id"] for el in selected] == ["text_page1_block1", "text_page1_block3"]
+    assert selected[1]["text"] == "tekst 3"
+    assert selected[1]["element_type"] == "text"
+    assert selected.bboxes[1].tolist() == store.bboxes[3].tolist()
+
+
+def test_partition_metadata_and_chunking_read_the_store(tmp_path):
+    pdf_path = tmp_path / "spec.pdf"
+    doc = fitz.open()
+    for page_number in range(1, 4):
+        page = doc.new_page(width=595, height=842)
+        page.insert_text((40, 60), f"{page_number}. Facade og tag", fontsize=14)
+        page.insert_textbox(fitz.Rect(40, 100, 555, 800), "Murværket udføres i blødstrøgne tegl. " * 20)
+    doc.save(str(pdf_path))
+    doc.close()
+
+    partitioner = UnifiedPartitionerV2(str(tmp_path / "tables"), str(tmp_path / "images"))
+    partitioner.stage1_pymupdf_analysis(str(pdf_path))
+    store, raw = partitioner.stage2_fast_text_extraction(str(pdf_path))
+    assert isinstance(store, TextElementStore) and raw is store
+
+    partition_step = PartitionStep({"ocr_strategy": "pymupdf_only"}, storage_service=Mock())
+    filtered_store = partition_step._filter_text_elements(store)
+    filtered_dicts = partition_step._filter_text_elements(store.to_dicts())
+    assert filtered_store.to_dicts() == filtered_dicts
+
+    def run_metadata_and_chunking(text_elements):
+        step = MetadataStep({}, storage_service=Mock())
+        data = {"text_elements": text_elements, "table_elements": [], "extracted_pages": {}, "metadata": {}}
+        result = asyncio.run(step.execute(data))
+        for element in result.data["text_elements"]:
+            element["element_type"] = "text"
+        chunker = IntelligentChunker({"strategy": "semantic", "chunk_size": 400, "max_chunk_size": 600})
+        chunks, _ = chunker.create_final_chunks(list(result.data["text_elements"]))
+        return [(chunk["content"], chunk["metadata"].get("section_title_inherited")) for chunk in chunks]
+
+    assert run_metadata_and_chunking(filtered_store) == run_metadata_and_chunking(filtered_dicts)
@@ -0,0 +1,139 @@
+import asyncio
+from uuid import uuid4
+
+from src.pipeline.indexing.models import as_chunking_data
+from src.pipeline.indexing.steps.chunking import ChunkingStep
+from src.pipeline.indexing.steps.embedding import EmbeddingStep
+from src.pipeline.indexing.token_counter import TokenCounter
+
+
+def _respond(query):
+    if query.method == "insert":
+        return [{"id": f"row-{row['chunk_id']}", "chunk_id": row["chunk_id"]} for row in query.payload]
+    if query.method == "update":
+        return [{"id": query.filters[-1][2]}]
+    return [{"id": "row-db", "content": "from database"}]
+
+
+def _chunks(count):
+    return [{"chunk_id": f"c{i}", "content": f"Afsnit {i}", "metadata": {"token_pieces": 2}} for i in range(count)]
+
+
+def _chunking_step(db, insert_batch_size=500):
+    step = ChunkingStep.__new__(ChunkingStep)
+    step.db = db
+    step.insert_batch_size = insert_batch_size
+    return step
+
+
+class FakeVoyageClient:
+    model = "voyage-multilingual-2"
+    dimensions = 1024
+
+    def __init__(self):
+        self.token_counter = TokenCounter()
+        self.token_counts = None
+
+    async def get_embeddings(self, texts, batch_size=100, token_counts=None):
+        self.token_counts = token_counts
+        return [[1.0, float(index)] for index, _ in enumerate(texts)]
+
+
+def _embedding_step(db):
+    step = EmbeddingStep.__new__(EmbeddingStep)
+    step.db = db
+    step.resume_capability = True
+    step.voyage_client = FakeVoyageClient()
+    step.embedding_queue = None
+    step.batch_size = 100
+    step.max_retries = 3
+    step.quality_sample_size = 2000
+    step.near_duplicate_threshold = 0.98
+    step.outlier_z = 4.0
+    return step
+
+
+def test_chunks_are_bulk_inserted_and_get_row_ids(fake_supabase):
+    db = fake_supabase(respond=_respond)
+    chunks = _chunks(5)
+
+    asyncio.run(_chunking_step(db, insert_batch_size=2).store_chunks_in_database(chunks, uuid4(), uuid4()))
+
+    assert [len(call.payload) for call in db.calls] == [2, 2, 1]
+    assert all(call.params["select"] == "id,chunk_id" for call in db.calls)
+    assert [chunk["id"] for chunk in chunks] == [f"row-c{i}" for i in range(5)]
+
+
+def test_embedding_uses_in_memory_chunks_with_ids(fake_supabase):
+    db = fake_supabase(respond=_respond)
+    chunks = _chunks(3)
+    asyncio.run(_chunking_step(db).store_chunks_in_database(chunks, uuid4(), uuid4()))
+
+    step = _embedding_step(db)
+    from_input = step.get_chunks_from_input(as_chunking_data({"chunks": chunks, "chunking_metadata": {}}))
+
+    assert from_input == chunks
+    assert [call.method for call in db.calls] == ["insert"]
+
+
+def test_embedding_falls_back_to_projected_database_read(fake_supabase):
+    db = fake_supabase(respond=_respond)
+    step = _embedding_step(db)
+
+    # Chunks without ids (storage failed) and the batch path (no input) read from the database
+    assert step.get_chunks_from_input({"chunks": _chunks(2)}) is None
+    assert step.get_chunks_from_input(None) is None
+
+    rows = asyncio.run(step.get_chunks_for_embedding(uuid4(), uuid4()))
+
+    assert rows == [{"id": "row-db", "content": "from database"}]
+    assert db.calls[0].columns == "id, content"
+    assert ("is", "embedding_1024", "null") in db.calls[0].filters
+
+
+def test_execute_embeds_chunks_read_from_the_database(fake_supabase):
+    db = fake_supabase(respond=_respond)
+
+    # No input: the resume-from-chunking and batch paths read the chunks back (id and content only)
+    result = asyncio.run(_embedding_step(db).execute(None, uuid4(), uuid4()))
+
+    assert result.status == "completed", result.error_message
+    assert result.summary_stats["embeddings_generated"] == 1
+    assert result.sample_outputs["sample_embeddings"][0]["chunk_id"] == "row-db"
+    assert [call.method for call in db.calls if call.method == "update"] == ["update"]
+
+
+def test_short_embedding_response_fails_instead_of_dropping_chunks(fake_supabase):
+    class ShortVoyageClient(FakeVoyageClient):
+        async def get_embeddings(self, texts, batch_size=100, token_counts=None):
+            return [[1.0, 0.0]] * (len(texts) - 1)
+
+    db = fake_supabase(respond=_respond)
+    step = _embedding_step(db)
+    step.voyage_client = ShortVoyageClient()
+    step.max_retries = 1
+    chunks = [{"id": f"row-{i}", "content": f"Afsnit {i}"} for i in range(3)]
+
+    result = asyncio.run(step.execute({"chunks": chunks}, uuid4(), uuid4()))
+
+    assert result.status == "failed"
+    assert result.data["embeddings_generated"] == 0
+    # Every chunk is marked failed; none is stored with another chunk's embedding
+    assert [call.payload["embedding_metadata"]["status"] for call in db.calls if call.method == "update"] == [
+        "failed"
+    ] * 3
+
+
+def test_cached_piece_counts_are_calibrated_when_batching(fake_supabase):
+    step = _embedding_step(fake_supabase(respond=_respond))
+    # Calibrated from Voyage usage after the chunks were cut
+    step.voyage_client.token_counter.tokens_per_piece = 2.0
+    chunks = [
+        {"id": "row-0", "content": "Afsnit 0", "metadata": {"token_pieces": 2}},
+        {"id": "row-1", "content": "Afsnit 1", "metadata": {}},
+    ]
+
+    asyncio.run(step.generate_embeddings(chunks))
+
+    # 2 pieces x 2.0 tokens per piece x 1.1 safety margin; the uncached chunk is counted by the client
+    assert step.voyage_client.token_counts == [5, None]
@@ -0,0 +1,75 @@
+import asyncio
+
+import numpy as np
+
+from src.pipeline.indexing.embedding_quality import compute_quality_metrics, count_duplicates
+from src.pipeline.indexing.steps.embedding import EmbeddingStep
+
+
+def _unit_vectors(count, dim=64, seed=1):
+    vectors = np.random.default_rng(seed).normal(size=(count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_exact_duplicates_match_tuple_set_count():
+    vectors = _unit_vectors(200)
+    vectors[10] = vectors[3]
+    vectors[11] = vectors[3]
+    vectors[50] = vectors[49]
+    embeddings = vectors.tolist()
+    distinct = set(map(tuple, embeddings))
+
+    assert count_duplicates(np.asarray(embeddings, dtype=np.float32)) == len(embeddings) - len(distinct)
+    assert count_duplicates(np.asarray(embeddings, dtype=np.float32)) == 3
+
+
+def test_metrics_keep_legacy_fields_and_score():
+    embeddings = _unit_vectors(100).tolist()
+    embeddings[5] = [0.0] * 64
+
+    metrics = compute_quality_metrics(embeddings)
+
+    assert metrics["total_embeddings"] == 100
+    assert metrics["embedding_dimensions"] == 64
+    assert metrics["zero_vectors"] == 1
+    assert metrics["duplicate_embeddings"] == 0
+    assert abs(metrics["similarity_analysis"]["self_similarity_check"] - 1.0) < 1e-5
+    assert abs(metrics["embedding_stats"]["norm_mean"] - 0.99) < 1e-5
+    assert abs(metrics["quality_score"] - 0.7) < 1e-9  # the zero vector costs 0.3
+    assert 5 in metrics["outlier_indices"]
+
+
+def test_near_duplicates_are_found_in_sample():
+    vectors = _unit_vectors(50)
+    vectors[7] = vectors[6] + 0.001
+    vectors[7] /= np.linalg.norm(vectors[7])
+
+    metrics = compute_quality_metrics(vectors)
+
+    assert metrics["duplicate_embeddings"] == 0
+    assert metrics["near_duplicate_pairs"] == 1
+    assert metrics["sample_size"] == 50
+
+
+def test_sample_size_bounds_similarity_work_and_outliers_are_flagged():
+    vectors = _unit_vectors(5000)
+    vectors[1234] *= 25.0
+
+    metrics = compute_quality_metrics(vectors, sample_size=300)
+
+    assert metrics["sample_size"] == 300
+    assert metrics["outlier_indices"] == [1234]
+
+
+def test_step_reports_outlier_chunk_ids():
+    step = EmbeddingStep.__new__(EmbeddingStep)
+    step.quality_sample_size = 2000
+    step.near_duplicate_threshold = 0.98
+    step.outlier_z = 4.0
+    vectors = _unit_vectors(20)
+    vectors[4] *= 50.0
+    chunks = [{"id": f"chunk-{i}"} for i in range(20)]
+
+    metrics = asyncio.run(step.validate_embedding_quality(chunks, vectors.tolist()))
+
+    assert metrics["outlier_chunk_ids"] == ["chunk-4"]
@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+from src.pipeline.indexing.embedding_queue import EmbeddingQueue
+from src.pipeline.indexing.steps.embedding import VoyageBatchError
+
+
+class FakeVoyageClient:
+    max_concurrency = 2
+
+    def __init__(self, fail_on=None):
+        self.batches = []
+        self.fail_on = fail_on
+
+    def estimate_tokens(self, text):
+        return len(text)
+
+    async def embed_batch(self, texts, batch_num=1, total_batches=1, batch_tokens=None):
+        self.batches.append(list(texts))
+        await asyncio.sleep(0.01)
+        if self.fail_on and self.fail_on in texts:
+            raise RuntimeError("voyage down")
+        return [[float(len(text)), float(batch_num)] for text in texts]
+
+
+def _doc(name, n):
+    return [f"{name}-{'x' * i}" for i in range(n)]
+
+
+async def _embed_documents(queue, documents):
+    try:
+        return await asyncio.gather(*(queue.get_embeddings(texts) for texts in documents), return_exceptions=True)
+    finally:
+        await queue.close()
+
+
+def test_small_documents_share_full_batches():
+    client = FakeVoyageClient()
+    queue = EmbeddingQueue(client, max_batch_texts=10, max_wait_seconds=0.05)
+    documents = [_doc(f"d{i}", 3) for i in range(8)]  # 24 texts
+
+    results = asyncio.run(_embed_documents(queue, documents))
+
+    assert [len(batch) for batch in client.batches] == [10, 10, 4]
+    # Results are routed back per document in input order
+    for texts, embeddings in zip(documents, results, strict=True):
+        assert [e[0] for e in embeddings] == [float(len(text)) for text in texts]
+    assert queue.stats["callers"] == 8
+
+
+def test_token_limit_closes_batch():
+    client = FakeVoyageClient()
+    queue = EmbeddingQueue(client, max_batch_texts=100, max_batch_tokens=25, max_wait_seconds=0.05)
+
+    results = asyncio.run(_embed_documents(queue, [["a" * 10, "b" * 10, "c" * 10], ["d" * 10]]))
+
+    assert [len(batch) for batch in client.batches] == [2, 2]
+    assert [len(r) for r in results] == [3, 1]
+
+
+def test_failed_batch_only_affects_its_documents():
+    client = FakeVoyageClient(fail_on="bad")
+    queue = EmbeddingQueue(client, max_batch_texts=2, max_wait_seconds=0.05)
+
+    results = asyncio.run(_embed_documents(queue, [["ok1", "ok2"], ["bad", "ok3"], ["ok4"]]))
+
+    assert isinstance(results[0], list)
+    assert isinstance(results[1], VoyageBatchError)
+    assert results[1].embeddings == [None, None]
+    assert isinstance(results[2], list)
+
+
+def test_close_without_use_is_noop():
+    queue = EmbeddingQueue(FakeVoyageClient())
+    asyncio.run(queue.close())
+    assert queue.stats["requests_sent"] == 0
+
+
+@pytest.mark.parametrize("n", [0, 1])
+def test_lone_document_is_sent_after_linger(n):
+    client = FakeVoyageClient()
+    queue = EmbeddingQueue(client, max_batch_texts=100, max_wait_seconds=0.02)
+
+    async def run():
+        embeddings = await queue.get_embeddings(_doc("solo", n))
+        await queue.close()
+        return embeddings
+
+    assert len(asyncio.run(run())) == n
+    assert len(client.batches) == (1 if n else 0)
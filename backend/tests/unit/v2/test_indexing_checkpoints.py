@@ -0,0 +1,200 @@
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+from uuid import uuid4
+
+from src.models import StepResult
+from src.pipeline.indexing.checkpoints import LocalCheckpointStore, create_checkpoint_store
+from src.pipeline.indexing.element_store import TextElementStore
+from src.pipeline.indexing.orchestrator import IndexingOrchestrator
+from src.pipeline.indexing.steps.chunking import ChunkingStep
+from src.pipeline.indexing.steps.embedding import EmbeddingStep
+from src.pipeline.indexing.steps.enrichment import EnrichmentStep
+from src.pipeline.indexing.steps.metadata import MetadataStep
+from src.pipeline.indexing.steps.partition import PartitionStep
+
+
+def _result(step, data=None, status="completed"):
+    now = datetime.utcnow()
+    return StepResult(step=step, status=status, duration_seconds=0.0, data=data, started_at=now, completed_at=now)
+
+
+def _partition_data():
+    store = TextElementStore()
+    store.append("t1", "NarrativeText", 1, "Fundament", (0, 0, 10, 10), 10.0, "Helvetica", False, "pymupdf_text")
+    return {
+        "text_elements": store,
+        "table_elements": [],
+        "extracted_pages": {1: {"storage_path": "runs/r/doc/extracted-pages/page_1.png", "url": "https://signed"}},
+        "page_analysis": {1: {"needs_extraction": True}},
+        "document_metadata": {"total_pages": 1},
+        "metadata": {},
+    }
+
+
+class FakeStepMixin:
+    def __init__(self, calls, fail=False):
+        self.calls = calls
+        self.fail = fail
+
+    async def validate_prerequisites_async(self, input_data):
+        return True
+
+    async def _run(self, input_data, data):
+        self.calls.append((self.get_step_name(), input_data))
+        if self.fail:
+            raise RuntimeError(f"{self.get_step_name()} interrupted")
+        return _result(self.get_step_name(), data)
+
+
+class FakePartition(FakeStepMixin, PartitionStep):
+    async def execute(self, input_data):
+        return await self._run(input_data, _partition_data())
+
+
+class FakeMetadata(FakeStepMixin, MetadataStep):
+    async def execute(self, input_data):
+        return await self._run(input_data, {**input_data, "page_sections": {1: "Fundament"}})
+
+
+class FakeEnrichment(FakeStepMixin, EnrichmentStep):
+    async def execute(self, input_data):
+        return await self._run(input_data, {**input_data, "table_elements": [{"id": "tb1", "caption": "VLM"}]})
+
+
+class FakeChunking(FakeStepMixin, ChunkingStep):
+    async def execute(self, input_data, indexing_run_id, document_id):
+        return await self._run(input_data, {"chunks": [{"id": "row-1", "content": "Fundament"}]})
+
+
+class FakeEmbedding(FakeStepMixin, EmbeddingStep):
+    async def execute(self, input_data, indexing_run_id=None, document_id=None):
+        return await self._run(input_data, {"chunks_processed": 1, "embeddings_generated": 1})
+
+
+class FakeDb:
+    def __init__(self):
+        self.deletes = []
+        self.filters = []
+
+    def table(self, name):
+        self.name = name
+        return self
+
+    def delete(self):
+        self.deletes.append(self.name)
+        return self
+
+    def eq(self, column, value):
+        self.filters.append((column, value))
+        return self
+
+    def execute(self):
+        return SimpleNamespace(data=[])
+
+
+class FakePipelineService:
+    async def store_document_step_result(self, **kwargs):
+        pass
+
+
+def _orchestrator(calls, fail_at=None):
+    orchestrator = IndexingOrchestrator.__new__(IndexingOrchestrator)
+    orchestrator.orchestration_config = {}
+    orchestrator.pipeline_service = FakePipelineService()
+    orchestrator.db = FakeDb()
+    orchestrator.chunking_step = None
+    orchestrator.steps = [
+        step_class(calls, fail=step_class is fail_at)
+        for step_class in (FakePartition, FakeMetadata, FakeEnrichment, FakeChunking, FakeEmbedding)
+    ]
+    return orchestrator
+
+
+def _process(orchestrator, document, run_id, store):
+    return asyncio.run(
+        orchestrator._process_single_document_steps(document, run_id, None, checkpoints=store)
+    )
+
+
+def test_retry_skips_checkpointed_steps(tmp_path):
+    store = LocalCheckpointStore(str(tmp_path))
+    document, run_id = SimpleNamespace(document_id=uuid4(), page_range=None), uuid4()
+
+    first_calls = []
+    assert _process(_orchestrator(first_calls, fail_at=FakeChunking), document, run_id, store) is False
+    assert [name for name, _ in first_calls] == ["FakePartition", "FakeMetadata", "FakeEnrichment", "FakeChunking"]
+
+    calls = []
+    retry = _orchestrator(calls)
+    assert _process(retry, document, run_id, store) is True
+
+    assert [name for name, _ in calls] == ["FakeChunking", "FakeEmbedding"]
+    chunking_input = calls[0][1]
+    assert chunking_input["table_elements"] == [{"id": "tb1", "caption": "VLM"}]
+    assert chunking_input["page_sections"] == {1: "Fundament"}
+    assert chunking_input["text_elements"].to_dicts() == _partition_data()["text_elements"].to_dicts()
+    # Chunks stored by the interrupted attempt are dropped before re-chunking
+    assert retry.db.deletes == ["document_chunks"]
+    assert ("document_id", str(document.document_id)) in retry.db.filters
+
+
+class UnsavedStepsStore(LocalCheckpointStore):
+    def __init__(self, directory, unsaved):
+        super().__init__(directory)
+        self.unsaved = unsaved
+
+    async def save(self, run_id, document_id, step_name, result):
+        if step_name in self.unsaved:
+            return False
+        return await super().save(run_id, document_id, step_name, result)
+
+
+def test_chunks_are_discarded_when_chunking_is_rerun_after_an_earlier_checkpoint(tmp_path):
+    store = UnsavedStepsStore(str(tmp_path), {"FakeEnrichment", "FakeChunking"})
+    document, run_id = SimpleNamespace(document_id=uuid4(), page_range=None), uuid4()
+    assert _process(_orchestrator([], fail_at=FakeEmbedding), document, run_id, store) is False
+
+    calls = []
+    retry = _orchestrator(calls)
+    assert _process(retry, document, run_id, store) is True
+
+    # The latest checkpoint is metadata, but the first attempt already stored chunks
+    assert [name for name, _ in calls] == ["FakeEnrichment", "FakeChunking", "FakeEmbedding"]
+    assert retry.db.deletes == ["document_chunks"]
+
+
+def test_resume_after_chunking_embeds_from_database_and_finished_documents_are_skipped(tmp_path):
+    store = LocalCheckpointStore(str(tmp_path))
+    document, run_id = SimpleNamespace(document_id=uuid4(), page_range=None), uuid4()
+    assert _process(_orchestrator([], fail_at=FakeEmbedding), document, run_id, store) is False
+
+    calls = []
+    assert _process(_orchestrator(calls), document, run_id, store) is True
+    # None makes the embedding step pick up the chunks that still lack an embedding
+    assert calls == [("FakeEmbedding", None)]
+
+    calls = []
+    assert _process(_orchestrator(calls), document, run_id, store) is True
+    assert calls == []
+
+    asyncio.run(store.clear_run(run_id))
+    assert asyncio.run(store.completed_steps(run_id, document.document_id)) == set()
+
+
+def test_unreadable_checkpoints_are_ignored(tmp_path):
+    store = LocalCheckpointStore(str(tmp_path))
+    run_id, document_id = uuid4(), uuid4()
+    asyncio.run(store.save(run_id, document_id, "FakePartition", _result("partition", _partition_data())))
+    (tmp_path / str(run_id) / str(document_id) / "FakeMetadata.ckpt").write_bytes(b"truncated")
+
+    step_name, result = asyncio.run(store.latest(run_id, document_id, ["FakePartition", "FakeMetadata"]))
+
+    assert step_name == "FakePartition"
+    assert result.data["extracted_pages"][1]["storage_path"].endswith("page_1.png")
+
+
+def test_checkpoint_store_from_config(tmp_path):
+    assert create_checkpoint_store({}) is None
+    store = create_checkpoint_store({"enabled": True, "backend": "local", "directory": str(tmp_path)})
+    assert isinstance(store, LocalCheckpointStore) and store.directory == tmp_path
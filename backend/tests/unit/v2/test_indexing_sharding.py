@@ -0,0 +1,140 @@
+import asyncio
+import os
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from src.pipeline.indexing.sharding import (
+    IndexingShard,
+    InMemoryShardLedger,
+    ShardCoordinator,
+    build_document_input,
+    find_stale_shards,
+    merge_document_results,
+    plan_shards,
+)
+
+
+class FakePipelineService:
+    def __init__(self):
+        self.statuses = []
+        self.step_results = []
+
+    async def update_indexing_run_status(self, indexing_run_id, status, error_message=None):
+        self.statuses.append((status, error_message))
+
+    async def store_step_result(self, indexing_run_id, step_name, step_result):
+        self.step_results.append((step_name, step_result.summary_stats))
+
+
+def fake_shard_runner(indexing_run_id, shard_payload, task_kwargs):
+    """Runs in a pool process: shard 1 crashes, document d3 fails, everything else succeeds"""
+    if shard_payload["index"] == 1:
+        raise RuntimeError("container preempted")
+    return {document_id: document_id != "d3" for document_id in shard_payload["document_ids"]} | {"pid": os.getpid()}
+
+
+def test_documents_are_balanced_and_giant_pdfs_split_by_pages():
+    documents = [{"id": f"d{i}", "page_count": pages} for i, pages in enumerate([120, 80, 60, 60, 40, 30, 30, 20])]
+    documents.append({"id": "giant", "page_count": 950})
+    documents.append({"id": "unknown", "file_size": 1_500_000})  # ~10 pages by size
+
+    shards = plan_shards(documents, max_shards=4, min_pages_per_shard=50, page_shard_threshold=400, pages_per_shard=200)
+
+    page_shards = [shard for shard in shards if shard.page_range]
+    document_shards = [shard for shard in shards if not shard.page_range]
+    assert [shard.page_range for shard in page_shards] == [(1, 200), (201, 400), (401, 600), (601, 800), (801, 950)]
+    assert len(document_shards) == 4
+    assert sorted(d for shard in document_shards for d in shard.document_ids) == sorted(
+        f"d{i}" for i in range(8)
+    ) + ["unknown"]
+    loads = [shard.estimated_pages for shard in document_shards]
+    assert max(loads) - min(loads) <= 40
+    assert [shard.index for shard in shards] == list(range(len(shards)))
+    assert IndexingShard.from_payload(page_shards[1].to_payload()) == page_shards[1]
+
+
+def test_small_runs_stay_in_one_shard():
+    shards = plan_shards([{"id": "a", "page_count": 12}, {"id": "b", "page_count": 20}], min_pages_per_shard=50)
+
+    assert len(shards) == 1 and sorted(shards[0].document_ids) == ["a", "b"]
+
+
+def test_page_sharded_document_needs_every_shard():
+    results = merge_document_results([
+        {"document_ids": ["big"], "status": "completed", "document_results": {"big": True}},
+        {"document_ids": ["big"], "status": "failed", "document_results": {}},
+        {"document_ids": ["a", "b"], "status": "completed", "document_results": {"a": True, "b": False}},
+    ])
+
+    assert results == {"big": False, "a": True, "b": False}
+
+
+def test_local_emulation_runs_shards_in_processes_and_finalizes_once():
+    shards = plan_shards([{"id": f"d{i}", "page_count": 60} for i in range(6)], max_shards=3)
+    pipeline_service = FakePipelineService()
+    ledger = InMemoryShardLedger()
+    coordinator = ShardCoordinator(ledger, pipeline_service)
+    run_id = str(uuid4())
+
+    outcome = asyncio.run(
+        coordinator.run_locally(run_id, shards, shard_runner=fake_shard_runner, mp_context="fork")
+    )
+
+    rows = asyncio.run(ledger.list_shards(run_id))
+    assert [row["status"] for row in rows] == ["completed", "failed", "completed"]
+    assert rows[1]["error_message"] == "container preempted"
+    assert {row["document_results"]["pid"] for row in rows if row["document_results"]} - {os.getpid()}
+    assert outcome is True
+    assert pipeline_service.statuses == [("completed", "3 of 6 documents failed")]
+    assert pipeline_service.step_results[0][1]["failed_shards"] == [1]
+
+    # A retried shard reporting again must not finalize the run a second time
+    assert asyncio.run(coordinator.complete_shard(run_id, 0, "completed", {})) is None
+    assert len(pipeline_service.statuses) == 1
+
+
+def test_document_input_carries_the_shard_page_range():
+    row = {"id": "7b1c0d58-1c1e-4f59-9a3a-0d0f3b0f2c11", "file_path": "p.pdf", "filename": "p.pdf"}
+
+    document_input = build_document_input(row, "1f0b7e1e-4d0a-4d38-9d6c-1c5d3c7b9a10", page_range=(201, 400))
+
+    assert document_input.page_range == (201, 400)
+    assert document_input.upload_type == "email"
+
+
+def test_lost_shards_are_reaped_and_the_last_one_finalizes_the_run():
+    shards = [IndexingShard(index, [f"d{index}"]) for index in range(3)]
+    pipeline_service = FakePipelineService()
+    ledger = InMemoryShardLedger()
+    coordinator = ShardCoordinator(ledger, pipeline_service)
+    run_id = str(uuid4())
+    asyncio.run(ledger.register(run_id, shards))
+    asyncio.run(ledger.mark_running(run_id, 0))
+    asyncio.run(ledger.mark_running(run_id, 1))
+    asyncio.run(coordinator.complete_shard(run_id, 0, "completed", {"d0": True}))
+    # Shard 1 was killed 20 minutes ago; shard 2 is still queued
+    ledger.shards[(run_id, 1)]["heartbeat_at"] = datetime.utcnow() - timedelta(minutes=20)
+
+    assert asyncio.run(coordinator.reap_stale_shards(run_id)) is None
+    assert asyncio.run(ledger.list_unfinished_runs()) == [run_id]
+
+    outcome = asyncio.run(coordinator.reap_stale_shards(run_id, now=datetime.utcnow() + timedelta(hours=5)))
+
+    rows = asyncio.run(ledger.list_shards(run_id))
+    assert [row["status"] for row in rows] == ["completed", "failed", "failed"]
+    assert "no heartbeat" in rows[1]["error_message"]
+    assert "never started" in rows[2]["error_message"]
+    assert outcome is True
+    assert pipeline_service.statuses == [("completed", "2 of 3 documents failed")]
+    assert asyncio.run(ledger.list_unfinished_runs()) == []
+
+
+def test_a_recent_heartbeat_keeps_a_shard_alive():
+    now = datetime(2025, 10, 26, 12, 0)
+    shards = [
+        {"shard_index": 0, "status": "running", "heartbeat_at": "2025-10-26T11:55:00+00:00"},
+        {"shard_index": 1, "status": "running", "started_at": "2025-10-26T13:30:00+02:00"},
+        {"shard_index": 2, "status": "completed", "heartbeat_at": "2025-10-26T08:00:00+00:00"},
+    ]
+
+    assert [shard["shard_index"] for shard in find_stale_shards(shards, now)] == [1]
@@ -0,0 +1,162 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
+
+import src.config.database as database
+import src.services.token_verifier as token_verifier
+from src.services.token_verifier import SupabaseTokenVerifier
+from src.utils.exceptions import AuthenticationError
+from src.utils.ttl_cache import TTLCache
+
+URL = "https://project.supabase.co"
+SECRET = "super-secret-jwt-token-with-at-least-32-characters"
+
+
+def _claims(**overrides):
+    claims = {
+        "sub": "user-1",
+        "email": "user@example.com",
+        "role": "authenticated",
+        "aud": "authenticated",
+        "iss": f"{URL}/auth/v1",
+        "exp": int(time.time()) + 3600,
+    }
+    claims.update(overrides)
+    return claims
+
+
+def _rsa_key(kid):
+    private = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = private.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+    public = jwk.construct(pem, "RS256").public_key().to_dict()
+    return pem, {**public, "kid": kid, "alg": "RS256"}
+
+
+class FakeProfiles:
+    def __init__(self):
+        self.queries = 0
+
+    def table(self, name):
+        return self
+
+    def select(self, columns):
+        return self
+
+    def eq(self, column, value):
+        return self
+
+    def execute(self):
+        self.queries += 1
+        return SimpleNamespace(data=[])
+
+
+@pytest.fixture
+def auth_service(monkeypatch):
+    monkeypatch.setenv("SUPABASE_URL", URL)
+    monkeypatch.setenv("SUPABASE_ANON_KEY", "anon")
+    monkeypatch.setenv("SUPABASE_SERVICE_ROLE_KEY", "service")
+    monkeypatch.setenv("SUPABASE_JWT_SECRET", SECRET)
+    database.reset_supabase_clients()
+    from src.services.auth_service import AuthService
+
+    service = AuthService()
+    service.supabase_client = FakeProfiles()
+    remote_calls = []
+
+    def get_user(token):
+        remote_calls.append(token)
+        return SimpleNamespace(user=SimpleNamespace(id="user-1", email="user@example.com"))
+
+    service.admin_client = SimpleNamespace(auth=SimpleNamespace(get_user=get_user))
+    service.remote_calls = remote_calls
+    yield service
+    database.reset_supabase_clients()
+
+
+def test_tokens_are_verified_locally_and_profiles_cached(auth_service):
+    token = jwt.encode(_claims(), SECRET, algorithm="HS256")
+
+    async def main():
+        return [await auth_service.get_current_user(token) for _ in range(3)]
+
+    users = asyncio.run(main())
+
+    assert [user["id"] for user in users] == ["user-1"] * 3
+    assert users[0]["email"] == "user@example.com"
+    assert auth_service.remote_calls == []
+    assert auth_service.supabase_client.queries == 1
+
+
+def test_verify_remote_asks_supabase_auth(auth_service):
+    token = jwt.encode(_claims(), SECRET, algorithm="HS256")
+
+    user = asyncio.run(auth_service.get_current_user(token, verify_remote=True))
+
+    assert user["id"] == "user-1"
+    assert auth_service.remote_calls == [token]
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        jwt.encode(_claims(exp=int(time.time()) - 10), SECRET, algorithm="HS256"),
+        jwt.encode(_claims(), "some-other-secret-with-at-least-32-characters", algorithm="HS256"),
+        jwt.encode(_claims(role="anon", sub=None), SECRET, algorithm="HS256"),
+        jwt.encode(_claims(iss="https://other.supabase.co/auth/v1"), SECRET, algorithm="HS256"),
+        "not-a-jwt",
+    ],
+    ids=["expired", "wrong-secret", "anon-key", "other-project", "malformed"],
+)
+def test_invalid_tokens_are_rejected_without_remote_fallback(auth_service, token):
+    with pytest.raises(AuthenticationError):
+        asyncio.run(auth_service.token_verifier.verify(token))
+
+    assert asyncio.run(auth_service.get_current_user(token)) is None
+    assert auth_service.remote_calls == []
+
+
+def test_jwks_is_cached_and_refetched_for_rotated_keys(monkeypatch):
+    monkeypatch.setattr(token_verifier, "MIN_JWKS_REFRESH_SECONDS", 0.0)
+    old_pem, old_jwk = _rsa_key("old")
+    new_pem, new_jwk = _rsa_key("new")
+    published = {"keys": [old_jwk]}
+    fetches = []
+
+    def fetch(url):
+        fetches.append(url)
+        return published
+
+    verifier = SupabaseTokenVerifier(supabase_url=URL, jwt_secret="", jwks_cache_seconds=600, fetch_jwks=fetch)
+    old_token = jwt.encode(_claims(), old_pem, algorithm="RS256", headers={"kid": "old"})
+    new_token = jwt.encode(_claims(sub="user-2"), new_pem, algorithm="RS256", headers={"kid": "new"})
+
+    assert asyncio.run(verifier.verify(old_token))["sub"] == "user-1"
+    assert asyncio.run(verifier.verify(old_token))["sub"] == "user-1"
+    assert fetches == [f"{URL}/auth/v1/.well-known/jwks.json"]
+
+    published["keys"] = [old_jwk, new_jwk]
+    assert asyncio.run(verifier.verify(new_token))["sub"] == "user-2"
+    assert len(fetches) == 2
+
+    # HS256 tokens can't be checked without the secret: the caller falls back to Supabase Auth
+    assert asyncio.run(verifier.verify(jwt.encode(_claims(), SECRET, algorithm="HS256"))) is None
+
+
+def test_ttl_cache_expires_and_evicts_least_recently_used():
+    now = [0.0]
+    cache = TTLCache(maxsize=2, ttl_seconds=10, clock=lambda: now[0])
+    cache.set("a", 1)
+    cache.set("b", None)
+    assert cache.get("a") == 1
+    cache.set("c", 3)  # evicts "b", the least recently used
+
+    assert cache.get("b", "missing") == "missing"
+    now[0] = 11
+    assert cache.get("a", "missing") == "missing"
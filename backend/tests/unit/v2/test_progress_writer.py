@@ -0,0 +1,173 @@
+import asyncio
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+
+from src.models import StepResult
+from src.pipeline.shared.progress_tracker import ProgressTracker
+from src.pipeline.shared.progress_writer import ProgressWriter
+from src.services.pipeline_service import PipelineService
+from src.utils.exceptions import DatabaseError
+
+
+def _merging_supabase(fake_supabase):
+    """Client whose merge_indexing_run_step_results rpc merges into ``db.step_results``."""
+
+    def respond(query):
+        if query.method == "rpc":
+            db.step_results = {**db.step_results, **query.payload["entries"]}
+            return dict(db.step_results)
+        return [{"id": 1}]
+
+    db = fake_supabase(respond=respond)
+    db.step_results = {"PartitionStep": {"status": "completed"}}
+    return db
+
+
+def _result(step, status="completed", **kwargs):
+    now = datetime.utcnow()
+    return StepResult(step=step, status=status, duration_seconds=1.0, started_at=now, completed_at=now, **kwargs)
+
+
+def test_step_results_of_concurrent_documents_are_batched(fake_supabase):
+    db = fake_supabase()
+    service = PipelineService(client=db)
+    first, second = uuid4(), uuid4()
+
+    async def run():
+        writer = ProgressWriter(db, interval_seconds=60)
+        for step in ("PartitionStep", "MetadataStep", "EnrichmentStep"):
+            for document_id in (first, second):
+                await service.store_document_step_result(document_id, step, _result(step), progress_writer=writer)
+        queued_writes = list(db.calls)
+        await writer.close()
+        return queued_writes
+
+    assert asyncio.run(run()) == []
+    assert db.writes() == [("document_step_results", "insert"), ("documents", "update"), ("documents", "update")]
+    rows = db.calls[0].payload
+    # Insert order is step order, so the latest-row view resolves as with per-step inserts
+    assert [(row["document_id"], row["step_name"]) for row in rows] == [
+        (str(document_id), step)
+        for step in ("PartitionStep", "MetadataStep", "EnrichmentStep")
+        for document_id in (first, second)
+    ]
+    assert db.calls[1].payload == {"indexing_status": "running"}
+
+
+def test_terminal_document_status_is_flushed_without_waiting_for_the_interval(fake_supabase):
+    db = fake_supabase()
+    service = PipelineService(client=db)
+
+    async def run():
+        writer = ProgressWriter(db, interval_seconds=60)
+        document_id = uuid4()
+        await service.store_document_step_result(
+            document_id, "PartitionStep", _result("partition"), progress_writer=writer
+        )
+        await service.store_document_step_result(
+            document_id,
+            "EnrichmentStep",
+            _result("enrichment", "failed", error_message="VLM down"),
+            progress_writer=writer,
+        )
+        await asyncio.sleep(0.2)
+        flushed = list(db.calls)
+        await writer.close()
+        return flushed
+
+    flushed = asyncio.run(run())
+    assert [(call.table, call.method) for call in flushed] == [
+        ("document_step_results", "insert"),
+        ("documents", "update"),
+    ]
+    assert len(flushed[0].payload) == 2
+    assert flushed[1].payload == {"indexing_status": "failed", "error_message": "VLM down"}
+
+
+def test_batch_step_entries_are_merged_into_one_run_update(fake_supabase):
+    db = _merging_supabase(fake_supabase)
+    run_id = uuid4()
+
+    async def run():
+        writer = ProgressWriter(db, interval_seconds=60)
+        tracker = ProgressTracker(run_id, db, progress_writer=writer)
+        await tracker.update_step_progress_async("EmbeddingStep", "running", _result("embedding", "running"))
+        await tracker.update_step_progress_async("EmbeddingStep", "completed", _result("embedding"))
+        await writer.close()
+
+    asyncio.run(run())
+
+    assert db.writes() == [("merge_indexing_run_step_results", "rpc")]
+    assert db.step_results["EmbeddingStep"]["status"] == "completed"
+    assert db.step_results["PartitionStep"] == {"status": "completed"}
+
+
+def test_shards_of_a_run_keep_their_own_run_step_entries(fake_supabase):
+    db = _merging_supabase(fake_supabase)
+    run_id = uuid4()
+
+    async def run():
+        for shard_index in (0, 1):
+            tracker = ProgressTracker(run_id, db, shard_index=shard_index)
+            await tracker.update_step_progress_async("EmbeddingStep", "completed", _result("embedding"))
+
+    asyncio.run(run())
+
+    # Merged in the database instead of read-modify-write, so neither shard's entry is lost
+    assert db.writes() == [("merge_indexing_run_step_results", "rpc")] * 2
+    assert {"EmbeddingStep:shard_0", "EmbeddingStep:shard_1", "PartitionStep"} == set(db.step_results)
+
+
+def test_failed_flush_is_retried(fake_supabase):
+    db = fake_supabase(fail_next=1)
+
+    async def run():
+        writer = ProgressWriter(db, interval_seconds=60)
+        writer.add_step_result({"document_id": "d1", "step_name": "PartitionStep"})
+        writer.update_document("d1", {"indexing_status": "running"})
+        await writer.close()
+        return writer.stats
+
+    stats = asyncio.run(run())
+
+    assert db.writes() == [("document_step_results", "insert"), ("documents", "update")]
+    assert stats["failed_flushes"] == 1
+
+
+def test_writers_of_concurrent_runs_on_one_service_stay_separate(fake_supabase):
+    first_db, second_db = fake_supabase(), fake_supabase()
+    service = PipelineService(client=fake_supabase())
+
+    async def run():
+        first, second = ProgressWriter(first_db, interval_seconds=60), ProgressWriter(second_db, interval_seconds=60)
+        await asyncio.gather(
+            service.store_document_step_result(uuid4(), "PartitionStep", _result("partition"), progress_writer=first),
+            service.store_document_step_result(uuid4(), "MetadataStep", _result("metadata"), progress_writer=second),
+        )
+        await asyncio.gather(first.close(), second.close())
+
+    asyncio.run(run())
+
+    assert [call.payload[0]["step_name"] for call in first_db.calls if call.method == "insert"] == ["PartitionStep"]
+    assert [call.payload[0]["step_name"] for call in second_db.calls if call.method == "insert"] == ["MetadataStep"]
+    assert service.supabase.calls == []
+
+
+def test_close_raises_instead_of_dropping_unwritten_progress(fake_supabase):
+    db = fake_supabase(fail_next=10)
+
+    async def run():
+        writer = ProgressWriter(db, interval_seconds=60, max_attempts=3)
+        writer.add_step_result({"document_id": "d1", "step_name": "PartitionStep"})
+        writer.update_document("d1", {"indexing_status": "running"})
+        with pytest.raises(DatabaseError, match="1 step results, 1 document"):
+            await writer.close()
+        return writer
+
+    writer = asyncio.run(run())
+
+    assert db.calls == []
+    # Nothing was silently discarded
+    assert writer.pending
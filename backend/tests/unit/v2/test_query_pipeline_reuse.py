@@ -0,0 +1,126 @@
+import asyncio
+import json
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from src.models import StepResult
+from src.pipeline.querying.models import QueryRequest, QueryResponse
+from src.pipeline.querying.orchestrator import QueryPipelineOrchestrator
+from src.pipeline.querying.steps.generation import ResponseGenerator
+from src.pipeline.querying.steps.query_processing import QueryProcessor
+from src.pipeline.querying.steps.retrieval import DocumentRetriever
+from src.services.config_service import ConfigService
+
+SOT = Path(__file__).resolve().parents[3] / "src" / "config" / "pipeline" / "pipeline_config.json"
+
+
+class FakeClient:
+    def __init__(self, name):
+        self.name = name
+        self.inserted = []
+
+    def table(self, name):
+        return self
+
+    def insert(self, row):
+        self.inserted.append(row)
+        return self
+
+    def execute(self):
+        return SimpleNamespace(data=[{"id": 1}])
+
+
+def _step(step, **sample_outputs):
+    now = datetime.utcnow()
+    return StepResult(
+        step=step,
+        status="completed",
+        duration_seconds=0.0,
+        started_at=now,
+        completed_at=now,
+        sample_outputs=sample_outputs,
+    )
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    monkeypatch.setenv("VOYAGE_API_KEY", "voyage-key")
+    seen = []
+
+    async def process(self, query):
+        return _step("query_processing", variations={"original": query})
+
+    async def retrieve(self, variations, indexing_run_id=None, allowed_document_ids=None, db_client=None):
+        seen.append(("retrieval", self, db_client))
+        return _step("retrieval", search_results=[])
+
+    async def generate(self, input_data, language=None):
+        seen.append(("generation", self, language, self.config.model))
+        response = QueryResponse(response="svar", search_results=[], performance_metrics={})
+        return _step("generation", response=response.model_dump())
+
+    monkeypatch.setattr(QueryProcessor, "execute", process)
+    monkeypatch.setattr(DocumentRetriever, "execute", retrieve)
+    monkeypatch.setattr(ResponseGenerator, "execute", generate)
+    return seen
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    path = tmp_path / "pipeline_config.json"
+    shutil.copy(SOT, path)
+    return path
+
+
+def _set_generation_model(path, model, mtime):
+    cfg = json.loads(path.read_text())
+    cfg["query"]["generation"]["model"] = model
+    path.write_text(json.dumps(cfg))
+    os.utime(path, (mtime, mtime))
+
+
+def test_one_pipeline_serves_requests_with_their_own_client_and_language(calls, config_path):
+    default = FakeClient("admin")
+    pipeline = QueryPipelineOrchestrator(db_client=default, config_service=ConfigService(config_path))
+    alice, anon = FakeClient("alice"), FakeClient("anon")
+
+    async def main():
+        await asyncio.gather(
+            pipeline.process_query(QueryRequest(query="Hvad er brandkravene?"), language="danish", db_client=alice),
+            pipeline.process_query(QueryRequest(query="What are the fire rules?"), language="english", db_client=anon),
+        )
+
+    asyncio.run(main())
+
+    retrievals = [call for call in calls if call[0] == "retrieval"]
+    generations = [call for call in calls if call[0] == "generation"]
+    assert {call[1] for call in retrievals} == {pipeline.retriever}
+    assert [call[2] for call in retrievals] == [alice, anon]
+    assert [call[2] for call in generations] == ["danish", "english"]
+    assert len(alice.inserted) == len(anon.inserted) == 1
+    assert default.inserted == []
+
+
+def test_config_edits_are_picked_up_by_mtime(calls, config_path):
+    pipeline = QueryPipelineOrchestrator(db_client=FakeClient("admin"), config_service=ConfigService(config_path))
+    generator = pipeline.generator
+
+    asyncio.run(pipeline.process_query(QueryRequest(query="q")))
+    assert pipeline.generator is generator  # unchanged file: steps are reused
+
+    _set_generation_model(config_path, "new/model", mtime=config_path.stat().st_mtime + 10)
+    asyncio.run(pipeline.process_query(QueryRequest(query="q")))
+
+    assert pipeline.generator is not generator
+    assert calls[-1][3] == "new/model"
+
+    config_path.write_text("{ not json")
+    os.utime(config_path, (config_path.stat().st_mtime + 20,) * 2)
+    asyncio.run(pipeline.process_query(QueryRequest(query="q")))
+
+    assert calls[-1][3] == "new/model"  # broken edit keeps the last good config
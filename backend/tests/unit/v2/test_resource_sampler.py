@@ -0,0 +1,123 @@
+import asyncio
+import time
+from datetime import datetime
+
+import src.utils.resource_monitor as resource_monitor
+from src.models import StepResult
+from src.pipeline.indexing.orchestrator import IndexingOrchestrator
+from src.pipeline.shared.base_step import PipelineStep
+from src.pipeline.shared.progress_tracker import ProgressTracker
+from src.utils.resource_monitor import ResourceSampler
+
+
+class AllocatingStep(PipelineStep):
+    async def execute(self, input_data):
+        started = datetime.utcnow()
+        buffer = bytearray(input_data * 1024 * 1024)
+        await asyncio.sleep(0.2)
+        del buffer
+        return StepResult(step="alloc", status="completed", duration_seconds=0.2, started_at=started)
+
+    async def validate_prerequisites_async(self, input_data):
+        return True
+
+    def estimate_duration(self, input_data):
+        return 1
+
+
+def _sampler_with(samples):
+    sampler = ResourceSampler(interval_seconds=10, capacity=4)
+    sampler._samples.extend(samples)
+    return sampler
+
+
+def test_ring_buffer_keeps_latest_samples():
+    sampler = _sampler_with([(float(t), 10.0, 100 * 1024 * 1024, 5, 3) for t in range(10)])
+
+    assert [sample[0] for sample in sampler._snapshot()] == [6.0, 7.0, 8.0, 9.0]
+
+
+def test_window_reports_mean_p95_and_peak():
+    mb = 1024 * 1024
+    sampler = _sampler_with([(1.0, 10.0, 100 * mb, 5, 3), (2.0, 30.0, 300 * mb, 7, 4), (3.0, 90.0, 50 * mb, 9, 4)])
+
+    window = sampler.window(1.5, 3.5)
+
+    assert window["samples"] == 2
+    assert window["cpu_percent"] == {"mean": 60.0, "p95": 90.0, "peak": 90.0}
+    assert window["rss_mb"]["peak"] == 300.0
+    assert window["open_fds"]["mean"] == 8.0
+
+
+def test_short_window_falls_back_to_previous_sample():
+    sampler = _sampler_with([(1.0, 10.0, 1024 * 1024, 5, 3)])
+
+    assert sampler.window(1.2, 1.3)["samples"] == 1
+    assert sampler.window(0.1, 0.5)["samples"] == 0
+
+
+def test_export_downsamples_timeseries():
+    sampler = ResourceSampler(capacity=100)
+    sampler._samples.extend((float(t), 1.0, 1024 * 1024, 1, 1) for t in range(100))
+
+    series = sampler.export(max_points=10)
+
+    assert len(series) == 10
+    assert series[1]["t"] == 10.0
+    assert set(series[0]) == {"t", "cpu_percent", "rss_mb", "open_fds", "threads"}
+
+
+def test_step_results_carry_resource_window(monkeypatch):
+    sampler = ResourceSampler(interval_seconds=0.02).start()
+    monkeypatch.setattr(resource_monitor, "_sampler", sampler)
+    try:
+        result = asyncio.run(AllocatingStep({}).execute(64))
+    finally:
+        sampler.stop()
+
+    usage = result.resource_usage
+    assert usage["samples"] >= 3
+    assert usage["rss_mb"]["peak"] >= usage["rss_mb"]["mean"] > 0
+    assert usage["threads"]["peak"] >= 2  # main thread + sampler
+
+
+def test_no_window_without_running_sampler(monkeypatch):
+    monkeypatch.setattr(resource_monitor, "_sampler", None)
+    start = time.perf_counter()
+
+    result = asyncio.run(AllocatingStep({}).execute(1))
+
+    assert result.resource_usage is None
+    assert time.perf_counter() - start < 1
+
+
+def test_run_step_result_keeps_mean_and_peak_and_the_time_series_is_stored_apart():
+    class FakePipelineService:
+        def __init__(self):
+            self.step_results = {}
+            self.timeseries = []
+
+        async def store_step_result(self, indexing_run_id, step_name, step_result):
+            self.step_results[step_name] = step_result.summary_stats
+
+        async def store_resource_timeseries(self, indexing_run_id, points, shard_index=None):
+            self.timeseries.append((shard_index, points))
+
+    now = time.monotonic()
+    sampler = _sampler_with([(now - 2 + i, 10.0 * i, (100 + i) * 1024**2, 8, 4) for i in range(3)])
+    orchestrator = IndexingOrchestrator.__new__(IndexingOrchestrator)
+    orchestrator.pipeline_service = FakePipelineService()
+
+    asyncio.run(
+        orchestrator._store_resource_usage(
+            "run", ProgressTracker("run", shard_index=2), sampler, now - 3, datetime.utcnow()
+        )
+    )
+
+    summary = orchestrator.pipeline_service.step_results["resource_usage:shard_2"]
+    assert summary["samples"] == 3
+    assert summary["rss_mb"] == {"mean": 101.0, "peak": 102.0}
+    assert "timeseries" not in summary
+    [(shard_index, points)] = orchestrator.pipeline_service.timeseries
+    assert shard_index == 2
+    assert [point["rss_mb"] for point in points] == [100.0, 101.0, 102.0]
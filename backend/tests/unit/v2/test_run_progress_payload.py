@@ -0,0 +1,49 @@
+import os
+
+# Ensure minimal env so importing src.api.* does not fail on settings
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_ANON_KEY", "test-anon-key")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "test-service-key")
+
+from src.api.pipeline import _count_completed_run_steps, _group_shard_step_results
+from src.pipeline.shared.progress_tracker import ProgressTracker
+
+
+def test_shard_entries_are_nested_under_their_step():
+    tracker = ProgressTracker("run", shard_index=1)
+    step_results = {
+        "embedding:shard_0": {"status": "completed", "duration_seconds": 3.0},
+        tracker.run_step_key("embedding"): {"status": "running"},
+        "sharding": {"status": "completed", "summary_stats": {"shards": 2}},
+    }
+
+    grouped = _group_shard_step_results(step_results)
+
+    assert set(grouped) == {"embedding", "sharding"}
+    assert grouped["embedding"]["status"] == "running"
+    assert grouped["embedding"]["shards"] == {
+        "0": {"status": "completed", "duration_seconds": 3.0},
+        "1": {"status": "running"},
+    }
+    assert grouped["sharding"] == step_results["sharding"]
+
+
+def test_grouped_step_fails_if_any_shard_failed():
+    grouped = _group_shard_step_results({
+        "embedding:shard_0": {"status": "completed"},
+        "embedding:shard_1": {"status": "failed"},
+    })
+
+    assert grouped["embedding"]["status"] == "failed"
+
+
+def test_run_diagnostics_do_not_count_as_run_steps():
+    completed = {"status": "completed"}
+    step_results = _group_shard_step_results({
+        "admission:shard_0": completed,
+        "resource_usage:shard_0": completed,
+        "sharding": completed,
+    })
+
+    assert _count_completed_run_steps(step_results) == 0
+    assert _count_completed_run_steps({**step_results, "embedding": completed}) == 1
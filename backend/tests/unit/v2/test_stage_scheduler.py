@@ -0,0 +1,139 @@
+import asyncio
+import os
+import pickle
+import time
+from datetime import datetime
+
+from src.models import StepResult
+from src.pipeline.indexing.element_store import TextElementStore
+from src.pipeline.indexing.orchestrator import IndexingOrchestrator
+from src.pipeline.indexing.scheduler import CPU_STAGE, IO_STAGE, StageScheduler, run_partition_in_process
+from src.services.storage_client_resolver import StorageClientResolver
+from src.services.storage_service import StorageService
+
+
+def _result(step):
+    now = datetime.utcnow()
+    return StepResult(step=step, status="completed", duration_seconds=0.0, data={}, started_at=now, completed_at=now)
+
+
+class FakeStep:
+    def __init__(self, name, seconds, blocking, log):
+        self.name = name
+        self.seconds = seconds
+        self.blocking = blocking
+        self.log = log
+
+    def get_step_name(self):
+        return self.name
+
+    async def validate_prerequisites_async(self, input_data):
+        return True
+
+    async def execute(self, input_data):
+        self.log.append((self.name, "start", time.perf_counter()))
+        if self.blocking:
+            await asyncio.to_thread(time.sleep, self.seconds)
+        else:
+            await asyncio.sleep(self.seconds)
+        self.log.append((self.name, "end", time.perf_counter()))
+        return _result(self.name)
+
+
+class PartitionStep(FakeStep):
+    pass
+
+
+class EnrichmentStep(FakeStep):
+    pass
+
+
+def test_steps_are_classified_by_resource():
+    assert StageScheduler.stage_of(PartitionStep("p", 0, False, [])) == CPU_STAGE
+    assert StageScheduler.stage_of(EnrichmentStep("e", 0, False, [])) == IO_STAGE
+
+
+def test_io_waits_do_not_hold_cpu_slots():
+    log = []
+    partition = PartitionStep("PartitionStep", 0.05, True, log)
+    enrichment = EnrichmentStep("EnrichmentStep", 0.3, False, log)
+
+    async def document(scheduler):
+        for step in (partition, enrichment):
+            await scheduler.run(scheduler.stage_of(step), lambda step=step: step.execute(None))
+
+    async def main():
+        scheduler = StageScheduler(cpu_workers=1, io_concurrency=8, use_process_pool=False)
+        start = time.perf_counter()
+        await asyncio.gather(*(document(scheduler) for _ in range(6)))
+        return scheduler, time.perf_counter() - start
+
+    scheduler, elapsed = asyncio.run(main())
+    summary = scheduler.summary()
+
+    # One CPU slot: partitions run one at a time, while enrichments of earlier documents overlap them
+    assert summary["max_cpu_active"] == 1
+    assert summary["max_io_active"] >= 3
+    assert summary["overlap_seconds"] > 0.1
+    # A whole-document slot would need 6 x (0.05 + 0.3) = 2.1s
+    assert elapsed < 1.2
+
+
+def test_process_pool_runs_outside_main_process():
+    async def main():
+        scheduler = StageScheduler(cpu_workers=2, io_concurrency=2)
+        try:
+            return await asyncio.gather(*(scheduler.run_in_process(os.getpid) for _ in range(2))), scheduler
+        finally:
+            scheduler.close()
+
+    pids, scheduler = asyncio.run(main())
+
+    assert os.getpid() not in pids
+    assert scheduler.stats["process_pool_tasks"] == 2
+
+
+def test_partition_output_survives_process_boundary():
+    store = TextElementStore()
+    store.append("t1", "NarrativeText", 1, "Tekst", (0, 0, 10, 10), 10.0, "Helvetica", False, "pymupdf_text")
+    store.append("t2", "Title", 2, "Afsnit", (0, 0, 10, 10), 14.0, "Helvetica", True, "pymupdf_text")
+    store[1]["structural_metadata"] = {"section_title_inherited": "Afsnit"}
+
+    copy = pickle.loads(pickle.dumps(store))
+
+    assert copy.to_dicts() == store.to_dicts()
+    assert "structural_metadata" not in copy[0]
+
+
+def test_orchestrator_creates_scheduler_from_config():
+    orchestrator = IndexingOrchestrator.__new__(IndexingOrchestrator)
+    orchestrator.orchestration_config = {"scheduler": {"enabled": True, "cpu_workers": 3, "io_concurrency": 20}}
+
+    scheduler = orchestrator._create_stage_scheduler()
+
+    assert (scheduler.cpu_workers, scheduler.io_concurrency) == (3, 20)
+    orchestrator.orchestration_config = {}
+    assert orchestrator._create_stage_scheduler() is None
+
+
+def test_partition_worker_rebuilds_the_orchestrators_storage_service(monkeypatch):
+    credentials = {"url": "http://localhost:54321", "service_role_key": "service.role.key", "anon_key": "anon.key.x"}
+    storage = StorageService(
+        bucket_name="pipeline-assets-test", resolver=StorageClientResolver.from_credentials(credentials)
+    )
+    created = []
+
+    class RecordingPartitionStep(PartitionStep):
+        def __init__(self, config, storage_service=None):
+            super().__init__("PartitionStep", 0, False, [])
+            created.append(storage_service)
+
+    monkeypatch.setattr("src.pipeline.indexing.steps.partition.PartitionStep", RecordingPartitionStep)
+
+    settings = pickle.loads(pickle.dumps(storage.worker_settings()))
+    result = run_partition_in_process({}, None, settings)
+
+    assert result.status == "completed"
+    worker_storage = created[0]
+    assert worker_storage.bucket_name == "pipeline-assets-test"
+    assert worker_storage._resolver.credentials() == credentials
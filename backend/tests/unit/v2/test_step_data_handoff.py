@@ -0,0 +1,59 @@
+import pytest
+
+from src.pipeline.indexing.models import (
+    ChunkingData,
+    EnrichmentData,
+    as_chunking_data,
+    as_enrichment_data,
+    as_metadata_data,
+    as_partition_data,
+)
+
+
+def _partition_result():
+    return {
+        "text_elements": [{"id": "t1", "page": 1, "text": "Tag", "metadata": {"page_number": 1}}],
+        "table_elements": [],
+        "extracted_pages": {1: {"filepath": "/tmp/p1.png"}},
+        "page_analysis": {1: {"needs_extraction": True}},
+        "metadata": {"processing_strategy": "pymupdf_only"},
+    }
+
+
+def test_handoff_shares_elements_without_copying():
+    raw = _partition_result()
+    data = as_partition_data(raw)
+
+    assert data.text_elements is raw["text_elements"]
+    assert data.text_elements[0] is raw["text_elements"][0]
+    assert data.extracted_pages is raw["extracted_pages"]
+    # Missing fields get empty defaults, existing keys and plain dict access keep working
+    assert data.document_metadata == {}
+    assert data.get("metadata")["processing_strategy"] == "pymupdf_only"
+    assert isinstance(data, dict)
+
+
+def test_handoff_through_steps_keeps_identity():
+    raw = _partition_result()
+    data = as_enrichment_data(as_metadata_data(as_partition_data(raw)))
+
+    assert isinstance(data, EnrichmentData)
+    assert data.page_sections == {}
+    assert data.text_elements is raw["text_elements"]
+    assert as_enrichment_data(data) is data
+
+
+def test_handoff_rejects_wrong_shape():
+    with pytest.raises(ValueError, match="text_elements"):
+        as_partition_data({"text_elements": {"not": "a list"}})
+    with pytest.raises(ValueError):
+        as_metadata_data(["not", "a", "dict"])
+
+
+def test_chunking_handoff_accepts_list():
+    chunks = [{"chunk_id": "c1", "content": "x"}]
+    data = as_chunking_data(chunks)
+
+    assert isinstance(data, ChunkingData)
+    assert data.chunks is chunks
+    assert data.chunking_metadata == {}
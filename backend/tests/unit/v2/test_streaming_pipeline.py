@@ -0,0 +1,213 @@
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import Mock
+from uuid import uuid4
+
+import fitz
+
+from src.models import StepResult
+from src.models.pipeline import UploadType
+from src.pipeline.indexing.steps.partition import PartitionStep
+from src.pipeline.indexing.streaming import StreamingDocumentProcessor
+from src.pipeline.shared.models import DocumentInput
+
+
+def _result(step, data=None, status="completed", **stats):
+    now = datetime.utcnow()
+    return StepResult(
+        step=step,
+        status=status,
+        duration_seconds=0.01,
+        summary_stats=stats,
+        data=data,
+        started_at=now,
+        completed_at=now,
+    )
+
+
+class FakePartition:
+    def __init__(self, events, windows):
+        self.events = events
+        self.windows = windows
+
+    def get_step_name(self):
+        return "PartitionStep"
+
+    async def iter_page_windows(self, document_input, page_window):
+        for index in range(self.windows):
+            await asyncio.sleep(0)
+            self.events.append(f"partition:{index}")
+            yield {
+                "text_elements": [
+                    {"id": f"t{index}", "category": "NarrativeText", "page": index + 1, "text": f"Side {index + 1}",
+                     "metadata": {"page_number": index + 1}}
+                ],
+                "table_elements": [],
+                "extracted_pages": {},
+                "page_analysis": {index + 1: {}},
+                "metadata": {},
+                "page_window": {"index": index},
+            }
+
+
+class FakeEnrichment:
+    def get_step_name(self):
+        return "EnrichmentStep"
+
+    async def execute(self, data):
+        return _result("enrichment", data=data, tables_processed=0)
+
+
+class FakeChunking:
+    def __init__(self, events, fail_on=None):
+        self.events = events
+        self.fail_on = fail_on
+
+    def get_step_name(self):
+        return "ChunkingStep"
+
+    async def execute(self, data, indexing_run_id, document_id):
+        page = data["text_elements"][0]["page"]
+        if page == self.fail_on:
+            raise RuntimeError("chunking exploded")
+        self.events.append(f"chunk:{page - 1}")
+        return _result("chunking", data={"chunks": [{"id": f"row-{page}", "content": f"Side {page}"}]},
+                       total_chunks_created=1)
+
+
+class FakeEmbedding:
+    resume_capability = True
+
+    def __init__(self, events):
+        self.events = events
+        self.inputs = []
+
+    def get_step_name(self):
+        return "EmbeddingStep"
+
+    async def execute(self, data, indexing_run_id=None, document_id=None):
+        self.events.append("embed")
+        self.inputs.append(data)
+        return _result("embedding", embeddings_generated=1)
+
+
+class FakePipelineService:
+    def __init__(self):
+        self.stored = {}
+
+    async def store_document_step_result(
+        self, document_id, step_name, step_result, indexing_run_id=None, progress_writer=None
+    ):
+        self.stored[step_name] = step_result
+        return True
+
+
+def _processor(events, pipeline_service, windows=6, fail_on=None):
+    metadata_step = SimpleNamespace(config={}, storage_client=None, tracker=None, storage_service=Mock())
+    return StreamingDocumentProcessor(
+        partition_step=FakePartition(events, windows),
+        metadata_step=metadata_step,
+        enrichment_step=FakeEnrichment(),
+        chunking_step=FakeChunking(events, fail_on=fail_on),
+        embedding_step=FakeEmbedding(events),
+        pipeline_service=pipeline_service,
+        page_window=1,
+        max_windows_in_flight=1,
+    )
+
+
+def _document(file_path="/tmp/x.pdf"):
+    return DocumentInput(
+        document_id=uuid4(),
+        run_id=uuid4(),
+        user_id=uuid4(),
+        file_path=file_path,
+        filename="x.pdf",
+        upload_type=UploadType.USER_PROJECT,
+    )
+
+
+def test_first_window_is_embedded_before_last_window_is_partitioned():
+    events = []
+    service = FakePipelineService()
+
+    ok = asyncio.run(_processor(events, service).process(_document(), uuid4()))
+
+    assert ok is True
+    assert events.index("chunk:0") < events.index("partition:5")
+    assert events.index("embed") < events.index("partition:5")
+    assert list(service.stored) == ["PartitionStep", "MetadataStep", "EnrichmentStep", "ChunkingStep", "EmbeddingStep"]
+    assert service.stored["ChunkingStep"].summary_stats["total_chunks_created"] == 6
+    assert service.stored["PartitionStep"].summary_stats["streaming_windows"] == 6
+    assert service.stored["EmbeddingStep"].summary_stats["first_chunk_searchable_seconds"] is not None
+
+
+def test_each_window_embeds_only_the_chunks_it_stored():
+    events = []
+    processor = _processor(events, FakePipelineService(), windows=3)
+
+    assert asyncio.run(processor.process(_document(), uuid4())) is True
+
+    # Never None: reading the document's unembedded chunks would pick up other page shards' chunks
+    assert processor.embedding_step.inputs == [
+        {"chunks": [{"id": f"row-{page}", "content": f"Side {page}"}]} for page in (1, 2, 3)
+    ]
+
+
+def test_window_failure_stops_pipeline_and_stores_failed_step():
+    events = []
+    service = FakePipelineService()
+
+    ok = asyncio.run(_processor(events, service, fail_on=3).process(_document(), uuid4()))
+
+    assert ok is False
+    assert service.stored["ChunkingStep"].status == "failed"
+    assert "chunking exploded" in service.stored["ChunkingStep"].error_message
+    assert "EmbeddingStep" not in service.stored
+
+
+def test_partition_step_yields_page_windows(tmp_path):
+    pdf_path = tmp_path / "spec.pdf"
+    doc = fitz.open()
+    for page_number in range(1, 6):
+        page = doc.new_page(width=595, height=842)
+        page.insert_textbox(fitz.Rect(40, 40, 555, 800), f"Afsnit {page_number}. " + "Beskrivelse af arbejdet. " * 30)
+    doc.save(str(pdf_path))
+    doc.close()
+
+    step = PartitionStep({"ocr_strategy": "pymupdf_only"}, storage_service=Mock())
+    document_input = _document(str(pdf_path))
+
+    async def collect():
+        return [window async for window in step.iter_page_windows(document_input, page_window=2)]
+
+    windows = asyncio.run(collect())
+
+    assert [w["page_window"]["start_page"] for w in windows] == [1, 3, 5]
+    assert windows[0]["page_window"]["total_windows"] == 3
+    assert {el["page"] for el in windows[1]["text_elements"]} == {3, 4}
+    assert set(windows[2]["page_analysis"]) == {5}
+
+
+def test_partition_step_windows_only_the_shard_page_range(tmp_path):
+    pdf_path = tmp_path / "spec.pdf"
+    doc = fitz.open()
+    for page_number in range(1, 8):
+        page = doc.new_page(width=595, height=842)
+        page.insert_textbox(fitz.Rect(40, 40, 555, 800), f"Afsnit {page_number}. " + "Beskrivelse af arbejdet. " * 30)
+    doc.save(str(pdf_path))
+    doc.close()
+
+    step = PartitionStep({"ocr_strategy": "pymupdf_only"}, storage_service=Mock())
+    document_input = _document(str(pdf_path))
+    document_input.page_range = (3, 6)
+
+    async def collect():
+        return [window async for window in step.iter_page_windows(document_input, page_window=3)]
+
+    windows = asyncio.run(collect())
+
+    assert [(w["page_window"]["start_page"], w["page_window"]["end_page"]) for w in windows] == [(3, 5), (6, 6)]
+    assert windows[0]["page_window"]["total_windows"] == 2
+    assert {el["page"] for window in windows for el in window["text_elements"]} == {3, 4, 5, 6}
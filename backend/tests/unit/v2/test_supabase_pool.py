@@ -0,0 +1,94 @@
+import json
+
+import httpx
+import pytest
+
+import src.config.database as database
+from src.config.database import (
+    PooledClient,
+    ScopedClient,
+    check_supabase_health,
+    get_supabase_admin_client,
+    get_supabase_client,
+    get_supabase_client_for_token,
+)
+
+SERVICE_KEY = "service.role.key"
+ANON_KEY = "anon.public.key"
+
+
+@pytest.fixture
+def requests(monkeypatch):
+    """Point the shared pool at an in-memory transport that records requests"""
+    monkeypatch.setenv("SUPABASE_URL", "https://project.supabase.co")
+    monkeypatch.setenv("SUPABASE_ANON_KEY", ANON_KEY)
+    monkeypatch.setenv("SUPABASE_SERVICE_ROLE_KEY", SERVICE_KEY)
+    database.reset_supabase_clients()
+
+    seen = []
+
+    def handler(request):
+        seen.append(request)
+        if request.url.path.endswith("/broken"):
+            return httpx.Response(500, json={"message": "boom", "code": "XX000"})
+        return httpx.Response(200, json=[{"id": 1}])
+
+    database._get_transport()  # load pool settings from the environment
+    database._transport = httpx.MockTransport(handler)
+    yield seen
+    database.reset_supabase_clients()
+
+
+def test_admin_client_is_built_once_and_pooled(requests):
+    admin = get_supabase_admin_client()
+
+    assert get_supabase_admin_client() is admin
+    assert isinstance(admin, PooledClient)
+    assert admin.postgrest.session._transport is database._transport
+
+    admin.table("documents").select("id").execute()
+    admin.table("indexing_runs").select("id").execute()
+
+    assert [request.url.path for request in requests] == ["/rest/v1/documents", "/rest/v1/indexing_runs"]
+    assert requests[0].headers["Authorization"] == f"Bearer {SERVICE_KEY}"
+
+
+def test_scoped_clients_carry_the_callers_token_without_touching_shared_clients(requests):
+    alice = get_supabase_client_for_token("alice.jwt.token")
+    bob = get_supabase_client_for_token("bob.jwt.token")
+
+    alice.table("documents").select("id").execute()
+    bob.rpc("match_chunks", {"match_count": 5}).execute()
+    get_supabase_client().table("documents").select("id").execute()
+
+    assert isinstance(alice, ScopedClient)
+    assert alice.postgrest.session._transport is bob.postgrest.session._transport is database._transport
+    assert [request.headers["Authorization"] for request in requests] == [
+        "Bearer alice.jwt.token",
+        "Bearer bob.jwt.token",
+        f"Bearer {ANON_KEY}",
+    ]
+    assert requests[1].url.path == "/rest/v1/rpc/match_chunks"
+    assert json.loads(requests[1].content) == {"match_count": 5}
+    assert all(request.headers["apikey"] == ANON_KEY for request in requests)
+
+
+def test_missing_token_falls_back_to_anon_client(requests):
+    assert get_supabase_client_for_token(None) is get_supabase_client()
+
+
+def test_health_check_reports_latency_and_failures(requests, monkeypatch):
+    health = check_supabase_health()
+
+    assert health["healthy"] is True
+    assert health["latency_ms"] >= 0
+    assert health["pool_size"] == 20
+
+    def broken_table(name):
+        return get_supabase_client().table("broken")
+
+    monkeypatch.setattr(get_supabase_admin_client(), "table", broken_table)
+    health = check_supabase_health()
+
+    assert health["healthy"] is False
+    assert "boom" in health["error"]
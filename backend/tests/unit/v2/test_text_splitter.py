@@ -0,0 +1,70 @@
+import random
+
+import pytest
+
+from src.pipeline.indexing.steps.chunking import IntelligentChunker
+from src.pipeline.indexing.text_splitter import RecursiveTextSplitter
+
+langchain_splitters = pytest.importorskip("langchain_text_splitters")
+
+PARAGRAPH = (
+    "Entreprenøren skal levere og montere præfabrikerede betonelementer i henhold til DS/EN 13369.\n"
+    "Elementerne skal være armeret med B550 og udføres i eksponeringsklasse XC3.  "
+    "Samlinger udstøbes med fugebeton, jf. afsnit 4.2.\n\n"
+)
+
+ATOMS = ["\n\n", "\n", " ", "  ", "\t", "ord", "Tegl", "betonelementer,", "DS/EN", "13369.", "æøå", "x" * 60, "§ 4.2"]
+
+
+def _corpus(count=400, seed=7):
+    rng = random.Random(seed)
+    texts = [PARAGRAPH * 12, "", "   \n\n  ", "x" * 3000, "ord " * 900]
+    for _ in range(count):
+        texts.append("".join(rng.choice(ATOMS) for _ in range(rng.randint(1, 500))))
+    return texts
+
+
+@pytest.mark.parametrize(
+    "chunk_size,chunk_overlap,separators",
+    [
+        (1000, 200, ["\n\n", "\n", " ", ""]),
+        (100, 20, ["\n\n", "\n", " ", ""]),
+        (50, 50, ["\n\n", "\n", " "]),
+        (30, 0, ["\n", ""]),
+        (200, 40, [". ", "ord", ""]),
+    ],
+)
+def test_output_is_identical_to_langchain(chunk_size, chunk_overlap, separators):
+    reference = langchain_splitters.RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        separators=separators,
+        length_function=len,
+        is_separator_regex=False,
+    )
+    splitter = RecursiveTextSplitter(chunk_size, chunk_overlap, separators)
+
+    for text in _corpus():
+        assert splitter.split_text(text) == reference.split_text(text)
+
+
+def test_chunker_splits_oversized_chunks_with_own_metadata():
+    chunker = IntelligentChunker(
+        {
+            "strategy": "semantic",
+            "chunk_size": 300,
+            "overlap": 50,
+            "max_chunk_size": 400,
+            "separators": ["\n\n", "\n", " ", ""],
+        }
+    )
+    chunk = {"chunk_id": "c1", "content": PARAGRAPH * 4, "metadata": {"bbox": [1, 2, 3, 4], "page_number": 2}}
+
+    split_chunks, stats = chunker.apply_semantic_text_splitting_to_chunks([chunk])
+
+    assert stats["chunks_split"] == 1
+    assert [c["content"] for c in split_chunks] == chunker.text_splitter.split_text(chunk["content"])
+    assert [c["chunk_id"] for c in split_chunks][:2] == ["c1_split_0", "c1_split_1"]
+    assert all(c["metadata"]["bbox"] == [1, 2, 3, 4] for c in split_chunks)
+    assert len({id(c["metadata"]) for c in split_chunks}) == len(split_chunks)
+    assert "is_semantic_split" not in chunk["metadata"]
@@ -0,0 +1,78 @@
+import asyncio
+import math
+
+import httpx
+
+from src.pipeline.indexing.steps.embedding import VoyageEmbeddingClient
+from src.pipeline.indexing.token_counter import TokenCounter, count_pieces
+
+DANISH = "Entreprenøren skal levere betonelementer i henhold til DS/EN 13369, inkl. armering (B550)."
+
+
+def _client(counter=None):
+    return VoyageEmbeddingClient(api_key="test", model="voyage-multilingual-2", token_counter=counter or TokenCounter())
+
+
+def test_calibration_converges_to_billed_usage():
+    counter = TokenCounter(safety_margin=1.0)
+    pieces = count_pieces(DANISH)
+
+    counter.observe([DANISH], actual_tokens=pieces * 2)
+    assert counter.tokens_per_piece == 2.0
+
+    for _ in range(30):
+        counter.observe([DANISH] * 3, actual_tokens=pieces * 3)
+    assert abs(counter.tokens_per_piece - 1.0) < 0.01
+    assert counter.count(DANISH) in (pieces, pieces + 1)
+
+
+def test_cached_piece_counts_follow_the_current_calibration():
+    counter = TokenCounter(safety_margin=1.0)
+    pieces = count_pieces(DANISH)
+    at_chunking = counter.count_from_pieces(pieces)
+
+    counter.observe([DANISH], actual_tokens=pieces * 3)
+
+    assert at_chunking == math.ceil(pieces * 1.6)
+    assert counter.count_from_pieces(pieces) == counter.count(DANISH) == pieces * 3
+    assert counter.count_from_pieces(None) is None
+
+
+def test_estimate_is_tighter_than_character_heuristic():
+    counter = TokenCounter()
+    text = DANISH * 20
+
+    # The old 1.8 x characters estimate overcounted several-fold and split batches early
+    assert counter.count(text) < len(text) * 1.8 / 3
+
+
+def test_cached_token_counts_drive_batch_split():
+    client = _client()
+    texts = ["a", "b", "c", "d"]
+
+    batches = client.split_batch_by_tokens(texts, max_tokens=100, token_counts=[60, 30, None, 90])
+
+    assert batches == [["a", "b", "c"], ["d"]]
+    planned = client.plan_batches(texts, batch_size=2, token_counts=[60, 30, 5, 90])
+    assert planned == [(["a", "b"], 90), (["c", "d"], 95)]
+
+
+def test_token_limit_rejection_splits_batch_in_half():
+    client = _client()
+    sent = []
+
+    async def fake_post(batch_texts):
+        sent.append(list(batch_texts))
+        if len(batch_texts) > 2:
+            request = httpx.Request("POST", client.base_url)
+            response = httpx.Response(400, text="max allowed tokens per submitted batch exceeded", request=request)
+            raise httpx.HTTPStatusError("400", request=request, response=response)
+        return [[float(text)] for text in batch_texts]
+
+    client._post_batch = fake_post
+    texts = [str(i) for i in range(6)]
+
+    embeddings = asyncio.run(client.embed_batch(texts))
+
+    assert embeddings == [[float(i)] for i in range(6)]
+    assert [len(batch) for batch in sent] == [6, 3, 1, 2, 3, 1, 2]
@@ -0,0 +1,121 @@
+import fitz
+
+from src.pipeline.indexing.steps.partition import UnifiedPartitionerV2
+from src.pipeline.indexing.vlm_budget import (
+    PLAN_FULL_PAGE_VLM,
+    PLAN_TEXT_ONLY,
+    PLAN_TEXT_WITH_IMAGE_CAPTION,
+    VLMBudgetPlanner,
+    compute_image_coverage,
+    score_text_quality,
+)
+
+
+def _page(**overrides):
+    info = {
+        "needs_extraction": True,
+        "meaningful_images": 0,
+        "has_vector_drawings": False,
+        "complexity": "simple",
+        "text_quality": 1.0,
+        "image_coverage": 0.0,
+        "table_confidence": 1.0,
+    }
+    info.update(overrides)
+    return info
+
+
+def test_text_quality_penalises_broken_encoding_and_sparse_text():
+    assert score_text_quality("") == 0.0
+    assert score_text_quality("a" * 400) == 1.0
+    assert score_text_quality("a" * 100) == 0.5
+    assert score_text_quality("�" * 200 + "a" * 200) == 0.5
+
+
+def test_image_coverage_is_clipped_to_page():
+    assert compute_image_coverage([(0, 0, 50, 100)], 100, 100) == 0.5
+    assert compute_image_coverage([(-50, -50, 500, 500)], 100, 100) == 1.0
+    assert compute_image_coverage([], 100, 100) == 0.0
+
+
+def test_desired_plan_per_page_type():
+    planner = VLMBudgetPlanner({})
+    assert planner.desired_plan(_page(needs_extraction=False)) == PLAN_TEXT_ONLY
+    # Good text layer plus one small photo -> caption the photo only
+    assert planner.desired_plan(_page(meaningful_images=1, image_coverage=0.15)) == PLAN_TEXT_WITH_IMAGE_CAPTION
+    # Clean table on a text page -> no VLM
+    assert planner.desired_plan(_page(table_confidence=0.9)) == PLAN_TEXT_ONLY
+    assert planner.desired_plan(_page(table_count=1, table_confidence=0.9, text_quality=0.3)) == PLAN_TEXT_ONLY
+    # Drawings, poor text layers, messy tables and image-dominated pages -> full page
+    assert planner.desired_plan(_page(has_vector_drawings=True)) == PLAN_FULL_PAGE_VLM
+    assert planner.desired_plan(_page(text_quality=0.2)) == PLAN_FULL_PAGE_VLM
+    assert planner.desired_plan(_page(table_confidence=0.3)) == PLAN_FULL_PAGE_VLM
+    assert planner.desired_plan(_page(meaningful_images=2, image_coverage=0.8)) == PLAN_FULL_PAGE_VLM
+
+
+def test_disabled_planner_keeps_legacy_full_page_behaviour():
+    planner = VLMBudgetPlanner({"enabled": False})
+    assert planner.desired_plan(_page(meaningful_images=1, image_coverage=0.1)) == PLAN_FULL_PAGE_VLM
+
+
+def test_budget_spent_on_most_visual_pages_first():
+    planner = VLMBudgetPlanner({"max_vlm_calls": 2, "full_page_tokens": 100, "image_caption_tokens": 50})
+    pages = {
+        1: _page(text_quality=0.1),
+        2: _page(has_vector_drawings=True, text_quality=0.0),
+        3: _page(text_quality=0.3, meaningful_images=2, image_coverage=0.3),
+        4: _page(needs_extraction=False),
+    }
+    summary = planner.plan_document(pages)
+
+    assert pages[2]["vlm_plan"] == PLAN_FULL_PAGE_VLM
+    assert pages[1]["vlm_plan"] == PLAN_FULL_PAGE_VLM
+    assert pages[3]["vlm_plan"] == PLAN_TEXT_ONLY
+    assert pages[3]["needs_extraction"] is False
+    assert pages[4]["vlm_plan"] == PLAN_TEXT_ONLY
+    assert summary["estimated_vlm_calls"] == 2
+    assert summary["estimated_vlm_tokens"] == 200
+    assert summary["downgraded_pages"] == [3]
+
+
+def test_token_budget_downgrades_full_page_to_image_caption():
+    planner = VLMBudgetPlanner({"max_vlm_tokens": 150, "full_page_tokens": 100, "image_caption_tokens": 40})
+    pages = {
+        1: _page(text_quality=0.2, meaningful_images=1, image_coverage=0.2),
+        2: _page(text_quality=0.4, meaningful_images=1, image_coverage=0.2),
+    }
+    summary = planner.plan_document(pages)
+
+    assert pages[1]["vlm_plan"] == PLAN_FULL_PAGE_VLM
+    assert pages[2]["vlm_plan"] == PLAN_TEXT_WITH_IMAGE_CAPTION
+    assert summary["estimated_vlm_tokens"] == 140
+
+
+def test_partitioner_keeps_text_layer_on_caption_pages(tmp_path):
+    # One text-rich page with two photos covering a small part of the page
+    pdf_path = tmp_path / "spec.pdf"
+    doc = fitz.open()
+    page = doc.new_page(width=595, height=842)
+    body = "Facaden udfoeres i tegl med isolering og ventileret hulrum. " * 12
+    page.insert_textbox(fitz.Rect(40, 40, 555, 400), body, fontsize=10)
+    pix = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 300, 200), 0)
+    pix.clear_with(200)
+    page.insert_image(fitz.Rect(40, 450, 190, 550), pixmap=pix)
+    page.insert_image(fitz.Rect(210, 450, 360, 550), pixmap=pix)
+    doc.save(str(pdf_path))
+    doc.close()
+
+    partitioner = UnifiedPartitionerV2(str(tmp_path / "tables"), str(tmp_path / "images"))
+    stage1 = partitioner.stage1_pymupdf_analysis(str(pdf_path))
+    page_info = stage1["page_analysis"][1]
+
+    assert page_info["vlm_plan"] == PLAN_TEXT_WITH_IMAGE_CAPTION
+    assert page_info["needs_extraction"] is True
+
+    text_elements, _ = partitioner.stage2_fast_text_extraction(str(pdf_path))
+    assert any("Facaden" in el["text"] for el in text_elements)
+
+    extracted = partitioner.stage4_full_page_extraction(str(pdf_path), stage1["page_analysis"])
+    assert extracted[1]["vlm_plan"] == PLAN_TEXT_WITH_IMAGE_CAPTION
+    # Only the image region is rendered, not the whole page
+    assert extracted[1]["height"] < 842
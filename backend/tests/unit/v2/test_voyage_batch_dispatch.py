@@ -0,0 +1,183 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.pipeline.indexing.steps.embedding import EmbeddingStep, VoyageBatchError, VoyageEmbeddingClient
+
+
+class FakeVoyage:
+    """Local stand-in for the Voyage embeddings endpoint"""
+
+    def __init__(self, latency=0.05):
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests = []
+        self.client_ports = set()
+        self.flaky_failures = {}  # text -> remaining 503s
+        self.broken = set()  # texts that always get a 400
+
+    def handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                texts = body["input"]
+                with fake.lock:
+                    fake.requests.append(texts)
+                    fake.client_ports.add(self.client_address[1])
+                    fake.in_flight += 1
+                    fake.max_in_flight = max(fake.max_in_flight, fake.in_flight)
+                    status = 200
+                    if any(text in fake.broken for text in texts):
+                        status = 400
+                    for text in texts:
+                        if fake.flaky_failures.get(text):
+                            fake.flaky_failures[text] -= 1
+                            status = 503
+                time.sleep(fake.latency)
+                with fake.lock:
+                    fake.in_flight -= 1
+
+                if status == 200:
+                    payload = {
+                        "data": [
+                            {"index": i, "embedding": [float(text.split()[-1]), 1.0]} for i, text in enumerate(texts)
+                        ]
+                    }
+                else:
+                    payload = {"detail": "fake failure"}
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+
+@pytest.fixture
+def fake_voyage():
+    fake = FakeVoyage()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), fake.handler())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    fake.url = f"http://127.0.0.1:{server.server_address[1]}/v1/embeddings"
+    yield fake
+    server.shutdown()
+    server.server_close()
+
+
+def _client(fake, **kwargs):
+    return VoyageEmbeddingClient(
+        api_key="test", model="voyage-multilingual-2", base_url=fake.url, retry_delay=0.0, **kwargs
+    )
+
+
+def _texts(n):
+    return [f"chunk {i}" for i in range(n)]
+
+
+def test_batches_run_concurrently_over_pooled_connections_in_order(fake_voyage):
+    fake_voyage.latency = 0.1
+    client = _client(fake_voyage, max_concurrency=4)
+
+    async def run():
+        try:
+            return await client.get_embeddings(_texts(40), batch_size=2)
+        finally:
+            await client.aclose()
+
+    started = time.perf_counter()
+    embeddings = asyncio.run(run())
+    elapsed = time.perf_counter() - started
+
+    assert [e[0] for e in embeddings] == [float(i) for i in range(40)]
+    assert len(fake_voyage.requests) == 20
+    assert 1 < fake_voyage.max_in_flight <= 4
+    # Connections are reused instead of one per batch
+    assert len(fake_voyage.client_ports) <= 4
+    # 20 sequential batches would take >= 2s
+    assert elapsed < 20 * fake_voyage.latency
+
+
+def test_transient_failure_retries_only_that_batch(fake_voyage):
+    fake_voyage.flaky_failures["chunk 7"] = 2
+    client = _client(fake_voyage, max_concurrency=3, max_retries=3)
+
+    embeddings = asyncio.run(client.get_embeddings(_texts(10), batch_size=2))
+
+    assert [e[0] for e in embeddings] == [float(i) for i in range(10)]
+    # 5 batches + 2 retries of the batch holding "chunk 7"
+    assert len(fake_voyage.requests) == 7
+    assert fake_voyage.requests.count(["chunk 6", "chunk 7"]) == 3
+
+
+def test_failed_batch_keeps_successful_embeddings(fake_voyage):
+    fake_voyage.broken.add("chunk 3")
+    client = _client(fake_voyage, max_concurrency=2)
+
+    with pytest.raises(VoyageBatchError) as exc_info:
+        asyncio.run(client.get_embeddings(_texts(6), batch_size=2))
+
+    error = exc_info.value
+    assert error.failed_batches == [1]
+    assert [e[0] if e else None for e in error.embeddings] == [0.0, 1.0, None, None, 4.0, 5.0]
+    # 400 is not retried
+    assert len(fake_voyage.requests) == 3
+
+
+def _embedding_step(client):
+    # Bypass __init__ (needs database and settings); only generate_embeddings is exercised
+    step = EmbeddingStep.__new__(EmbeddingStep)
+    step.voyage_client = client
+    step.embedding_queue = None
+    step.batch_size = 2
+    step.max_retries = client.max_retries
+    return step
+
+
+def test_generate_embeddings_keeps_successful_batches(fake_voyage):
+    fake_voyage.broken.add("chunk 3")
+    step = _embedding_step(_client(fake_voyage, max_concurrency=2))
+
+    embeddings = asyncio.run(step.generate_embeddings([{"content": text} for text in _texts(6)]))
+
+    assert [e[0] if e else None for e in embeddings] == [0.0, 1.0, None, None, 4.0, 5.0]
+    assert len(fake_voyage.requests) == 3
+
+
+def test_generate_embeddings_retries_each_batch_only_in_the_client(fake_voyage):
+    fake_voyage.flaky_failures["chunk 3"] = 10
+    step = _embedding_step(_client(fake_voyage, max_concurrency=2, max_retries=3))
+
+    embeddings = asyncio.run(step.generate_embeddings([{"content": text} for text in _texts(6)]))
+
+    assert [e[0] if e else None for e in embeddings] == [0.0, 1.0, None, None, 4.0, 5.0]
+    # max_retries attempts in total, not max_retries per step attempt
+    assert fake_voyage.requests.count(["chunk 2", "chunk 3"]) == 3
+
+
+def test_client_closes_its_connection_pool_on_exit(fake_voyage):
+    async def run():
+        async with _client(fake_voyage) as client:
+            await client.get_embeddings(_texts(2))
+            pool = client._client
+        return client, pool
+
+    client, pool = asyncio.run(run())
+
+    assert pool.is_closed
+    assert client._client is None
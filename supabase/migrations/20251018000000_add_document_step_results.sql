@@ -0,0 +1,74 @@
+-- Append-only per-document step results
+-- Each pipeline step of each document inserts one small row instead of reading,
+-- mutating and rewriting the whole documents.step_results JSONB blob (which grew
+-- with every step and lost updates when two writers raced on the same document).
+
+CREATE TABLE IF NOT EXISTS document_step_results (
+    id BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    document_id UUID NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+    indexing_run_id UUID REFERENCES indexing_runs(id) ON DELETE CASCADE,
+    step_name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    duration_seconds DOUBLE PRECISION,
+    summary_stats JSONB DEFAULT '{}',
+    error_message TEXT,
+    started_at TIMESTAMP WITH TIME ZONE,
+    completed_at TIMESTAMP WITH TIME ZONE,
+    result JSONB NOT NULL DEFAULT '{}',
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_document_step_results_document_step
+    ON document_step_results(document_id, step_name, id DESC);
+CREATE INDEX IF NOT EXISTS idx_document_step_results_indexing_run_id
+    ON document_step_results(indexing_run_id);
+
+-- Latest result per document and step (retries append new rows)
+CREATE OR REPLACE VIEW document_step_results_latest
+WITH (security_invoker = true) AS
+SELECT DISTINCT ON (document_id, step_name)
+    id, document_id, indexing_run_id, step_name, status, duration_seconds,
+    summary_stats, error_message, started_at, completed_at, result, created_at
+FROM document_step_results
+ORDER BY document_id, step_name, id DESC;
+
+-- Backfill from the existing JSONB blobs
+INSERT INTO document_step_results (
+    document_id, step_name, status, duration_seconds, summary_stats,
+    error_message, started_at, completed_at, result
+)
+SELECT
+    d.id,
+    s.key,
+    COALESCE(s.value ->> 'status', 'completed'),
+    (s.value ->> 'duration_seconds')::DOUBLE PRECISION,
+    COALESCE(s.value -> 'summary_stats', '{}'::jsonb),
+    s.value ->> 'error_message',
+    (s.value ->> 'started_at')::TIMESTAMP WITH TIME ZONE,
+    (s.value ->> 'completed_at')::TIMESTAMP WITH TIME ZONE,
+    s.value
+FROM documents d, jsonb_each(d.step_results) s
+WHERE d.step_results IS NOT NULL
+  AND d.step_results != '{}'
+  AND jsonb_typeof(s.value) = 'object'
+  AND NOT EXISTS (SELECT 1 FROM document_step_results r WHERE r.document_id = d.id);
+
+-- Visible whenever the parent document is visible (writes go through the service role)
+ALTER TABLE public.document_step_results ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS document_step_results_select_policy ON public.document_step_results;
+CREATE POLICY document_step_results_select_policy ON public.document_step_results
+FOR SELECT
+USING (
+  EXISTS (
+    SELECT 1 FROM public.documents d
+    WHERE d.id = document_step_results.document_id AND (
+      d.access_level = 'public'
+      OR (d.access_level = 'auth' AND current_setting('request.jwt.claims', true)::jsonb ? 'sub')
+      OR (d.user_id IS NOT NULL AND d.user_id::text = coalesce((current_setting('request.jwt.claims', true)::jsonb ->> 'sub')::text, ''))
+    )
+  )
+);
+
+COMMENT ON TABLE document_step_results IS 'Append-only pipeline step results per document; supersedes documents.step_results';
+COMMENT ON VIEW document_step_results_latest IS 'Latest step result per (document_id, step_name)';
@@ -0,0 +1,102 @@
+-- Access-filtered vector search
+-- Date: 2025-10-19
+-- Description: match_accessible_chunks applies chunk visibility inside Postgres while
+-- walking the HNSW index, instead of the API fetching every accessible document id
+-- and filtering the 15 rows match_chunks returned in Python. The visibility rules
+-- are those of chunks_select_policy, evaluated for the caller's JWT:
+--   - a chunk is visible if its document is visible (public, auth + signed in, owner)
+--   - or if its indexing run is visible (public email upload, auth + signed in,
+--     run owner, or owner of the run's project)
+--   - service_role callers (pipelines, admin tools) see everything, as with RLS
+-- With pgvector >= 0.8 the scan is iterative (hnsw.iterative_scan = relaxed_order):
+-- it keeps reading the index until match_count permitted rows are found, so a
+-- selective filter no longer shrinks the result below k.
+
+CREATE OR REPLACE FUNCTION public.match_accessible_chunks (
+  query_embedding vector(1024),
+  match_count int DEFAULT 15,
+  indexing_run_id_filter uuid DEFAULT null,
+  document_ids_filter uuid[] DEFAULT null
+)
+RETURNS TABLE (
+  id uuid,
+  content text,
+  metadata jsonb,
+  embedding_1024 vector(1024),
+  document_id uuid,
+  indexing_run_id uuid,
+  similarity float
+)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, extensions
+AS $$
+DECLARE
+  claims jsonb := coalesce(nullif(current_setting('request.jwt.claims', true), '')::jsonb, '{}'::jsonb);
+  viewer text := coalesce(claims ->> 'sub', '');
+  unrestricted boolean := coalesce(claims ->> 'role', '') = 'service_role';
+BEGIN
+  BEGIN
+    PERFORM set_config('hnsw.iterative_scan', 'relaxed_order', true);
+  EXCEPTION WHEN OTHERS THEN
+    -- pgvector < 0.8 has no iterative scans: widen the candidate list instead
+    PERFORM set_config('hnsw.ef_search', least(1000, greatest(100, match_count * 10))::text, true);
+  END;
+
+  RETURN QUERY
+  WITH candidates AS MATERIALIZED (
+    SELECT
+      dc.id,
+      dc.content,
+      dc.metadata,
+      dc.embedding_1024,
+      dc.document_id,
+      dc.indexing_run_id,
+      dc.embedding_1024 <=> query_embedding AS distance
+    FROM document_chunks dc
+    WHERE
+      dc.embedding_1024 IS NOT NULL
+      AND (indexing_run_id_filter IS NULL OR dc.indexing_run_id = indexing_run_id_filter)
+      AND (document_ids_filter IS NULL OR dc.document_id = ANY (document_ids_filter))
+      AND (
+        unrestricted
+        OR EXISTS (
+          SELECT 1 FROM documents d
+          WHERE d.id = dc.document_id AND (
+            d.access_level = 'public'
+            OR (d.access_level = 'auth' AND viewer <> '')
+            OR (d.user_id IS NOT NULL AND d.user_id::text = viewer)
+          )
+        )
+        OR EXISTS (
+          SELECT 1 FROM indexing_runs r
+          WHERE r.id = dc.indexing_run_id AND (
+            (r.access_level = 'public' AND r.upload_type = 'email')
+            OR (r.access_level = 'auth' AND viewer <> '')
+            OR (r.user_id IS NOT NULL AND r.user_id::text = viewer)
+            OR (
+              r.project_id IS NOT NULL AND EXISTS (
+                SELECT 1 FROM projects p
+                WHERE p.id = r.project_id AND p.user_id::text = viewer
+              )
+            )
+          )
+        )
+      )
+    ORDER BY dc.embedding_1024 <=> query_embedding
+    LIMIT LEAST(match_count, 200)
+  )
+  -- relaxed_order may return neighbours slightly out of order; sort the k rows exactly
+  SELECT c.id, c.content, c.metadata, c.embedding_1024, c.document_id, c.indexing_run_id, 1 - c.distance
+  FROM candidates c
+  ORDER BY c.distance;
+END;
+$$;
+
+REVOKE ALL ON FUNCTION public.match_accessible_chunks FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION public.match_accessible_chunks TO authenticated;
+GRANT EXECUTE ON FUNCTION public.match_accessible_chunks TO anon;
+GRANT EXECUTE ON FUNCTION public.match_accessible_chunks TO service_role;
+
+COMMENT ON FUNCTION public.match_accessible_chunks IS
+  'K nearest chunks visible to the caller (chunks_select_policy rules), filtered during the HNSW scan.';
@@ -0,0 +1,108 @@
+-- Configurable-k access-filtered search without embeddings in the response
+-- Date: 2025-10-20
+-- Description: match_accessible_chunks returned each chunk's embedding_1024 so the
+-- API could recompute cosine similarity in Python, which made every query ship
+-- k x 1024 floats as text (~200 KB for k = 15). The similarity is already computed
+-- in Postgres, so the function now returns only id, content, metadata, document and
+-- run ids, and similarity. Callers also choose the HNSW candidate list size
+-- (hnsw.ef_search) to trade recall for latency; k remains capped at 200.
+-- Visibility rules are unchanged from 20251019000000_add_match_accessible_chunks.sql.
+
+-- The return type changes, so the old signature has to go first
+DROP FUNCTION IF EXISTS public.match_accessible_chunks(vector, int, uuid, uuid[]);
+
+CREATE OR REPLACE FUNCTION public.match_accessible_chunks (
+  query_embedding vector(1024),
+  match_count int DEFAULT 15,
+  indexing_run_id_filter uuid DEFAULT null,
+  document_ids_filter uuid[] DEFAULT null,
+  ef_search int DEFAULT null
+)
+RETURNS TABLE (
+  id uuid,
+  content text,
+  metadata jsonb,
+  document_id uuid,
+  indexing_run_id uuid,
+  similarity float
+)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, extensions
+AS $$
+DECLARE
+  claims jsonb := coalesce(nullif(current_setting('request.jwt.claims', true), '')::jsonb, '{}'::jsonb);
+  viewer text := coalesce(claims ->> 'sub', '');
+  unrestricted boolean := coalesce(claims ->> 'role', '') = 'service_role';
+  k int := least(greatest(match_count, 1), 200);
+BEGIN
+  -- The candidate list must hold at least k rows; pgvector caps ef_search at 1000
+  IF ef_search IS NOT NULL THEN
+    PERFORM set_config('hnsw.ef_search', least(1000, greatest(ef_search, k))::text, true);
+  END IF;
+
+  BEGIN
+    PERFORM set_config('hnsw.iterative_scan', 'relaxed_order', true);
+  EXCEPTION WHEN OTHERS THEN
+    -- pgvector < 0.8 has no iterative scans: widen the candidate list instead
+    IF ef_search IS NULL THEN
+      PERFORM set_config('hnsw.ef_search', least(1000, greatest(100, k * 10))::text, true);
+    END IF;
+  END;
+
+  RETURN QUERY
+  WITH candidates AS MATERIALIZED (
+    SELECT
+      dc.id,
+      dc.content,
+      dc.metadata,
+      dc.document_id,
+      dc.indexing_run_id,
+      dc.embedding_1024 <=> query_embedding AS distance
+    FROM document_chunks dc
+    WHERE
+      dc.embedding_1024 IS NOT NULL
+      AND (indexing_run_id_filter IS NULL OR dc.indexing_run_id = indexing_run_id_filter)
+      AND (document_ids_filter IS NULL OR dc.document_id = ANY (document_ids_filter))
+      AND (
+        unrestricted
+        OR EXISTS (
+          SELECT 1 FROM documents d
+          WHERE d.id = dc.document_id AND (
+            d.access_level = 'public'
+            OR (d.access_level = 'auth' AND viewer <> '')
+            OR (d.user_id IS NOT NULL AND d.user_id::text = viewer)
+          )
+        )
+        OR EXISTS (
+          SELECT 1 FROM indexing_runs r
+          WHERE r.id = dc.indexing_run_id AND (
+            (r.access_level = 'public' AND r.upload_type = 'email')
+            OR (r.access_level = 'auth' AND viewer <> '')
+            OR (r.user_id IS NOT NULL AND r.user_id::text = viewer)
+            OR (
+              r.project_id IS NOT NULL AND EXISTS (
+                SELECT 1 FROM projects p
+                WHERE p.id = r.project_id AND p.user_id::text = viewer
+              )
+            )
+          )
+        )
+      )
+    ORDER BY dc.embedding_1024 <=> query_embedding
+    LIMIT k
+  )
+  -- relaxed_order may return neighbours slightly out of order; sort the k rows exactly
+  SELECT c.id, c.content, c.metadata, c.document_id, c.indexing_run_id, 1 - c.distance
+  FROM candidates c
+  ORDER BY c.distance;
+END;
+$$;
+
+REVOKE ALL ON FUNCTION public.match_accessible_chunks FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION public.match_accessible_chunks TO authenticated;
+GRANT EXECUTE ON FUNCTION public.match_accessible_chunks TO anon;
+GRANT EXECUTE ON FUNCTION public.match_accessible_chunks TO service_role;
+
+COMMENT ON FUNCTION public.match_accessible_chunks IS
+  'K nearest chunks visible to the caller with server-side cosine similarity; k and hnsw.ef_search are caller-controlled.';
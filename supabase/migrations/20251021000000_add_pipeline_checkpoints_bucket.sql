@@ -0,0 +1,11 @@
+-- Private bucket for indexing step checkpoints
+-- The indexing orchestrator saves each document's completed step results
+-- (partition elements, page asset references, VLM captions, chunks) under
+-- index-runs/{indexing_run_id}/{document_id}/{StepName}.ckpt so a retried Beam
+-- task resumes instead of restarting the run. Checkpoints are binary and can be
+-- larger than pipeline-assets' 50MB / image+text allow-list, hence a separate bucket.
+-- No storage.objects policies are added: only the service role reads and writes it.
+
+INSERT INTO storage.buckets (id, name, public, file_size_limit, allowed_mime_types)
+VALUES ('pipeline-checkpoints', 'pipeline-checkpoints', false, 524288000, ARRAY['application/octet-stream'])
+ON CONFLICT (id) DO NOTHING;
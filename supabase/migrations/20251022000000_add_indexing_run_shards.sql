@@ -0,0 +1,67 @@
+-- Indexing run shards
+-- Date: 2025-10-22
+-- Description: Large indexing runs are split into shards (groups of documents, or
+-- page ranges of one very large PDF) that run as separate Beam tasks. Each shard
+-- has one row here. complete_indexing_run_shard records a shard's outcome and
+-- returns how many shards are still pending or running; completions of one run are
+-- serialized on the indexing_runs row, so exactly one caller sees 0 and merges the
+-- run's final status. A shard that already completed returns -1 (duplicate
+-- delivery or a retried task), so a run is never finalized twice.
+
+CREATE TABLE IF NOT EXISTS indexing_run_shards (
+    indexing_run_id UUID NOT NULL REFERENCES indexing_runs(id) ON DELETE CASCADE,
+    shard_index INTEGER NOT NULL,
+    document_ids UUID[] NOT NULL,
+    page_start INTEGER,
+    page_end INTEGER,
+    status TEXT NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'running', 'completed', 'failed')),
+    document_results JSONB NOT NULL DEFAULT '{}',
+    error_message TEXT,
+    started_at TIMESTAMP WITH TIME ZONE,
+    completed_at TIMESTAMP WITH TIME ZONE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (indexing_run_id, shard_index)
+);
+
+-- Written and read by the indexing pipeline (service role) only
+ALTER TABLE indexing_run_shards ENABLE ROW LEVEL SECURITY;
+
+CREATE OR REPLACE FUNCTION public.complete_indexing_run_shard (
+  run_id uuid,
+  shard integer,
+  shard_status text,
+  results jsonb DEFAULT '{}'::jsonb,
+  error text DEFAULT null
+)
+RETURNS integer
+LANGUAGE plpgsql
+SET search_path = public
+AS $$
+DECLARE
+  remaining integer;
+BEGIN
+  PERFORM 1 FROM indexing_runs WHERE id = run_id FOR UPDATE;
+
+  UPDATE indexing_run_shards
+  SET status = shard_status,
+      document_results = coalesce(results, '{}'::jsonb),
+      error_message = error,
+      completed_at = now()
+  WHERE indexing_run_id = run_id
+    AND shard_index = shard
+    AND status NOT IN ('completed', 'failed');
+
+  IF NOT FOUND THEN
+    RETURN -1;
+  END IF;
+
+  SELECT count(*) INTO remaining
+  FROM indexing_run_shards
+  WHERE indexing_run_id = run_id AND status NOT IN ('completed', 'failed');
+
+  RETURN remaining;
+END;
+$$;
+
+REVOKE ALL ON FUNCTION public.complete_indexing_run_shard FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.complete_indexing_run_shard TO service_role;
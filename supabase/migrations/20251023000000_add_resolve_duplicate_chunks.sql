@@ -0,0 +1,75 @@
+-- Link deduplicated chunks to their canonical chunk
+-- Date: 2025-10-23
+-- Description: Chunks that repeat an earlier chunk of the same indexing run are
+-- stored with metadata.duplicate_of = {chunk_id, document_id, similarity}, keep a
+-- NULL embedding_1024 and are not sent to Voyage, so the HNSW index holds one
+-- vector per duplicate group. The canonical chunk's row id is not known while
+-- chunking (chunk_id is), so resolve_duplicate_chunks adds it as
+-- metadata.duplicate_of.id once the run's documents are stored. That id is the
+-- back-reference match_accessible_chunks uses to return the group once, with the
+-- duplicates' documents and pages for citation. Duplicates whose canonical chunk
+-- has no embedding (its document failed) lose the duplicate_of mark and are
+-- returned, so the pipeline embeds them itself.
+
+CREATE OR REPLACE FUNCTION public.resolve_duplicate_chunks (
+  run_id uuid,
+  document_ids uuid[]
+)
+RETURNS TABLE (id uuid, document_id uuid, content text)
+LANGUAGE plpgsql
+SET search_path = public
+AS $$
+BEGIN
+  UPDATE document_chunks d
+  SET metadata = jsonb_set(d.metadata, '{duplicate_of,id}', to_jsonb(c.id::text))
+  FROM document_chunks c
+  WHERE d.indexing_run_id = run_id
+    AND d.document_id = ANY(document_ids)
+    AND d.embedding_1024 IS NULL
+    AND d.metadata ? 'duplicate_of'
+    AND NOT (d.metadata->'duplicate_of' ? 'id')
+    AND c.indexing_run_id = run_id
+    AND c.document_id = (d.metadata->'duplicate_of'->>'document_id')::uuid
+    AND c.chunk_id = d.metadata->'duplicate_of'->>'chunk_id'
+    AND c.embedding_1024 IS NOT NULL;
+
+  RETURN QUERY
+  UPDATE document_chunks d
+  SET metadata = d.metadata - 'duplicate_of'
+  WHERE d.indexing_run_id = run_id
+    AND d.document_id = ANY(document_ids)
+    AND d.embedding_1024 IS NULL
+    AND d.metadata ? 'duplicate_of'
+    AND NOT (d.metadata->'duplicate_of' ? 'id')
+  RETURNING d.id, d.document_id, d.content;
+END;
+$$;
+
+REVOKE ALL ON FUNCTION public.resolve_duplicate_chunks FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.resolve_duplicate_chunks TO service_role;
+
+-- Duplicates are looked up by their canonical chunk's id at query time
+CREATE INDEX IF NOT EXISTS idx_document_chunks_duplicate_of
+  ON document_chunks ((metadata->'duplicate_of'->>'id'))
+  WHERE metadata ? 'duplicate_of';
+
+-- Backfill duplicates stored before this function existed
+UPDATE document_chunks d
+SET metadata = jsonb_set(d.metadata, '{duplicate_of,id}', to_jsonb(c.id::text))
+FROM document_chunks c
+WHERE d.embedding_1024 IS NULL
+  AND d.metadata ? 'duplicate_of'
+  AND NOT (d.metadata->'duplicate_of' ? 'id')
+  AND c.indexing_run_id = d.indexing_run_id
+  AND c.document_id = (d.metadata->'duplicate_of'->>'document_id')::uuid
+  AND c.chunk_id = d.metadata->'duplicate_of'->>'chunk_id'
+  AND c.embedding_1024 IS NOT NULL;
+
+-- Duplicates of finished runs whose canonical chunk was never embedded become
+-- regular chunks, so re-indexing their document embeds them
+UPDATE document_chunks
+SET metadata = metadata - 'duplicate_of'
+WHERE embedding_1024 IS NULL
+  AND metadata ? 'duplicate_of'
+  AND NOT (metadata->'duplicate_of' ? 'id')
+  AND indexing_run_id IN (SELECT id FROM indexing_runs WHERE status IN ('completed', 'failed'));
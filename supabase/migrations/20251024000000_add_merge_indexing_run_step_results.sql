@@ -0,0 +1,26 @@
+-- Merge run-level step results atomically
+-- Date: 2025-10-24
+-- Description: Run-level step results (batch step progress, admission decisions,
+-- resource usage, the sharding summary) were written by reading
+-- indexing_runs.step_results, adding one entry and writing the whole object back.
+-- The shards of a run write to the same row concurrently, so one shard's entries
+-- overwrote another's. merge_indexing_run_step_results merges the given entries
+-- into step_results in one statement (later entries win per key) and returns the
+-- merged object, or null if the run does not exist.
+
+CREATE OR REPLACE FUNCTION public.merge_indexing_run_step_results (
+  run_id uuid,
+  entries jsonb
+)
+RETURNS jsonb
+LANGUAGE sql
+SET search_path = public
+AS $$
+  UPDATE indexing_runs
+  SET step_results = coalesce(step_results, '{}'::jsonb) || coalesce(entries, '{}'::jsonb)
+  WHERE id = run_id
+  RETURNING step_results;
+$$;
+
+REVOKE ALL ON FUNCTION public.merge_indexing_run_step_results FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.merge_indexing_run_step_results TO service_role;
@@ -0,0 +1,158 @@
+-- One search hit per duplicate group
+-- Date: 2025-10-25
+-- Description: Deduplicated chunks keep a NULL embedding and point at their
+-- canonical chunk through metadata.duplicate_of.id (20251023000000), so the
+-- index never returns the same boilerplate several times. match_accessible_chunks
+-- now resolves citations through that back-reference:
+--   - a canonical chunk matches document_ids_filter, and is visible to the caller,
+--     if the chunk itself or one of its duplicates is
+--   - each hit lists its visible duplicates (id, document_id, page_number) in the
+--     new duplicates column, so the answer can cite every document the text is in
+-- k, ef_search and the visibility rules are unchanged from 20251020000000.
+
+-- The return type changes, so the old signature has to go first
+DROP FUNCTION IF EXISTS public.match_accessible_chunks(vector, int, uuid, uuid[], int);
+
+-- Visibility rules of chunks_select_policy for one chunk (document or indexing run)
+CREATE OR REPLACE FUNCTION public.chunk_visible_to (
+  chunk_document_id uuid,
+  chunk_indexing_run_id uuid,
+  viewer text
+)
+RETURNS boolean
+LANGUAGE sql
+STABLE
+SET search_path = public
+AS $$
+  SELECT
+    EXISTS (
+      SELECT 1 FROM documents d
+      WHERE d.id = chunk_document_id AND (
+        d.access_level = 'public'
+        OR (d.access_level = 'auth' AND viewer <> '')
+        OR (d.user_id IS NOT NULL AND d.user_id::text = viewer)
+      )
+    )
+    OR EXISTS (
+      SELECT 1 FROM indexing_runs r
+      WHERE r.id = chunk_indexing_run_id AND (
+        (r.access_level = 'public' AND r.upload_type = 'email')
+        OR (r.access_level = 'auth' AND viewer <> '')
+        OR (r.user_id IS NOT NULL AND r.user_id::text = viewer)
+        OR (
+          r.project_id IS NOT NULL AND EXISTS (
+            SELECT 1 FROM projects p
+            WHERE p.id = r.project_id AND p.user_id::text = viewer
+          )
+        )
+      )
+    );
+$$;
+
+REVOKE ALL ON FUNCTION public.chunk_visible_to FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.chunk_visible_to TO service_role;
+
+CREATE OR REPLACE FUNCTION public.match_accessible_chunks (
+  query_embedding vector(1024),
+  match_count int DEFAULT 15,
+  indexing_run_id_filter uuid DEFAULT null,
+  document_ids_filter uuid[] DEFAULT null,
+  ef_search int DEFAULT null
+)
+RETURNS TABLE (
+  id uuid,
+  content text,
+  metadata jsonb,
+  document_id uuid,
+  indexing_run_id uuid,
+  similarity float,
+  duplicates jsonb
+)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, extensions
+AS $$
+DECLARE
+  claims jsonb := coalesce(nullif(current_setting('request.jwt.claims', true), '')::jsonb, '{}'::jsonb);
+  viewer text := coalesce(claims ->> 'sub', '');
+  unrestricted boolean := coalesce(claims ->> 'role', '') = 'service_role';
+  k int := least(greatest(match_count, 1), 200);
+BEGIN
+  -- The candidate list must hold at least k rows; pgvector caps ef_search at 1000
+  IF ef_search IS NOT NULL THEN
+    PERFORM set_config('hnsw.ef_search', least(1000, greatest(ef_search, k))::text, true);
+  END IF;
+
+  BEGIN
+    PERFORM set_config('hnsw.iterative_scan', 'relaxed_order', true);
+  EXCEPTION WHEN OTHERS THEN
+    -- pgvector < 0.8 has no iterative scans: widen the candidate list instead
+    IF ef_search IS NULL THEN
+      PERFORM set_config('hnsw.ef_search', least(1000, greatest(100, k * 10))::text, true);
+    END IF;
+  END;
+
+  RETURN QUERY
+  WITH candidates AS MATERIALIZED (
+    SELECT
+      dc.id,
+      dc.content,
+      dc.metadata,
+      dc.document_id,
+      dc.indexing_run_id,
+      dc.embedding_1024 <=> query_embedding AS distance
+    FROM document_chunks dc
+    WHERE
+      dc.embedding_1024 IS NOT NULL
+      AND (indexing_run_id_filter IS NULL OR dc.indexing_run_id = indexing_run_id_filter)
+      AND (
+        (
+          (document_ids_filter IS NULL OR dc.document_id = ANY (document_ids_filter))
+          AND (unrestricted OR chunk_visible_to(dc.document_id, dc.indexing_run_id, viewer))
+        )
+        OR EXISTS (
+          SELECT 1 FROM document_chunks dup
+          WHERE dup.metadata->'duplicate_of'->>'id' = dc.id::text
+            AND dup.metadata ? 'duplicate_of'
+            AND (document_ids_filter IS NULL OR dup.document_id = ANY (document_ids_filter))
+            AND (unrestricted OR chunk_visible_to(dup.document_id, dup.indexing_run_id, viewer))
+        )
+      )
+    ORDER BY dc.embedding_1024 <=> query_embedding
+    LIMIT k
+  )
+  -- relaxed_order may return neighbours slightly out of order; sort the k rows exactly
+  SELECT
+    c.id,
+    c.content,
+    c.metadata,
+    c.document_id,
+    c.indexing_run_id,
+    1 - c.distance,
+    (
+      SELECT coalesce(
+        jsonb_agg(jsonb_build_object(
+          'id', dup.id,
+          'document_id', dup.document_id,
+          'page_number', dup.metadata->'page_number'
+        ) ORDER BY dup.document_id, dup.metadata->'page_number'),
+        '[]'::jsonb
+      )
+      FROM document_chunks dup
+      WHERE dup.metadata->'duplicate_of'->>'id' = c.id::text
+        AND dup.metadata ? 'duplicate_of'
+        AND (unrestricted OR chunk_visible_to(dup.document_id, dup.indexing_run_id, viewer))
+    )
+  FROM candidates c
+  ORDER BY c.distance;
+END;
+$$;
+
+REVOKE ALL ON FUNCTION public.match_accessible_chunks FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION public.match_accessible_chunks TO authenticated;
+GRANT EXECUTE ON FUNCTION public.match_accessible_chunks TO anon;
+GRANT EXECUTE ON FUNCTION public.match_accessible_chunks TO service_role;
+
+COMMENT ON FUNCTION public.match_accessible_chunks IS
+  'K nearest chunks visible to the caller, one per duplicate group with its duplicates for citation; '
+  'k and hnsw.ef_search are caller-controlled.';
@@ -0,0 +1,15 @@
+-- Heartbeat of running indexing run shards
+-- Date: 2025-10-26
+-- Description: A shard task that dies without reporting (out of memory, preempted
+-- container) never calls complete_indexing_run_shard, so its run stayed 'running'
+-- forever. Running shards now refresh heartbeat_at every minute; the shard reaper
+-- (ShardCoordinator.reap_stale_shards, run when a shard completes and on a schedule)
+-- records shards with a stale heartbeat, or that never started, as failed, and the
+-- last one finalizes the run.
+
+ALTER TABLE indexing_run_shards ADD COLUMN IF NOT EXISTS heartbeat_at TIMESTAMP WITH TIME ZONE;
+
+-- The reaper looks up unfinished shards across runs
+CREATE INDEX IF NOT EXISTS idx_indexing_run_shards_unfinished
+  ON indexing_run_shards (indexing_run_id)
+  WHERE status IN ('pending', 'running');
@@ -0,0 +1,23 @@
+-- Resource usage time series of indexing runs
+-- Date: 2025-10-27
+-- Description: The sampled CPU/RSS/FD/thread time series of a run (up to 500
+-- points per run or shard) was stored in indexing_runs.step_results, which every
+-- progress poll reads. The run step result now keeps mean and peak per metric,
+-- and the time series is one row here per run (or per shard of a sharded run).
+
+CREATE TABLE IF NOT EXISTS indexing_run_resource_usage (
+    id BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    indexing_run_id UUID NOT NULL REFERENCES indexing_runs(id) ON DELETE CASCADE,
+    shard_index INTEGER,
+    points JSONB NOT NULL DEFAULT '[]',
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_indexing_run_resource_usage_indexing_run_id
+    ON indexing_run_resource_usage(indexing_run_id);
+
+-- Written and read by the indexing pipeline (service role) only
+ALTER TABLE indexing_run_resource_usage ENABLE ROW LEVEL SECURITY;
+
+COMMENT ON TABLE indexing_run_resource_usage IS
+  'Sampled resource usage time series per indexing run or shard (t, cpu_percent, rss_mb, open_fds, threads)';